@@ -0,0 +1,266 @@
+"""
+# *******************************<><><><><>************************************
+# *  FireCommander 2020 - An Interactive Joint Perception-Action Environment  *
+# *******************************<><><><><>************************************
+#
+# Properties of CORE Robotics Lab
+#	- Institute for Robotics & Intelligent Machines (IRIM), Georgia Institute
+#		of Technology, Atlanta, GA, United States, 30332
+#
+# Authors
+#	- Esmaeil Seraj* <IRIM, School of ECE, Georgia Tech - eseraj3@gatech.edu>
+#	- Xiyang Wu <School of ECE, Georgia Tech - xwu391@gatech.edu>
+#	- Matthew Gombolay (Ph.D) <IRIM, School of IC, Georgia Tech>
+#
+#	- *Esmaeil Seraj >> Author to whom any correspondences shall be forwarded
+#
+# Dependencies and Tutorials
+#	- GitHub: ................... https://github.com/EsiSeraj/FireCommander2020
+#	- Documentation (arXiv): .................................. [Add_Link_Here]
+#	- PPT Tutorial: ........................................... [Add_Link_Here]
+#	- Video Tutorial: ............................ https://youtu.be/UQsWPh9c3eM
+#	- Supported by Python 3.6.4 and PyGame 1.9.6 (or any later version)
+#
+# Licence
+# - (C) CORE Robotics Lab. All Rights Reserved - FireCommander 2020 (TM)
+#
+# - <FireCommander 2020 - An Interactive Joint Perception-Action Robotics Game>
+#	Copyright (C) <2020> <Esmaeil Seraj, Xiyang Wu and Matthew C. Gombolay>
+#
+#	This program is free software; you can redistribute it and/or modify it
+# 	under the terms of the GNU General Public License as published by the
+# 	Free Software Foundation; either version 3.0 of the License, or (at your
+# 	option) any later version.
+#
+# 	This program is distributed in the hope that it will be useful, but
+# 	WITHOUT ANY WARRANTY; without even the implied warranty of
+# 	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+# 	Public License for more details. 
+#
+#	You should have received a copy of the
+# 	GNU General Public License along with this program; if not, write to the
+# 	Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# 	MA  02110-1301, USA.
+#
+"""
+
+
+
+import json
+import os
+import pickle
+import numpy as np
+from Dependencies.SessionLogger import load_Session_Data
+
+
+# The fields of the dataset: the columns of each row and the meaning of the row key
+# Every row also has a frame (the index of the simulation tick, with the same convention as the animation replay) and all the rows of an
+# episode are sorted by (frame, key), so a frame range of a field is a contiguous slice
+DATASET_FIELDS = {
+    'frames': {'columns': ['time'], 'key': 'none'},
+    'agent_states': {'columns': ['x', 'y', 'z', 'velocity_x', 'velocity_y', 'velocity_z', 'goal_index', 'time', 'type', 'index', 'distance',
+                                 'waiting_time', 'water_tank', 'move_flag', 'patrolling_flag', 'patrolling_goal'], 'key': 'agent'},
+    'fire_states': {'columns': ['x', 'y', 'intensity', 'time'], 'key': 'fire_region'},
+    'sensed_fire': {'columns': ['x', 'y', 'intensity', 'velocity'], 'key': 'sensing_agent'},
+    'sensing_com': {'columns': ['x', 'y', 'max_intensity', 'velocity'], 'key': 'sensing_agent'},
+    'pruned_fire': {'columns': ['x', 'y', 'intensity', 'agent_x', 'agent_y', 'time'], 'key': 'pruning_agent'},
+    'user_data': {'columns': ['x', 'y', 'time', 'action', 'goal_index'], 'key': 'agent'}}
+
+
+# Find the recorded sessions (the open world sessions are listed as scenario 0)
+# Input value: the directory of the Open_World_Data and Scenario_Data folders
+# Output value: list of (scenario index, user name, data directory)
+def find_Sessions(root_Dir='Dependencies'):
+    sessions = []
+    open_World_Dir = os.path.join(root_Dir, 'Open_World_Data')
+    if os.path.isdir(open_World_Dir):
+        for user in sorted(os.listdir(open_World_Dir)):
+            sessions.append((0, user, os.path.join(open_World_Dir, user)))
+
+    scenario_Data_Dir = os.path.join(root_Dir, 'Scenario_Data')
+    if os.path.isdir(scenario_Data_Dir):
+        for scenario in sorted(os.listdir(scenario_Data_Dir)):
+            if scenario.startswith('Scenario#') and scenario[9:].isdigit():
+                for user in sorted(os.listdir(os.path.join(scenario_Data_Dir, scenario))):
+                    sessions.append((int(scenario[9:]), user, os.path.join(scenario_Data_Dir, scenario, user)))
+
+    # Only the directories holding a recorded session
+    return [session for session in sessions if os.path.exists(os.path.join(session[2], 'Background_Info.pkl'))]
+
+
+# Offline converter of the recorded sessions into a columnar dataset
+# For each field, the rows of all the episodes are stored in one contiguous array (<field>.npy, float64 [rows, columns]) together with the
+# frame (<field>_frame.npy, int32) and the key (<field>_key.npy, int16) of each row and the first row of each episode
+# (<field>_offsets.npy, int64 [episodes + 1]). The manifest.json lists the episodes (scenario, user, number of frames, settings) and the
+# fields.
+class DemoDatasetBuilder(object):
+    def __init__(self):
+        self.episodes = []
+        self.field_Rows = {name: [] for name in DATASET_FIELDS}
+
+    # Add all the recorded sessions found under a directory
+    def add_All(self, root_Dir='Dependencies'):
+        for scenario, user, data_Dir in find_Sessions(root_Dir):
+            self.add_Session(data_Dir, scenario, user)
+
+        return len(self.episodes)
+
+    # Add one recorded session as an episode
+    # Input value: the data directory of the session, the scenario index, the user name
+    def add_Session(self, data_Dir, scenario, user):
+        with open(data_Dir + '/Background_Info.pkl', 'rb') as file_IO:
+            [environment_para, robo_team_para, set_loci, adv_setting, agent_Radius, agent_FOV, state_List_Size] = pickle.load(file_IO)
+        user_Data = []
+        if os.path.exists(data_Dir + '/User_Data.pkl'):
+            with open(data_Dir + '/User_Data.pkl', 'rb') as file_IO:
+                user_Data = pickle.load(file_IO)
+        session_Data = load_Session_Data(data_Dir)
+
+        fields = self.episode_Rows(session_Data, user_Data, set_loci, state_List_Size)
+        for name in DATASET_FIELDS:
+            self.field_Rows[name].append(fields[name])
+
+        self.episodes.append({'scenario': scenario, 'user': user, 'num_frames': int(len(fields['frames'][0])), 'source': data_Dir,
+                              'environment_para': environment_para, 'robo_team_para': robo_team_para})
+
+    # Convert the stored lists of a session into the rows of each field
+    # Output value: {field: (data [rows, columns], frame [rows], key [rows])}, sorted by (frame, key)
+    @staticmethod
+    def episode_Rows(session_Data, user_Data, set_loci, state_List_Size):
+        rows = {name: ([], [], []) for name in DATASET_FIELDS}
+
+        def add(name, data, frame, key):
+            rows[name][0].append(np.asarray(data, dtype=float).reshape(-1, len(DATASET_FIELDS[name]['columns'])))
+            rows[name][1].append(np.broadcast_to(np.asarray(frame, dtype=np.int32), (len(rows[name][0][-1]),)))
+            rows[name][2].append(np.full(len(rows[name][0][-1]), key, dtype=np.int16))
+
+        # The time (100ms) of each frame, from the agent base records (one per frame after the initial one)
+        agent_Base_Loci = session_Data.get('Agent_Base_Loci', [[]])[0]
+        frame_Time = np.array([base_Info[6] for base_Info in agent_Base_Loci[1:]], dtype=float)
+        add('frames', frame_Time, np.arange(len(frame_Time)), 0)
+
+        for i, agent_States in enumerate(session_Data.get('Agent_States', [])):
+            agent_States = np.asarray(agent_States, dtype=float).reshape(-1, state_List_Size)
+            add('agent_states', agent_States, np.arange(len(agent_States)), i)
+
+        # The fire fronts of each region are stored in blocks of num_ign_points per frame
+        for i, fire_States in enumerate(session_Data.get('Fire_States', [])):
+            ign_Points = set_loci[1][0] if set_loci[1][9] == 0 else set_loci[1][0][i]
+            add('fire_states', fire_States, np.arange(len(fire_States)) // ign_Points, i)
+
+        for i, sensed_Fire in enumerate(session_Data.get('Sensed_Fire_Map', [])):
+            for frame, fire_Sensed_Map in enumerate(sensed_Fire):
+                if len(fire_Sensed_Map) > 0:
+                    add('sensed_fire', fire_Sensed_Map, frame, i)
+
+        for i, CoM_Info in enumerate(session_Data.get('Sensing_Data_CoM', [])):
+            for frame, CoM in enumerate(CoM_Info):
+                if len(CoM) > 0:
+                    add('sensing_com', CoM, frame, i)
+
+        for i, pruned_Fire in enumerate(session_Data.get('Pruned_Fire_Map', [])):
+            for frame, pruned_Info in enumerate(pruned_Fire):
+                if (len(pruned_Info) > 0) and (len(pruned_Info[0]) > 0):
+                    fire_Pruned_Map = np.asarray(pruned_Info[0], dtype=float).reshape(-1, 3)
+                    agent_Info = np.broadcast_to(np.asarray(pruned_Info[1], dtype=float), (len(fire_Pruned_Map), 3))
+                    add('pruned_fire', np.concatenate([fire_Pruned_Map, agent_Info], axis=1), frame, i)
+
+        # The goals are recorded with a 100ms resolution, they are assigned to the first frame at their time
+        for i, goals in enumerate(user_Data):
+            goals = np.asarray(goals, dtype=float).reshape(-1, 5)
+            add('user_data', goals, np.searchsorted(frame_Time, goals[:, 2]), i)
+
+        fields = {}
+        for name in DATASET_FIELDS:
+            data, frame, key = rows[name]
+            if len(data) == 0:
+                fields[name] = (np.zeros((0, len(DATASET_FIELDS[name]['columns']))), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int16))
+                continue
+            data, frame, key = np.concatenate(data), np.concatenate(frame), np.concatenate(key)
+            order = np.lexsort((key, frame))
+            fields[name] = (data[order], frame[order], key[order])
+
+        return fields
+
+    # Write the dataset
+    # Input value: the output directory
+    def build(self, dataset_Dir):
+        os.makedirs(dataset_Dir, exist_ok=True)
+        for name in DATASET_FIELDS:
+            episode_Rows = self.field_Rows[name]
+            offsets = np.zeros(len(episode_Rows) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(data) for data, frame, key in episode_Rows])
+
+            # Each array is written straight into its memory-mapped file
+            for suffix, index, dtype, shape in [('', 0, np.float64, (int(offsets[-1]), len(DATASET_FIELDS[name]['columns']))),
+                                                ('_frame', 1, np.int32, (int(offsets[-1]),)), ('_key', 2, np.int16, (int(offsets[-1]),))]:
+                output = np.lib.format.open_memmap(os.path.join(dataset_Dir, name + suffix + '.npy'), mode='w+', dtype=dtype, shape=shape)
+                for i in range(len(episode_Rows)):
+                    output[offsets[i]:offsets[i + 1]] = episode_Rows[i][index]
+                output.flush()
+                del output
+            np.save(os.path.join(dataset_Dir, name + '_offsets.npy'), offsets)
+
+        with open(os.path.join(dataset_Dir, 'manifest.json'), 'w') as manifest_File:
+            json.dump({'version': 1, 'fields': DATASET_FIELDS, 'episodes': self.episodes}, manifest_File, indent=1)
+
+        return dataset_Dir
+
+
+# Memory-mapped reader of a columnar dataset (nothing is unpickled, the slices are views into the files)
+class DemoDataset(object):
+    # Input value: the dataset directory, the numpy memory-map mode ('r' -> read only, None -> load into memory)
+    def __init__(self, dataset_Dir, mmap_mode='r'):
+        with open(os.path.join(dataset_Dir, 'manifest.json'), 'r') as manifest_File:
+            self.manifest = json.load(manifest_File)
+        self.episodes = self.manifest['episodes']
+        self.fields = self.manifest['fields']
+
+        self.data, self.frame, self.key, self.offsets = {}, {}, {}, {}
+        for name in self.fields:
+            self.data[name] = np.load(os.path.join(dataset_Dir, name + '.npy'), mmap_mode=mmap_mode)
+            self.frame[name] = np.load(os.path.join(dataset_Dir, name + '_frame.npy'), mmap_mode=mmap_mode)
+            self.key[name] = np.load(os.path.join(dataset_Dir, name + '_key.npy'), mmap_mode=mmap_mode)
+            self.offsets[name] = np.load(os.path.join(dataset_Dir, name + '_offsets.npy'))
+
+    def __len__(self):
+        return len(self.episodes)
+
+    # The indices of the episodes of a scenario and / or a user (None -> any)
+    def select(self, scenario=None, user=None):
+        return [i for i, episode in enumerate(self.episodes)
+                if ((scenario is None) or (episode['scenario'] == scenario)) and ((user is None) or (episode['user'] == user))]
+
+    # The column index of a field's column
+    def column(self, name, column):
+        return self.fields[name]['columns'].index(column)
+
+    # The rows of a field in an episode, within a frame range [start_Frame, end_Frame) (None -> from the beginning / to the end)
+    # Output value: data [rows, columns], frame [rows], key [rows] (views into the memory-mapped files)
+    def get(self, name, episode, start_Frame=None, end_Frame=None):
+        if name not in self.fields:
+            raise ValueError(">>> Oops! Unknown dataset field '" + str(name) + "'. Options: " + ', '.join(self.fields))
+
+        start, end = int(self.offsets[name][episode]), int(self.offsets[name][episode + 1])
+        frame = self.frame[name][start:end]
+        if start_Frame is not None:
+            start += int(np.searchsorted(frame, start_Frame, side='left'))
+        if end_Frame is not None:
+            end = int(self.offsets[name][episode]) + int(np.searchsorted(frame, end_Frame, side='left'))
+        end = max(start, end)
+
+        return self.data[name][start:end], self.frame[name][start:end], self.key[name][start:end]
+
+
+if __name__ == '__main__':
+    import sys
+
+    # convert all the recorded sessions under Dependencies/ into a columnar dataset
+    dataset_Dir = sys.argv[1] if len(sys.argv) > 1 else 'Dependencies/Demo_Dataset'
+    builder = DemoDatasetBuilder()
+    print(str(builder.add_All('Dependencies')) + ' sessions found')
+    builder.build(dataset_Dir)
+
+    dataset = DemoDataset(dataset_Dir)
+    for name in dataset.fields:
+        print(name + ':: ' + str(dataset.data[name].shape[0]) + ' rows')
@@ -47,6 +47,7 @@
 
 # Import the PyGame package
 import pygame
+import numpy as np
 
 from pygame.locals import *
 
@@ -235,4 +236,89 @@ class Animation_Reconstruction_Reconn_Utilities(object):
         for i in range(len(target_Loci)):
             for j in range(i, len(target_Loci)):
                 pygame.draw.line(screen, (139, 69, 19), (target_Loci[i][0][0], target_Loci[i][0][1]),
-                                 (target_Loci[j][0][0], target_Loci[j][0][1]), 5)
\ No newline at end of file
+                                 (target_Loci[j][0][0], target_Loci[j][0][1]), 5)
+
+# Replay index of a recorded demonstration
+# The cumulative lists of the replay (onFire, sensed and pruned fire spots) only grow over time, so each of them is stored once as the
+# concatenation of its per-frame deltas (an array) plus the end offset of every frame. The state of any frame is then a prefix of these
+# arrays, i.e., every frame is a keyframe and seeking to a time (forward or backward) returns views without copying or replaying anything.
+class ReplayIndex(object):
+    # Input value: the same fire info as onFire_List_Recovery(), the loaded sensed and pruned fire lists, number of frames
+    def __init__(self, num_ign_points, fire_States_List, sensed_Fire_List, pruned_Fire_List, world_Size, fireSpots_Num, spec_flag, set_time,
+                 num_Frames):
+        self.num_Frames = num_Frames
+
+        # the per-frame deltas (concatenated) and the end offset of each frame
+        self.fire_Front, self.onFire, self.sensed, self.pruned = [], [], [], []
+        self.fire_Front_End, self.onFire_End, self.sensed_End, self.pruned_End = [], [], [], []
+        self.max_Intensity_End = []  # the maximum sensed fire intensity at the end of each frame (at least 155)
+
+        burning = set()
+        max_Intensity = 155
+        for time in range(num_Frames):
+            # the new fire fronts of this frame and the cells that catch fire for the first time (as in onFire_List_Recovery)
+            for i in range(fireSpots_Num):
+                ign_Points = num_ign_points if spec_flag == 0 else num_ign_points[i]
+                start_Time = set_time if spec_flag == 0 else set_time[i]
+                for j in range(ign_Points):
+                    k = ign_Points * time + j
+                    if (k < len(fire_States_List[i])) and ((start_Time * 1000) < fire_States_List[i][k][3]):
+                        fire_Point = fire_States_List[i][k]
+                        self.fire_Front.append([fire_Point[0], fire_Point[1], fire_Point[2]])
+                        if (0 <= fire_Point[0] <= (world_Size - 1)) and (0 <= fire_Point[1] <= (world_Size - 1)):
+                            cell = (int(fire_Point[0]), int(fire_Point[1]))
+                            if cell not in burning:
+                                burning.add(cell)
+                                self.onFire.append([cell[0], cell[1]])
+
+            # the fire spots sensed in this frame
+            for i in range(len(sensed_Fire_List)):
+                if time < len(sensed_Fire_List[i]):
+                    for sensed_Point in sensed_Fire_List[i][time]:
+                        self.sensed.append(sensed_Point)
+                        max_Intensity = max(max_Intensity, sensed_Point[2])
+
+            # the fire spots pruned in this frame (as in pruned_List_Recovery)
+            for i in range(len(pruned_Fire_List)):
+                if (time < len(pruned_Fire_List[i])) and (len(pruned_Fire_List[i][time]) > 0):
+                    for pruned_Point in pruned_Fire_List[i][time][0]:
+                        self.pruned.append([int(pruned_Point[0]), int(pruned_Point[1])])
+
+            self.fire_Front_End.append(len(self.fire_Front))
+            self.onFire_End.append(len(self.onFire))
+            self.sensed_End.append(len(self.sensed))
+            self.pruned_End.append(len(self.pruned))
+            self.max_Intensity_End.append(max_Intensity)
+
+        # the concatenated deltas as arrays, the per-frame states are views of them
+        self.fire_Front = np.array(self.fire_Front, dtype=float).reshape(-1, 3)                       # [x, y, intensity]
+        self.onFire = np.array(self.onFire, dtype=int).reshape(-1, 2)                                 # [x, y]
+        self.sensed = np.array([point[0:3] for point in self.sensed], dtype=float).reshape(-1, 3)     # [x, y, intensity]
+        self.pruned = np.array(self.pruned, dtype=int).reshape(-1, 2)                                 # [x, y]
+        for deltas in [self.fire_Front, self.onFire, self.sensed, self.pruned]:
+            deltas.flags.writeable = False
+
+    # The replay state at a given frame
+    # Output value: {new_fire_front, onFire_List, sensed_List, pruned_List (read-only array views of the index), current_Max_Intensity
+    #               (the value to pass to sensed_Fire_Spot_Plot() for this frame)}
+    def frame(self, time):
+        time = self.clamp(time)
+        fire_Front_Start = self.fire_Front_End[time - 1] if time > 0 else 0
+
+        return {'new_fire_front': self.fire_Front[fire_Front_Start:self.fire_Front_End[time]],
+                'onFire_List': self.onFire[:self.onFire_End[time]],
+                'sensed_List': self.sensed[:self.sensed_End[time]],
+                'pruned_List': self.pruned[:self.pruned_End[time]],
+                'current_Max_Intensity': self.max_Intensity_End[time - 1] if time > 0 else 155}
+
+    # The next playback position for a given playback speed in frames per step (> 1 -> fast forward, < 0 -> reverse, fractional speeds
+    # are accumulated by the caller), clamped to the recording
+    def step(self, time, speed=1):
+        return min(max(time + speed, 0), self.num_Frames - 1)
+
+    # Clamp a (possibly fractional) playback position to a valid frame
+    def clamp(self, time):
+        if self.num_Frames == 0:
+            raise ValueError(">>> Oops! The recording has no frames to replay.")
+
+        return min(max(int(time), 0), self.num_Frames - 1)
@@ -0,0 +1,293 @@
+"""
+# *******************************<><><><><>************************************
+# *  FireCommander 2020 - An Interactive Joint Perception-Action Environment  *
+# *******************************<><><><><>************************************
+#
+# Properties of CORE Robotics Lab
+#	- Institute for Robotics & Intelligent Machines (IRIM), Georgia Institute
+#		of Technology, Atlanta, GA, United States, 30332
+#
+# Authors
+#	- Esmaeil Seraj* <IRIM, School of ECE, Georgia Tech - eseraj3@gatech.edu>
+#	- Xiyang Wu <School of ECE, Georgia Tech - xwu391@gatech.edu>
+#	- Matthew Gombolay (Ph.D) <IRIM, School of IC, Georgia Tech>
+#
+#	- *Esmaeil Seraj >> Author to whom any correspondences shall be forwarded
+#
+# Dependencies and Tutorials
+#	- GitHub: ................... https://github.com/EsiSeraj/FireCommander2020
+#	- Documentation (arXiv): .................................. [Add_Link_Here]
+#	- PPT Tutorial: ........................................... [Add_Link_Here]
+#	- Video Tutorial: ............................ https://youtu.be/UQsWPh9c3eM
+#	- Supported by Python 3.6.4 and PyGame 1.9.6 (or any later version)
+#
+# Licence
+# - (C) CORE Robotics Lab. All Rights Reserved - FireCommander 2020 (TM)
+#
+# - <FireCommander 2020 - An Interactive Joint Perception-Action Robotics Game>
+#	Copyright (C) <2020> <Esmaeil Seraj, Xiyang Wu and Matthew C. Gombolay>
+#
+#	This program is free software; you can redistribute it and/or modify it
+# 	under the terms of the GNU General Public License as published by the
+# 	Free Software Foundation; either version 3.0 of the License, or (at your
+# 	option) any later version.
+#
+# 	This program is distributed in the hope that it will be useful, but
+# 	WITHOUT ANY WARRANTY; without even the implied warranty of
+# 	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+# 	Public License for more details. 
+#
+#	You should have received a copy of the
+# 	GNU General Public License along with this program; if not, write to the
+# 	Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# 	MA  02110-1301, USA.
+#
+"""
+
+
+import os
+import pickle
+import queue
+import threading
+import time
+import traceback
+
+
+# Background writer of the demonstration data
+# The main loop hands over the I/O jobs (log batches, screen shots, ...) through a bounded queue and a worker thread performs them, so the
+# interactive loop never waits for the disk. When the queue is full, a job either waits for a free slot (back-pressure, the waiting time is
+# counted) or is dropped (e.g., a video frame). The jobs are performed in the order they were submitted.
+class BackgroundWriter(object):
+    # Input value: the maximum number of pending jobs
+    def __init__(self, max_Queue=64):
+        self.jobs = queue.Queue(maxsize=max_Queue)
+        self.lock = threading.Lock()
+        self.closed = False
+
+        # back-pressure metrics
+        # submitted/written/dropped: number of jobs, max_Queue_Depth: the largest number of pending jobs seen, blocked_Time: seconds the
+        # main loop waited for a free slot, write_Time: seconds spent performing the jobs, errors: number of failed jobs
+        self.metrics = {'submitted': 0, 'written': 0, 'dropped': 0, 'max_Queue_Depth': 0, 'blocked_Time': 0.0, 'write_Time': 0.0, 'errors': 0}
+
+        self.thread = threading.Thread(target=self.run, name='BackgroundWriter', daemon=True)
+        self.thread.start()
+
+    # Hand a job over to the writer thread
+    # Input value: the function to call, its arguments, the flag to drop the job instead of waiting when the queue is full
+    # Output value: True if the job was queued
+    def submit(self, job, args=(), drop_If_Full=False):
+        if self.closed:
+            raise ValueError(">>> Oops! The background writer has already been closed.")
+
+        if drop_If_Full:
+            try:
+                self.jobs.put_nowait((job, args))
+            except queue.Full:
+                with self.lock:
+                    self.metrics['dropped'] += 1
+                return False
+        else:
+            start_Time = time.time()
+            self.jobs.put((job, args))
+            with self.lock:
+                self.metrics['blocked_Time'] += time.time() - start_Time
+
+        with self.lock:
+            self.metrics['submitted'] += 1
+            self.metrics['max_Queue_Depth'] = max(self.metrics['max_Queue_Depth'], self.jobs.qsize())
+        return True
+
+    # The writer thread
+    def run(self):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                self.jobs.task_done()
+                break
+
+            job, args = item
+            start_Time = time.time()
+            try:
+                job(*args)
+                failed = 0
+            except Exception:
+                traceback.print_exc()
+                failed = 1
+            with self.lock:
+                self.metrics['write_Time'] += time.time() - start_Time
+                self.metrics['written'] += 1 - failed
+                self.metrics['errors'] += failed
+            self.jobs.task_done()
+
+    # Wait until all the submitted jobs are performed
+    def drain(self):
+        self.jobs.join()
+
+    # Perform the remaining jobs and stop the writer thread
+    # Output value: the back-pressure metrics
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.jobs.put(None)
+            self.thread.join()
+
+        return dict(self.metrics)
+
+
+# Append-only session log of the demonstration data
+# Every tick appends one record holding only what the stored lists gained since the previous record, and the buffered records are written
+# to the log file in batches (flush), so the cost of a save does not grow with the session length. Each stored list is given by its depth:
+# depth 1 -> the list itself grows (e.g., [record, ...]), depth 2 -> each element grows (e.g., fire_States_List[fire][record]), etc.
+class SessionLogger(object):
+    # Input value: the log file path, {name: depth} of the stored lists, the BackgroundWriter to write the batches (None -> write in place)
+    def __init__(self, file_path, depths, writer=None):
+        self.file_path = file_path
+        self.depths = dict(depths)
+        self.writer = writer
+        self.lengths = {name: None for name in self.depths}  # the stored lists' lengths at the previous record
+        self.buffer = []  # the records not written yet
+        self.closed = False
+        self.log_file = open(file_path, 'wb')  # a new session starts a new log
+
+    # Append the new data of the current tick to the buffer
+    # Input value: the current time, {name: stored list} (all the lists given to the constructor)
+    def record(self, current_Time, structures):
+        delta = {}
+        for name, depth in self.depths.items():
+            delta[name], self.lengths[name] = self.list_Delta(structures[name], self.lengths[name], depth)
+        self.buffer.append(('delta', current_Time, delta))
+
+    # Append the whole value of a non-growing structure (e.g., the current fire map) to the buffer, the latest one is kept by the reader
+    # (the value is written later, so pass a copy if it is still going to be modified)
+    def snapshot(self, current_Time, name, value):
+        self.buffer.append(('snapshot', current_Time, {name: value}))
+
+    # Write the buffered records to the log file (handed over to the writer thread if there is one)
+    def flush(self):
+        if len(self.buffer) > 0:
+            batch, self.buffer = self.buffer, []
+            if self.writer is None:
+                self.write_Batch(batch)
+            else:
+                self.writer.submit(self.write_Batch, (batch,))
+
+    # Append a batch of records to the log file
+    def write_Batch(self, batch):
+        pickle.dump(batch, self.log_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.log_file.flush()
+
+    # Write the remaining records and close the log file
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.flush()
+            if self.writer is None:
+                self.log_file.close()
+            else:
+                self.writer.submit(self.log_file.close)
+
+    # The part of a stored list appended since the previous record
+    # The last element of a growing list is sent again, since the environment still updates it in place after appending it (e.g., the
+    # number of the burning cells of a target is reduced by pruning)
+    # Output value: delta [(start index, new elements) at depth 1, a list of the elements' deltas otherwise], the current lengths
+    def list_Delta(self, stored_List, lengths, depth):
+        if depth == 1:
+            start = 0 if lengths is None else max(lengths - 1, 0)
+            return (start, stored_List[start:]), len(stored_List)
+
+        lengths = [] if lengths is None else lengths
+        delta, new_lengths = [], []
+        for i in range(len(stored_List)):
+            element_Delta, element_Lengths = self.list_Delta(stored_List[i], lengths[i] if i < len(lengths) else None, depth - 1)
+            delta.append(element_Delta)
+            new_lengths.append(element_Lengths)
+
+        return delta, new_lengths
+
+
+# Reader of the session logs, reassembling the stored lists
+class SessionLogReader(object):
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    # Read all the records of the log
+    # Output value: list of (kind, time, data) records
+    def records(self):
+        records = []
+        with open(self.file_path, 'rb') as log_file:
+            while True:
+                try:
+                    records += pickle.load(log_file)
+                except (EOFError, pickle.UnpicklingError):  # the end of the log (or a batch cut off by a crash)
+                    break
+
+        return records
+
+    # Reassemble the stored lists (and the latest snapshots) from the log, up to a given time (None -> the whole session)
+    # Output value: {name: stored list or snapshot}
+    def load(self, until_Time=None):
+        data = {}
+        for kind, current_Time, record in self.records():
+            if (until_Time is not None) and (current_Time > until_Time):
+                break
+            for name, value in record.items():
+                if kind == 'delta':
+                    data[name] = self.apply_Delta(data.get(name, []), value)
+                else:
+                    data[name] = value
+
+        return data
+
+    # Apply a delta of SessionLogger.list_Delta to a stored list
+    def apply_Delta(self, stored_List, delta):
+        if isinstance(delta, tuple):
+            start, new_Elements = delta
+            del stored_List[start:]
+            stored_List.extend(new_Elements)
+            return stored_List
+
+        while len(stored_List) < len(delta):
+            stored_List.append([])
+        for i in range(len(delta)):
+            self.apply_Delta(stored_List[i], delta[i])
+
+        return stored_List
+
+    # Write the reassembled lists into one .pkl file each (<name>.pkl, the format of the per-list files used before the session log)
+    def export_Pickles(self, data_Dir):
+        data = self.load()
+        for name in data:
+            with open(data_Dir + '/' + name + '.pkl', 'wb') as output_File:
+                pickle.dump(data[name], output_File)
+
+        return data
+
+
+# Write a snapshot of a value into its .pkl file, replacing the previous snapshot (a job of the background writer)
+# The snapshot is written to a temporary file first, so an interrupted session still leaves the previous snapshot readable
+# Input value: the value to store (a copy, the caller keeps updating its own), the path of the .pkl file
+def save_Snapshot(value, file_path):
+    with open(file_path + '.tmp', 'wb') as output_File:
+        pickle.dump(value, output_File)
+    os.replace(file_path + '.tmp', file_path)
+
+
+# The lists stored for each session (Session_Log.pkl, or one <name>.pkl file each for the sessions recorded before the session log)
+SESSION_LISTS = ['Target_Loci', 'Fire_States', 'Lake_info', 'Sensing_Data_CoM', 'Sensed_Fire_Map', 'target_onFire_List', 'Pruned_Fire_Map',
+                 'Agent_Base_Loci', 'Agent_States']
+
+
+# Load the stored lists of a session from its session log, or from the per-list .pkl files of the sessions recorded without one
+# Input value: the data directory of the session
+# Output value: {name: stored list} (the lists missing from an old session are left out)
+def load_Session_Data(data_Dir):
+    if os.path.exists(data_Dir + '/Session_Log.pkl'):
+        return SessionLogReader(data_Dir + '/Session_Log.pkl').load()
+
+    session_Data = {}
+    for name in SESSION_LISTS:
+        if os.path.exists(data_Dir + '/' + name + '.pkl'):
+            with open(data_Dir + '/' + name + '.pkl', 'rb') as file_IO:
+                session_Data[name] = pickle.load(file_IO)
+
+    return session_Data
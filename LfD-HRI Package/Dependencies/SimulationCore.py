@@ -0,0 +1,776 @@
+"""
+# *******************************<><><><><>************************************
+# *  FireCommander 2020 - An Interactive Joint Perception-Action Environment  *
+# *******************************<><><><><>************************************
+#
+# Properties of CORE Robotics Lab
+#	- Institute for Robotics & Intelligent Machines (IRIM), Georgia Institute
+#		of Technology, Atlanta, GA, United States, 30332
+#
+# Authors
+#	- Esmaeil Seraj* <IRIM, School of ECE, Georgia Tech - eseraj3@gatech.edu>
+#	- Xiyang Wu <School of ECE, Georgia Tech - xwu391@gatech.edu>
+#	- Matthew Gombolay (Ph.D) <IRIM, School of IC, Georgia Tech>
+#
+#	- *Esmaeil Seraj >> Author to whom any correspondences shall be forwarded
+#
+# Dependencies and Tutorials
+#	- GitHub: ................... https://github.com/EsiSeraj/FireCommander2020
+#	- Documentation (arXiv): .................................. [Add_Link_Here]
+#	- PPT Tutorial: ........................................... [Add_Link_Here]
+#	- Video Tutorial: ............................ https://youtu.be/UQsWPh9c3eM
+#	- Supported by Python 3.6.4 and PyGame 1.9.6 (or any later version)
+#
+# Licence
+# - (C) CORE Robotics Lab. All Rights Reserved - FireCommander 2020 (TM)
+#
+# - <FireCommander 2020 - An Interactive Joint Perception-Action Robotics Game>
+#	Copyright (C) <2020> <Esmaeil Seraj, Xiyang Wu and Matthew C. Gombolay>
+#
+#	This program is free software; you can redistribute it and/or modify it
+# 	under the terms of the GNU General Public License as published by the
+# 	Free Software Foundation; either version 3.0 of the License, or (at your
+# 	option) any later version.
+#
+# 	This program is distributed in the hope that it will be useful, but
+# 	WITHOUT ANY WARRANTY; without even the implied warranty of
+# 	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+# 	Public License for more details. 
+#
+#	You should have received a copy of the
+# 	GNU General Public License along with this program; if not, write to the
+# 	Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# 	MA  02110-1301, USA.
+#
+"""
+
+
+
+import numpy as np
+from Dependencies.WildFireModel import WildFire, MultiAreaWildFire, FireMapBuffer, TerrainField, RasterField
+from Dependencies.Utilities import HeteroFireBots_Reconn_Env_Utilities, FireStateGrid, EventScheduler
+
+
+# Headless simulation core of the FireCommander game
+# The core holds the state of a session (targets, fire, agents, user goals, score) and advances it by one fixed tick in step(dt, commands),
+# where the commands are the user actions of that tick. The interactive GUI translates the pygame events into the same commands and only
+# draws the core's state, so a recorded or scripted command stream runs through the exact same dynamics without a display, as fast as
+# the fire model allows.
+# Commands (applied to the currently selected agent, in the given order, like the GUI events of a frame):
+#   ('goal', X, Y):: mouse click at (X, Y), a new goal (or back to the base when (X, Y) is inside the agent base)
+#   ('lift', 1) / ('lift', -1):: keyboard up / down, change the flight height of a perception or hybrid agent
+#   ('select', agent_Index):: digit keys 1 - 9, select the agent with the given index (starting from 0)
+class SimulationCore(object):
+    # Input value:
+    #   environment_para, robo_team_para, set_loci, adv_setting:: the scenario settings (the same lists as environment_ctl)
+    #   facility_penalty:: the penalty of each facility type (None:: [1, 2, 5, 5])
+    #   time_Step:: the default tick length (ms)
+    #   seed:: the random seed (None:: not seeded)
+    #   terrain_tile_size:: the tile size of the lazily generated (float32) terrain field shared by the areas (None:: dense maps per area)
+    #   terrain_rasters:: {'fuel': raster, 'wind_speed': raster, 'wind_direction': raster} (.npy paths or RasterFields, wind optional)
+    #                     memory-mapped instead of the random terrain (None:: random terrain)
+    #   fire_multi_area:: the flag of the multi-area wildfire model (all the fire spot areas advanced in one call)
+    def __init__(self, environment_para, robo_team_para, set_loci, adv_setting, facility_penalty=None, time_Step=50, seed=None,
+                 terrain_tile_size=None, terrain_rasters=None, fire_multi_area=False):
+        if fire_multi_area and terrain_rasters is not None:
+            raise ValueError(">>> Oops! The multi-area fire model only supports random terrains.")
+
+        self.environment_para = environment_para
+        self.robo_team_para = robo_team_para
+        self.set_loci = set_loci
+        self.adv_setting = adv_setting
+        self.facility_penalty = [1, 2, 5, 5] if facility_penalty is None else facility_penalty
+        self.time_Step = time_Step
+        self.terrain_tile_size = terrain_tile_size
+        self.terrain_rasters = None if terrain_rasters is None else \
+            {key: raster if isinstance(raster, RasterField) else RasterField(raster) for key, raster in terrain_rasters.items()}
+        self.fire_multi_area = fire_multi_area
+
+        # The wildfire model and the stochastic perception / pruning draw from the global numpy random state
+        if seed is not None:
+            np.random.seed(seed)
+
+        self.Agent_Util = HeteroFireBots_Reconn_Env_Utilities()
+
+        # The size of the simulation environment (pixel)
+        self.world_Size = self.environment_para[0]
+
+        # The simulation time (ms) and the flag of the end of the session
+        self.current_Time = 0
+        self.done = False
+
+        self.target_init()
+        self.fire_init()
+        self.agent_init()
+
+        # The score list (the same as the score_Calculation outputs)
+        self.score_list = [0, 0, 0, 0, 0, 0, 0]
+
+        # The flag to mark that new user data are recorded during the last tick (the GUI writes the User_Data.pkl then)
+        self.user_Data_Updated = False
+
+    # ************************ Part 1: Target ******************************
+    def target_init(self):
+        # The number of the targets
+        self.house_Num = self.environment_para[3]
+        self.hospital_Num = self.environment_para[4]
+        self.power_station_Num = self.environment_para[5]
+        self.target_Num = self.house_Num + self.hospital_Num + self.power_station_Num
+
+        # Target info: target center position, target size, target type (0: Normal, 1: Hospital, 2: Power Station)
+        # The list to store the position of each target in the dictionary (the GUI appends its display records to it)
+        self.target_Loci = []
+        self.target_onFire_list = [[], [], [], []]
+        self.target_onFire_Flag = [[], [], [], []]
+        self.target_info = [[], [], [], []]
+        for i in range(self.house_Num):
+            # The center of the target, size 120 * 150, Normal, enable_Edge_Flag, current time
+            self.target_Loci.append([[self.set_loci[3][i][0], self.set_loci[3][i][1], 120, 150, 0, 1, 0]])
+            self.target_info[0].append([self.set_loci[3][i][0], self.set_loci[3][i][1], 120, 150, 0, i])
+            self.target_onFire_list[0].append([0])
+            self.target_onFire_Flag[0].append(0)
+
+        for i in range(self.hospital_Num):
+            # The center of the target, size 150 * 180, Hospital, enable_Edge_Flag, current time
+            self.target_Loci.append([[self.set_loci[4][i][0], self.set_loci[4][i][1], 150, 180, 1, 1, 0]])
+            self.target_info[1].append([self.set_loci[4][i][0], self.set_loci[4][i][1], 150, 180, 1, i])
+            self.target_onFire_list[1].append([0])
+            self.target_onFire_Flag[1].append(0)
+
+        for i in range(self.power_station_Num):
+            # The center of the target, size 180 * 220, Power Station, enable_Edge_Flag, current time
+            self.target_Loci.append([[self.set_loci[5][i][0], self.set_loci[5][i][1], 180, 220, 2, 1, 0]])
+            self.target_info[2].append([self.set_loci[5][i][0], self.set_loci[5][i][1], 180, 220, 2, i])
+            self.target_onFire_list[2].append([0])
+            self.target_onFire_Flag[2].append(0)
+
+        self.lake_list = []
+        self.lake_Loci = []
+        for i in range(len(self.set_loci[6])):
+            self.lake_list.append([[self.set_loci[6][i][0], self.set_loci[6][i][1]]])
+            self.lake_Loci.append([[self.set_loci[6][i][0], self.set_loci[6][i][1], 100, 0]])
+
+    # ************************ Part 2: Fire state ******************************
+    def fire_init(self):
+        # The wildfire generation and propagation utilizes the FARSITE wildfire mathematical model
+        # The number of the fire spots
+        self.fireSpots_Num = self.environment_para[2]
+        # Create the fire state dictionary list
+        self.fire_States_List = []
+        for i in range(self.fireSpots_Num):
+            self.fire_States_List.append([])
+
+        terrain_sizes = [self.world_Size, self.world_Size]  # length and width of the terrain as a list [length [m], width [m]]
+        # [[x_min [m], x_max [m], y_min [m], y_max [m]]]
+        hotspot_areas = []
+        for i in range(self.fireSpots_Num):
+            hotspot_areas.append([self.set_loci[0][i][0] - 50, self.set_loci[0][i][0] + 50, self.set_loci[0][i][1] - 50, self.set_loci[0][i][1] + 50])
+        duration = self.environment_para[1]  # total duration to run the simulation
+        # The lazily generated terrain field (if any) is shared by all the fire spot areas
+        fuel_field = None
+        if self.terrain_tile_size is not None:
+            fuel_field = TerrainField(shape=terrain_sizes, tile_size=self.terrain_tile_size, seed=np.random.randint(2 ** 31))
+
+        # The flag of the fire setting mode (0: Uniform, 1: Specific)
+        self.spec_flag = self.set_loci[1][9]
+        if self.spec_flag == 0:
+            num_ign_points = self.set_loci[1][0]  # initial number of fire spots (ignition points) per hotspot area
+            fuel_coeff = self.set_loci[1][2]  # fuel coefficient for vegetation type of the terrain (higher fuel_coeff:: more circular shape fire)
+            wind_speed = self.set_loci[1][3]  # average mid-flame wind velocity (higher values streches the fire more)
+            wind_direction = np.pi * 2 * self.set_loci[1][4] / 360  # wind azimuth
+
+            self.fire_env = WildFire(
+                terrain_sizes=terrain_sizes, hotspot_areas=hotspot_areas, num_ign_points=num_ign_points, duration=duration, time_step=1,
+                radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi/3, spatial_index=True)  # local form
+
+            self.ign_points_all = self.fire_env.hotspot_init()  # initializing hotspots
+            # The growing fire histories are kept in capacity-doubling buffers (fire_map and previous_terrain_map are their views)
+            self.terrain_map_buffer = FireMapBuffer(self.ign_points_all)
+            self.previous_terrain_map = self.terrain_map_buffer.view  # initializing the starting terrain map
+            if self.terrain_rasters is not None:
+                self.geo_phys_info = self.fire_env.geo_phys_info_load(
+                    fuel_raster=self.terrain_rasters['fuel'], wind_speed_raster=self.terrain_rasters.get('wind_speed'),
+                    wind_direction_raster=self.terrain_rasters.get('wind_direction'), avg_wind_speed=wind_speed, avg_wind_direction=wind_direction)
+            else:
+                self.geo_phys_info = self.fire_env.geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
+                                                                      avg_wind_direction=wind_direction, fuel_field=fuel_field)
+
+            self.fire_map_buffer = FireMapBuffer(self.ign_points_all)
+            self.fire_map = self.fire_map_buffer.view  # initializing fire-map
+            self.fire_map_spec = self.fire_map
+            self.fire_turnon_flag = 0
+        else:
+            self.fire_env = []
+            self.geo_phys_info = []
+            self.ign_points_all = []
+            self.previous_terrain_map = []
+            self.terrain_map_buffer = []  # The region-wise terrain map buffers
+            self.new_fire_front_temp = []
+            self.current_geo_phys_info = []
+            if self.fire_multi_area:
+                # One model holding the per-area parameters as arrays (all the fire spot areas are propagated in one batched call)
+                self.fire_env = MultiAreaWildFire(
+                    terrain_sizes=terrain_sizes, hotspot_areas=hotspot_areas, num_ign_points=self.set_loci[1][0], area_delays=self.set_loci[1][1],
+                    duration=duration, time_step=1, radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3)
+                ign_points_all, area_ids = self.fire_env.hotspot_init()  # initializing hotspots
+                terrain_map, terrain_area_ids = self.fire_env.hotspot_init()
+                self.ign_points_all = self.fire_env.split_areas(ign_points_all, area_ids)
+                for i, fire_spots in enumerate(self.fire_env.split_areas(terrain_map, terrain_area_ids)):
+                    self.new_fire_front_temp.append([])
+                    self.current_geo_phys_info.append([])
+                    self.terrain_map_buffer.append(FireMapBuffer(fire_spots))
+                    self.previous_terrain_map.append(self.terrain_map_buffer[i].view)  # initializing the starting terrain map
+                self.geo_phys_info = self.fire_env.geo_phys_info_init(
+                    max_fuel_coeff=self.set_loci[1][2], avg_wind_speed=self.set_loci[1][3],
+                    avg_wind_direction=np.pi * 2 * np.asarray(self.set_loci[1][4]) / 360, fuel_field=fuel_field)
+            else:
+                for i in range(self.fireSpots_Num):
+                    self.new_fire_front_temp.append([])
+                    self.current_geo_phys_info.append([])
+                    num_ign_points = self.set_loci[1][0][i]  # initial number of fire spots (ignition points) per hotspot area
+                    fuel_coeff = self.set_loci[1][2][i]  # fuel coefficient for vegetation type of the terrain (higher fuel_coeff:: more circular shape fire)
+                    wind_speed = self.set_loci[1][3][i]  # average mid-flame wind velocity (higher values streches the fire more)
+                    wind_direction = np.pi * 2 * self.set_loci[1][4][i] / 360  # wind azimuth
+
+                    self.fire_env.append(WildFire(
+                        terrain_sizes=terrain_sizes, hotspot_areas=[hotspot_areas[i]], num_ign_points=num_ign_points,
+                        duration=duration, time_step=1, radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3,
+                        spatial_index=True))  # local form
+                    self.ign_points_all.append(self.fire_env[i].hotspot_init())  # initializing hotspots
+                    self.terrain_map_buffer.append(FireMapBuffer(self.fire_env[i].hotspot_init()))
+                    self.previous_terrain_map.append(self.terrain_map_buffer[i].view)  # initializing the starting terrain map
+                    if self.terrain_rasters is not None:
+                        self.geo_phys_info.append(self.fire_env[i].geo_phys_info_load(
+                            fuel_raster=self.terrain_rasters['fuel'], wind_speed_raster=self.terrain_rasters.get('wind_speed'),
+                            wind_direction_raster=self.terrain_rasters.get('wind_direction'), avg_wind_speed=wind_speed,
+                            avg_wind_direction=wind_direction))
+                    else:
+                        self.geo_phys_info.append(self.fire_env[i].geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
+                                                                                      avg_wind_direction=wind_direction, fuel_field=fuel_field))
+            self.fire_map_buffer = FireMapBuffer(np.concatenate(self.ign_points_all, axis=0))
+            self.fire_map = self.fire_map_buffer.view  # initializing fire-map
+            self.fire_map_spec_buffer = [FireMapBuffer(self.ign_points_all[i]) for i in range(self.fireSpots_Num)]
+            self.fire_map_spec = [self.fire_map_spec_buffer[i].view for i in range(self.fireSpots_Num)]
+            self.fire_turnon_flag = np.zeros((self.fireSpots_Num, 1), dtype=int)
+
+        # The fire spot areas are activated by timed events once their start delays pass (the dormant areas are skipped until then, the
+        # uniform setting has a single area). They are the only timed events:: the lakes have no refill timer (they are static water
+        # sources) and the battery runs out when the flown distance plus the way back to the base exceeds it, which the motion controller
+        # checks as the agent moves, so neither is polled on a timer that the scheduler could replace
+        self.events = EventScheduler()
+        area_Delays = self.set_loci[1][1] if self.spec_flag == 1 else [self.set_loci[1][1]]
+        for i in range(len(area_Delays)):
+            self.events.schedule(area_Delays[i] * 1000, 'fire_area', i)
+        self.active_Areas = []  # the indices of the active fire spot areas (in order)
+
+        self.fire_Current_Map = np.zeros([self.world_Size, self.world_Size], dtype=float)
+
+        # The grid to store the firespots in different state (the lists below are its views, refreshed every tick)
+        self.fire_grid = FireStateGrid(self.world_Size)
+        # The onFire_List, store the points currently on fire (sensed points included, pruned points excluded)
+        self.onFire_List = []
+        # The sensed_List, store the points currently on fire and have been sensed by agents
+        self.sensed_List = []
+        # The pruned_List, store the pruned fire spots
+        self.pruned_List = []
+
+    # ************************ Part 3: Agents ******************************
+    # The initial position of each agent around the agent base
+    def agent_arrange(self):
+        if self.set_loci[2][1] == 1:
+            relative_pos = [[-40, -180], [-40, -120], [-40, -60], [-40, 0], [-40, 60], [-40, 120], [40, -180], [40, -120], [40, -60]]
+        else:
+            relative_pos = [[-180, -40], [-100, -40], [-20, -40], [60, -40], [140, -40], [-180, 40], [-100, 40], [-20, 40], [60, 40]]
+        self.agent_pos_list = []
+        for i in range(self.agent_Num):
+            self.agent_pos_list.append([self.set_loci[2][0][0] + relative_pos[i][0], self.set_loci[2][0][1] + relative_pos[i][1]])
+
+    def agent_init(self):
+        # The number of the agent's base
+        self.agent_Base_Num = 1
+
+        # The list to store the position of each agent base (the GUI appends its display records to it)
+        # Agent Base: Position, Size, Capacity, enable_Edge_Flag, current time
+        if self.set_loci[2][1] == 1:
+            self.agent_Base_Loci = [[[self.set_loci[2][0][0], self.set_loci[2][0][1], 160, 400, 9, 1, 0]]]
+            self.target_info[3].append([self.set_loci[2][0][0], self.set_loci[2][0][1], 160, 400, 1, 0])
+        else:
+            self.agent_Base_Loci = [[[self.set_loci[2][0][0], self.set_loci[2][0][1], 400, 160, 9, 1, 0]]]
+            self.target_info[3].append([self.set_loci[2][0][0], self.set_loci[2][0][1], 400, 160, 1, 0])
+        self.target_onFire_list[3].append([0])
+        self.target_onFire_Flag[3].append(0)
+
+        # The number of the searching, firefighter and hybrid agents
+        self.searching_Agent_Num = self.robo_team_para[0]
+        self.firefighter_Agent_Num = self.robo_team_para[1]
+        self.hybrid_Agent_Num = self.robo_team_para[2]
+        self.agent_Num = self.searching_Agent_Num + self.firefighter_Agent_Num + self.hybrid_Agent_Num
+
+        # The agent is represented as a dot with radius of 8
+        self.agent_Radius = 8
+        # The field of view (FOV) of the agent is [pi/4, pi/6], which corresponds to the size of the searching scope
+        self.agent_FOV = [np.pi/4, np.pi/6]
+
+        # The upper and lower bounds of the agent's flight (Meter)
+        self.agent_Upper_Height_List = np.zeros(self.agent_Num, dtype=int)
+        self.agent_Lower_Height_List = np.zeros(self.agent_Num, dtype=int)
+        for i in range(self.searching_Agent_Num):
+            self.agent_Lower_Height_List[i], self.agent_Upper_Height_List[i] = self.agent_setting(0, i)[0:2]
+        for i in range(self.firefighter_Agent_Num):
+            self.agent_Lower_Height_List[self.searching_Agent_Num + i] = 30
+            self.agent_Upper_Height_List[self.searching_Agent_Num + i] = 30
+        for i in range(self.hybrid_Agent_Num):
+            self.agent_Lower_Height_List[self.searching_Agent_Num + self.firefighter_Agent_Num + i], \
+                self.agent_Upper_Height_List[self.searching_Agent_Num + self.firefighter_Agent_Num + i] = self.agent_setting(1, i)[0:2]
+
+        # lift_Step is the length of each height change after pressing the keyboard up and down button (Meter)
+        self.lift_Step = 5
+
+        # Battery parameter [Total energy, consumption during flight, consumption during waiting]
+        self.battery_para = []
+        for i in range(self.searching_Agent_Num):
+            self.battery_para.append([self.agent_setting(2, i)[0], 0.1, 0.05])
+        for i in range(self.firefighter_Agent_Num):
+            self.battery_para.append([self.agent_setting(3, i)[0], 0.1, 0.05])
+        for i in range(self.hybrid_Agent_Num):
+            self.battery_para.append([self.agent_setting(4, i)[0], 0.1, 0.05])
+
+        # Start flag, if the start flag is 0, silent
+        # If the start flag is 1, the agent begins to move
+        # If the start flag is 2, return
+        self.start_Flag = np.zeros(self.agent_Num, dtype=int)
+
+        # Move mode flag, if its value is 0, the agent will automatically fly towards the goal
+        # If its value is 1, the agent will fly by one step when clicking
+        self.move_Mode_Flag = np.zeros(self.agent_Num, dtype=int)
+
+        self.agent_arrange()
+
+        # Initialize the list to store the current state of each agent
+        # Content: [agent_Position(X, Y, Z), agent_Velocity(X, Y, Z), goal_Index, current_Time, agent' type, agent index,
+        #          sum of running distance, sum of waiting time, water tank capacity, move_enabling_flag, patrolling flag,
+        #          patrolling goal]
+        self.current_Agent_State_List = []
+        for i in range(self.searching_Agent_Num):
+            self.current_Agent_State_List.append([self.agent_pos_list[i][0], self.agent_pos_list[i][1], max(20, self.agent_Lower_Height_List[i]),
+                                                  0, 0, 0, 0, 0, 0, i + 1, 0, 0, 0, 1, 0, 0])
+        for i in range(self.firefighter_Agent_Num):
+            k = self.searching_Agent_Num + i
+            self.current_Agent_State_List.append([self.agent_pos_list[k][0], self.agent_pos_list[k][1], 30,
+                                                  0, 0, 0, 0, 0, 1, i + 1, 0, 0, self.agent_setting(8, i)[0], 1, 0, 0])
+        for i in range(self.hybrid_Agent_Num):
+            k = self.searching_Agent_Num + self.firefighter_Agent_Num + i
+            self.current_Agent_State_List.append([self.agent_pos_list[k][0], self.agent_pos_list[k][1], max(20, self.agent_Lower_Height_List[k]),
+                                                  0, 0, 0, 0, 0, 2, i + 1, 0, 0, self.agent_setting(9, i)[0], 1, 0, 0])
+
+        # Preserve the original info for each agent
+        self.original_Agent_State_List = [list(agent_State) for agent_State in self.current_Agent_State_List]
+
+        # The current flight height of the agents (the initial and the current heights share one list, as in the interactive loop)
+        self.agent_Init_Pos_Z = [agent_State[2] for agent_State in self.current_Agent_State_List]
+        self.agent_Current_Pos_Z = self.agent_Init_Pos_Z
+
+        # current agent index is the index of the agent in operation
+        self.current_Agent_Index = 0
+
+        # Initialize the global list to store the agent state at each tick
+        self.global_Agent_State = [[] for i in range(self.agent_Num)]
+        # Initialize the patrolling goal list to store the current patrolling goal for each agent
+        self.patrolling_Goal_List = [[] for i in range(self.agent_Num)]
+        # Initialize the goal index list to store the index for each goal for reference
+        self.goal_Index_List = [[] for i in range(self.agent_Num)]
+        # Initialize the list to store the sensed fire spot data
+        self.sensed_Fire_Spot_List = [[] for i in range(self.searching_Agent_Num + self.hybrid_Agent_Num)]
+        # Initialize the list to store the pruned fire spot data
+        self.pruned_Fire_Spot_List = [[] for i in range(self.firefighter_Agent_Num + self.hybrid_Agent_Num)]
+        # Initialize the list to store the waiting time for the action agent only
+        self.waiting_Time_List = [0 for i in range(self.firefighter_Agent_Num)]
+        # Initialize the list to store the CoM info of sensed fire spot
+        self.CoM_Info_List = [[] for i in range(self.searching_Agent_Num + self.hybrid_Agent_Num)]
+
+        # The pruning confidence level of each agent
+        self.confidence_level_list = np.zeros(self.agent_Num, dtype=float)
+        for i in range(self.firefighter_Agent_Num):
+            self.confidence_level_list[self.searching_Agent_Num + i] = self.set_loci[1][7]/100
+        for i in range(self.hybrid_Agent_Num):
+            self.confidence_level_list[self.searching_Agent_Num + self.firefighter_Agent_Num + i] = self.set_loci[1][8]/100
+
+        # Initialize the trigger for pruning the fire spot
+        self.pruning_Trigger = np.zeros(self.firefighter_Agent_Num + self.hybrid_Agent_Num)
+
+        # ************************ Part 4: User Data ******************************
+        # goal_Index: store the index of the goal (Action type 0, Mouse click)
+        self.goal_Index = np.zeros(self.agent_Num, dtype=int)
+        # current_Goal_Index: the position of the current goal in user_data_list
+        self.current_Goal_Index = np.zeros(self.agent_Num, dtype=int)
+
+        # The history of the agent's goal
+        # Content: The goal position (X, Y), current time, action type, goal_index
+        # Action type: -1: Keyboard Down, 0: Mouse click, 1: Keyboard Up
+        self.global_User_Data_List = [[] for i in range(self.agent_Num)]
+
+    # The advanced setting of an agent (the common setting when the robot team is uniform)
+    # Input value: the index of the setting in adv_setting, the index of the agent within its type
+    # Output value: the setting list of the agent
+    def agent_setting(self, setting_Index, agent_Index):
+        if self.robo_team_para[3] == 0:
+            return self.adv_setting[setting_Index][0]
+        return self.adv_setting[setting_Index][agent_Index]
+
+    # The speed of an agent, according to its type
+    def agent_speed(self, agent_State):
+        return self.agent_setting(5 + agent_State[8], agent_State[9] - 1)[0]
+
+    # ************************ Simulation tick ******************************
+    # Advance the simulation by one tick
+    # Input value: the elapsed time (ms, None:: the default tick length), the list of the commands of this tick
+    # Output value: the score list, the flag of the end of the session
+    def step(self, dt=None, commands=None):
+        self.current_Time += self.time_Step if dt is None else dt
+        self.user_Data_Updated = False
+
+        # The speed and height limits of the agent that is selected at the beginning of the tick (all the agents move at this speed, as in
+        # the interactive loop)
+        current_Agent_State = self.current_Agent_State_List[self.current_Agent_Index]
+        self.agent_Speed = self.agent_speed(current_Agent_State)
+        self.agent_Upper_Height = self.agent_Upper_Height_List[self.current_Agent_Index]
+        self.agent_Lower_Height = self.agent_Lower_Height_List[self.current_Agent_Index]
+
+        for command in (commands or []):
+            self.apply_command(command)
+
+        self.fire_update()
+        self.agent_update()
+
+        # Compute the game score
+        self.score_list = list(self.Agent_Util.score_Calculation(len(self.fire_map), self.onFire_List, self.sensed_List, self.pruned_List,
+                                                                 self.target_onFire_list, self.target_onFire_Flag, self.facility_penalty,
+                                                                 self.environment_para, self.set_loci, self.current_Time, fire_grid=self.fire_grid))
+
+        if (self.current_Time//1000) >= self.environment_para[1]:
+            self.done = True
+
+        return self.score_list, self.done
+
+    # The session is idle when no fire spot area is active and no agent has a goal (the state only changes at the next event or command)
+    def idle(self):
+        return len(self.active_Areas) == 0 and all(len(user_Data) == 0 for user_Data in self.global_User_Data_List)
+
+    # Run a time-stamped command stream until the end of the session
+    # Input value: list of (time (ms), command) in time order, the tick length (ms, None:: the default tick length) and the flag to jump
+    #              over the idle ticks in one step (up to the last tick before the next event, command or the end of the session, the
+    #              ticks stay on the same time grid but the idle ones are logged as a single tick)
+    # Output value: the final score list
+    def run(self, command_Stream, dt=None, skip_Idle=False):
+        stream_Index = 0
+        while not self.done:
+            tick = self.time_Step if dt is None else dt
+            next_Time = self.current_Time + tick
+            if skip_Idle and self.idle():
+                # The ticks at or before the next event time and before the next command and the end of the session are idle
+                command_Time = command_Stream[stream_Index][0] if stream_Index < len(command_Stream) else np.inf
+                idle_Ticks = min(np.floor((self.events.next_time() - self.current_Time) / tick),
+                                 np.ceil((command_Time - self.current_Time) / tick) - 1,
+                                 np.ceil((self.environment_para[1] * 1000 - self.current_Time) / tick) - 1)
+                next_Time = self.current_Time + tick * max(1, int(idle_Ticks))
+            commands = []
+            while (stream_Index < len(command_Stream)) and (command_Stream[stream_Index][0] <= next_Time):
+                commands.append(command_Stream[stream_Index][1])
+                stream_Index += 1
+            self.step(next_Time - self.current_Time, commands)
+
+        return self.score_list
+
+    # Convert a recorded User_Data list (one goal list per agent) into a time-stamped command stream
+    # Input value: the global user data list
+    # Output value: list of (time (ms), command) in time order
+    @staticmethod
+    def user_data_commands(global_User_Data_List):
+        command_Stream = []
+        for i in range(len(global_User_Data_List)):
+            for goal in global_User_Data_List[i]:
+                # The goals are recorded with a 100ms resolution
+                goal_Time = int(goal[2]) * 100
+                command_Stream.append((goal_Time, ('select', i)))
+                if goal[3] == 0:
+                    command_Stream.append((goal_Time, ('goal', goal[0], goal[1])))
+                else:
+                    command_Stream.append((goal_Time, ('lift', int(goal[3]))))
+        # A stable sort keeps each select right before its action
+        command_Stream.sort(key=lambda command: command[0])
+
+        return command_Stream
+
+    # Apply a user command to the selected agent
+    def apply_command(self, command):
+        current_Agent_Index = self.current_Agent_Index
+        current_Agent_State = self.current_Agent_State_List[current_Agent_Index]
+
+        if command[0] == 'goal':
+            (goal_X, goal_Y) = command[1:3]
+            # Ensure that the mouse click happens inside the window
+            if (goal_X <= self.world_Size) and (goal_Y <= self.world_Size):
+                self.new_goal(current_Agent_Index, current_Agent_State, goal_X, goal_Y)
+
+        elif command[0] == 'lift':
+            # This action is only effective for the sensing agents and hybrid agents
+            if (current_Agent_State[8] == 0) or (current_Agent_State[8] == 2):
+                if command[1] > 0:
+                    # Update the flight height, ensure the height value does not exceed the upper bound
+                    self.agent_Current_Pos_Z[current_Agent_Index] = min(self.agent_Init_Pos_Z[current_Agent_Index] + self.lift_Step,
+                                                                        self.agent_Upper_Height)
+                    keyboard_Action_Type = 1
+                else:
+                    # Update the flight height, ensure the height value does not exceed the lower bound
+                    self.agent_Current_Pos_Z[current_Agent_Index] = max(self.agent_Init_Pos_Z[current_Agent_Index] - self.lift_Step,
+                                                                        self.agent_Lower_Height)
+                    keyboard_Action_Type = -1
+
+                # Record the location and time of the keyboard action (Action -1 / 1)
+                self.global_User_Data_List[current_Agent_Index].append([current_Agent_State[0], current_Agent_State[1],
+                                                                        np.floor(self.current_Time/100), keyboard_Action_Type, 0])
+                self.user_Data_Updated = True
+
+        elif command[0] == 'select':
+            if command[1] < self.agent_Num:
+                # Append to the current agent state list into the corresponding list
+                for i in range(self.agent_Num):
+                    self.global_Agent_State[i] += self.current_Agent_State_List[i]
+                # Switch the agent index
+                self.current_Agent_Index = command[1]
+
+        else:
+            raise ValueError(">>> Oops! Unknown command '" + str(command[0]) + "'. Options: goal, lift, select")
+
+    # A new goal (mouse click) for the selected agent
+    def new_goal(self, current_Agent_Index, current_Agent_State, goal_X, goal_Y):
+        in_Base_Flag, base_Index = self.Agent_Util.in_Agent_Base_Region(goal_X, goal_Y, self.agent_Base_Num, self.agent_Base_Loci)
+        # If the clicked position locates within the base region, the agent will go back the base to refuel
+        if in_Base_Flag:
+            current_Agent_State[13] = 2
+
+        else:
+            goal_Index_List = self.goal_Index_List[current_Agent_Index]
+            patrolling_Goal_List = self.patrolling_Goal_List
+
+            # Update the goal_Index variable
+            self.goal_Index[current_Agent_Index] += 1
+
+            # Create the buffer to store the location and time(ms) of the new goal (Action 0)
+            new_Goal_Buffer = [goal_X, goal_Y, np.floor(self.current_Time / 100), 0, self.goal_Index[current_Agent_Index]]
+
+            if (self.start_Flag[current_Agent_Index] == 0) and (current_Agent_State[7] > 0):
+                self.current_Goal_Index[current_Agent_Index] = max(len(goal_Index_List), self.current_Goal_Index[current_Agent_Index])
+                patrolling_Goal_List[current_Agent_Index] = [new_Goal_Buffer]
+                current_Agent_State[6] = max(len(goal_Index_List) + 1, current_Agent_State[6])
+                current_Agent_State[14] = 0
+                current_Agent_State[15] = 0
+
+            # If patrolling agent flag is 0, add it into the patrolling goal list
+            if current_Agent_State[14] == 0:
+                # Set the first goal as the first element in the patrolling goal list
+                if len(self.global_User_Data_List[current_Agent_Index]) == 0:
+                    patrolling_Goal_List[current_Agent_Index].append(new_Goal_Buffer)
+                else:
+                    # Determine the closure of the patrolling loop
+                    patrolling_Distance = np.sqrt((new_Goal_Buffer[0] - patrolling_Goal_List[current_Agent_Index][0][0]) ** 2 +
+                                                  (new_Goal_Buffer[1] - patrolling_Goal_List[current_Agent_Index][0][1]) ** 2)
+                    # If the distance between the new goal and the 1st element in the patrolling loop list is less than the agent_Speed,
+                    # set the flag of the patrolling loop closure as 1
+                    if (patrolling_Distance <= (self.agent_Speed * 5)) and (len(patrolling_Goal_List[current_Agent_Index]) > 1):
+                        current_Agent_State[14] = 1
+                        index = 0
+                        for i in range(len(patrolling_Goal_List[current_Agent_Index])):
+                            if current_Agent_State[6] == patrolling_Goal_List[current_Agent_Index][i][4]:
+                                index = i
+                                break
+                        current_Agent_State[15] = index
+
+                    # If not, add it into the patrolling goal list
+                    else:
+                        patrolling_Goal_List[current_Agent_Index].append(new_Goal_Buffer)
+            # If patrolling agent flag is 1, determine the ending condition of the patrolling loop
+            else:
+                self.current_Goal_Index[current_Agent_Index] = max(len(goal_Index_List), self.current_Goal_Index[current_Agent_Index])
+                current_Agent_State[6] = max(len(goal_Index_List) + 1, current_Agent_State[6])
+                current_Agent_State[14] = 0
+                current_Agent_State[15] = 0
+                patrolling_Goal_List[current_Agent_Index] = [new_Goal_Buffer]
+
+            # Record the index of the current goal in the global_User_Data_List
+            goal_Index_List.append(len(self.global_User_Data_List[current_Agent_Index]))
+
+            # Record the goal information in the global list
+            self.global_User_Data_List[current_Agent_Index].append(new_Goal_Buffer)
+            self.user_Data_Updated = True
+
+            # Update the start flag
+            if current_Agent_State[13] != 2:
+                self.start_Flag[current_Agent_Index] = 1
+
+        # If its value of the move mode flag is 1, the agent will fly by one step when clicking
+        if self.move_Mode_Flag[current_Agent_Index] == 1:
+            self.motion_update(current_Agent_Index, goal_X, goal_Y)
+
+    # Move an agent with the motion controller
+    def motion_update(self, i, goal_X, goal_Y):
+        self.current_Agent_State_List[i], self.agent_Current_Pos_Z[i], self.agent_Init_Pos_Z[i], self.current_Goal_Index[i], \
+        self.pruning_Trigger, self.start_Flag[i], self.waiting_Time_List = \
+            self.Agent_Util.agent_Motion_Controller(self.agent_Speed, self.current_Agent_State_List[i], self.move_Mode_Flag[i], goal_X, goal_Y,
+                                                    self.agent_Current_Pos_Z[i], self.agent_Init_Pos_Z[i], self.global_User_Data_List[i],
+                                                    self.current_Goal_Index[i], self.goal_Index[i], self.start_Flag[i],
+                                                    self.firefighter_Agent_Num, self.pruning_Trigger, self.battery_para[i],
+                                                    self.original_Agent_State_List[i], self.patrolling_Goal_List[i], self.waiting_Time_List,
+                                                    self.current_Time)
+
+    # Read the terrain raster tiles around the active fire and the agents ahead of the fire propagation (raster terrains only)
+    def prefetch_terrain(self):
+        points = [np.array([agent_State[0:2] for agent_State in self.current_Agent_State_List], dtype=float).reshape(-1, 2)]
+        if self.spec_flag == 0:
+            points.extend([self.ign_points_all[:, 0:2], self.previous_terrain_map[:, 0:2]])
+            fire_env, geo_phys_info = self.fire_env, self.geo_phys_info
+        else:
+            for i in range(self.fireSpots_Num):
+                points.extend([self.ign_points_all[i][:, 0:2], self.previous_terrain_map[i][:, 0:2]])
+            fire_env, geo_phys_info = self.fire_env[0], self.geo_phys_info[0]  # The rasters are shared by the fire spot areas
+
+        fire_env.prefetch_terrain(geo_phys_info, np.concatenate(points, axis=0))
+
+    # Handle the timed events that are due (activation of the fire spot areas)
+    def process_events(self):
+        for event_Time, kind, payload in self.events.pop_due(self.current_Time):
+            if kind == 'fire_area':
+                self.active_Areas = sorted(self.active_Areas + [payload])
+
+    # Propagate the wildfire and store the new fire fronts
+    def fire_update(self):
+        current_Time = self.current_Time
+        self.process_events()
+        if self.terrain_rasters is not None:
+            self.prefetch_terrain()
+
+        if self.spec_flag == 0:
+            if len(self.active_Areas) > 0:
+                self.new_fire_front, self.current_geo_phys_info = self.fire_env.fire_propagation(
+                    self.world_Size, ign_points_all=self.ign_points_all, geo_phys_info=self.geo_phys_info,
+                    previous_terrain_map=self.previous_terrain_map, pruned_List=self.pruned_List)
+            else:
+                self.new_fire_front = np.array([])
+                self.current_geo_phys_info = []
+        elif self.fire_multi_area:
+            # All the fire spot areas in one call (the areas whose start delay has not passed yet are left out)
+            new_fire_front, current_geo_phys_info, area_ids = self.fire_env.fire_propagation(
+                self.world_Size, ign_points_all=self.ign_points_all, previous_terrain_map=self.previous_terrain_map,
+                pruned_List=self.pruned_List, current_time=current_Time / 1000)
+            self.new_fire_front_temp = self.fire_env.split_areas(new_fire_front, area_ids)
+            self.current_geo_phys_info = self.fire_env.split_areas(current_geo_phys_info, area_ids)
+            self.new_fire_front = new_fire_front
+
+            for i in self.active_Areas:
+                self.fire_map_spec[i] = self.fire_map_spec_buffer[i].append(self.new_fire_front_temp[i])
+        else:
+            # Only the active areas are propagated (the dormant ones keep no fire fronts)
+            for i in self.active_Areas:
+                self.new_fire_front_temp[i], self.current_geo_phys_info[i] = self.fire_env[i].fire_propagation(
+                    self.world_Size, ign_points_all=self.ign_points_all[i], geo_phys_info=self.geo_phys_info[i],
+                    previous_terrain_map=self.previous_terrain_map[i], pruned_List=self.pruned_List)
+            new_fire_front = []
+            for i in self.active_Areas:
+                for j in range(len(self.new_fire_front_temp[i])):
+                    new_fire_front.append(self.new_fire_front_temp[i][j])
+            self.new_fire_front = np.array(new_fire_front)
+
+            for i in self.active_Areas:
+                self.fire_map_spec[i] = self.fire_map_spec_buffer[i].append(self.new_fire_front_temp[i])
+
+        if self.spec_flag == 0:
+            self.fire_map_spec = self.fire_map
+
+        # Process the fire spot information
+        self.fire_Current_Map, self.fire_States_List, self.target_onFire_list, self.target_onFire_Flag = \
+            self.Agent_Util.fire_Data_Storage_Grid(self.set_loci[1][0], self.fire_States_List, self.new_fire_front, self.world_Size,
+                                                   self.fireSpots_Num, self.fire_Current_Map, current_Time, self.fire_grid, self.target_onFire_list,
+                                                   self.target_onFire_Flag, self.target_info, self.spec_flag, self.fire_turnon_flag)
+
+    # Move the agents, sense and prune the fire spots and update the fire map for the next tick
+    def agent_update(self):
+        firefighter_Agent_Num = self.firefighter_Agent_Num
+        current_Agent_State_List = self.current_Agent_State_List
+
+        # Search all the existing agents, update its position
+        for i in range(self.agent_Num):
+            # If its value of the move mode flag is 0, the agent will automatically fly towards the goal
+            if (self.move_Mode_Flag[i] == 0) and (len(self.global_User_Data_List[i]) > 0):
+                self.motion_update(i, 0.0, 0.0)
+
+            # Append to the current agent state list into the corresponding list
+            self.global_Agent_State[i] = self.global_Agent_State[i] + current_Agent_State_List[i]
+
+            # If the current agent is the sensing agent, enable the sensing function
+            if current_Agent_State_List[i][8] == 0:
+                fire_Sensed_Map, CoM_Info = self.Agent_Util.fire_Sensing_Grid(
+                    self.fire_map_spec, current_Agent_State_List[i], self.agent_FOV, self.geo_phys_info, self.fire_grid, self.world_Size,
+                    self.set_loci[1][0], self.spec_flag, self.fire_turnon_flag,
+                    [self.agent_Lower_Height_List[i], self.agent_Upper_Height_List[i], current_Agent_State_List[i][2]])
+
+                self.sensed_Fire_Spot_List[current_Agent_State_List[i][9] - 1].append(fire_Sensed_Map)
+                self.CoM_Info_List[current_Agent_State_List[i][9] - 1].append(CoM_Info)
+
+            # For the firefighter agents, utilize the pruning function and update the onFire, sensed, and pruned list
+            elif current_Agent_State_List[i][8] == 1:
+                self.prune(i, 30)
+
+            # For the hybrid agents, enable both function of the sensing and firefighter agents
+            elif current_Agent_State_List[i][8] == 2:
+                fire_Sensed_Map, CoM_Info = self.Agent_Util.fire_Sensing_Grid(
+                    self.fire_map_spec, current_Agent_State_List[i], self.agent_FOV, self.geo_phys_info, self.fire_grid, self.world_Size,
+                    self.set_loci[1][0], self.spec_flag, self.fire_turnon_flag,
+                    [self.agent_Lower_Height_List[i], self.agent_Upper_Height_List[i], current_Agent_State_List[i][2]])
+
+                self.sensed_Fire_Spot_List[self.searching_Agent_Num + current_Agent_State_List[i][9] - 1].append(fire_Sensed_Map)
+                self.CoM_Info_List[self.searching_Agent_Num + current_Agent_State_List[i][9] - 1].append(CoM_Info)
+
+                self.prune(i, 20)
+
+        # Refresh the list views of the fire states
+        self.onFire_List = self.fire_grid.as_list(FireStateGrid.ON_FIRE)
+        self.sensed_List = self.fire_grid.as_list(FireStateGrid.SENSED, sort=True)
+        self.pruned_List = self.fire_grid.as_list(FireStateGrid.PRUNED)
+
+        # updating the fire-map data for next step
+        if self.new_fire_front.shape[0] > 0:
+            self.fire_map = self.fire_map_buffer.append(self.new_fire_front)  # raw fire map without fire decay
+
+        if self.spec_flag == 1:
+            for i in self.active_Areas:
+                if self.new_fire_front_temp[i].shape[0] > 0:
+                    self.previous_terrain_map[i] = self.terrain_map_buffer[i].append(self.new_fire_front_temp[i])
+                self.fire_turnon_flag[i] = 1
+                self.ign_points_all[i] = self.new_fire_front_temp[i]
+        else:
+            if len(self.active_Areas) > 0:
+                self.fire_turnon_flag = 1
+            if self.new_fire_front.shape[0] > 0:
+                self.previous_terrain_map = self.terrain_map_buffer.append(self.new_fire_front)
+                self.ign_points_all = self.new_fire_front
+
+    # The pruning of a firefighter / hybrid agent, once it hovers over its goal at the pruning height
+    def prune(self, i, pruning_Height):
+        agent_State = self.current_Agent_State_List[i]
+        trigger_Index = agent_State[9] - 1 + self.firefighter_Agent_Num * (agent_State[8] - 1)
+        if (self.pruning_Trigger[trigger_Index] == 1) and (agent_State[2] == pruning_Height):
+            fire_Pruned_Map, self.target_onFire_list, sensed_flag = \
+                self.Agent_Util.fire_Pruning_Grid(self.fire_map, agent_State, self.agent_FOV, self.fire_grid, self.target_onFire_list,
+                                                  self.target_info, self.confidence_level_list[i])
+            if sensed_flag == 1:
+                self.pruned_Fire_Spot_List[trigger_Index].append([fire_Pruned_Map, [agent_State[0], agent_State[1], self.current_Time]])
+
+                if agent_State[12] > 0:
+                    agent_State[12] = agent_State[12] - 1
+                else:
+                    agent_State[13] = 0
+
+                self.pruning_Trigger[trigger_Index] = 2
+        else:
+            self.pruned_Fire_Spot_List[trigger_Index].append([])
+
@@ -52,6 +52,7 @@ from matplotlib.patches import Rectangle
 import numpy as np
 import cv2
 import os
+import heapq
 
 
 # Utilities
@@ -1600,6 +1601,78 @@ class HeteroFireBots_Reconn_Env_Utilities(object):
 
         return fire_Current_Map, fire_States_List, onFire_List, target_onFire_list, target_onFire_Flag
 
+    # The grid-based version of fire_Data_Storage (the onFire cells are kept in a FireStateGrid instead of the onFire_List)
+    # Input: the same as fire_Data_Storage, with the FireStateGrid in place of the onFire_List
+    # Output: The updated fire map, the fire state list for storage, the updated target lists (the grid is updated in place)
+    def fire_Data_Storage_Grid(self, num_ign_points, fire_States_List, new_fire_front, world_Size,
+                               fireSpots_Num, fire_Current_Map, current_Time, fire_grid, target_onFire_list, target_onFire_Flag, target_info, spec_flag, fire_turnon_flag):
+        # Initialize the list to store the fire front that locates inside the target region
+        target_new_firefront = []
+        for i in range(len(target_onFire_list)):
+            target_new_firefront.append([])
+            for j in range(len(target_onFire_list[i])):
+                target_new_firefront[i].append(target_onFire_list[i][j][len(target_onFire_list[i][j]) - 1])
+
+        if new_fire_front.shape[0] > 0:
+            # Ensure that all the fire spots to be displayed must be within the window scope
+            in_window = (new_fire_front[:, 0] <= (world_Size - 1)) & (new_fire_front[:, 1] <= (world_Size - 1)) & \
+                        (new_fire_front[:, 0] >= 0) & (new_fire_front[:, 1] >= 0)
+            cells = new_fire_front[in_window, 0:2].astype(int)
+            np.add.at(fire_Current_Map, (cells[:, 0], cells[:, 1]), new_fire_front[in_window, 2])
+
+            # The new fire front points which are not on fire yet are added to the onFire cells
+            new_cells = cells[fire_grid.add(FireStateGrid.ON_FIRE, cells)]
+
+            # Determine whether the new fire fronts locate inside the target region
+            hits = self.target_Hits(new_cells, target_info, target_onFire_list)
+            for i1 in range(len(hits)):
+                for j1 in np.nonzero(hits[i1])[0]:
+                    target_new_firefront[i1][j1] += int(hits[i1][j1])
+                    target_onFire_Flag[i1][j1] = 1
+
+            if spec_flag == 0:
+                # Write the fire spot into the current world map list
+                for i in range(fireSpots_Num):
+                    for j in range(num_ign_points):
+                        fire_States_List[i].append([new_fire_front[i * num_ign_points + j][0],
+                                                    new_fire_front[i * num_ign_points + j][1],
+                                                    new_fire_front[i * num_ign_points + j][2], current_Time])
+            else:
+                # Write the fire spot into the current world map list
+                count = 0
+                for i in range(fireSpots_Num):
+                    if fire_turnon_flag[i] == 1:
+                        for j in range(num_ign_points[i]):
+                            fire_States_List[i].append([new_fire_front[count + j][0],
+                                                        new_fire_front[count + j][1],
+                                                        new_fire_front[count + j][2], current_Time])
+                        count += num_ign_points[i]
+
+        # Write the number of fire fronts inside the target region into the storage list
+        for i1 in range(len(target_onFire_list)):
+            for j1 in range(len(target_onFire_list[i1])):
+                target_onFire_list[i1][j1].append(target_new_firefront[i1][j1])
+
+        return fire_Current_Map, fire_States_List, target_onFire_list, target_onFire_Flag
+
+    # Count the fire spot cells inside each target region
+    # Input: the fire spot cells, the target info, the target onFire list (for the number of targets of each type)
+    # Output: list (per target type) of the number of cells inside each target region
+    @staticmethod
+    def target_Hits(cells, target_info, target_onFire_list):
+        hits = []
+        for i1 in range(len(target_onFire_list)):
+            num_targets = len(target_onFire_list[i1])
+            if len(cells) == 0 or num_targets == 0:
+                hits.append(np.zeros(num_targets, dtype=int))
+                continue
+            target_loci = np.array([target_info[i1][j1][0:4] for j1 in range(num_targets)], dtype=float)
+            inside = (cells[:, 0:1] > target_loci[:, 0] - target_loci[:, 2] / 2) & (cells[:, 0:1] < target_loci[:, 0] + target_loci[:, 2] / 2) & \
+                     (cells[:, 1:2] > target_loci[:, 1] - target_loci[:, 3] / 2) & (cells[:, 1:2] < target_loci[:, 1] + target_loci[:, 3] / 2)
+            hits.append(inside.sum(axis=0))
+
+        return hits
+
     # check if a point is inside FOV
     @staticmethod
     def in_fov(br_x=None, br_y=None, tl_x=None, tl_y=None, x=None, y=None):
@@ -1653,6 +1726,11 @@ class HeteroFireBots_Reconn_Env_Utilities(object):
 
         U = wind_speed[np.random.randint(low=0, high=world_Size)][0]
         Theta = wind_direction[np.random.randint(low=0, high=world_Size)][0]
+        # The local wind of the fire spots replaces the drawn wind (when the wind rasters are loaded)
+        if 'wind_speed_map' in geo_phys_info:
+            U = geo_phys_info['wind_speed_map'][np.array(x).astype(int), np.array(y).astype(int)]
+        if 'wind_direction_map' in geo_phys_info:
+            Theta = geo_phys_info['wind_direction_map'][np.array(x).astype(int), np.array(y).astype(int)]
         # current_geo_phys_info = np.array([R, U, Theta])  # storing GP information
 
         # Calculate the necessary parameters: LB, HB, C
@@ -1840,6 +1918,104 @@ class HeteroFireBots_Reconn_Env_Utilities(object):
 
         return fire_Pruned_Map, fire_map, onFire_List, sensed_List, pruned_List, new_fire_front, target_onFire_list, sensed_flag
 
+    # The grid-based version of fire_Sensing (the sensed cells are flagged in the FireStateGrid instead of the sensed_List)
+    # Input: the same as fire_Sensing, with the FireStateGrid in place of the onFire_List and sensed_List
+    # Output: fire sensed map (for agent status recording), CoM info (the grid is updated in place)
+    def fire_Sensing_Grid(self, fire_map, current_Agent_State, agent_FOV, geo_phys_info, fire_grid, world_Size, num_ign_points, spec_flag, fire_turnon_flag, height_info):
+        # Initialize the list to store the sensed fire state
+        fire_Sensed_Map = []
+
+        # Initialize the height info (Upper and lower bound, current height) from the external height info list
+        [lower_bound, upper_bound, current_height] = height_info
+
+        # If the lower_bound equals to the upper bound (Fixed perception height), set the confidence level as 1
+        if lower_bound == upper_bound:
+            confidence_level = 1
+        # If not, compute the confidence level (0.4 - 1.0) in proportion to the height range (Lower - Upper Bound)
+        elif lower_bound < upper_bound:
+            confidence_level = 1 - (current_height - lower_bound) / (upper_bound - lower_bound) * 0.6
+
+        # Calculate the size of the searching scope
+        searching_Scope_X = 2 * np.tan(agent_FOV[0]) * current_Agent_State[2]
+        searching_Scope_Y = 2 * np.tan(agent_FOV[1]) * current_Agent_State[2]
+        # The coordination of the upper-left and lower-right corners of the agent searching scope
+        (tl_x, tl_y) = (current_Agent_State[0] - searching_Scope_X / 2, current_Agent_State[1] - searching_Scope_Y / 2)
+        (br_x, br_y) = (current_Agent_State[0] + searching_Scope_X / 2, current_Agent_State[1] + searching_Scope_Y / 2)
+
+        if spec_flag == 0:
+            fire_maps, geo_phys_infos, turnon_flags = [fire_map], [geo_phys_info], [fire_turnon_flag]
+        else:
+            fire_maps, geo_phys_infos, turnon_flags = fire_map, geo_phys_info, fire_turnon_flag
+
+        for i in range(len(fire_maps)):
+            # Search for the current fire map, determine whether the given fire spot locates within the searching scope
+            raw_sensed_idx = np.nonzero((fire_maps[i][:, 0] <= br_x) & (fire_maps[i][:, 0] >= tl_x) &
+                                        (fire_maps[i][:, 1] <= br_y) & (fire_maps[i][:, 1] >= tl_y))[0]
+            # Apply the stochastic perception
+            raw_sensed_idx = np.random.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))), replace=False)
+            raw_sensed_list = fire_maps[i][raw_sensed_idx, :]
+            if turnon_flags[i] == 1 and len(raw_sensed_list[:, 0]) > 0:
+                fire_Velocity = self.fire_Propagation_Velocity([raw_sensed_list[:, 0], raw_sensed_list[:, 1]], geo_phys_infos[i], world_Size)
+
+                fire_Sensed_Map = np.zeros((len(raw_sensed_list[:, 0]), 4), dtype=float)
+                fire_Sensed_Map[:, 0:3] = raw_sensed_list[:, 0:3]
+                fire_Sensed_Map[:, 3] = fire_Velocity
+
+                fire_grid.add(FireStateGrid.SENSED, raw_sensed_list[:, 0:2].astype(int))
+
+        # If the sensed fire spot list is not null, calculate its center of mass
+        CoM_Info = []
+        if len(fire_Sensed_Map) > 0:
+            CoM_Info = self.center_Of_Mass_Calculate(fire_Sensed_Map)
+
+        return fire_Sensed_Map, CoM_Info
+
+    # The grid-based version of fire_Pruning (the fire states are updated in the FireStateGrid instead of the lists)
+    # Input: the same as fire_Pruning, with the FireStateGrid in place of the onFire_List, sensed_List and pruned_List
+    # Output: fire_Pruned_Map (for agent status recording), the updated target onFire list, the sensed flag (the grid is updated in place)
+    def fire_Pruning_Grid(self, fire_map, current_Agent_State, agent_FOV, fire_grid, target_onFire_list, target_info, confidence_level):
+        # Initialize the list to store the sensed fire state
+        fire_Pruned_Map = []
+
+        # Calculate the size of the searching scope
+        searching_Scope_X = 2 * np.tan(agent_FOV[0]) * current_Agent_State[2]
+        searching_Scope_Y = 2 * np.tan(agent_FOV[1]) * current_Agent_State[2]
+        # The coordination of the upper-left and lower-right corners of the agent searching scope
+        (tl_x, tl_y) = (current_Agent_State[0] - searching_Scope_X / 2, current_Agent_State[1] - searching_Scope_Y / 2)
+        (br_x, br_y) = (current_Agent_State[0] + searching_Scope_X / 2, current_Agent_State[1] + searching_Scope_Y / 2)
+        # sensed list flag, if there is any points that is included in the sensed list, this flag will become 1
+        sensed_flag = 0
+
+        # Search for the current fire map, determine whether the given fire spot locates within the searching scope
+        raw_sensed_idx = np.nonzero((fire_map[:, 0] <= br_x) & (fire_map[:, 0] >= tl_x) & (fire_map[:, 1] <= br_y) & (fire_map[:, 1] >= tl_y))[0]
+        # Apply the stochastic pruning
+        raw_sensed_idx = np.random.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))), replace=False)
+        temp_list = fire_map[raw_sensed_idx, :]
+        if len(temp_list) > 0:
+            temp_cells = temp_list[:, 0:2].astype(int)
+            if fire_grid.count(FireStateGrid.SENSED) == 0 or fire_grid.test(FireStateGrid.SENSED, temp_cells).any():
+                sensed_flag = 1
+
+            # The pruning agent could only put out fire region that contains the sensed fire fronts
+            if sensed_flag == 1:
+                # the first fire front of each cell that is on fire and not pruned yet
+                candidates = fire_grid.test(FireStateGrid.ON_FIRE, temp_cells) & ~fire_grid.test(FireStateGrid.PRUNED, temp_cells)
+                pruned_idx = np.nonzero(candidates)[0]
+                pruned_idx = pruned_idx[fire_grid.add(FireStateGrid.PRUNED, temp_cells[pruned_idx])]
+                pruned_cells = temp_cells[pruned_idx]
+                fire_grid.remove(FireStateGrid.ON_FIRE, pruned_cells)
+                fire_grid.remove(FireStateGrid.SENSED, pruned_cells)
+
+                # Determine whether the pruned fire fronts locate inside the target region
+                hits = self.target_Hits(pruned_cells, target_info, target_onFire_list)
+                for i1 in range(len(hits)):
+                    for j1 in np.nonzero(hits[i1])[0]:
+                        target_onFire_list[i1][j1][len(target_onFire_list[i1][j1]) - 1] -= int(hits[i1][j1])
+
+                fire_Pruned_Map = temp_list[pruned_idx, 0:3].tolist()
+
+        return fire_Pruned_Map, target_onFire_list, sensed_flag
+
     # Display the battery capacity and water tank info
     # Input: current screen, current states of each agent, display font, battery parameter, user_Data_List,
     #        index_1st, goal_Index_List, the world size
@@ -2039,11 +2215,15 @@ class HeteroFireBots_Reconn_Env_Utilities(object):
         return  current_Max_Intensity
 
     # Compute score for online and offline display
-    def score_Calculation(self, fire_map_len, onfire_List, sensed_list, pruning_list, target_onFire_List, target_onFire_Flag, facility_penalty, environment_para, set_loci, time):
+    def score_Calculation(self, fire_map_len, onfire_List, sensed_list, pruning_list, target_onFire_List, target_onFire_Flag, facility_penalty, environment_para, set_loci, time,
+                          fire_grid=None):
         time = time / 1000
 
         sensed_List_copy = sensed_list.copy()
-        if len(sensed_List_copy) > 0:
+        if fire_grid is not None:
+            # the number of sensed cells that are still on fire, read from the FireStateGrid
+            modified_sensed_num = fire_grid.count_all(FireStateGrid.ON_FIRE | FireStateGrid.SENSED)
+        elif len(sensed_List_copy) > 0:
             sensed_List_copy[0:0] = list(onfire_List).copy()
             modified_sensed_num = len(sensed_list) - len(np.unique(np.array(sensed_List_copy), axis=0).tolist()) + len(onfire_List)
         else:
@@ -2155,3 +2335,253 @@ class HeteroFireBots_Reconn_Env_Utilities(object):
                 pygame.draw.line(screen, (139, 69, 19), (target_Loci[i][0][0], target_Loci[i][0][1]),
                                  (target_Loci[j][0][0], target_Loci[j][0][1]), 5)
 
+
+# Grid-based store of the firespot states (canonical store behind onFire_List, sensed_List and pruned_List)
+class FireStateGrid(object):
+    """
+    Compact world grid of the firespot states. Every cell holds a uint8 bit-mask of its states (unburnt -> 0, on fire -> ON_FIRE, sensed ->
+    SENSED, pruned -> PRUNED), so adding, testing and removing a cell are O(1) and the bulk updates are array operations. For each state a
+    dense array of the cells (in insertion order) and a cell -> slot map are kept next to the grid, from which the legacy [[x, y], ...] list
+    views are derived lazily (and cached until the state changes). The grid grows automatically for cells outside the world window.
+    """
+
+    UNBURNT = 0
+    ON_FIRE = 1
+    SENSED = 2
+    PRUNED = 4
+    FLAGS = (ON_FIRE, SENSED, PRUNED)
+
+    def __init__(self, world_size=100):
+        self.world_size = world_size
+        self.clear()
+
+    # removing all the firespots
+    def clear(self):
+        self.origin = np.zeros(2, dtype=np.int64)  # world coordinates of grid[0, 0]
+        self.grid = np.zeros((self.world_size, self.world_size), dtype=np.uint8)  # state bit-mask of each cell
+        self.slots = {}  # per state: grid of the cells' slots in the dense cell array (-1 -> not in that state)
+        self.cells = {}  # per state: dense array of the [x, y] cells (insertion order, removed cells are compacted lazily)
+        self.alive = {}  # per state: flags of the dense array entries still in that state
+        self.sizes = {}  # per state: number of used entries of the dense array
+        self.counts = {}  # per state: number of cells in that state
+        self.views = {}  # cached list views
+        for flag in self.FLAGS:
+            self.slots[flag] = np.full(self.grid.shape, -1, dtype=np.int64)
+            self.cells[flag] = np.zeros((64, 2), dtype=np.int64)
+            self.alive[flag] = np.zeros(64, dtype=bool)
+            self.sizes[flag] = 0
+            self.counts[flag] = 0
+
+    # number of cells in a state
+    def count(self, flag):
+        return self.counts[flag]
+
+    # number of cells that are in all the given states (e.g., ON_FIRE | SENSED)
+    def count_all(self, flags):
+        return int(np.count_nonzero((self.grid & flags) == flags))
+
+    # converting cells into grid indices (returns the local indices and the in-grid flags)
+    def local(self, cells):
+        cells = np.asarray(cells).reshape(-1, 2).astype(np.int64)  # same truncation as int()
+        local = cells - self.origin
+        inside = (local[:, 0] >= 0) & (local[:, 0] < self.grid.shape[0]) & (local[:, 1] >= 0) & (local[:, 1] < self.grid.shape[1])
+
+        return local, inside
+
+    # enlarging the grid so that it covers a set of cells
+    def grow(self, cells):
+        low = np.minimum(cells.min(axis=0), self.origin)
+        high = np.maximum(cells.max(axis=0) + 1, self.origin + self.grid.shape)
+        pad = max(16, self.world_size // 4)  # some head-room so that the grid does not grow at every new cell
+        low = np.where(low < self.origin, low - pad, low)
+        high = np.where(high > self.origin + self.grid.shape, high + pad, high)
+
+        offset = self.origin - low
+        window = (slice(offset[0], offset[0] + self.grid.shape[0]), slice(offset[1], offset[1] + self.grid.shape[1]))
+        grid = np.zeros(tuple(high - low), dtype=np.uint8)
+        grid[window] = self.grid
+        self.grid = grid
+        for flag in self.FLAGS:
+            slots = np.full(grid.shape, -1, dtype=np.int64)
+            slots[window] = self.slots[flag]
+            self.slots[flag] = slots
+        self.origin = low
+
+    # checking which cells are in a state
+    def test(self, flag, cells):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param cells: array (or list) of [x, y] cells (truncated to int)
+        :return: boolean flag per cell
+        """
+
+        local, inside = self.local(cells)
+        found = np.zeros(local.shape[0], dtype=bool)
+        found[inside] = (self.grid[local[inside, 0], local[inside, 1]] & flag) > 0
+
+        return found
+
+    # adding cells to a state (cells already in that state and repeated cells are skipped)
+    def add(self, flag, cells):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param cells: array (or list) of [x, y] cells (truncated to int)
+        :return: boolean flag per cell, True where the cell was newly added
+        """
+
+        cells = np.asarray(cells).reshape(-1, 2).astype(np.int64)
+        added = np.zeros(cells.shape[0], dtype=bool)
+        if cells.shape[0] == 0:
+            return added
+
+        local, inside = self.local(cells)
+        if not inside.all():
+            self.grow(cells)
+            local, inside = self.local(cells)
+
+        # first occurrence of each cell which is not in the state yet
+        keys = local[:, 0] * self.grid.shape[1] + local[:, 1]
+        first = np.zeros(cells.shape[0], dtype=bool)
+        first[np.unique(keys, return_index=True)[1]] = True
+        added = first & ((self.grid[local[:, 0], local[:, 1]] & flag) == 0)
+        new_local = local[added]
+        num_new = new_local.shape[0]
+        if num_new == 0:
+            return added
+
+        # appending the cells to the dense array (doubling its capacity when needed)
+        size = self.sizes[flag]
+        if size + num_new > self.cells[flag].shape[0]:
+            capacity = max(2 * self.cells[flag].shape[0], size + num_new)
+            self.cells[flag] = np.concatenate([self.cells[flag], np.zeros((capacity - self.cells[flag].shape[0], 2), dtype=np.int64)])
+            self.alive[flag] = np.concatenate([self.alive[flag], np.zeros(capacity - self.alive[flag].shape[0], dtype=bool)])
+        self.cells[flag][size:size + num_new] = cells[added]
+        self.alive[flag][size:size + num_new] = True
+        self.slots[flag][new_local[:, 0], new_local[:, 1]] = np.arange(size, size + num_new)
+        self.grid[new_local[:, 0], new_local[:, 1]] |= flag
+        self.sizes[flag] += num_new
+        self.counts[flag] += num_new
+        self.views.pop(flag, None)
+
+        return added
+
+    # removing cells from a state
+    def remove(self, flag, cells):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param cells: array (or list) of [x, y] cells (truncated to int)
+        :return: boolean flag per cell, True where the cell was removed
+        """
+
+        local, inside = self.local(cells)
+        removed = np.zeros(local.shape[0], dtype=bool)
+        if local.shape[0] == 0:
+            return removed
+
+        # first occurrence of each cell which is in the state
+        keys = np.where(inside, local[:, 0] * self.grid.shape[1] + local[:, 1], -1)
+        first = np.zeros(local.shape[0], dtype=bool)
+        first[np.unique(keys, return_index=True)[1]] = True
+        removed[inside] = (self.grid[local[inside, 0], local[inside, 1]] & flag) > 0
+        removed &= first
+        old_local = local[removed]
+        if old_local.shape[0] == 0:
+            return removed
+
+        self.alive[flag][self.slots[flag][old_local[:, 0], old_local[:, 1]]] = False
+        self.slots[flag][old_local[:, 0], old_local[:, 1]] = -1
+        self.grid[old_local[:, 0], old_local[:, 1]] &= np.uint8(~flag & 0xFF)
+        self.counts[flag] -= old_local.shape[0]
+        self.views.pop(flag, None)
+
+        # compacting the dense array once half of it is removed cells
+        if self.sizes[flag] > 64 and 2 * self.counts[flag] < self.sizes[flag]:
+            self.compact(flag)
+
+        return removed
+
+    # dropping the removed cells from the dense array of a state
+    def compact(self, flag):
+        live = self.cells[flag][:self.sizes[flag]][self.alive[flag][:self.sizes[flag]]]
+        num_live = live.shape[0]
+        self.cells[flag][:num_live] = live
+        self.alive[flag][:] = False
+        self.alive[flag][:num_live] = True
+        self.sizes[flag] = num_live
+        local = live - self.origin
+        self.slots[flag][local[:, 0], local[:, 1]] = np.arange(num_live)
+
+    # the cells in a state as an array (insertion order)
+    def get_cells(self, flag):
+        if self.sizes[flag] != self.counts[flag]:
+            self.compact(flag)
+
+        return self.cells[flag][:self.sizes[flag]].copy()
+
+    # boolean mask of a state over the world window (world_size x world_size)
+    def mask(self, flag):
+        mask = np.zeros((self.world_size, self.world_size), dtype=bool)
+        low = np.maximum(self.origin, 0)
+        high = np.minimum(self.origin + self.grid.shape, self.world_size)
+        if (high > low).all():
+            mask[low[0]:high[0], low[1]:high[1]] = (self.grid[low[0] - self.origin[0]:high[0] - self.origin[0],
+                                                              low[1] - self.origin[1]:high[1] - self.origin[1]] & flag) > 0
+
+        return mask
+
+    # the legacy [[x, y], ...] list view of a state (cached, do not modify it in place)
+    def as_list(self, flag, sort=False):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param sort: sort the cells by [x, y] (the order np.unique() gives) instead of the insertion order
+        :return: list of [x, y] cells
+        """
+
+        views = self.views.setdefault(flag, {})
+        if sort not in views:
+            cells = self.get_cells(flag)
+            if sort and cells.shape[0] > 0:
+                cells = cells[np.lexsort((cells[:, 1], cells[:, 0]))]
+            views[sort] = cells.tolist()
+
+        return views[sort]
+
+
+# Scheduler of the timed events of a session (e.g., the activation of the delayed fire spot areas)
+class EventScheduler(object):
+    """
+    Min-heap of timed events (time, kind, payload), so the simulation only pays for an event when it is due instead of testing every
+    pending condition on every tick, and knows when the next event is. Events with the same time pop in the order they were scheduled. An
+    event at time t is due on the first tick strictly after t (the same as the "current_Time > delay" tests it replaces).
+    """
+
+    def __init__(self):
+        self.heap = []    # [(time, sequence number, kind, payload)]
+        self.counter = 0  # sequence number of the next scheduled event (keeps the heap order stable)
+
+    # number of the pending events
+    def __len__(self):
+        return len(self.heap)
+
+    # adding an event
+    def schedule(self, time, kind, payload=None):
+        heapq.heappush(self.heap, (time, self.counter, kind, payload))
+        self.counter += 1
+
+    # the time of the next pending event (inf if there is none)
+    def next_time(self):
+        return self.heap[0][0] if len(self.heap) > 0 else np.inf
+
+    # removing and returning the events that are due at a time
+    def pop_due(self, time):
+        """
+        :param time: the current time
+        :return: list of (time, kind, payload) of the events scheduled strictly before the current time, in time order
+        """
+
+        events = []
+        while len(self.heap) > 0 and self.heap[0][0] < time:
+            event_time, _, kind, payload = heapq.heappop(self.heap)
+            events.append((event_time, kind, payload))
+
+        return events
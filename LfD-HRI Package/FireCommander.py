@@ -59,9 +59,10 @@ from Dependencies.Utilities import Utilities as Util
 import matplotlib.pyplot as plt
 import os, sys
 import shutil
-from Dependencies.WildFireModel import WildFire
 from Dependencies.Utilities import HeteroFireBots_Reconn_Env_Utilities
-from Dependencies.DemoVisualization import Animation_Reconstruction_Reconn_Utilities
+from Dependencies.DemoVisualization import Animation_Reconstruction_Reconn_Utilities, ReplayIndex
+from Dependencies.SessionLogger import SessionLogger, SessionLogReader, BackgroundWriter, save_Snapshot, load_Session_Data
+from Dependencies.SimulationCore import SimulationCore
 from Dependencies.ScenarioModeParams import scenario_setting
 
 scenario = scenario_setting()
@@ -5346,15 +5347,6 @@ class environment_ctl():
         self.close_flag = 0
         self.environment_simulation()
 
-    def agent_arrange(self):
-        if self.set_loci[2][1] == 1:
-            relative_pos = [[-40, -180], [-40, -120], [-40, -60], [-40, 0], [-40, 60], [-40, 120], [40, -180], [40, -120], [40, -60]]
-        else:
-            relative_pos = [[-180, -40], [-100, -40], [-20, -40], [60, -40], [140, -40], [-180, 40], [-100, 40], [-20, 40], [60, 40]]
-        self.agent_pos_list = []
-        for i in range(self.robo_team_para[0] + self.robo_team_para[1] + self.robo_team_para[2]):
-            self.agent_pos_list.append([self.set_loci[2][0][0] + relative_pos[i][0], self.set_loci[2][0][1] + relative_pos[i][1]])
-
     def environment_simulation(self):
         # ************************ Part 0: Background ******************************
         # All the size unit of the object are represented in pixel
@@ -5371,382 +5363,20 @@ class environment_ctl():
         global score_list
         global username
 
-        # ************************ Part 1: Target ******************************
-        # Targets (Color: Orange (255, 165, 0))
-        # The number of the targets: 3
-        house_Num = self.environment_para[3]
-        hospital_Num = self.environment_para[4]
-        power_station_Num =self.environment_para[5]
-
-        target_Num = house_Num + hospital_Num + power_station_Num
-
-        # Target info: target center position, target size, target type (0: Normal, 1: Hospital, 2: Power Station)
-        # The list to store the position of each target in the dictionary
-        target_Loci = []
-        target_onFire_list = [[], [], [], []]
-        target_onFire_Flag = [[], [], [], []]
-        target_info = [[], [], [], []]
-        for i in range(house_Num):
-            # The center of the target 1: (700, 700), size 120 * 150, Normal, enable_Edge_Flag, current time
-            target_Loci.append([[self.set_loci[3][i][0], self.set_loci[3][i][1], 120, 150, 0, 1, 0]])
-            target_info[0].append([self.set_loci[3][i][0], self.set_loci[3][i][1], 120, 150, 0, i])
-            target_onFire_list[0].append([0])
-            target_onFire_Flag[0].append(0)
-
-        for i in range(hospital_Num):
-            # The center of the target 2: (600, 800), size 120 * 150, Hospital, current time
-            target_Loci.append([[self.set_loci[4][i][0], self.set_loci[4][i][1], 150, 180, 1, 1, 0]])
-            target_info[1].append([self.set_loci[4][i][0], self.set_loci[4][i][1], 150, 180, 1, i])
-            target_onFire_list[1].append([0])
-            target_onFire_Flag[1].append(0)
-
-        for i in range(power_station_Num):
-            # The center of the target 2: (600, 800), size 120 * 150, Hospital, current time
-            target_Loci.append([[self.set_loci[5][i][0], self.set_loci[5][i][1], 180, 220, 2, 1, 0]])
-            target_info[2].append([self.set_loci[5][i][0], self.set_loci[5][i][1], 180, 220, 2, i])
-            target_onFire_list[2].append([0])
-            target_onFire_Flag[2].append(0)
-
-        lake_list = []
-        lake_Loci = []
-        for i in range(len(self.set_loci[6])):
-            lake_list.append([[self.set_loci[6][i][0], self.set_loci[6][i][1]]])
-            lake_Loci.append([[self.set_loci[6][i][0], self.set_loci[6][i][1], 100, 0]])
-
-        # ************************ Part 2: Fire state ******************************
-        # Fire region (Color: Red (255, 0, 0))
-        # The wildfire generation and propagation utilizes the FARSITE wildfire mathematical model (Thanks to Esi Seraj)
-        # To clarify the fire state data, the state of the fire spot at each moment is stored in the dictionary list separately
-        # Besides, the current fire map will also be stored as the matrix with the same size of the simulation model, which
-        # reflects the fire intensity of each position on the world
-        # The number of the fire spots
-        fireSpots_Num = self.environment_para[2]
-        # Create the fire state dictionary list
-        fire_States_List = []
-        for i in range(fireSpots_Num):
-            fire_States_List.append([])
-
-        terrain_sizes = [world_Size, world_Size]  # length and width of the terrain as a list [length [m], width [m]]
-        # [[x_min [m], x_max [m], y_min [m], y_max [m]]]
-        hotspot_areas = []
-        for i in range(self.environment_para[2]):
-            hotspot_areas.append([self.set_loci[0][i][0] - 50, self.set_loci[0][i][0] + 50, self.set_loci[0][i][1] - 50, self.set_loci[0][i][1] + 50])
-        duration = self.environment_para[1]  # total duration to run the simulation
-        time_point = 0  # current time
-        time_step = 0.01  # (sampling frequency)^-1
-        fire_decay_flg = False  # declare if dynamic fire decay over time should be included or not
-        decay_rate = 0.0005  # fuel exhaustion rate (greater means faster exhaustion)
-
-        if self.set_loci[1][9] == 0:
-            num_ign_points = self.set_loci[1][0]  # initial number of fire spots (ignition points) per hotspot area
-
-            fuel_coeff = self.set_loci[1][2]  # fuel coefficient for vegetation type of the terrain (higher fuel_coeff:: more circular shape fire)
-            wind_speed = self.set_loci[1][3]  # average mid-flame wind velocity (higher values streches the fire more)
-            wind_direction = np.pi * 2 * self.set_loci[1][4] / 360 # wind azimuth
-
-            time_vector = time_point * np.ones(num_ign_points * len(hotspot_areas))  # a vector containing the time passed after ignition of each point
-            fire_env = WildFire(
-                terrain_sizes=terrain_sizes, hotspot_areas=hotspot_areas, num_ign_points=num_ign_points, duration=duration, time_step=1,
-                radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi/3)  # local form
-
-            ign_points_all = fire_env.hotspot_init()  # initializing hotspots
-            previous_terrain_map = ign_points_all.copy()  # initializing the starting terrain map
-            geo_phys_info = fire_env.geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed, avg_wind_direction=wind_direction)
-
-            fire_map = ign_points_all  # initializing fire-map
-        else:
-            fire_env = []
-            geo_phys_info = []
-            ign_points_all = []
-            previous_terrain_map = []
-            time_vector = []
-            new_fire_front_temp = []
-            current_geo_phys_info = []
-            for i in range(self.environment_para[2]):
-                new_fire_front_temp.append([])
-                current_geo_phys_info.append([])
-                num_ign_points = self.set_loci[1][0][i]  # initial number of fire spots (ignition points) per hotspot area
-
-                fuel_coeff = self.set_loci[1][2][i]  # fuel coefficient for vegetation type of the terrain (higher fuel_coeff:: more circular shape fire)
-                wind_speed = self.set_loci[1][3][i]  # average mid-flame wind velocity (higher values streches the fire more)
-                wind_direction = np.pi * 2 * self.set_loci[1][4][i] / 360  # wind azimuth
-
-                time_vector.append(time_point * np.ones(num_ign_points * 1))  # a vector containing the time passed after ignition of each point
-                fire_env.append(WildFire(
-                    terrain_sizes=terrain_sizes, hotspot_areas=[hotspot_areas[i]], num_ign_points=num_ign_points,
-                    duration=duration, time_step=1, radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3))  # local form
-                ign_points_all.append(fire_env[i].hotspot_init())  # initializing hotspots
-                previous_terrain_map.append(fire_env[i].hotspot_init())  # initializing the starting terrain map
-                geo_phys_info.append(fire_env[i].geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
-                                                            avg_wind_direction=wind_direction))
-            fire_map = []
-            for i in range(self.environment_para[2]):
-                for j in range(len(ign_points_all[i])):
-                    fire_map.append(ign_points_all[i][j])   # initializing fire-map
-            fire_map = np.array(fire_map)
-            fire_map_spec = ign_points_all
-
-        fire_Current_Map = np.zeros([world_Size,world_Size], dtype=float)
-        if self.set_loci[1][9] == 1:
-            fire_turnon_flag = np.zeros((self.environment_para[2], 1), dtype=int)
-        else:
-            fire_turnon_flag = 0
-
-        # The lists to store the firespots in different state, coordinates only
-        # The onFire_List, store the points currently on fire (sensed points included, pruned points excluded)
-        onFire_List = []
-        # The sensed_List, store the points currently on fire and have been sensed by agents
-        sensed_List = []
-        # The pruned_List, store the pruned fire spots
-        pruned_List = []
-
-        fire_Num_list = [0, 0, 0]
-
-        # ************************ Part 3: Agents ******************************
-        # Agent base: Rectangle, Yellow(255, 255, 0)
-        # The number of the agent's base
-        agent_Base_Num = 1
-
-        # The list to store the position of each agent base in the dictionary
-        # Agent Base 1: Position (120, 600), Size: (160, 400), Capacity, enable_Edge_Flag, current time
-        if self.set_loci[2][1] == 1:
-            agent_Base_Loci = [[[self.set_loci[2][0][0], self.set_loci[2][0][1], 160, 400, 9, 1, 0]]]
-            target_info[3].append([self.set_loci[2][0][0], self.set_loci[2][0][1], 160, 400, 1, 0])
-            target_onFire_list[3].append([0])
-            target_onFire_Flag[3].append(0)
-        else:
-            agent_Base_Loci = [[[self.set_loci[2][0][0], self.set_loci[2][0][1], 400, 160, 9, 1, 0]]]
-            target_info[3].append([self.set_loci[2][0][0], self.set_loci[2][0][1], 400, 160, 1, 0])
-            target_onFire_list[3].append([0])
-            target_onFire_Flag[3].append(0)
-
-        # Agents: Color: Searching agents: Blue (0, 0, 255)
-        #                HeteroFireBot_Env agents: Purple (128, 0, 128)
-        #                Hybrid agents: Cyan (0, 255, 255)
-        # The number of the searching agents
-        searching_Agent_Num = self.robo_team_para[0]
-        # The number of the firefighter agents
-        firefighter_Agent_Num = self.robo_team_para[1]
-        # The number of the hybrid agents
-        hybrid_Agent_Num = self.robo_team_para[2]
-
-        # The agent is represented as a blue dot with radius of 8
-        agent_Radius = 8
-        # The field of view (FOV) of the agent is [pi/4, pi/6], which corresponds to the size of the searching scope
-        agent_FOV = [np.pi/4, np.pi/6]
-
-        # The upper bound of the agent's flight (Meter)
-        agent_Upper_Height_List = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=int)
-        for i in range(searching_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                agent_Upper_Height_List[i] = self.adv_setting[0][0][1]
-            else:
-                agent_Upper_Height_List[i] = self.adv_setting[0][i][1]
-
-        for i in range(firefighter_Agent_Num):
-            agent_Upper_Height_List[searching_Agent_Num + i] = 30
-
-        for i in range(hybrid_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                agent_Upper_Height_List[searching_Agent_Num + firefighter_Agent_Num + i] = self.adv_setting[1][0][1]
-            else:
-                agent_Upper_Height_List[searching_Agent_Num + firefighter_Agent_Num + i] = self.adv_setting[1][i][1]
-
-        # The lower bound of the agent's flight (Meter)
-        agent_Lower_Height_List = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=int)
-        for i in range(searching_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                agent_Lower_Height_List[i] = self.adv_setting[0][0][0]
-            else:
-                agent_Lower_Height_List[i] = self.adv_setting[0][i][0]
-
-        for i in range(firefighter_Agent_Num):
-            agent_Lower_Height_List[searching_Agent_Num + i] = 30
-
-        for i in range(hybrid_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                agent_Lower_Height_List[searching_Agent_Num + firefighter_Agent_Num + i] = self.adv_setting[1][0][0]
-            else:
-                agent_Lower_Height_List[searching_Agent_Num + firefighter_Agent_Num + i] = self.adv_setting[1][i][0]
-
-        # lift_Step is the length of each height change after pressing the keyboard up and down button (Meter)
-        lift_Step = 5
-
-        # Battery parameter [Total energy, consumption during flight, consumption during waiting]
-        battery_para = []
-        for i in range(searching_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                battery_para.append([self.adv_setting[2][0][0], 0.1, 0.05])
-            else:
-                battery_para.append([self.adv_setting[2][i][0], 0.1, 0.05])
-
-        for i in range(firefighter_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                battery_para.append([self.adv_setting[3][0][0], 0.1, 0.05])
-            else:
-                battery_para.append([self.adv_setting[3][i][0], 0.1, 0.05])
-
-        for i in range(hybrid_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                battery_para.append([self.adv_setting[4][0][0], 0.1, 0.05])
-            else:
-                battery_para.append([self.adv_setting[4][i][0], 0.1, 0.05])
-
-        # Start flag, if the start flag is 0, silent
-        # If the start flag is 1, the agent begins to move
-        # If the start flag is 2, return
-        start_Flag = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=int)
-
-        # Move mode flag, if its value is 0, the agent will automatically fly towards the goal
-        # If its value is 1, the agent will fly by one step when clicking
-        move_Mode_Flag = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=int)
-
-        self.agent_arrange()
-
-        # Initialize the list to store the agent current state at each moment
-        current_Agent_State_List = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            current_Agent_State_List.append([])
-
-        # Initialize the list to store the current state of each agent
-        # Content: [agent_Position(X, Y, Z), agent_Velocity(X, Y, Z), goal_Index, current_Time, agent' type, agent index,
-        #          sum of running distance, sum of waiting time, water tank capacity, move_enabling_flag, patrolling flag,
-        #          patrolling goal]
-        for i in range(searching_Agent_Num):
-            current_Agent_State_List[i] = [self.agent_pos_list[i][0], self.agent_pos_list[i][1], max(20, agent_Lower_Height_List[i]), 0, 0, 0, 0, 0, 0, i + 1, 0, 0, 0, 1, 0, 0]
-
-        for i in range(firefighter_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                current_Agent_State_List[searching_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + i][0], self.agent_pos_list[searching_Agent_Num + i][1],
-                                                                    30, 0, 0, 0, 0, 0, 1, i + 1, 0, 0, self.adv_setting[8][0][0], 1, 0, 0]
-            else:
-                current_Agent_State_List[searching_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + i][0], self.agent_pos_list[searching_Agent_Num + i][1],
-                                                                     30, 0, 0, 0, 0, 0, 1, i + 1, 0, 0, self.adv_setting[8][i][0], 1, 0, 0]
-
-        for i in range(hybrid_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                current_Agent_State_List[searching_Agent_Num + firefighter_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][0],
-                                                                                            self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][1],
-                                                                                            max(20, agent_Lower_Height_List[searching_Agent_Num + firefighter_Agent_Num + i]),
-                                                                                            0, 0, 0, 0, 0, 2, i + 1, 0, 0, self.adv_setting[9][0][0], 1, 0, 0]
-            else:
-                current_Agent_State_List[searching_Agent_Num + firefighter_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][0],
-                                                                                             self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][1],
-                                                                                             max(20, agent_Lower_Height_List[searching_Agent_Num + firefighter_Agent_Num + i]),
-                                                                                             0, 0, 0, 0, 0, 2, i + 1, 0, 0, self.adv_setting[9][i][0], 1, 0, 0]
-        # Initial height of the agents
-        agent_Init_Pos_Z = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            agent_Init_Pos_Z.append(current_Agent_State_List[i][2])
-
-        # agent_Current_Pos_Z is the current flight height of the agent
-        agent_Current_Pos_Z = agent_Init_Pos_Z
-
-        # Initialize the original agent state list
-        original_Agent_State_List = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            original_Agent_State_List.append([])
-
-        # Preserve the original info for each agent
-        for i in range(searching_Agent_Num):
-            original_Agent_State_List[i] = [self.agent_pos_list[i][0], self.agent_pos_list[i][1], max(20, agent_Lower_Height_List[i]), 0, 0, 0, 0, 0, 0, i + 1, 0, 0, 0, 1, 0, 0]
-
-        for i in range(firefighter_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                original_Agent_State_List[searching_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + i][0], self.agent_pos_list[searching_Agent_Num + i][1],
-                                                                    30, 0, 0, 0, 0, 0, 1, i + 1, 0, 0, self.adv_setting[8][0][0], 1, 0, 0]
-            else:
-                original_Agent_State_List[searching_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + i][0], self.agent_pos_list[searching_Agent_Num + i][1],
-                                                                     30, 0, 0, 0, 0, 0, 1, i + 1, 0, 0, self.adv_setting[8][i][0], 1, 0, 0]
-
-        for i in range(hybrid_Agent_Num):
-            if self.robo_team_para[3] == 0:
-                original_Agent_State_List[searching_Agent_Num + firefighter_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][0],
-                                                                                            self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][1],
-                                                                                            max(20, agent_Lower_Height_List[searching_Agent_Num + firefighter_Agent_Num + i]),
-                                                                                            0, 0, 0, 0, 0, 2, i + 1, 0, 0, self.adv_setting[9][0][0], 1, 0, 0]
-            else:
-                original_Agent_State_List[searching_Agent_Num + firefighter_Agent_Num + i] = [self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][0],
-                                                                                             self.agent_pos_list[searching_Agent_Num + firefighter_Agent_Num + i][1],
-                                                                                             max(20, agent_Lower_Height_List[searching_Agent_Num + firefighter_Agent_Num + i]),
-                                                                                             0, 0, 0, 0, 0, 2, i + 1, 0, 0, self.adv_setting[9][i][0], 1, 0, 0]
+        # ************************ Part 1: Simulation core ******************************
+        # The targets, the fire state (FARSITE wildfire model), the agents and the user data are held by the headless simulation core,
+        # which is advanced by one tick every frame with the user actions of that frame. The loop below translates the pygame events into
+        # the core's commands and draws the core's state
+        sim = SimulationCore(self.environment_para, self.robo_team_para, self.set_loci, self.adv_setting, facility_penalty=facility_penalty)
 
-        # Initialize the list to store the selected agent current state at each moment
-        current_Agent_State = []
-
-        # current agent index is the current index of the agent in operation
-        # For the current program, 0, 1 are the searching agent, 2, 3 are the firefighter agent
-        current_Agent_Index = 0
+        # The digit keys 1 - 9 select the agent with the corresponding index
+        select_Keys = [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5, pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9]
 
         # Th initial maximum fire intensity
         current_Max_Intensity = 155
 
-        # Initialize the global list to store the agent state at each moment
-        global_Agent_State = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            global_Agent_State.append([])
-
-        # Initialize the patrolling goal list to store the current patrolling goal for each agent
-        patrolling_Goal_List = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            patrolling_Goal_List.append([])
-
-        # Initialize the goal index list to store the index for each goal for reference
-        goal_Index_List = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            goal_Index_List.append([])
-
-        # Initialize the list to store the sensed fire spot data
-        sensed_Fire_Spot_List = []
-        for i in range(searching_Agent_Num + hybrid_Agent_Num):
-            sensed_Fire_Spot_List.append([])
-
-        # Initialize the list to store the pruned fire spot data
-        pruned_Fire_Spot_List = []
-        for i in range(firefighter_Agent_Num + hybrid_Agent_Num):
-            pruned_Fire_Spot_List.append([])
-
-        # Initialize the list to store the waiting time for the action agent only
-        waiting_Time_List = []
-        for i in range(firefighter_Agent_Num):
-            waiting_Time_List.append(0)
-
-        # The upper bound of the agent's flight (Meter)
-        confidence_level_list = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=float)
-        for i in range(searching_Agent_Num):
-            confidence_level_list[i] = 0
-
-        for i in range(firefighter_Agent_Num):
-            confidence_level_list[searching_Agent_Num + i] = self.set_loci[1][7]/100
-
-        for i in range(hybrid_Agent_Num):
-            confidence_level_list[searching_Agent_Num + firefighter_Agent_Num + i] = self.set_loci[1][8]/100
-
-        # Initialize the trigger for pruning the fire spot
-        pruning_Trigger = np.zeros(firefighter_Agent_Num + hybrid_Agent_Num)
-
-        # Initialize the list to store the CoM info of sensed fire spot
-        CoM_Info_List = []
-        for i in range(searching_Agent_Num + hybrid_Agent_Num):
-            CoM_Info_List.append([])
-
-        # ************************ Part 4: User Data ******************************
-        # goal_Index: store the index of the goal (Action type 0, Mouse click)
-        goal_Index = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=int)
-        # current_Goal_Index: the position of the current goal in user_data_list
-        current_Goal_Index = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num, dtype=int)
-
-        # Initialize the list to store the history of the agent's goal
-        # Content: The goal position (X, Y), current time, action type, goal_index
-        # Action type: -1: Keyboard Down, 0: Mouse click, 1: Keyboard Up
-        # goal_index will only be utilized when action 0 happens. For the rest of the actions, it will remain 0
-        # Initial the global_User_Data_List to store all the goals of each agent
-        global_User_Data_List = []
-        for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-            global_User_Data_List.append([])
-
         # Initialize the index for each agent's next goal
-        index_Next = np.zeros(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num)
+        index_Next = np.zeros(sim.agent_Num)
 
         # Initialize the pygame environment
         pygame.init()
@@ -5790,7 +5420,7 @@ class environment_ctl():
 
         # ************************ Background Information Storage ******************************
         # Create the list to store the background information
-        background_Info = [self.environment_para, self.robo_team_para, self.set_loci, self.adv_setting, agent_Radius, agent_FOV, 16]
+        background_Info = [self.environment_para, self.robo_team_para, self.set_loci, self.adv_setting, sim.agent_Radius, sim.agent_FOV, 16]
         # Write the background information into the .pkl file
         if self.scenario_idx == 0:
             background_Info_Output = open('Dependencies/Open_World_Data/' + username + '/Background_Info.pkl', 'wb')
@@ -5798,14 +5428,26 @@ class environment_ctl():
 
             # Write the information of the agent's battery into the .pkl file
             battery_Info_Output = open('Dependencies/Open_World_Data/' + username + '/Battery_Info.pkl', 'wb')
-            pickle.dump(battery_para, battery_Info_Output)
+            pickle.dump(sim.battery_para, battery_Info_Output)
         elif self.scenario_idx > 0:
             background_Info_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Background_Info.pkl', 'wb')
             pickle.dump(background_Info, background_Info_Output)
 
             # Write the information of the agent's battery into the .pkl file
             battery_Info_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Battery_Info.pkl', 'wb')
-            pickle.dump(battery_para, battery_Info_Output)
+            pickle.dump(sim.battery_para, battery_Info_Output)
+
+        # ************************ Session Log ******************************
+        # The lists below only grow during the session, so every tick only their new data is appended to the session log
+        if self.scenario_idx == 0:
+            data_Dir = 'Dependencies/Open_World_Data/' + username
+        else:
+            data_Dir = 'Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username
+        # The log batches and the screen shots are written by a background thread, so the main loop does not block on the disk
+        data_Writer = BackgroundWriter(max_Queue=64)
+        session_Log = SessionLogger(data_Dir + '/Session_Log.pkl', {'Target_Loci': 2, 'Fire_States': 2, 'Lake_info': 2, 'Sensing_Data_CoM': 2,
+                                                                     'Sensed_Fire_Map': 2, 'target_onFire_List': 3, 'Pruned_Fire_Map': 2,
+                                                                     'Agent_Base_Loci': 2, 'Agent_States': 2}, writer=data_Writer)
 
         # ************************ Main loop for display ******************************
         while True:
@@ -5814,33 +5456,18 @@ class environment_ctl():
 
             # Acquire the current time (Synchronize the time stamp)
             current_Time = pygame.time.get_ticks()
-            # Extract the info and goal set of the current selected agent from the whole list
-            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-            agent_Upper_Height = agent_Upper_Height_List[current_Agent_Index]
-            agent_Lower_Height = agent_Lower_Height_List[current_Agent_Index]
 
-            # Assume the agent moves in the constant speed, the maximum speed is 20
-            if current_Agent_State[8] == 0:
-                if self.robo_team_para[3] == 0:
-                    agent_Speed = self.adv_setting[5][0][0]
-                else:
-                    agent_Speed = self.adv_setting[5][current_Agent_State[9] - 1][0]
-            elif current_Agent_State[8] == 1:
-                if self.robo_team_para[3] == 0:
-                    agent_Speed = self.adv_setting[6][0][0]
-                else:
-                    agent_Speed = self.adv_setting[6][current_Agent_State[9] - 1][0]
-            else:
-                if self.robo_team_para[3] == 0:
-                    agent_Speed = self.adv_setting[7][0][0]
-                else:
-                    agent_Speed = self.adv_setting[7][current_Agent_State[9] - 1][0]
+            # The user actions of this frame, applied by the simulation core in the given order
+            commands = []
 
             # ************************ Part 1: Monitor the click event ******************************
             # Set the exit event to generate the simulation video and exit the simulation environment
             for event in pygame.event.get():
                 if event.type == QUIT:
                     if video_Recording_Flag == 1:
+                        # Wait for the pending screen shots to be written
+                        data_Writer.drain()
+
                         # Generate the video to record the simulation
                         if self.scenario_idx == 0:
                             Util.generate_animation('Dependencies/Open_World_Data/' + username + '/Raw_Images',
@@ -5867,470 +5494,69 @@ class environment_ctl():
                     self.close_flag = 1
                     #sys.exit()
 
-                # If the left button of the mouse is pressed, get the current position of the mouse (Goal)
+                # If the left button of the mouse is pressed, the current position of the mouse is a new goal of the selected agent
                 elif event.type == MOUSEBUTTONDOWN:
-                    # Get the position of the mouse when the click event happens
                     (goal_X, goal_Y) = pygame.mouse.get_pos()
+                    commands.append(('goal', goal_X, goal_Y))
 
-                    # Ensure that the mouse click happens inside the window
-                    if (goal_X <= world_Size) and (goal_Y <= world_Size):
-                        in_Base_Flag, base_Index = Agent_Util.in_Agent_Base_Region(goal_X, goal_Y, agent_Base_Num, agent_Base_Loci)
-                        # If the clicked position locates within the base region, the agent will go back the base to refuel
-                        if in_Base_Flag:
-                            current_Agent_State[13] = 2
-
-                        else:
-                            # Update the goal_Index variable
-                            goal_Index[current_Agent_Index] += 1
-
-                            # Create the buffer to store the location and time(ms) of the new goal (Action 0)
-                            new_Goal_Buffer = [goal_X, goal_Y, np.floor(current_Time / 100), 0, goal_Index[current_Agent_Index]]
-
-                            if (start_Flag[current_Agent_Index] == 0) and (current_Agent_State[7] > 0):
-                                current_Goal_Index[current_Agent_Index] = max(len(goal_Index_List[current_Agent_Index]),
-                                                                              current_Goal_Index[current_Agent_Index])
-                                patrolling_Goal_List[current_Agent_Index] = [new_Goal_Buffer]
-                                current_Agent_State[6] = max(len(goal_Index_List[current_Agent_Index]) + 1, current_Agent_State[6])
-                                current_Agent_State[14] = 0
-                                current_Agent_State[15] = 0
-
-                            # If patrolling agent flag is 0, add it into the patrolling goal list
-                            if (current_Agent_State[14] == 0):
-                                # Set the first goal as the first element in the patrolling goal list
-                                if (len(global_User_Data_List[current_Agent_Index]) == 0):
-                                    patrolling_Goal_List[current_Agent_Index].append(new_Goal_Buffer)
-                                else:
-                                    # Determine the closure of the patrolling loop
-                                    patrolling_Distance = np.sqrt(
-                                        (new_Goal_Buffer[0] - patrolling_Goal_List[current_Agent_Index][0][0]) ** 2 +
-                                        (new_Goal_Buffer[1] - patrolling_Goal_List[current_Agent_Index][0][1]) ** 2)
-                                    # If the distance between the new goal and the 1st element in the patrolling loop list is less than the agent_Speed,
-                                    # set the flag of the patrolling loop closure as 1
-                                    if (patrolling_Distance <= (agent_Speed * 5)) and (len(patrolling_Goal_List[current_Agent_Index]) > 1):
-                                        current_Agent_State[14] = 1
-                                        index = 0
-                                        for i in range(len(patrolling_Goal_List[current_Agent_Index])):
-                                            if current_Agent_State[6] == patrolling_Goal_List[current_Agent_Index][i][4]:
-                                                index = i
-                                                break
-                                        current_Agent_State[15] = index
-
-                                    # If not, add it into the patrolling goal list
-                                    else:
-                                        patrolling_Goal_List[current_Agent_Index].append(new_Goal_Buffer)
-                            # If patrolling agent flag is 1, determine the ending condition of the patrolling loop
-                            else:
-                                current_Goal_Index[current_Agent_Index] = max(len(goal_Index_List[current_Agent_Index]), current_Goal_Index[current_Agent_Index])
-                                current_Agent_State[6] = max(len(goal_Index_List[current_Agent_Index]) + 1, current_Agent_State[6])
-                                current_Agent_State[14] = 0
-                                current_Agent_State[15] = 0
-                                patrolling_Goal_List[current_Agent_Index] = [new_Goal_Buffer]
-
-                            # Record the index of the current goal in the global_User_Data_List
-                            goal_Index_List[current_Agent_Index].append(len(global_User_Data_List[current_Agent_Index]))
-
-                            # Record the goal information in the global list
-                            global_User_Data_List[current_Agent_Index].append(new_Goal_Buffer)
-
-                            if self.scenario_idx == 0:
-                                # Write the information of the goals into the .pkl file
-                                user_Data_Output = open('Dependencies/Open_World_Data/' + username + '/User_Data.pkl', 'wb')
-                                pickle.dump(global_User_Data_List, user_Data_Output)
-                            elif self.scenario_idx > 0:
-                                # Write the information of the goals into the .pkl file
-                                user_Data_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/User_Data.pkl', 'wb')
-                                pickle.dump(global_User_Data_List, user_Data_Output)
-
-                            # Update the start flag
-                            if current_Agent_State[13] != 2:
-                                start_Flag[current_Agent_Index] = 1
-
-                        # If its value of the move mode flag is 1, the agent will fly by one step when clicking
-                        if move_Mode_Flag[current_Agent_Index] == 1:
-                            current_Agent_State, agent_Current_Pos_Z[current_Agent_Index], agent_Init_Pos_Z[current_Agent_Index], \
-                            current_Goal_Index[current_Agent_Index], pruning_Trigger, start_Flag[current_Agent_Index], waiting_Time_List = \
-                                Agent_Util.agent_Motion_Controller(agent_Speed, current_Agent_State,
-                                                                 move_Mode_Flag[current_Agent_Index],
-                                                                 goal_X, goal_Y, agent_Current_Pos_Z[current_Agent_Index],
-                                                                 agent_Init_Pos_Z[current_Agent_Index],
-                                                                 global_User_Data_List[current_Agent_Index],
-                                                                 current_Goal_Index[current_Agent_Index],
-                                                                 goal_Index[current_Agent_Index],
-                                                                 start_Flag[current_Agent_Index], firefighter_Agent_Num,
-                                                                 pruning_Trigger, battery_para[current_Agent_Index],
-                                                                 original_Agent_State_List[current_Agent_Index],
-                                                                 patrolling_Goal_List[current_Agent_Index], waiting_Time_List, current_Time)
-
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-
-                # If the up or down button of the keyboard is pressed, change the size of the searching scope
+                # If the up or down button of the keyboard is pressed, change the flight height (the size of the searching scope)
+                # If digit key between 1 and 9 on the keyboard is pressed, switch the agent index
                 elif event.type == KEYDOWN:
-                    # Mark the keyboard action for storage
-                    keyboard_Action_Type = 0
-
-                    # If the up button of the keyboard is pressed, enlarge the searching scope
                     if event.key == pygame.K_UP:
-                        # This action is only effective for the sensing agents and hybrid agents
-                        if (current_Agent_State[8] == 0) or (current_Agent_State[8] == 2):
-                            # Update the flight height
-                            agent_Current_Pos_Z[current_Agent_Index] = agent_Init_Pos_Z[current_Agent_Index] + lift_Step
-                            # Ensure the height value does not exceed the upper bound
-                            if agent_Current_Pos_Z[current_Agent_Index] > agent_Upper_Height:
-                                agent_Current_Pos_Z[current_Agent_Index] = agent_Upper_Height
-                            # Set the keyboard action as 1
-                            keyboard_Action_Type = 1
-
-                    # If the down button of the keyboard is pressed, shrink the searching scope
+                        commands.append(('lift', 1))
                     elif event.key == pygame.K_DOWN:
-                        # This action is only effective for the sensing agents and hybrid agents
-                        if (current_Agent_State[8] == 0) or (current_Agent_State[8] == 2):
-                            # Update the flight height
-                            agent_Current_Pos_Z[current_Agent_Index] = agent_Init_Pos_Z[current_Agent_Index] - lift_Step
-                            # Ensure the height value does not exceed the lower bound
-                            if agent_Current_Pos_Z[current_Agent_Index] < agent_Lower_Height:
-                                agent_Current_Pos_Z[current_Agent_Index] = agent_Lower_Height
-                            # Set the keyboard action as -1
-                            keyboard_Action_Type = -1
-
-                    # If digit key between 1 and 9 on the keyboard is pressed, switch the agent index
-                    elif event.key == pygame.K_1:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 1:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 0
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_2:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 2:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 1
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_3:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 3:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 2
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_4:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 4:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 3
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_5:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 5:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 4
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_6:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 6:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 5
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_7:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 7:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 6
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_8:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 8:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 7
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    elif event.key == pygame.K_9:
-                        if (searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num) >= 9:
-                            # Update the current_Agent_State_List first
-                            # Update the corresponding element in the current_Agent_State_List
-                            current_Agent_State_List[current_Agent_Index] = current_Agent_State
-                            # Append to the current agent state list into the corresponding list
-                            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                                global_Agent_State[i] += current_Agent_State_List[i]
-
-                            # Switch the agent index
-                            current_Agent_Index = 8
-
-                            # Update the current_Agent_State list
-                            current_Agent_State = current_Agent_State_List[current_Agent_Index]
-
-                    # If the keyboard up or down event happens, write the action to the list
-                    if keyboard_Action_Type != 0:
-                        # Create the buffer to store the location and time(ms) of the new goal (Action -1 / 1)
-                        new_Goal_Buffer = [current_Agent_State[0], current_Agent_State[1],
-                                           np.floor(current_Time/100), keyboard_Action_Type, 0]
-                        # Record the goal information in the global list
-                        global_User_Data_List[current_Agent_Index].append(new_Goal_Buffer)
-
-                        if self.scenario_idx == 0:
-                            # Write the information of the goals into the .pkl file
-                            user_Data_Output = open('Dependencies/Open_World_Data/' + username + '/User_Data.pkl', 'wb')
-                            pickle.dump(global_User_Data_List, user_Data_Output)
-                        elif self.scenario_idx > 0:
-                            # Write the information of the goals into the .pkl file
-                            user_Data_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/User_Data.pkl', 'wb')
-                            pickle.dump(global_User_Data_List, user_Data_Output)
-
-
-            # ************************ Part 2: Plot the targets ******************************
-            Agent_Util.road_plot(screen, target_Loci)
+                        commands.append(('lift', -1))
+                    elif event.key in select_Keys:
+                        commands.append(('select', select_Keys.index(event.key)))
+
+            # ************************ Part 2: Advance the simulation ******************************
+            # Propagate the wildfire, move the agents, sense / prune the fire spots and compute the game score up to the current time
+            score_list, done = sim.step(current_Time - sim.current_Time, commands)
+
+            # Write the information of the goals into the .pkl file
+            if sim.user_Data_Updated:
+                if self.scenario_idx == 0:
+                    user_Data_Output = open('Dependencies/Open_World_Data/' + username + '/User_Data.pkl', 'wb')
+                    pickle.dump(sim.global_User_Data_List, user_Data_Output)
+                elif self.scenario_idx > 0:
+                    user_Data_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/User_Data.pkl', 'wb')
+                    pickle.dump(sim.global_User_Data_List, user_Data_Output)
+
+            # The state of the agents to display
+            current_Agent_State_List = sim.current_Agent_State_List
+            global_User_Data_List = sim.global_User_Data_List
+            patrolling_Goal_List = sim.patrolling_Goal_List
+            agent_Radius = sim.agent_Radius
+            agent_FOV = sim.agent_FOV
+
+            # ************************ Part 3: Plot the targets ******************************
+            Agent_Util.road_plot(screen, sim.target_Loci)
             # Plot all the targets
-            for i in range(target_Num):
-                target_Loci[i] = Agent_Util.target_Plot(screen, hospital_Font, target_Loci[i], current_Time)
-
-            lake_Loci = Agent_Util.lake_plot(screen, lake_list, lake_Loci, current_Time)
-
-            # ************************ Part 3: Plot the fire spot ******************************
-            # propagate the wildfire
-            if self.set_loci[1][9] == 0:
-                if current_Time > (self.set_loci[1][1] * 1000):
-                    new_fire_front, current_geo_phys_info = fire_env.fire_propagation(world_Size, ign_points_all=ign_points_all,
-                        geo_phys_info=geo_phys_info, previous_terrain_map=previous_terrain_map, pruned_List = pruned_List)
-                    updated_terrain_map = previous_terrain_map
-                else:
-                    new_fire_front = np.array([])
-                    current_geo_phys_info = []
-            else:
-                updated_terrain_map = previous_terrain_map
-                for i in range(self.environment_para[2]):
-                    if current_Time > (self.set_loci[1][1][i] * 1000):
-                        new_fire_front_temp[i], current_geo_phys_info[i] = fire_env[i].fire_propagation(world_Size,
-                                                                                          ign_points_all=ign_points_all[i],
-                                                                                          geo_phys_info=geo_phys_info[i],
-                                                                                          previous_terrain_map=previous_terrain_map[i],
-                                                                                          pruned_List=pruned_List)
-                    else:
-                        new_fire_front_temp[i] = np.array([])
-                        current_geo_phys_info[i] = []
-                new_fire_front = []
-                for i in range(self.environment_para[2]):
-                    for j in range(len(new_fire_front_temp[i])):
-                        new_fire_front.append(new_fire_front_temp[i][j])
-                new_fire_front = np.array(new_fire_front)
-
-            if self.set_loci[1][9] == 1:
-                for i in range(self.environment_para[2]):
-                    if current_Time > (self.set_loci[1][1][i] * 1000):
-                        fire_map_spec[i] = np.concatenate([fire_map_spec[i], new_fire_front_temp[i]], axis=0)
-                    else:
-                        fire_map_spec[i] = fire_map_spec[i]
-            else:
-                fire_map_spec = fire_map
-
-            # Process the fire spot information
-            fire_Current_Map, fire_States_List, onFire_List, target_onFire_list, target_onFire_Flag = Agent_Util.fire_Data_Storage(self.set_loci[1][0], fire_States_List,
-                                    new_fire_front, world_Size, fireSpots_Num, fire_Current_Map, current_Time, onFire_List, target_onFire_list, target_onFire_Flag, target_info, self.set_loci[1][9], fire_turnon_flag)
-
-            # ************************ Part 4: Update the position of the agent ******************************
-            agent_Base_Loci = Agent_Util.agent_Base_Plot(screen, agent_Base_Num, agent_Base_Loci, current_Time)
-
-            # Search all the existing agents, update its position
-            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
-                # If its value of the move mode flag is 0, the agent will automatically fly towards the goal
-                if ((move_Mode_Flag[i] == 0) and (len(global_User_Data_List[i]) > 0)):
-                    # Current selected agent
-                    if i == current_Agent_Index:
-                        current_Agent_State, agent_Current_Pos_Z[i], agent_Init_Pos_Z[i], \
-                        current_Goal_Index[i], pruning_Trigger, start_Flag[i], waiting_Time_List\
-                          = Agent_Util.agent_Motion_Controller(agent_Speed, current_Agent_State, move_Mode_Flag[i], 0.0, 0.0,
-                                                             agent_Current_Pos_Z[i], agent_Init_Pos_Z[i],
-                                                             global_User_Data_List[i], current_Goal_Index[i], goal_Index[i],
-                                                             start_Flag[i], firefighter_Agent_Num, pruning_Trigger,
-                                                             battery_para[i], original_Agent_State_List[i],
-                                                             patrolling_Goal_List[i], waiting_Time_List, current_Time)
-                        # Update the corresponding element in the current_Agent_State_List
-                        current_Agent_State_List[i] = current_Agent_State
-
-                    else:
-                        # Rest agent, moving towards to the previous goal automatically
-                        current_Agent_State1, agent_Current_Pos_Z[i], agent_Init_Pos_Z[i], \
-                        current_Goal_Index[i], pruning_Trigger, start_Flag[i], waiting_Time_List \
-                          = Agent_Util.agent_Motion_Controller(agent_Speed, current_Agent_State_List[i], move_Mode_Flag[i],
-                                                             0.0, 0.0, agent_Current_Pos_Z[i], agent_Init_Pos_Z[i],
-                                                             global_User_Data_List[i], current_Goal_Index[i], goal_Index[i],
-                                                             start_Flag[i], firefighter_Agent_Num, pruning_Trigger,
-                                                             battery_para[i], original_Agent_State_List[i],
-                                                             patrolling_Goal_List[i], waiting_Time_List, current_Time)
-                        # Update the corresponding element in the current_Agent_State_List
-                        current_Agent_State_List[i] = current_Agent_State1
-
-                # Append to the current agent state list into the corresponding list
-                global_Agent_State[i] = global_Agent_State[i] + current_Agent_State_List[i]
-
-            # ************************ Part 5: Sensing the fire spots ******************************
-                # If the current agent is the sensing agent, enable the sensing function
-                if (current_Agent_State_List[i][8] == 0):
-                    fire_Sensed_Map, CoM_Info, sensed_List = Agent_Util.fire_Sensing(fire_map_spec, current_Agent_State_List[i],
-                                                agent_FOV, geo_phys_info, onFire_List, sensed_List, world_Size, self.set_loci[1][0],
-                                                self.set_loci[1][9], fire_turnon_flag, [agent_Lower_Height_List[i], agent_Upper_Height_List[i], current_Agent_State_List[i][2]])
-
-                    sensed_Fire_Spot_List[current_Agent_State_List[i][9] - 1].append(fire_Sensed_Map)
-                    CoM_Info_List[current_Agent_State_List[i][9] - 1].append(CoM_Info)
-
-                # For the firefighter agents, utilize the pruning function and update the onFire, sensed, and pruned list
-                elif (current_Agent_State_List[i][8] == 1):
-                    trigger_Index = current_Agent_State_List[i][9] - 1 + firefighter_Agent_Num * (current_Agent_State_List[i][8] - 1)
-                    if ((pruning_Trigger[trigger_Index] == 1) and (current_Agent_State_List[i][2] == 30)):
-                        fire_Pruned_Map, fire_map, onFire_List, sensed_List, pruned_List, new_fire_front, target_onFire_list, sensed_flag = \
-                            Agent_Util.fire_Pruning(fire_map, current_Agent_State_List[i], agent_FOV, onFire_List, sensed_List,
-                                                  pruned_List, new_fire_front, target_onFire_list, target_info, confidence_level_list[i])
-                        if sensed_flag == 1:
-                            pruned_Fire_Spot_List[trigger_Index].append\
-                                ([fire_Pruned_Map, [current_Agent_State_List[i][0], current_Agent_State_List[i][1], current_Time]])
-
-
-                            if current_Agent_State_List[i][12] > 0:
-                                current_Agent_State_List[i][12] = current_Agent_State_List[i][12] - 1
-                            else:
-                               current_Agent_State_List[i][13] = 0
-
-                            pruning_Trigger[trigger_Index] = 2
-                    else:
-                        pruned_Fire_Spot_List[trigger_Index].append([])
+            for i in range(sim.target_Num):
+                sim.target_Loci[i] = Agent_Util.target_Plot(screen, hospital_Font, sim.target_Loci[i], current_Time)
 
-                # For the hybrid agents, enable both function of the sensing and firefighter agents
-                elif (current_Agent_State_List[i][8] == 2):
-                    fire_Sensed_Map, CoM_Info, sensed_List = Agent_Util.fire_Sensing(fire_map_spec, current_Agent_State_List[i],
-                                                 agent_FOV, geo_phys_info, onFire_List, sensed_List, world_Size, self.set_loci[1][0],
-                                                 self.set_loci[1][9], fire_turnon_flag, [agent_Lower_Height_List[i], agent_Upper_Height_List[i], current_Agent_State_List[i][2]])
+            sim.lake_Loci = Agent_Util.lake_plot(screen, sim.lake_list, sim.lake_Loci, current_Time)
 
-                    sensed_Fire_Spot_List[searching_Agent_Num + current_Agent_State_List[i][9] - 1].append(fire_Sensed_Map)
-                    CoM_Info_List[searching_Agent_Num + current_Agent_State_List[i][9] - 1].append(CoM_Info)
-
-                    trigger_Index = current_Agent_State_List[i][9] - 1 + firefighter_Agent_Num * (current_Agent_State_List[i][8] - 1)
-                    if ((pruning_Trigger[trigger_Index] == 1) and (current_Agent_State_List[i][2] == 20)):
-                        fire_Pruned_Map, fire_map, onFire_List, sensed_List, pruned_List, new_fire_front, target_onFire_list, sensed_flag = \
-                            Agent_Util.fire_Pruning(fire_map, current_Agent_State_List[i], agent_FOV, onFire_List, sensed_List,
-                                                  pruned_List, new_fire_front, target_onFire_list, target_info, confidence_level_list[i])
-                        if sensed_flag == 1:
-                            pruned_Fire_Spot_List[trigger_Index].append \
-                                ([fire_Pruned_Map, [current_Agent_State_List[i][0], current_Agent_State_List[i][1], current_Time]])
-
-                            if current_Agent_State_List[i][12] > 0:
-                                current_Agent_State_List[i][12] = current_Agent_State_List[i][12] - 1
-
-                            else:
-                               current_Agent_State_List[i][13] = 0
-
-                            pruning_Trigger[trigger_Index] = 2
-                    else:
-                        pruned_Fire_Spot_List[trigger_Index].append([])
+            sim.agent_Base_Loci = Agent_Util.agent_Base_Plot(screen, sim.agent_Base_Num, sim.agent_Base_Loci, current_Time)
 
+            # ************************ Part 4: Plot the fire spot ******************************
             # Plot the sensed fire spot for method learning
-            current_Max_Intensity = Agent_Util.sensed_Fire_Spot_Plot(screen, sensed_List, fire_Current_Map,
-                                                                   current_Max_Intensity)
+            current_Max_Intensity = Agent_Util.sensed_Fire_Spot_Plot(screen, sim.sensed_List, sim.fire_Current_Map, current_Max_Intensity)
 
             # Plot the pruned fire dots
+            pruned_List = sim.pruned_List
             for i in range(len(pruned_List)):
                 # Ensure that all the fire spots to be displayed must be within the window scope
                 if ((pruned_List[i][0] <= world_Size) and (pruned_List[i][1] <= world_Size)
                         and (pruned_List[i][0] >= 0) and (pruned_List[i][1] >= 0)):
                     pygame.draw.circle(screen, (0, 0, 0), (pruned_List[i][0], pruned_List[i][1]), 1)
 
-            # updating the fire-map data for next step
-            if new_fire_front.shape[0] > 0:
-                fire_map = np.concatenate([fire_map, new_fire_front], axis=0)  # raw fire map without fire decay
-
-            if self.set_loci[1][9] == 1:
-                ign_points_all_temp = []
-                for i in range(self.environment_para[2]):
-                    if new_fire_front_temp[i].shape[0] > 0:
-                        previous_terrain_map[i] = np.concatenate((updated_terrain_map[i], new_fire_front_temp[i]), axis=0)  # fire map with fire decay
-
-                    if current_Time > self.set_loci[1][1][i] * 1000:
-                        fire_turnon_flag[i] = 1
-                        ign_points_all_temp.append(new_fire_front_temp[i])
-                    else:
-                        ign_points_all_temp.append(ign_points_all[i])
-                ign_points_all = ign_points_all_temp
-            else:
-                if current_Time > self.set_loci[1][1] * 1000:
-                    fire_turnon_flag = 1
-                if new_fire_front.shape[0] > 0:
-                    previous_terrain_map = np.concatenate((updated_terrain_map, new_fire_front))  # fire map with fire decay
-                    ign_points_all = new_fire_front
-
-            # ************************ Part 6: Plot all the agents ******************************
+            # ************************ Part 5: Plot all the agents ******************************
             # Initialize the text display buffer
             text = []
 
             # Go over all the elements in the current_Agent_State_List
-            for i in range(searching_Agent_Num + firefighter_Agent_Num + hybrid_Agent_Num):
+            for i in range(sim.agent_Num):
                 # Plot all the searching agents
                 if current_Agent_State_List[i][8] == 0:
                     # Calculate the size of the searching scope
@@ -6406,137 +5632,59 @@ class environment_ctl():
 
                 # Display the goal list of the corresponding agent
                 Agent_Util.goal_Marker(screen, font_Agent, global_User_Data_List[i], current_Agent_State_List[i],
-                                     patrolling_Goal_List[i], move_Mode_Flag[i])
-
-            # ************************ Part 7: Plot the center of mass ******************************
+                                     patrolling_Goal_List[i], sim.move_Mode_Flag[i])
 
-            # ************************ Part 8: Plot the display bar ******************************
+            # ************************ Part 6: Plot the display bar ******************************
             # Display the side bar
             pygame.draw.rect(screen, (211, 211, 211), Rect((world_Size, 0), (display_Size, world_Size)))
 
             # Update the state info
-            pos = Agent_Util.side_Bar_Display(screen, current_Agent_State_List, font_Side, font_Side_Bold, font_Side_Title, battery_para,
-                                      global_User_Data_List, index_Next, goal_Index_List, world_Size)
-
-            # ************************ Part 9: Compute the game score ******************************
-            overall_pruning_score, preception_score, action_score, safe_Num, facility_perception_score, total_Negative_Score, total_Negative_percent = \
-                Agent_Util.score_Calculation(len(fire_map), onFire_List, sensed_List, pruned_List, target_onFire_list, target_onFire_Flag, facility_penalty, self.environment_para, self.set_loci, current_Time)
+            pos = Agent_Util.side_Bar_Display(screen, current_Agent_State_List, font_Side, font_Side_Bold, font_Side_Title, sim.battery_para,
+                                      global_User_Data_List, index_Next, sim.goal_Index_List, world_Size)
 
-            score_list = [overall_pruning_score, preception_score, action_score, safe_Num, facility_perception_score, total_Negative_Score, total_Negative_percent]
+            # ************************ Part 7: Display the game score ******************************
             Agent_Util.score_display(screen, font_Side_Bold, font_Score, font_Scorelist, pos, score_list)
 
-            # ************************ Part 10: Save the .pkl and the images ******************************
-            # Save the current state on the screen
-            # # All the data files will be saved every 200ms (Frequency = 5 Hz)
+            # ************************ Part 8: Save the .pkl and the images ******************************
+            # Save the current state on the screen (the screen shot is dropped if the writer is lagging behind, the data records never are)
             if video_Recording_Flag == 1:
                 if (pygame.time.get_ticks() % 100) == 0:
-                    if self.scenario_idx == 0:
-                        pygame.image.save(screen, 'Dependencies/Open_World_Data/' + username + '/Raw_Images/' + str(current_Time) + ".png")
-                    elif self.scenario_idx > 0:
-                        pygame.image.save(screen, 'Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Raw_Images/' + str(current_Time) + ".png")
-
-            if self.scenario_idx == 0:
-                # All the data files will be saved every 200ms (Frequency = 5 Hz)
-                if (pygame.time.get_ticks() - last_store_time) >= 200:
-                    # Write the information of the targets into the .pkl file
-                    target_Loci_Output = open('Dependencies/Open_World_Data/' + username + '/Target_Loci.pkl', 'wb')
-                    pickle.dump(target_Loci, target_Loci_Output)
-
-                    # Write the information of the fire states into the .pkl file
-                    fire_States_Output = open('Dependencies/Open_World_Data/' + username + '/Fire_States.pkl', 'wb')
-                    pickle.dump(fire_States_List, fire_States_Output)
-
-                    # Write the current fire spot map into the .pkl file
-                    fire_Map_Output = open('Dependencies/Open_World_Data/' + username + '/Fire_Map.pkl', 'wb')
-                    pickle.dump(fire_Current_Map, fire_Map_Output)
-
-                    # Write the lake info into the .pkl file
-                    lake_Output = open('Dependencies/Open_World_Data/' + username + '/Lake_info.pkl', 'wb')
-                    pickle.dump(lake_Loci, lake_Output)
-
-                    # Write the center of mass information into the .pkl file
-                    CoM_Output = open('Dependencies/Open_World_Data/' + username + '/Sensing_Data_CoM.pkl', 'wb')
-                    pickle.dump(CoM_Info_List, CoM_Output)
-
-                    # Write the current sensed fire spot info into the .pkl file
-                    sensed_Fire_Map_Output = open('Dependencies/Open_World_Data/' + username + '/Sensed_Fire_Map.pkl', 'wb')
-                    pickle.dump(sensed_Fire_Spot_List, sensed_Fire_Map_Output)
-
-                    # Write the list of the fire fronts that locates inside the targets info into the .pkl file
-                    target_onFire_List_Output = open('Dependencies/Open_World_Data/' + username + '/target_onFire_List.pkl', 'wb')
-                    pickle.dump(target_onFire_list, target_onFire_List_Output)
-
-                    # Write the current pruned fire spot info into the .pkl file
-                    pruned_Fire_Map_Output = open('Dependencies/Open_World_Data/' + username + '/Pruned_Fire_Map.pkl', 'wb')
-                    pickle.dump(pruned_Fire_Spot_List, pruned_Fire_Map_Output)
-
-                    # Write the information of the agent base into the .pkl file
-                    agent_Base_Loci_Output = open('Dependencies/Open_World_Data/' + username + '/Agent_Base_Loci.pkl', 'wb')
-                    pickle.dump(agent_Base_Loci, agent_Base_Loci_Output)
-
-                    # Write the information of the global agent state into the .pkl file
-                    agent_States_Output = open('Dependencies/Open_World_Data/' + username + '/Agent_States.pkl', 'wb')
-                    pickle.dump(global_Agent_State, agent_States_Output)
-
-                    last_store_time = pygame.time.get_ticks()
-
-            elif self.scenario_idx > 0:
-                # All the data files will be saved every 200ms (Frequency = 5 Hz)
-                if (pygame.time.get_ticks() - last_store_time) >= 200:
-                    # Write the information of the targets into the .pkl file
-                    target_Loci_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Target_Loci.pkl', 'wb')
-                    pickle.dump(target_Loci, target_Loci_Output)
-
-                    # Write the information of the fire states into the .pkl file
-                    fire_States_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Fire_States.pkl', 'wb')
-                    pickle.dump(fire_States_List, fire_States_Output)
-
-                    # Write the current fire spot map into the .pkl file
-                    fire_Map_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Fire_Map.pkl', 'wb')
-                    pickle.dump(fire_Current_Map, fire_Map_Output)
-
-                    # Write the lake info into the .pkl file
-                    lake_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Lake_info.pkl', 'wb')
-                    pickle.dump(lake_Loci, lake_Output)
-
-                    # Write the center of mass information into the .pkl file
-                    CoM_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Sensing_Data_CoM.pkl', 'wb')
-                    pickle.dump(CoM_Info_List, CoM_Output)
-
-                    # Write the current sensed fire spot info into the .pkl file
-                    sensed_Fire_Map_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Sensed_Fire_Map.pkl', 'wb')
-                    pickle.dump(sensed_Fire_Spot_List, sensed_Fire_Map_Output)
-
-                    # Write the list of the fire fronts that locates inside the targets info into the .pkl file
-                    target_onFire_List_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/target_onFire_List.pkl', 'wb')
-                    pickle.dump(target_onFire_list, target_onFire_List_Output)
-
-                    # Write the current pruned fire spot info into the .pkl file
-                    pruned_Fire_Map_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Pruned_Fire_Map.pkl', 'wb')
-                    pickle.dump(pruned_Fire_Spot_List, pruned_Fire_Map_Output)
-
-                    # Write the information of the agent base into the .pkl file
-                    agent_Base_Loci_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Agent_Base_Loci.pkl', 'wb')
-                    pickle.dump(agent_Base_Loci, agent_Base_Loci_Output)
-
-                    # Write the information of the global agent state into the .pkl file
-                    agent_States_Output = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Agent_States.pkl', 'wb')
-                    pickle.dump(global_Agent_State, agent_States_Output)
-
-                    last_store_time = pygame.time.get_ticks()
-
-            if (current_Time//1000) >= self.environment_para[1]:
+                    data_Writer.submit(pygame.image.save, (screen.copy(), data_Dir + '/Raw_Images/' + str(current_Time) + ".png"), drop_If_Full=True)
+
+            # Append the new data of this tick to the session log, the log file is written every 200ms (Frequency = 5 Hz)
+            session_Log.record(current_Time, {'Target_Loci': sim.target_Loci, 'Fire_States': sim.fire_States_List, 'Lake_info': sim.lake_Loci,
+                                              'Sensing_Data_CoM': sim.CoM_Info_List, 'Sensed_Fire_Map': sim.sensed_Fire_Spot_List,
+                                              'target_onFire_List': sim.target_onFire_list, 'Pruned_Fire_Map': sim.pruned_Fire_Spot_List,
+                                              'Agent_Base_Loci': sim.agent_Base_Loci, 'Agent_States': sim.global_Agent_State})
+            # The current fire map is not a growing list, so its snapshot (Fire_Map.pkl) is replaced at the same rate instead (a snapshot is
+            # dropped if the writer is lagging behind, the next one replaces it anyway)
+            if (pygame.time.get_ticks() - last_store_time) >= 200:
+                session_Log.flush()
+                data_Writer.submit(save_Snapshot, (sim.fire_Current_Map.copy(), data_Dir + '/Fire_Map.pkl'), drop_If_Full=True)
+                last_store_time = pygame.time.get_ticks()
+
+            if done:
                 self.close_flag = 1
 
             # Update the display according to the latest change
             if self.close_flag == 0:
                 pygame.display.update()
             else:
+                # Close the session log, write the per-list .pkl files of the session and wait for the writer to finish
+                session_Log.snapshot(current_Time, 'Fire_Map', sim.fire_Current_Map.copy())
+                session_Log.close()
+                data_Writer.submit(SessionLogReader(data_Dir + '/Session_Log.pkl').export_Pickles, (data_Dir,))
+                writer_Metrics = data_Writer.close()
+                print('>>> Data writer:: ' + str(writer_Metrics['written']) + ' jobs written, ' + str(writer_Metrics['dropped']) +
+                      ' screen shots/fire map snapshots dropped, max queue depth ' + str(writer_Metrics['max_Queue_Depth']) + ', main loop blocked ' +
+                      str(round(writer_Metrics['blocked_Time'], 3)) + ' s')
+
                 pygame.quit()
                 global simulated_flag
                 simulated_flag = 1
                 break
 
+
 # The score computation page
 class game_over(QWidget):
     def __init__(self, scenario_idx):
@@ -6706,6 +5854,9 @@ class game_over(QWidget):
 # Load the utilities for animation reconstruction
 Animation_Util = Animation_Reconstruction_Reconn_Utilities()
 
+# The playback speeds of the animation reconstruction (frames per displayed frame, negative:: backwards)
+replay_Speeds = [-8, -4, -2, -1, -0.5, 0.5, 1, 2, 4, 8]
+
 # The animation reconstruction class
 class Animation_Reconstruction():
     def __init__(self, scenario_idx):
@@ -6725,55 +5876,21 @@ class Animation_Reconstruction():
         fireSpots_Num = environment_para[2]
         num_ign_points = set_loci[1][0]
 
-        # Load the target info'
-        if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Target_Loci.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Target_Loci.pkl', 'rb')
-        target_Loci = pickle.load(file_IO)
-
-        # Load the agent base info
-        if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Agent_Base_Loci.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Agent_Base_Loci.pkl', 'rb')
-        agent_Base_Loci = pickle.load(file_IO)
-
-        # Load the agent state info
-        if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Agent_States.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Agent_States.pkl', 'rb')
-        global_Agent_State_List = pickle.load(file_IO)
-
-        # Load the fire state info
-        if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Fire_States.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Fire_States.pkl', 'rb')
-        fire_States_List = pickle.load(file_IO)
-
-        # Load the sensed fire info
         if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Sensed_Fire_Map.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Sensed_Fire_Map.pkl', 'rb')
-        sensed_Fire_List = pickle.load(file_IO)
+            data_Dir = 'Dependencies/Open_World_Data/' + username
+        else:
+            data_Dir = 'Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username
 
-        # Load the pruned fire info
-        if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Pruned_Fire_Map.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Pruned_Fire_Map.pkl', 'rb')
-        pruned_Fire_List = pickle.load(file_IO)
+        # Load the stored lists from the session log (or from the per-list .pkl files of the sessions recorded without one)
+        session_Data = load_Session_Data(data_Dir)
 
-        # Load the lake fire info
-        if self.scenario_idx == 0:
-            file_IO = open('Dependencies/Open_World_Data/' + username + '/Lake_info.pkl', 'rb')
-        elif self.scenario_idx > 0:
-            file_IO = open('Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Lake_info.pkl', 'rb')
-        lake_list = pickle.load(file_IO)
-        current_Max_Intensity = 155
+        target_Loci = session_Data['Target_Loci']  # the target info
+        agent_Base_Loci = session_Data['Agent_Base_Loci']  # the agent base info
+        global_Agent_State_List = session_Data['Agent_States']  # the agent state info
+        fire_States_List = session_Data['Fire_States']  # the fire state info
+        sensed_Fire_List = session_Data['Sensed_Fire_Map']  # the sensed fire info
+        pruned_Fire_List = session_Data['Pruned_Fire_Map']  # the pruned fire info
+        lake_list = session_Data['Lake_info']  # the lake info
 
         # Initialize the pygame environment
         pygame.init()
@@ -6785,22 +5902,20 @@ class Animation_Reconstruction():
         # Set the current font for the hospital word
         hospital_Font = pygame.font.SysFont('arial', 40)
 
-        onFire_List = []
-        pruned_List = []
-
         # Initialize the simulation timeline
         clock = len(agent_Base_Loci[0]) - 1
 
+        # Index the cumulative fire/sensed/pruned lists, so any frame can be displayed without replaying the ones before it
+        replay_Index = ReplayIndex(num_ign_points, fire_States_List, sensed_Fire_List, pruned_Fire_List, world_Size, fireSpots_Num,
+                                   set_loci[1][9], set_loci[1][1], clock)
+
         # Create a screen (Width * Height) = (1024 * 1024)
         screen = pygame.display.set_mode((world_Size, world_Size), 0, 32)
-        current_Max_Intensity = 155
         # Set the title of the window
         pygame.display.set_caption("Recreated HeteroFireBot Environment")
 
-        sensed_list = []
-
-        # ************************ Main loop for display ******************************
-        for time in range(clock):
+        # Draw a frame of the recording (straight from the replay index, so any frame can be drawn in any order)
+        def frame_Plot(time):
             # Fill the screen with green
             screen.fill((197, 225, 165))
 
@@ -6816,20 +5931,11 @@ class Animation_Reconstruction():
 
             text = []
 
-            new_fire_front, onFire_List = Animation_Util.onFire_List_Recovery(num_ign_points, fire_States_List,
-                                                                              world_Size,
-                                                                              fireSpots_Num, onFire_List, time,
-                                                                              set_loci[1][7], set_loci[1][1])
-
-            pruned_List = Animation_Util.pruned_List_Recovery(pruned_Fire_List, pruned_List, time)
+            replay_Frame = replay_Index.frame(time)
+            pruned_List = replay_Frame['pruned_List']
             Animation_Util.lake_plot(screen, lake_list, time)
 
-            for i in range(len(sensed_Fire_List)):
-                if len(sensed_Fire_List[i][time]) > 0:
-                    for j in range(len(sensed_Fire_List[i][time])):
-                        sensed_list.append(sensed_Fire_List[i][time][j])
-            current_Max_Intensity = Animation_Util.sensed_Fire_Spot_Plot(screen, sensed_list, time,
-                                                                         current_Max_Intensity)
+            Animation_Util.sensed_Fire_Spot_Plot(screen, replay_Frame['sensed_List'], time, replay_Frame['current_Max_Intensity'])
 
             # Plot the pruned fire dots
             for i in range(len(pruned_List)):
@@ -6909,16 +6015,58 @@ class Animation_Reconstruction():
                 # Display the name of each agent
                 screen.blit(text[i], (current_Agent_State_List[0], current_Agent_State_List[1]))
 
-            # Write the current screen shot to the directory
-            if self.scenario_idx == 0:
-                pygame.image.save(screen, 'Dependencies/Open_World_Data/' + username + '/Raw_Images/' + str(time) + ".png")
-            elif self.scenario_idx > 0:
-                pygame.image.save(screen, 'Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Raw_Images/' + str(time) + ".png")
+            # Write the current screen shot to the directory (each frame once, the video is made of all the frames in order)
+            if time not in saved_Frames:
+                saved_Frames.add(time)
+                if self.scenario_idx == 0:
+                    pygame.image.save(screen, 'Dependencies/Open_World_Data/' + username + '/Raw_Images/' + str(time) + ".png")
+                elif self.scenario_idx > 0:
+                    pygame.image.save(screen, 'Dependencies/Scenario_Data/Scenario#' + str(self.scenario_idx) + "/" + username + '/Raw_Images/' + str(time) + ".png")
+
+        # ************************ Main loop for display ******************************
+        # The playback position moves by the playback speed (frames per displayed frame, fractional speeds are accumulated and negative
+        # speeds play backwards) and is clamped to the recording. The playback ends once the last frame is reached playing forward.
+        # Keys:: Space -> pause / resume, Right / Left -> faster / slower (through the reverse speeds), R -> reverse the direction,
+        #        Home / End -> seek to the first / last frame, 0 - 9 -> seek to 0% - 90% of the recording
+        saved_Frames = set()
+        position, speed, paused = 0, 1, False
+        running = clock > 0
+        while running:
+            time = replay_Index.clamp(position)
+            frame_Plot(time)
 
             # Update the display according to the latest change
             pygame.display.update()
             pygame.time.wait(10)
 
+            for event in pygame.event.get():
+                if event.type == QUIT:
+                    running = False
+                elif event.type == KEYDOWN:
+                    if event.key == K_SPACE:
+                        paused = not paused
+                    elif event.key in [K_RIGHT, K_LEFT]:
+                        speed_Index = replay_Speeds.index(speed) + (1 if event.key == K_RIGHT else -1)
+                        speed = replay_Speeds[min(max(speed_Index, 0), len(replay_Speeds) - 1)]
+                    elif event.key == K_r:
+                        speed = -speed
+                    elif event.key == K_HOME:
+                        position = 0
+                    elif event.key == K_END:
+                        position = clock - 1
+                    elif K_0 <= event.key <= K_9:
+                        position = (event.key - K_0) * clock // 10
+
+            if not paused:
+                if (speed > 0) and (time == clock - 1):
+                    running = False
+                position = replay_Index.step(position, speed)
+
+        # The frames skipped while seeking or playing fast are drawn off-screen for the video
+        for time in range(clock):
+            if time not in saved_Frames:
+                frame_Plot(time)
+
         # Generate the video to record the simulation
         if self.scenario_idx == 0:
             Util.generate_animation('Dependencies/Open_World_Data/' + username + '/Raw_Images', 'Dependencies/Open_World_Data/' + username + '/Open_World' + '_' + username + '_Animation.avi')
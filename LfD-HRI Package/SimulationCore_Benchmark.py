@@ -0,0 +1,63 @@
+"""
+# *******************************<><><><><>************************************
+# *  FireCommander 2020 - An Interactive Joint Perception-Action Environment  *
+# *******************************<><><><><>************************************
+#
+# Properties of CORE Robotics Lab
+#	- Institute for Robotics & Intelligent Machines (IRIM), Georgia Institute
+#		of Technology, Atlanta, GA, United States, 30332
+#
+# Authors
+#	- Esmaeil Seraj* <IRIM, School of ECE, Georgia Tech - eseraj3@gatech.edu>
+#	- Xiyang Wu <School of ECE, Georgia Tech - xwu391@gatech.edu>
+#	- Matthew Gombolay (Ph.D) <IRIM, School of IC, Georgia Tech>
+#
+#	- *Esmaeil Seraj >> Author to whom any correspondences shall be forwarded
+#
+# Dependencies and Tutorials
+#	- GitHub: ................... https://github.com/EsiSeraj/FireCommander2020
+#	- Documentation (arXiv): .................................. [Add_Link_Here]
+#	- PPT Tutorial: ........................................... [Add_Link_Here]
+#	- Video Tutorial: ............................ https://youtu.be/UQsWPh9c3eM
+#	- Supported by Python 3.6.4 and PyGame 1.9.6 (or any later version)
+#
+# Licence
+# - (C) CORE Robotics Lab. All Rights Reserved - FireCommander 2020 (TM)
+#
+# - <FireCommander 2020 - An Interactive Joint Perception-Action Robotics Game>
+#	Copyright (C) <2020> <Esmaeil Seraj, Xiyang Wu and Matthew C. Gombolay>
+#
+#	This program is free software; you can redistribute it and/or modify it
+# 	under the terms of the GNU General Public License as published by the
+# 	Free Software Foundation; either version 3.0 of the License, or (at your
+# 	option) any later version.
+#
+# 	This program is distributed in the hope that it will be useful, but
+# 	WITHOUT ANY WARRANTY; without even the implied warranty of
+# 	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General
+# 	Public License for more details. 
+#
+#	You should have received a copy of the
+# 	GNU General Public License along with this program; if not, write to the
+# 	Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+# 	MA  02110-1301, USA.
+#
+"""
+# Benchmark of the headless simulation core:: run it from this folder as python SimulationCore_Benchmark.py
+
+import time
+from Dependencies.ScenarioModeParams import scenario_setting
+from Dependencies.SimulationCore import SimulationCore
+
+# run the first 30 s of the first scenario headless with a scripted command stream: the perception agent patrols over the fire and the
+# action agents prune it
+[environment_para, robo_team_para, set_loci, adv_setting] = scenario_setting().scenario_para[0][0:4]
+environment_para = [environment_para[0], 30] + environment_para[2:]
+sim = SimulationCore(environment_para, robo_team_para, set_loci, adv_setting, time_Step=50, seed=0)
+command_Stream = [(0, ('select', 0)), (0, ('goal', 300, 300)), (0, ('goal', 400, 400)),
+                  (1000, ('select', 2)), (1000, ('goal', 350, 350)), (1000, ('select', 3)), (1000, ('goal', 370, 330))]
+
+startTime = time.time()
+score_list = sim.run(command_Stream)
+executionTime = time.time() - startTime
+print('simulated ' + str(sim.current_Time / 1000) + ' s in ' + str(round(executionTime, 2)) + ' s, score:: ' + str(score_list))
@@ -0,0 +1,13 @@
+"""
+# Regression checks of the LfD-HRI package:: python -m pytest "LfD-HRI Package/tests"
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import os
+import sys
+
+# the modules are imported from the Dependencies package (as in FireCommander.py), from the package directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
@@ -0,0 +1,123 @@
+"""
+# Regression checks of the columnar demonstration dataset:: the episode and frame range slices against the stored lists of the sessions
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import os
+import pickle
+import numpy as np
+import pytest
+from Dependencies.DemoDataset import DemoDatasetBuilder, DemoDataset, find_Sessions
+from Dependencies.SessionLogger import SessionLogger
+
+STATE_LIST_SIZE = 16
+IGN_POINTS = 3
+
+
+# a recorded session with num_Frames ticks (stored in a session log, or in the per-list .pkl files of the older sessions)
+def write_Session(data_Dir, num_Frames, seed, session_Log=True):
+    rng = np.random.default_rng(seed)
+    os.makedirs(data_Dir)
+    set_loci = [[], [IGN_POINTS, 0, 10, 5, 45, 1.25, 0.1, 90, 80, 0]]
+    with open(data_Dir + '/Background_Info.pkl', 'wb') as file_IO:
+        pickle.dump([[1200, 180], [2, 2, 0, 0], set_loci, [], 10, 45, STATE_LIST_SIZE], file_IO)
+
+    # one base record per frame after the initial one, each holding the frame time (100ms)
+    session_Data = {'Agent_Base_Loci': [[[0, 0, 0, 0, 0, 0, t] for t in range(num_Frames + 1)]],
+                    'Agent_States': [list(rng.random(num_Frames * STATE_LIST_SIZE)) for _ in range(2)],
+                    'Fire_States': [[list(rng.random(4)) for _ in range(num_Frames * IGN_POINTS)] for _ in range(2)],
+                    'Sensed_Fire_Map': [[rng.random((int(rng.integers(0, 4)), 4)) for _ in range(num_Frames)] for _ in range(2)],
+                    'Sensing_Data_CoM': [[rng.random((1, 4)) for _ in range(num_Frames)] for _ in range(2)],
+                    'Pruned_Fire_Map': [[[list(rng.random((2, 3))), list(rng.random(3))] if frame % 4 == 0 else []
+                                         for frame in range(num_Frames)] for _ in range(2)]}
+    user_Data = [[[rng.random(), rng.random(), float(t), 0, i] for t in sorted(rng.integers(1, num_Frames, 3))] for i in range(2)]
+    with open(data_Dir + '/User_Data.pkl', 'wb') as file_IO:
+        pickle.dump(user_Data, file_IO)
+
+    if session_Log:
+        log = SessionLogger(data_Dir + '/Session_Log.pkl', {name: 1 for name in session_Data})
+        log.record(0, session_Data)
+        log.close()
+    else:
+        for name in session_Data:
+            with open(data_Dir + '/' + name + '.pkl', 'wb') as file_IO:
+                pickle.dump(session_Data[name], file_IO)
+
+    return session_Data, user_Data
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    root_Dir = str(tmp_path_factory.mktemp('Dependencies'))
+    sessions = {}
+    for scenario, user, num_Frames, session_Log in [(1, 'alice', 20, True), (4, 'bob', 31, False), (4, 'carol', 12, True)]:
+        data_Dir = os.path.join(root_Dir, 'Scenario_Data', 'Scenario#' + str(scenario), user)
+        sessions[user] = write_Session(data_Dir, num_Frames, scenario + num_Frames, session_Log)
+
+    builder = DemoDatasetBuilder()
+    assert builder.add_All(root_Dir) == 3
+    builder.build(os.path.join(root_Dir, 'Demo_Dataset'))
+
+    return DemoDataset(os.path.join(root_Dir, 'Demo_Dataset')), sessions, root_Dir
+
+
+def test_find_sessions(dataset):
+    demo_Dataset, sessions, root_Dir = dataset
+    assert [(scenario, user) for scenario, user, data_Dir in find_Sessions(root_Dir)] == [(1, 'alice'), (4, 'bob'), (4, 'carol')]
+    assert len(demo_Dataset) == 3
+    assert demo_Dataset.select(scenario=4) == [1, 2] and demo_Dataset.select(user='alice') == [0]
+
+
+def test_episodes_hold_the_stored_lists(dataset):
+    demo_Dataset, sessions, root_Dir = dataset
+    for episode, user in enumerate(['alice', 'bob', 'carol']):
+        session_Data, user_Data = sessions[user]
+        num_Frames = demo_Dataset.episodes[episode]['num_frames']
+        assert num_Frames == len(session_Data['Agent_Base_Loci'][0]) - 1
+
+        data, frame, key = demo_Dataset.get('agent_states', episode)
+        for i, agent_States in enumerate(session_Data['Agent_States']):
+            assert np.array_equal(data[key == i].reshape(-1), agent_States)
+            assert np.array_equal(frame[key == i], np.arange(num_Frames))
+
+        data, frame, key = demo_Dataset.get('fire_states', episode)
+        for i, fire_States in enumerate(session_Data['Fire_States']):
+            assert np.array_equal(data[key == i], fire_States)
+            assert np.array_equal(frame[key == i], np.arange(num_Frames * IGN_POINTS) // IGN_POINTS)
+
+        data, frame, key = demo_Dataset.get('sensed_fire', episode)
+        for i, sensed_Fire in enumerate(session_Data['Sensed_Fire_Map']):
+            assert np.array_equal(data[key == i], np.concatenate(sensed_Fire))
+
+        data, frame, key = demo_Dataset.get('pruned_fire', episode)
+        assert len(data) == sum(2 for pruned_Fire in session_Data['Pruned_Fire_Map'] for pruned_Info in pruned_Fire if pruned_Info)
+
+        data, frame, key = demo_Dataset.get('user_data', episode)
+        for i, goals in enumerate(user_Data):
+            assert np.array_equal(data[key == i], goals)
+            assert np.array_equal(frame[key == i], [goal[2] - 1 for goal in goals])  # the first frame at the goal's time
+
+
+@pytest.mark.parametrize('name', ['frames', 'agent_states', 'fire_states', 'sensed_fire', 'sensing_com', 'pruned_fire', 'user_data'])
+def test_frame_range_slices(dataset, name):
+    demo_Dataset, sessions, root_Dir = dataset
+    for episode in range(len(demo_Dataset)):
+        data, frame, key = demo_Dataset.get(name, episode)
+        assert np.all(np.diff(frame) >= 0)
+        num_Frames = demo_Dataset.episodes[episode]['num_frames']
+        for start_Frame, end_Frame in [(0, num_Frames), (3, 9), (5, 5), (9, 3), (None, 4), (num_Frames - 2, None), (-5, 2 * num_Frames)]:
+            sliced, sliced_Frame, sliced_Key = demo_Dataset.get(name, episode, start_Frame, end_Frame)
+            selected = np.ones(len(frame), dtype=bool)
+            if start_Frame is not None:
+                selected &= frame >= start_Frame
+            if end_Frame is not None:
+                selected &= frame < end_Frame
+            assert np.array_equal(sliced, data[selected])
+            assert np.array_equal(sliced_Frame, frame[selected]) and np.array_equal(sliced_Key, key[selected])
+
+
+def test_unknown_field(dataset):
+    with pytest.raises(ValueError):
+        dataset[0].get('wind', 0)
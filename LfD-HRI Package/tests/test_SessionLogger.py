@@ -0,0 +1,99 @@
+"""
+# Regression checks of the session log:: the lists reassembled from Session_Log.pkl against the live structures of the session
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import os
+import pickle
+import random
+import numpy as np
+import pytest
+from Dependencies.SessionLogger import SessionLogger, SessionLogReader, BackgroundWriter, save_Snapshot, load_Session_Data
+
+
+# a session growing lists of each depth the interactive loop stores, recorded every tick and flushed every few ticks
+def record_Session(file_path, num_Ticks, writer=None, until_Time=None):
+    rng = random.Random(0)
+    fire_States = [[] for _ in range(3)]  # depth 2
+    agent_States = [[] for _ in range(4)]  # depth 2
+    target_onFire = [[[0], [0]], [[0]], [], [[0]]]  # depth 3, the last element is updated in place after it is appended
+    sensed_Fire = [[] for _ in range(2)]  # depth 2, arrays
+    lake_Info = []  # depth 1
+    session_Log = SessionLogger(file_path, {'Fire_States': 2, 'Agent_States': 2, 'target_onFire_List': 3, 'Sensed_Fire_Map': 2,
+                                            'Lake_info': 1}, writer=writer)
+    partial = None
+    for t in range(num_Ticks):
+        for fire in fire_States:
+            fire.append([rng.random(), rng.random(), rng.random(), t])
+        for agent in agent_States:
+            agent += [rng.random() for _ in range(16)]
+        for category in target_onFire:
+            for target in category:
+                target.append(target[-1] + rng.randint(0, 3))
+                target[-1] -= rng.randint(0, 1)
+        for sensed in sensed_Fire:
+            if rng.random() < 0.5:
+                sensed.append(np.arange(rng.randint(0, 5), dtype=float))
+        if t % 50 == 0:
+            lake_Info.append([t, rng.random()])
+        session_Log.record(t, {'Fire_States': fire_States, 'Agent_States': agent_States, 'target_onFire_List': target_onFire,
+                               'Sensed_Fire_Map': sensed_Fire, 'Lake_info': lake_Info})
+        if t % 12 == 0:
+            session_Log.flush()
+        if t == until_Time:
+            partial = pickle.loads(pickle.dumps([fire_States, target_onFire]))
+    session_Log.snapshot(num_Ticks - 1, 'Fire_Map', np.ones((4, 4)))
+    session_Log.close()
+
+    return {'Fire_States': fire_States, 'Agent_States': agent_States, 'target_onFire_List': target_onFire, 'Sensed_Fire_Map': sensed_Fire,
+            'Lake_info': lake_Info}, partial
+
+
+def assert_Session_Equal(data, structures):
+    for name in ['Fire_States', 'Agent_States', 'target_onFire_List', 'Lake_info']:
+        assert data[name] == structures[name]
+    assert len(data['Sensed_Fire_Map']) == len(structures['Sensed_Fire_Map'])
+    for loaded, sensed in zip(data['Sensed_Fire_Map'], structures['Sensed_Fire_Map']):
+        assert len(loaded) == len(sensed) and all(np.array_equal(p, q) for p, q in zip(loaded, sensed))
+
+
+@pytest.mark.parametrize('threaded', [False, True])
+def test_session_log_reassembles_live_structures(tmp_path, threaded):
+    writer = BackgroundWriter(max_Queue=4) if threaded else None
+    structures, partial = record_Session(str(tmp_path / 'Session_Log.pkl'), 300, writer=writer, until_Time=99)
+    if writer is not None:
+        metrics = writer.close()
+        assert metrics['errors'] == 0 and metrics['dropped'] == 0
+
+    reader = SessionLogReader(str(tmp_path / 'Session_Log.pkl'))
+    data = reader.load()
+    assert_Session_Equal(data, structures)
+    assert np.array_equal(data['Fire_Map'], np.ones((4, 4)))
+
+    # the lists as they were at a given time
+    early = reader.load(until_Time=99)
+    assert early['Fire_States'] == partial[0] and early['target_onFire_List'] == partial[1]
+
+    # the per-list .pkl files read back as the live structures
+    reader.export_Pickles(str(tmp_path))
+    assert_Session_Equal(load_Session_Data(str(tmp_path)), structures)
+    os.remove(str(tmp_path / 'Session_Log.pkl'))
+    assert_Session_Equal(load_Session_Data(str(tmp_path)), structures)
+
+
+def test_save_snapshot_replaces_file(tmp_path):
+    file_path = str(tmp_path / 'Fire_Map.pkl')
+    for value in [np.zeros((3, 3)), np.ones((5, 5))]:
+        save_Snapshot(value, file_path)
+    with open(file_path, 'rb') as file_IO:
+        assert np.array_equal(pickle.load(file_IO), np.ones((5, 5)))
+    assert os.listdir(str(tmp_path)) == ['Fire_Map.pkl']
+
+
+def test_closed_writer_rejects_jobs():
+    writer = BackgroundWriter()
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.submit(print)
@@ -0,0 +1,40 @@
+"""
+# Regression checks of the headless simulation core:: a seeded session replays identically
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import pickle
+import numpy as np
+import pytest
+
+pytest.importorskip('cv2')  # Dependencies.Utilities needs OpenCV
+pytest.importorskip('pygame')
+from Dependencies.ScenarioModeParams import scenario_setting
+from Dependencies.SimulationCore import SimulationCore
+
+# the command stream of a short session (select an agent, send it to a goal, lift it up, ...)
+COMMAND_STREAM = [(50, ('select', 0)), (50, ('goal', 300, 300)), (100, ('goal', 400, 400)), (1050, ('select', 2)),
+                  (1050, ('goal', 350, 350)), (1100, ('select', 3)), (1100, ('goal', 370, 330)), (2050, ('select', 0)), (2050, ('lift', 1)),
+                  (3050, ('lift', -1)), (5050, ('select', 1)), (5050, ('goal', 700, 700))]
+
+
+def run_Session(scenario, seed, duration=6, **kwargs):
+    environment_para, robo_team_para, set_loci, adv_setting = scenario_setting().scenario_para[scenario][0:4]
+    environment_para = list(environment_para)
+    environment_para[1] = duration
+    sim = SimulationCore(environment_para, robo_team_para, set_loci, adv_setting, time_Step=50, seed=seed, **kwargs)
+    score = sim.run(COMMAND_STREAM)
+
+    # everything the session log stores, compared through its pickled bytes
+    return score, pickle.dumps([sim.fire_States_List, sim.global_Agent_State, sim.target_onFire_list, sim.pruned_Fire_Spot_List,
+                                sim.sensed_Fire_Spot_List, sim.fire_Current_Map])
+
+
+@pytest.mark.parametrize('scenario', [0, 4])
+def test_seeded_session_is_deterministic(scenario):
+    score, stored = run_Session(scenario, seed=7)
+    np.random.random(1000)  # the seed resets the random state the session draws from
+    assert run_Session(scenario, seed=7) == (score, stored)
+    assert run_Session(scenario, seed=8)[1] != stored
@@ -25,7 +25,8 @@ Agent_Util = EnvUtilities()
 # Simplified FireCommander Environment
 class FireCommanderEasy(object):
     def __init__(self, world_size=None, duration=None, fireSpots_Num=None, P_agent_num=None, A_agent_num=None, vision=None,
-                 rnd_seed=None, center_init=None, stationary_fire=None, local_reward_ratio=None, termination_rewrad=None):
+                 rnd_seed=None, center_init=None, stationary_fire=None, local_reward_ratio=None, termination_rewrad=None, seed=None,
+                 delta_update=None):
 
         # pars parameters
         self.center_init = False if center_init is None else center_init  # flag if you want to initialize agents in center (rnd init if NOT)
@@ -39,12 +40,11 @@ class FireCommanderEasy(object):
         self.fireSpots_Num = 5 if fireSpots_Num is None else fireSpots_Num  # number of firespots
         self.perception_agent_num = 2 if P_agent_num is None else P_agent_num  # number of perception agents
         self.action_agent_num = 2 if A_agent_num is None else A_agent_num  # number of action agents
+        self.rng = WildFire.make_rng(seed=seed)  # the env's random number generator (a stream per env, kept across episodes)
+        self.delta_update = False if delta_update is None else delta_update  # update the state matrix in place (only the changed cells, see env_step())
 
     # initialize the environment
     def env_init(self, comm_range=None, water_dump_action=None, no_op_action=None, feat_dim=None):
-        # initialize random seed
-        # np.random.seed(self.rnd_seed)
-
         # initialize some required variables
         self.comm_hop = 5 if comm_range is None else comm_range  # number of hops for discrete communication range:: default=5
         self.water_dump_action = True if water_dump_action is None else water_dump_action  # flag if the water dumping is an action or not
@@ -64,10 +64,13 @@ class FireCommanderEasy(object):
         # Dim (1) to (num_PAgents):: individual P_agent maps [0 -> nothing, 1 -> agent's location, 2 -> agent's scope]
         # Dim (num_PAgents) to (num_PAgents+num_AAgents):: individual A_agent maps [0 -> nothing, 1 -> agent's location]
         self.state = np.zeros([self.perception_agent_num + self.action_agent_num + 1, self.world_size, self.world_size], dtype=float)
+        self.fire_lists = None  # the (firespot, sensed, pruned) lists last written into the state matrix
+        self.fire_cells = None  # the cells holding a fire code in the state matrix
+        self.footprints = None  # the agents' [x, y] positions last written into the state matrix
 
         # initialize firespot positions (uniformly randomly distributed)
         if not self.stationary_fire:
-            self.firespot_loci = np.random.choice(np.arange(0, self.world_size * self.world_size), size=self.fireSpots_Num, replace=False)
+            self.firespot_loci = self.rng.choice(np.arange(0, self.world_size * self.world_size), size=self.fireSpots_Num, replace=False)
         else:
             self.firespot_loci = np.array([39, 5, 22, 81, 69])  # some random fixed position within bounds for testing
 
@@ -81,7 +84,7 @@ class FireCommanderEasy(object):
             for i in range(self.action_agent_num):
                 self.agent_state.append([int(self.world_size / 2), int(self.world_size / 2), 1])  # Action Agent
         else:
-            temp = np.random.choice(np.arange(0, self.world_size),
+            temp = self.rng.choice(np.arange(0, self.world_size),
                                     size=(2, self.perception_agent_num + self.action_agent_num),
                                     replace=False)  # randomize agents initial positions
 
@@ -120,10 +123,11 @@ class FireCommanderEasy(object):
 
         # update the Perception agents' contribution
         self.FOV_list = []
+        FOVs = self.FOV_batch()  # all P agents' FOVs (sensing does not change the state matrix until the update below)
         for i in range(self.perception_agent_num):
             sensed_num_prev = self.sensed_contribution[i]  # remember how many spots have been detected so far
-            this_sensed_list, FOV = Agent_Util.sensing(self.state[0].copy(), self.state[i + 1], self.world_size, self.vision, self.state.copy(),
-                                                       self.feat_dim, self.perception_agent_num, self.action_agent_num)  # sensing
+            this_sensed_list, FOV = Agent_Util.sensing(self.state[0].copy(), self.state[i + 1], self.world_size, self.vision, self.state,
+                                                       self.feat_dim, self.perception_agent_num, self.action_agent_num, FOV=FOVs[i])  # sensing
             self.sensed_list = np.unique(np.concatenate((self.sensed_list, this_sensed_list), axis=0))  # adding new sensing results to the list
             self.FOV_list.append(FOV)  # gather FOVs in a list for CNN input
             self.sensed_contribution[i] += len(list(this_sensed_list)) - sensed_num_prev  # compute contributions
@@ -206,74 +210,71 @@ class FireCommanderEasy(object):
                 episode_return = [-10.0 * (self.fireSpots_Num - len(list(self.pruned_list)))] * (self.perception_agent_num + self.action_agent_num)
                 self.reward = [x + y for x, y in zip(self.reward, episode_return)]
 
+        # in delta-update mode the returned state matrix is the env's own buffer, which is overwritten in place at the next step (copy it to
+        # keep it across steps)
         return self.state, self.reward, self.done, self.outcom_flg, step, self.perception_complete, self.action_complete
 
     # generating the state matrix
     def state_matrix_update(self):
+        # delta-update mode:: only the changed fire cells and the old/new footprints of the moved agents are rewritten
+        if self.delta_update and self.footprints is not None:
+            self.state_matrix_delta()
+            return
+
         # clean-up the previous states
-        self.state = np.zeros([self.perception_agent_num + self.action_agent_num + 1, self.world_size, self.world_size], dtype=float)
+        if self.delta_update:
+            self.state.fill(0)
+        else:
+            self.state = np.zeros([self.perception_agent_num + self.action_agent_num + 1, self.world_size, self.world_size], dtype=float)
 
         # update fire's state in state matrix (Dim 1)
-        self.state[0].reshape(1, self.world_size * self.world_size)[0, self.firespot_loci.astype(int)] = 1
-        self.state[0].reshape(1, self.world_size * self.world_size)[0, self.sensed_list.astype(int)] = 2
-        self.state[0].reshape(1, self.world_size * self.world_size)[0, self.pruned_list.astype(int)] = 3
+        self.fire_map_update()
 
         # update agents states in state matrix
-        # P agents
-        if self.vision == 1:
-            for i in range(1, self.perception_agent_num + 1):
-                # mark P agents' scopes (1-hop)
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), self.agent_state[i - 1][1]] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), self.agent_state[i - 1][1]] = 2
-                self.state[i, self.agent_state[i - 1][0], min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-                self.state[i, self.agent_state[i - 1][0], max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-
-                # P agent location
-                self.state[i, self.agent_state[i - 1][0], self.agent_state[i - 1][1]] = 1
-        elif self.vision == 2:
-            for i in range(1, self.perception_agent_num + 1):
-                # mark P agents' scopes (2-hop)
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), self.agent_state[i - 1][1]] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), self.agent_state[i - 1][1]] = 2
-                self.state[i, self.agent_state[i - 1][0], min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-                self.state[i, self.agent_state[i - 1][0], max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 2), self.agent_state[i - 1][1]] = 2
-                self.state[i, self.agent_state[i - 1][0], min(self.world_size - 1, self.agent_state[i - 1][1] + 2)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 2), self.agent_state[i - 1][1]] = 2
-                self.state[i, self.agent_state[i - 1][0], max(0, self.agent_state[i - 1][1] - 2)] = 2
-
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 2), min(self.world_size - 1, self.agent_state[i - 1][1] + 2)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 2), max(0, self.agent_state[i - 1][1] - 2)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 2), max(0, self.agent_state[i - 1][1] - 2)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 2), min(self.world_size - 1, self.agent_state[i - 1][1] + 2)] = 2
-
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 2), min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 2), max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 2), max(0, self.agent_state[i - 1][1] - 1)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 2), min(self.world_size - 1, self.agent_state[i - 1][1] + 1)] = 2
-
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), min(self.world_size - 1, self.agent_state[i - 1][1] + 2)] = 2
-                self.state[i, min(self.world_size - 1, self.agent_state[i - 1][0] + 1), max(0, self.agent_state[i - 1][1] - 2)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), max(0, self.agent_state[i - 1][1] - 2)] = 2
-                self.state[i, max(0, self.agent_state[i - 1][0] - 1), min(self.world_size - 1, self.agent_state[i - 1][1] + 2)] = 2
-
-                # P agent location
-                self.state[i, self.agent_state[i - 1][0], self.agent_state[i - 1][1]] = 1
-        else:
-            raise ValueError(">>> Oops! Sorry, for now, only 1-hop and 2-hop visions are available options...")
-
-        # A agents
-        for i in range(self.perception_agent_num + 1, self.perception_agent_num + self.action_agent_num + 1):
-            self.state[i, self.agent_state[i - 1][0], self.agent_state[i - 1][1]] = 1  # A agents locations
+        for i in range(self.perception_agent_num + self.action_agent_num):
+            self.agent_map_update(i)
+        self.footprints = [agent[0:self.agent_pose_dim] for agent in self.agent_state]
+
+    # updating the state matrix in place (no reallocation)
+    def state_matrix_delta(self):
+        # fire's state (the fire lists are replaced, not modified in place, whenever sensing/pruning changes them)
+        if (self.fire_lists[0] is not self.firespot_loci) or (self.fire_lists[1] is not self.sensed_list) or \
+                (self.fire_lists[2] is not self.pruned_list):
+            self.state[0].reshape(self.world_size * self.world_size)[self.fire_cells] = 0
+            self.fire_map_update()
+
+        # agents' states (only the agents that moved)
+        for i in range(self.perception_agent_num + self.action_agent_num):
+            old_x, old_y = self.footprints[i]
+            if (self.agent_state[i][0] == old_x) and (self.agent_state[i][1] == old_y):
+                continue
+            if i < self.perception_agent_num:
+                self.state[i + 1][self.scope_window(old_x, old_y)] = 0  # clear the old scope
+            else:
+                self.state[i + 1, old_x, old_y] = 0
+            self.agent_map_update(i)
+            self.footprints[i] = self.agent_state[i][0:self.agent_pose_dim]
+
+    # writing the fire codes into the state matrix [1 -> onFire_notFound, 2 -> onFire_found, 3 -> pruned]
+    def fire_map_update(self):
+        fire_map = self.state[0].reshape(self.world_size * self.world_size)
+        fire_map[self.firespot_loci.astype(int)] = 1
+        fire_map[self.sensed_list.astype(int)] = 2
+        fire_map[self.pruned_list.astype(int)] = 3
+        self.fire_lists = (self.firespot_loci, self.sensed_list, self.pruned_list)
+        self.fire_cells = np.concatenate((self.firespot_loci, self.sensed_list, self.pruned_list)).astype(int)
+
+    # writing an agent's location (and a P agent's scope) into its state map
+    def agent_map_update(self, agent_idx):
+        x, y = self.agent_state[agent_idx][0], self.agent_state[agent_idx][1]
+        if agent_idx < self.perception_agent_num:
+            self.state[agent_idx + 1][self.scope_window(x, y)] = 2  # P agents' scopes (all cells within the vision hops)
+        self.state[agent_idx + 1, x, y] = 1  # agent's location
+
+    # the vision stencil of an agent at [x, y]:: the (2 * vision + 1)-square around it, clipped at the world's edges
+    def scope_window(self, x, y):
+        return (slice(max(0, x - self.vision), min(self.world_size, x + self.vision + 1)),
+                slice(max(0, y - self.vision), min(self.world_size, y + self.vision + 1)))
 
     # updating agents' states according to the actions taken
     def agent_state_update(self, action_type):
@@ -315,29 +316,13 @@ class FireCommanderEasy(object):
         self.old_reward_without_adjacent = new_reward
 
         # computing adjacency rewards for homogeneous communicatiion channel
-        uniques = list(range(0, len(self.agent_state)))
-        for pair in all_adjacencies:
-            for idx in pair:
-                if idx in uniques:
-                    uniques.remove(idx)
-                    if len(uniques) == 0:
-                        break
+        num_agents = len(self.agent_state)
+        pairs = np.asarray(all_adjacencies, dtype=int).reshape(-1, 2)
+        im_reward -= 1.0 * Agent_Util.isolated_agents(pairs, num_agents)
 
-        im_reward -= 1.0 * len(uniques)
-
-        # computing adjacency rewards for homogeneous communicatiion channel
-        uniques_hetero_cm = list(range(0, len(self.agent_state)))
-        for pair in all_adjacencies:
-            if 0 <= pair[0] < self.perception_agent_num:  # one way check is OK since heterogeneous communication is symmetric
-                if self.perception_agent_num <= pair[1] < self.perception_agent_num + self.action_agent_num:
-                    if pair[0] in uniques_hetero_cm:
-                        uniques_hetero_cm.remove(pair[0])
-                    if pair[1] in uniques_hetero_cm:
-                        uniques_hetero_cm.remove(pair[1])
-                    if len(uniques_hetero_cm) == 0:
-                        break
-
-        im_reward -= 3.0 * len(uniques_hetero_cm)
+        # computing adjacency rewards for heterogeneous communicatiion channel (one way check is OK since it is symmetric)
+        hetero = (pairs[:, 0] < self.perception_agent_num) & (pairs[:, 1] >= self.perception_agent_num) & (pairs[:, 1] < num_agents)
+        im_reward -= 3.0 * Agent_Util.isolated_agents(pairs[hetero], num_agents)
 
         return im_reward
 
@@ -388,67 +373,49 @@ class FireCommanderEasy(object):
 
     # generate the adjacency matrix for current time-step
     def get_adjacency_matrices(self):
-        self.adjacent_agents_PnP, self.adjacent_agents_PnA, self.adjacent_agents_AnA = [], [], []  # clean-up the previous adjacencies
-        # Perception-Perception adjacency
-        for i in range(self.perception_agent_num):
-            for j in range(self.perception_agent_num):
-                if i != j:
-                    pose1 = self.agent_state[i]
-                    pose2 = self.agent_state[j]
-                    if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim], pose2[0:self.agent_pose_dim], hop_num=self.comm_hop):
-                        self.adjacent_agents_PnP.append([i, j])
-        # Perception-Action adjacency
-        for i in range(self.perception_agent_num):
-            for j in range(self.action_agent_num):
-                pose1 = self.agent_state[i]
-                pose2 = self.agent_state[self.perception_agent_num + j]
-                if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim], pose2[0:self.agent_pose_dim], hop_num=self.comm_hop):
-                    self.adjacent_agents_PnA.append([i, self.perception_agent_num + j])
-        # Action-Action adjacency
-        for i in range(self.action_agent_num):
-            for j in range(self.action_agent_num):
-                if i != j:
-                    pose1 = self.agent_state[self.perception_agent_num + i]
-                    pose2 = self.agent_state[self.perception_agent_num + j]
-                    if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim], pose2[0:self.agent_pose_dim], hop_num=self.comm_hop):
-                        self.adjacent_agents_AnA.append([self.perception_agent_num + i, self.perception_agent_num + j])
+        agent_poses = [agent[0:self.agent_pose_dim] for agent in self.agent_state]
+        self.adjacency = Agent_Util.adjacency_matrix(agent_poses, hop_num=self.comm_hop)  # [N, N] boolean, P agents first
+        self.adjacent_agents_PnP, self.adjacent_agents_PnA, self.adjacent_agents_AnA = \
+            Agent_Util.adjacency_pairs(self.adjacency, self.perception_agent_num)
 
         return self.adjacent_agents_PnP, self.adjacent_agents_PnA, self.adjacent_agents_AnA
 
+    # the communication graph of the current time-step in edge-index form, [2, E]
+    def get_edge_index(self):
+        return Agent_Util.adjacency_edge_index(self.adjacency)
+
     # get the FOV of each agent
     def get_FOV(self):
         if len(self.FOV_list) > 0:
             return self.FOV_list
         else:
-            FOV_list = []
+            return list(self.FOV_batch())
 
-            for i in range(self.perception_agent_num):
-                # extracting 1-hot encoded FOV tensors
-                FOV = Agent_Util.FOV_encoding(self.state.copy(), self.state[i + 1], self.feat_dim, self.perception_agent_num,
-                                              self.action_agent_num, self.world_size, self.vision)
-                # creating the FOV list
-                FOV_list.append(FOV)
+    # the 1-hot encoded FOV tensors of all the P agents, [P_agent_num, feat_dim, 2 * vision + 1, 2 * vision + 1]
+    def FOV_batch(self):
+        agent_locs = [agent[0:self.agent_pose_dim] for agent in self.agent_state[:self.perception_agent_num]]
 
-            return FOV_list
+        return Agent_Util.FOV_encoding_batch(self.state, agent_locs, self.feat_dim, self.perception_agent_num, self.action_agent_num,
+                                             self.vision)
 
     '''Get the FOV of each agent in vector form.
 
     For each square information is:
         [[NxN position one hot], [F+P+A binary encoding of agents on square], [out of bounds], [seen before]]
-    '''
-    def get_FOV_vectorized(self):
-        FOV_list = []
 
-        for i in range(self.perception_agent_num):
-            # extracting 1-hot encoded FOV tensors
-            FOV = Agent_Util.FOV_vectorized_encoding(self.state.copy(), 
-                self.state[i + 1], self.feat_dim, self.perception_agent_num,
-                self.action_agent_num, self.world_size, self.vision)
-
-            # creating the FOV list
-            FOV_list.append(FOV)
-
-        return FOV_list
+    With encoding='index' the one-hot positions are replaced by integer position indices and the FOVs of all agents are returned at once
+    as (position, features) arrays (see EnvUtilities.FOV_index_encoding), EnvUtilities.FOV_index_to_dense expands them back.
+    '''
+    def get_FOV_vectorized(self, encoding='dense'):
+        agent_locs = [agent[0:self.agent_pose_dim] for agent in self.agent_state[:self.perception_agent_num]]
+        position, features = Agent_Util.FOV_index_encoding(self.state, agent_locs, self.perception_agent_num, self.action_agent_num,
+                                                           self.vision)
+        if encoding == 'index':
+            return position, features
+        elif encoding == 'dense':
+            return list(Agent_Util.FOV_index_to_dense(position, features, self.world_size))
+        else:
+            raise ValueError(">>> Oops! The specified FOV encoding doesn't exist. Options: 'dense', 'index'")
 
     def get_agent_state_vector(self):
         agent_state_vector = []
@@ -39,16 +39,45 @@ class EnvUtilities(object):
 
         return adjacent_agents
 
+    # pairwise adjacency of all the agents at once (Chebyshev distance within hop_num, no self-loops), [N, N] boolean
+    @staticmethod
+    def adjacency_matrix(agent_poses, hop_num=1):
+        poses = np.asarray(agent_poses).reshape(len(agent_poses), -1)
+        adjacency = np.abs(poses[:, np.newaxis, :] - poses[np.newaxis, :, :]).max(axis=2) <= hop_num
+        np.fill_diagonal(adjacency, False)
+
+        return adjacency
+
+    # the Perception-Perception, Perception-Action and Action-Action lists of adjacent [i, j] pairs (P agents first)
+    @staticmethod
+    def adjacency_pairs(adjacency, NumP):
+        adjacent_agents_PnP = np.argwhere(adjacency[:NumP, :NumP]).tolist()
+        adjacent_agents_PnA = (np.argwhere(adjacency[:NumP, NumP:]) + [0, NumP]).tolist()
+        adjacent_agents_AnA = (np.argwhere(adjacency[NumP:, NumP:]) + NumP).tolist()
+
+        return adjacent_agents_PnP, adjacent_agents_PnA, adjacent_agents_AnA
+
+    # the edge-index array of the communication graph, [2, E] (source, target) rows as used by GNN libraries
+    @staticmethod
+    def adjacency_edge_index(adjacency):
+        return np.stack(np.nonzero(adjacency))
+
+    # number of agents that do not appear in any of the adjacent pairs
+    @staticmethod
+    def isolated_agents(pairs, num_agents):
+        return num_agents - np.unique(np.asarray(pairs, dtype=int)).shape[0]
+
     # Sense the firemap (by Perception agents)
     @staticmethod
-    def sensing(world_state, agent_loci, world_size, vision, state_space, feat_dim, NumP, NumA):
+    def sensing(world_state, agent_loci, world_size, vision, state_space, feat_dim, NumP, NumA, FOV=None):
         # sensing
         world_state[world_state >= 2] = 0  # only taking into account the firespots that have not been put out yet
         temp = np.multiply(world_state, agent_loci)  # lay over the respective tensor layers to get the newly detected firespots
         sensed_list = np.where(temp.reshape(1, world_size * world_size) > 0)[1]  # form the sensed list
 
-        # extracting 1-hot encoded FOV tensors
-        FOV = EnvUtilities.FOV_encoding(state_space, agent_loci, feat_dim, NumP, NumA, world_size, vision)
+        # extracting 1-hot encoded FOV tensors (unless already extracted by FOV_encoding_batch)
+        if FOV is None:
+            FOV = EnvUtilities.FOV_encoding(state_space, agent_loci, feat_dim, NumP, NumA, world_size, vision)
 
         return sensed_list, FOV
 
@@ -72,204 +101,101 @@ class EnvUtilities(object):
     # FOV encoding (i.e., 1-hot encoding from 2D matrix view into N-D tensor data)
     @staticmethod
     def FOV_encoding(state_space, agent_loci, feat_dim, NumP, NumA, world_size, vision):
-        env_space = state_space[0].copy()  # building a temporary info map for FOV extraction
-        # the agent view
-        coords = np.argwhere(agent_loci > 0)
-        x_min, y_min = coords.min(axis=0)
-        x_max, y_max = coords.max(axis=0)
-        agent_view = env_space[x_min:x_max + 1, y_min:y_max + 1]
-
-        # padding the agent view if at edge
-        m1, m2 = agent_view.shape
-        if vision == 1:
-            FOV = np.zeros(shape=(feat_dim, 3, 3))
-            if (m1 < 3) or (m2 < 3):
-                agent_view = EnvUtilities.padding_FOV_1hop(agent_view, agent_loci, world_size, -1)
-        elif vision == 2:
-            FOV = np.zeros(shape=(feat_dim, 5, 5))
-            if (m1 < 5) or (m2 < 5):
-                agent_view = EnvUtilities.padding_FOV_2hop(agent_view, agent_loci, world_size, -1)
-        else:
-            raise ValueError(">>> Oops! Sorry, for now, only 1-hop and 2-hop visions are available options...")
-
-        # extracting/encoding the FOV information
-        FOV_temp = np.zeros(shape=(feat_dim, 10, 10))
-        FOV_temp[1][np.where(state_space[0] == 1)] = 1  # encoding the fire information (0 -> nothing, 1 -> fire not seen before)
-        FOV_temp[2][np.where(state_space[0] == 2)] = 1  # encoding the fire information (0 -> nothing, 1 -> fire seen before)
-        FOV_temp[3][np.where(state_space[0] == 3)] = 1  # encoding the fire information (0 -> nothing, 1 -> fire pruned before)
-        for i in range(NumP):
-            FOV_temp[4 + i][np.where(state_space[i + 1] == 1)] = 1  # encoding other P agent's locations
-            FOV_temp[4 + NumP + i][np.where(state_space[i + 1] == 2)] = 1  # encoding other P agent's FOVs
-        for i in range(NumA):
-            FOV_temp[4 + (2 * NumP) + i][np.where(state_space[i + NumP + 1] == 1)] = 1  # encoding A agent's locations
-
-        # cropping the FOV
-        for i in range(feat_dim):
-            temp = FOV_temp[i][x_min:x_max + 1, y_min:y_max + 1]
-            if temp.shape != FOV[i].shape:
-                if vision == 1:
-                    if (m1 < 3) or (m2 < 3):
-                        temp = EnvUtilities.padding_FOV_1hop(temp, agent_loci, world_size, 0)
-                elif vision == 2:
-                    if (m1 < 5) or (m2 < 5):
-                        temp = EnvUtilities.padding_FOV_2hop(temp, agent_loci, world_size, 0)
-                else:
-                    raise ValueError(">>> Oops! Sorry, for now, only 1-hop and 2-hop visions are available options...")
-                FOV[i] = temp
-            else:
-                FOV[i] = temp
-        FOV[0][np.where(agent_view == -1)] = 1  # encoding the edge and padding information
+        center = np.argwhere(agent_loci == 1)[0]  # the agent's location
 
-        return FOV
+        return EnvUtilities.FOV_encoding_batch(state_space, center[np.newaxis], feat_dim, NumP, NumA, vision)[0]
 
+    # FOV encoding of several agents at once (the feature planes are built and padded once for the whole world, and all the agents'
+    # windows are gathered from a strided view of them)
     @staticmethod
-    def FOV_vectorized_encoding(state_space, agent_loci, feat_dim, NumP, NumA, world_size, vision):
-        # the agent view
-        center = np.argwhere(agent_loci == 1)[0]
-        x_min, y_min = center - vision
-        x_max, y_max = center + vision
+    def FOV_encoding_batch(state_space, agent_locs, feat_dim, NumP, NumA, vision):
+        """
+        :param state_space: the [P+A+1, W, W] state matrix
+        :param agent_locs: [n, 2] array of the agents' [x, y] locations (the FOV centers)
+        :param feat_dim: number of feature planes (at least 4 + 2 * NumP + NumA)
+        :param NumP: number of perception agents
+        :param NumA: number of action agents
+        :param vision: visible hops around each agent (any radius)
+        :return: [n, feat_dim, 2 * vision + 1, 2 * vision + 1] 1-hot encoded FOV tensors
+        """
+
+        world_size = state_space.shape[1]
+        width = 2 * vision + 1
+        inner = (slice(vision, vision + world_size), slice(vision, vision + world_size))
 
-        # tiles in grid + number of agents + is out of bounds + if seen before
-        agent_start_idx = world_size**2
-        num_agents = NumP + NumA + 1
-        out_bounds_idx = agent_start_idx + num_agents
-        if_seen_idx = out_bounds_idx + 1
+        # the feature planes of the whole world, padded by the vision hops
+        planes = np.zeros((feat_dim, world_size + 2 * vision, world_size + 2 * vision))
+        planes[0] = 1  # encoding the edge and padding information
+        planes[0][inner] = 0
+        planes[(slice(1, 4),) + inner] = state_space[0] == np.arange(1, 4)[:, np.newaxis, np.newaxis]  # fire [not seen, seen, pruned]
+        planes[(slice(4, 4 + NumP),) + inner] = state_space[1:NumP + 1] == 1  # encoding P agent's locations
+        planes[(slice(4 + NumP, 4 + 2 * NumP),) + inner] = state_space[1:NumP + 1] == 2  # encoding P agent's FOVs
+        planes[(slice(4 + 2 * NumP, 4 + 2 * NumP + NumA),) + inner] = state_space[NumP + 1:NumP + NumA + 1] == 1  # encoding A agent's locations
 
-        square_size = if_seen_idx + 1
+        # every (2 * vision + 1)-window of the padded planes, the window at [x, y] being centered on cell [x, y] of the world
+        s0, s1, s2 = planes.strides
+        windows = np.lib.stride_tricks.as_strided(planes, shape=(feat_dim, world_size, world_size, width, width),
+                                                  strides=(s0, s1, s2, s1, s2), writeable=False)
 
-        width = 2 * vision + 1
-        FOV = np.zeros((width, width, square_size))
-
-        for i_x, x in enumerate(range(x_min, x_max + 1)):
-            for i_y, y in enumerate(range(y_min, y_max + 1)):
-                square = np.zeros(square_size)
-
-                # out of bounds
-                if x < 0 or y < 0 or x >= world_size or y >= world_size:
-                    square[out_bounds_idx] = 1
-                else:
-                    # square location
-                    square[:agent_start_idx] = EnvUtilities.position_one_hot(x, y, world_size)
-                    
-                    # agent type
-                    for agent_idx in range(num_agents):
-                        if agent_idx == 0:  # fire
-                            agent_on_square = 1 if state_space[agent_idx][x, y] in [1, 2] else 0
-
-                            # seen before
-                            if state_space[agent_idx][x, y] == 2:
-                                square[if_seen_idx] = 1
-                        else:   # perception or action agent
-                            agent_on_square = 1 if state_space[agent_idx][x, y] == 1 else 0
-
-                        square[agent_start_idx + agent_idx] = agent_on_square
-
-                FOV[i_x][i_y] = square
+        agent_locs = np.asarray(agent_locs, dtype=int).reshape(-1, 2)
+        FOV = windows[:, agent_locs[:, 0], agent_locs[:, 1]]  # [feat_dim, n, width, width]
 
-        return FOV
+        return FOV.transpose(1, 0, 2, 3)
 
-    # padding the FOV while at edges
     @staticmethod
-    def padding_FOV_1hop(FOV, agent_loci, world_size, pad_val):
-        m1, m2 = FOV.shape
-
-        # top and bottom edges
-        if m2 == 3:
-            if m1 == 2:
-                if np.where(agent_loci != 0)[0][0] > world_size/2:
-                    FOV = np.pad(FOV, [(0, 1), (0, 0)], mode='constant', constant_values=pad_val)
-                else:
-                    FOV = np.pad(FOV, [(1, 0), (0, 0)], mode='constant', constant_values=pad_val)
-
-        # left and right edges
-        if m1 == 3:
-            if m2 == 2:
-                if np.where(agent_loci != 0)[1][0] > world_size/2:
-                    FOV = np.pad(FOV, [(0, 0), (0, 1)], mode='constant', constant_values=pad_val)
-                else:
-                    FOV = np.pad(FOV, [(0, 0), (1, 0)], mode='constant', constant_values=pad_val)
-
-        # the four corners
-        if (m1 == 2) and (m2 == 2):
-            if (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size/2):
-                FOV = np.pad(FOV, [(0, 1), (0, 1)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size/2):
-                FOV = np.pad(FOV, [(0, 1), (1, 0)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size/2):
-                FOV = np.pad(FOV, [(1, 0), (0, 1)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size/2):
-                FOV = np.pad(FOV, [(1, 0), (1, 0)], mode='constant', constant_values=pad_val)
+    def FOV_vectorized_encoding(state_space, agent_loci, feat_dim, NumP, NumA, world_size, vision):
+        center = np.argwhere(agent_loci == 1)[0]  # the agent's location
+        position, features = EnvUtilities.FOV_index_encoding(state_space, center[np.newaxis], NumP, NumA, vision)
 
-        return FOV
+        return EnvUtilities.FOV_index_to_dense(position, features, world_size)[0]
 
-    # padding the FOV while at edges
+    # compact vectorized FOV encoding of several agents at once:: instead of a world_size^2 one-hot vector, each square carries its
+    # integer position index (y * world_size + x, or -1 if out of bounds) next to the small per-square feature vector
+    @staticmethod
+    def FOV_index_encoding(state_space, agent_locs, NumP, NumA, vision):
+        """
+        :param state_space: the [P+A+1, W, W] state matrix
+        :param agent_locs: [n, 2] array of the agents' [x, y] locations (the FOV centers)
+        :param NumP: number of perception agents
+        :param NumA: number of action agents
+        :param vision: visible hops around each agent
+        :return: position: [n, 2 * vision + 1, 2 * vision + 1] position indices (-1 -> out of bounds)
+                 features: [n, 2 * vision + 1, 2 * vision + 1, F+P+A+2] int8 [F+P+A binary encoding of agents on square, out of bounds,
+                 seen before], i.e., the last F+P+A+2 entries of each square of FOV_vectorized_encoding
+        """
+
+        world_size = state_space.shape[1]
+        num_agents = NumP + NumA + 1
+        agent_locs = np.asarray(agent_locs, dtype=int).reshape(-1, 2)
+
+        # the squares' coordinates
+        hops = np.arange(-vision, vision + 1)
+        xs, ys = np.broadcast_arrays(agent_locs[:, 0, np.newaxis, np.newaxis] + hops[np.newaxis, :, np.newaxis],
+                                     agent_locs[:, 1, np.newaxis, np.newaxis] + hops[np.newaxis, np.newaxis, :])
+        out_bounds = (xs < 0) | (ys < 0) | (xs >= world_size) | (ys >= world_size)
+        in_bounds = ~out_bounds
+        xs, ys = np.clip(xs, 0, world_size - 1), np.clip(ys, 0, world_size - 1)
+
+        # square location
+        position = np.where(out_bounds, -1, ys * world_size + xs)
+
+        # agent type, out of bounds and seen before
+        features = np.zeros(position.shape + (num_agents + 2,), dtype=np.int8)
+        fire = state_space[0][xs, ys]
+        features[..., 0] = ((fire == 1) | (fire == 2)) & in_bounds  # fire
+        features[..., 1:num_agents] = np.moveaxis(state_space[1:num_agents][:, xs, ys] == 1, 0, -1) & in_bounds[..., np.newaxis]
+        features[..., num_agents] = out_bounds
+        features[..., num_agents + 1] = (fire == 2) & in_bounds
+
+        return position, features
+
+    # expanding the compact FOV encoding into the dense (one-hot position) vectorized FOVs, [n, width, width, world_size^2 + F+P+A+2]
     @staticmethod
-    def padding_FOV_2hop(FOV, agent_loci, world_size, pad_val):
-        m1, m2 = FOV.shape
-
-        # top and bottom edges
-        if m2 == 5:
-            if m1 == 4:
-                if np.where(agent_loci != 0)[0][0] > world_size / 2:
-                    FOV = np.pad(FOV, [(0, 1), (0, 0)], mode='constant', constant_values=pad_val)
-                else:
-                    FOV = np.pad(FOV, [(1, 0), (0, 0)], mode='constant', constant_values=pad_val)
-            if m1 == 3:
-                if np.where(agent_loci != 0)[0][0] > world_size / 2:
-                    FOV = np.pad(FOV, [(0, 2), (0, 0)], mode='constant', constant_values=pad_val)
-                else:
-                    FOV = np.pad(FOV, [(2, 0), (0, 0)], mode='constant', constant_values=pad_val)
-
-        # left and right edges
-        if m1 == 5:
-            if m2 == 4:
-                if np.where(agent_loci != 0)[1][0] > world_size / 2:
-                    FOV = np.pad(FOV, [(0, 0), (0, 1)], mode='constant', constant_values=pad_val)
-                else:
-                    FOV = np.pad(FOV, [(0, 0), (1, 0)], mode='constant', constant_values=pad_val)
-            if m2 == 3:
-                if np.where(agent_loci != 0)[1][0] > world_size / 2:
-                    FOV = np.pad(FOV, [(0, 0), (0, 2)], mode='constant', constant_values=pad_val)
-                else:
-                    FOV = np.pad(FOV, [(0, 0), (2, 0)], mode='constant', constant_values=pad_val)
-
-        # the four corners
-        if (m1 == 4) and (m2 == 4):
-            if (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(0, 1), (0, 1)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(0, 1), (1, 0)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(1, 0), (0, 1)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(1, 0), (1, 0)], mode='constant', constant_values=pad_val)
-        elif (m1 == 3) and (m2 == 3):
-            if (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(0, 2), (0, 2)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(0, 2), (2, 0)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(2, 0), (0, 2)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(2, 0), (2, 0)], mode='constant', constant_values=pad_val)
-        elif (m1 == 4) and (m2 == 3):
-            if (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(0, 1), (0, 2)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(0, 1), (2, 0)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(1, 0), (0, 2)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(1, 0), (2, 0)], mode='constant', constant_values=pad_val)
-        elif (m1 == 3) and (m2 == 4):
-            if (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(0, 2), (0, 1)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] > world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(0, 2), (1, 0)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] > world_size / 2):
-                FOV = np.pad(FOV, [(2, 0), (0, 1)], mode='constant', constant_values=pad_val)
-            elif (np.where(agent_loci != 0)[0][0] < world_size / 2) and (np.where(agent_loci != 0)[1][0] < world_size / 2):
-                FOV = np.pad(FOV, [(2, 0), (1, 0)], mode='constant', constant_values=pad_val)
+    def FOV_index_to_dense(position, features, world_size):
+        FOV = np.zeros(position.shape + (world_size ** 2 + features.shape[-1],))
+        agent_idx, x_idx, y_idx = np.nonzero(position >= 0)
+        FOV[agent_idx, x_idx, y_idx, position[agent_idx, x_idx, y_idx]] = 1
+        FOV[..., world_size ** 2:] = features
 
         return FOV
 
@@ -0,0 +1,307 @@
+"""
+# **************************<><><><><>********************************
+# * Script for the Batched Simple Perception-Action Firefighting Env *
+# **************************<><><><><>********************************
+#
+# This script and all its dependencies are implemented by: Esmaeil Seraj
+#   - Esmaeil Seraj, PhD Student, Institute for Robotics and Inteelligent
+#   Machines (IRIM), Electrical and Computer Engineering (ECE)
+#   Georgia Tech, Atlanta, GA, USA
+#   - email <eseraj3@gatech.edu>
+#
+# Supported by Python 3.6.4
+#
+"""
+
+import numpy as np
+from FireCommander_Base import FireCommanderEasy
+from WildFire_Model import WildFire
+import time
+
+
+# Batched (vectorized) Simplified FireCommander Environment
+class FireCommanderEasyVec(object):
+    """
+    B independent FireCommanderEasy episodes stored in stacked arrays and stepped all at once. The game logic (moves, sensing, pruning,
+    rewards, termination) follows FireCommanderEasy step by step, and finished episodes are reset automatically (the terminal state is
+    kept in final_state).
+
+    Stacked arrays:
+        state:      [B, P+A+1, W, W] state matrices (same layout as FireCommanderEasy.state)
+        agent_pos:  [B, N, 2] agents' [x, y] positions (N = P + A, P agents first)
+        fire_map:   [B, W, W] fire codes [0 -> not_on_fire, 1 -> onFire_notFound, 2 -> onFire_found, 3 -> pruned]
+    """
+
+    # moves per action index [Forward, Backward, Left, Right, Dump/No-op, No-op]
+    action_dx = np.array([-1, 1, 0, 0, 0, 0])
+    action_dy = np.array([0, 0, -1, 1, 0, 0])
+
+    def __init__(self, num_envs=None, world_size=None, duration=None, fireSpots_Num=None, P_agent_num=None, A_agent_num=None, vision=None,
+                 center_init=None, stationary_fire=None, local_reward_ratio=None, termination_rewrad=None, seed=None):
+
+        # pars parameters
+        self.num_envs = 16 if num_envs is None else num_envs  # number of parallel episodes
+        self.center_init = False if center_init is None else center_init  # flag if you want to initialize agents in center (rnd init if NOT)
+        self.stationary_fire = False if stationary_fire is None else stationary_fire  # stationary fire loci during training
+        self.vision = 1 if vision is None else vision  # visible hops around each agent
+        self.world_size = 10 if world_size is None else world_size  # world size
+        self.duration = 100 if duration is None else duration  # numbr of steps per game
+        self.local_reward_ratio = 0.5 if local_reward_ratio is None else local_reward_ratio  # the local reward ration
+        self.termination_rewrad = False if termination_rewrad is None else termination_rewrad  # termination reward flag
+        self.fireSpots_Num = 5 if fireSpots_Num is None else fireSpots_Num  # number of firespots
+        self.perception_agent_num = 2 if P_agent_num is None else P_agent_num  # number of perception agents
+        self.action_agent_num = 2 if A_agent_num is None else A_agent_num  # number of action agents
+        self.agent_num = self.perception_agent_num + self.action_agent_num  # total number of agents
+        self.rng = WildFire.make_rng(seed=seed)  # the env's random number generator (all episodes' draws of a reset in one call)
+
+        if self.vision < 1:
+            raise ValueError(">>> Oops! The vision of the agents must be at least 1-hop.")
+        if self.fireSpots_Num > self.world_size * self.world_size:
+            raise ValueError(">>> Oops! The number of firespots can not be larger than the number of cells.")
+        if not self.center_init and 2 * self.agent_num > self.world_size:
+            raise ValueError(">>> Oops! Random agent initialization needs world_size >= 2 * (P_agent_num + A_agent_num).")
+
+        # the P agents' scope stencil (all cells within the vision hops)
+        hops = np.arange(-self.vision, self.vision + 1)
+        self.scope_dx = np.repeat(hops, hops.shape[0])
+        self.scope_dy = np.tile(hops, hops.shape[0])
+
+    # initialize all the environments
+    def env_init(self, comm_range=None, water_dump_action=None, no_op_action=None):
+        # initialize some required variables
+        self.comm_hop = 5 if comm_range is None else comm_range  # number of hops for discrete communication range:: default=5
+        self.water_dump_action = True if water_dump_action is None else water_dump_action  # flag if the water dumping is an action or not
+        self.no_op_action = [False, False] if no_op_action is None else no_op_action  # flag if no-op is going to be an action
+
+        B, N, W = self.num_envs, self.agent_num, self.world_size
+        self.fire_map = np.zeros([B, W, W], dtype=np.int8)  # fire codes of all episodes
+        self.agent_pos = np.zeros([B, N, 2], dtype=np.int64)  # agents' positions of all episodes
+        self.sensed_contribution = np.zeros([B, self.perception_agent_num])  # keeping track of P agents' contributions
+        self.pruned_contribution = np.zeros([B, self.action_agent_num])  # keeping track of A agents' contributions
+        self.pruned_num = np.zeros(B, dtype=np.int64)  # length of each episode's pruned list
+        self.old_reward_without_adjacent = np.zeros(B)  # RF1 memory
+        self.steps = np.zeros(B, dtype=np.int64)  # step counter of each episode
+        self.state = np.zeros([B, N + 1, W, W], dtype=float)
+        self.final_state = np.zeros([B, N + 1, W, W], dtype=float)  # terminal states of the episodes reset in the last step
+
+        self.reset_envs(np.arange(B))
+
+        # initialize the adjacency matrices
+        self.adjacency = self.get_adjacency_matrices()
+
+        # initialize task success rates and rewards
+        self.perception_complete, self.action_complete = np.zeros(B), np.zeros(B)
+        self.reward = np.zeros([B, N])
+
+    # (re)initialize a subset of the environments
+    def reset_envs(self, env_ids):
+        num_reset = env_ids.shape[0]
+        if num_reset == 0:
+            return
+        W = self.world_size
+
+        # initialize firespot positions (uniformly randomly distributed)
+        self.fire_map[env_ids] = 0
+        if not self.stationary_fire:
+            firespot_loci = np.argsort(self.rng.random((num_reset, W * W)), axis=1)[:, :self.fireSpots_Num]
+        else:
+            firespot_loci = np.tile(np.array([39, 5, 22, 81, 69]), (num_reset, 1))  # some random fixed position within bounds for testing
+        self.fire_map.reshape(self.num_envs, W * W)[env_ids[:, np.newaxis], firespot_loci] = 1
+
+        # initialize agents
+        if self.center_init:
+            self.agent_pos[env_ids] = int(W / 2)
+        else:
+            temp = np.argsort(self.rng.random((num_reset, W)), axis=1)[:, :2 * self.agent_num]  # randomize agents initial positions
+            self.agent_pos[env_ids, :, 0] = temp[:, :self.agent_num]
+            self.agent_pos[env_ids, :, 1] = temp[:, self.agent_num:]
+
+        # reset the episode counters
+        self.sensed_contribution[env_ids] = 0
+        self.pruned_contribution[env_ids] = 0
+        self.pruned_num[env_ids] = 0
+        self.old_reward_without_adjacent[env_ids] = 0.0
+        self.steps[env_ids] = 0
+
+        # update state matrix
+        self.state_matrix_update(env_ids)
+
+    # proceed all the environments one step into the future
+    def env_step(self, action, a_c_threshold=1.0, r_func=None, global_penalty=-0.1, local_P_reward=0.1, local_A_reward=0.1, A_penalty=-0.05,
+                 max_steps=1000):
+        action = np.asarray(action, dtype=np.int64)
+        if action.shape != (self.num_envs, self.agent_num):
+            raise ValueError(">>> Oops! The actions must be of shape [num_envs, P_agent_num + A_agent_num].")
+        B, P, A, W = self.num_envs, self.perception_agent_num, self.action_agent_num, self.world_size
+        env_idx = np.arange(B)[:, np.newaxis]
+
+        # update agents' states
+        valid = (action >= 0) & (action < self.action_dx.shape[0])
+        safe_action = np.where(valid, action, 4)
+        self.agent_pos[:, :, 0] = np.clip(self.agent_pos[:, :, 0] + self.action_dx[safe_action], 0, W - 1)
+        self.agent_pos[:, :, 1] = np.clip(self.agent_pos[:, :, 1] + self.action_dy[safe_action], 0, W - 1)
+
+        # update the Perception agents' contribution (firespots not found yet within each P agent's scope)
+        scope_x = self.agent_pos[:, :P, 0:1] + self.scope_dx
+        scope_y = self.agent_pos[:, :P, 1:2] + self.scope_dy
+        in_bounds = (scope_x >= 0) & (scope_x < W) & (scope_y >= 0) & (scope_y < W)
+        scope_x, scope_y = np.clip(scope_x, 0, W - 1), np.clip(scope_y, 0, W - 1)
+        newly_sensed = (self.fire_map[env_idx[:, :, np.newaxis], scope_x, scope_y] == 1) & in_bounds
+        self.sensed_contribution = newly_sensed.sum(axis=2).astype(float)
+
+        # update the Action agents' contribution (found firespots under each A agent, as seen before this step's sensing)
+        A_pos = self.agent_pos[:, P:]
+        pruned = self.fire_map[env_idx, A_pos[:, :, 0], A_pos[:, :, 1]] == 2
+        if self.water_dump_action:
+            dumping = action[:, P:] == 4
+            pruned &= dumping
+            self.pruned_contribution = np.where(dumping, pruned, self.pruned_contribution)
+        else:
+            self.pruned_contribution = pruned.astype(float)
+        self.pruned_num += pruned.sum(axis=1)  # two A agents on the same spot both add it to the pruned list (as in FireCommanderEasy)
+
+        # update the fire map
+        sensed_env = np.broadcast_to(env_idx[:, :, np.newaxis], newly_sensed.shape)
+        self.fire_map[sensed_env[newly_sensed], scope_x[newly_sensed], scope_y[newly_sensed]] = 2
+        pruned_env = np.broadcast_to(env_idx, pruned.shape)
+        self.fire_map[pruned_env[pruned], A_pos[:, :, 0][pruned], A_pos[:, :, 1][pruned]] = 3
+
+        # update the state space
+        self.state_matrix_update()
+
+        # update the adjacency matrices
+        self.adjacency = self.get_adjacency_matrices()
+
+        # compute the global reward
+        num_firespots = ((self.fire_map == 1) | (self.fire_map == 2)).sum(axis=(1, 2))
+        num_dumps = (action[:, P:] == 4).sum(axis=1)
+        if r_func == 'RF1':
+            global_reward = self.get_global_reward1(self.sensed_contribution.sum(axis=1), self.pruned_contribution.sum(axis=1))
+        elif r_func == 'RF2':
+            global_reward = np.where(num_firespots > 0, -1.0, 0.0)
+        elif r_func == 'RF3' or r_func is None:
+            global_reward = global_penalty * num_firespots + A_penalty * num_dumps
+        else:
+            raise ValueError(">>> Oops! The specified Global Reward Function doesn't exist. Options: RF1, RF2, RF3")
+
+        # compute the local reward
+        local_reward = np.where(num_firespots > 0, global_penalty, 0.0)[:, np.newaxis] * np.ones([1, self.agent_num])
+        local_reward[:, :P] += local_P_reward * self.sensed_contribution
+        local_reward[:, P:] += local_A_reward * self.pruned_contribution + A_penalty * (action[:, P:] == 4)
+
+        # calculate the mixed reward with local reward ratio
+        self.reward = self.local_reward_ratio * local_reward + (1 - self.local_reward_ratio) * global_reward[:, np.newaxis]
+
+        # compute performances
+        num_sensed = (self.fire_map == 2).sum(axis=(1, 2))
+        self.perception_complete = (num_sensed + self.pruned_num) / (num_firespots + self.pruned_num)
+        self.action_complete = self.pruned_num / (num_firespots + self.pruned_num)
+
+        # if all the firespots have been put out, finish the game
+        outcom_flg = self.action_complete >= a_c_threshold
+        self.steps += 1
+        timeout = ~outcom_flg & (self.steps >= max_steps)
+        done = outcom_flg | timeout
+        if self.termination_rewrad:
+            self.reward[outcom_flg] += 10.0 * self.fireSpots_Num
+            self.reward[timeout] += (-10.0 * (self.fireSpots_Num - self.pruned_num[timeout]))[:, np.newaxis]
+
+        # auto-reset the finished episodes (keeping their terminal states)
+        steps = self.steps.copy()
+        done_ids = np.where(done)[0]
+        self.final_state[done_ids] = self.state[done_ids]
+        self.reset_envs(done_ids)
+        if done_ids.shape[0] > 0:
+            self.adjacency = self.get_adjacency_matrices()
+
+        return self.state, self.reward, done, outcom_flg, steps, self.perception_complete, self.action_complete
+
+    # generating the state matrices (all or a subset of the environments)
+    def state_matrix_update(self, env_ids=None):
+        env_ids = np.arange(self.num_envs) if env_ids is None else env_ids
+        P, W = self.perception_agent_num, self.world_size
+
+        # clean-up the previous states and update fire's state (Dim 1)
+        self.state[env_ids] = 0.0
+        self.state[env_ids, 0] = self.fire_map[env_ids]
+
+        # P agents' scopes and locations
+        pos = self.agent_pos[env_ids]
+        layer = np.arange(1, P + 1)[np.newaxis, :, np.newaxis]
+        scope_x = np.clip(pos[:, :P, 0:1] + self.scope_dx, 0, W - 1)
+        scope_y = np.clip(pos[:, :P, 1:2] + self.scope_dy, 0, W - 1)
+        self.state[env_ids[:, np.newaxis, np.newaxis], layer, scope_x, scope_y] = 2
+
+        # agents' locations (P and A agents)
+        self.state[env_ids[:, np.newaxis], np.arange(1, self.agent_num + 1), pos[:, :, 0], pos[:, :, 1]] = 1
+
+    # get the reward for agents (reward function number 1) - w/o time penalty, w/o firespot penalty, w/ communication reward
+    def get_global_reward1(self, num_sensed, num_pruned):
+        P = self.perception_agent_num
+
+        # compute performance rewards
+        new_reward = 2.0 * num_sensed + 20.0 * num_pruned
+        im_reward = new_reward - self.old_reward_without_adjacent
+        self.old_reward_without_adjacent = new_reward
+
+        # computing adjacency rewards for homogeneous communicatiion channel (agents with no neighbor at all)
+        im_reward -= 1.0 * (~self.adjacency.any(axis=2)).sum(axis=1)
+
+        # computing adjacency rewards for heterogeneous communicatiion channel (agents with no neighbor of the other type)
+        hetero = self.adjacency[:, :P, P:]
+        im_reward -= 3.0 * ((~hetero.any(axis=2)).sum(axis=1) + (~hetero.any(axis=1)).sum(axis=1))
+
+        return im_reward
+
+    # generate the adjacency matrices for current time-step ([B, N, N] boolean, P agents first)
+    def get_adjacency_matrices(self):
+        diff = np.abs(self.agent_pos[:, :, np.newaxis, :] - self.agent_pos[:, np.newaxis, :, :]).max(axis=3)
+        adjacency = diff <= self.comm_hop
+        adjacency[:, np.arange(self.agent_num), np.arange(self.agent_num)] = False
+
+        return adjacency
+
+    # close env
+    @staticmethod
+    def env_close():
+        return 0
+
+
+if __name__ == '__main__':
+    # benchmark: B batched episodes vs. looping over B scalar environments
+    num_envs = 256
+    num_steps = 200
+    Num_P, Num_A = 2, 2
+    water_dump_action = True
+    P_action_space, A_action_space = 4, 5
+
+    # scalar environments
+    envs = [FireCommanderEasy(vision=1, local_reward_ratio=0.5) for _ in range(num_envs)]
+    for env in envs:
+        env.env_init(water_dump_action=water_dump_action)
+    steps = [0] * num_envs
+    startTime = time.time()
+    for t in range(num_steps):
+        for b, env in enumerate(envs):
+            actions = list(np.random.randint(0, P_action_space, Num_P)) + list(np.random.randint(0, A_action_space, Num_A))
+            state, reward, done, outcom_flg, steps[b], p_c, a_c = env.env_step(actions, step=steps[b], r_func='RF1')
+            if done:
+                env.env_init(water_dump_action=water_dump_action)
+                steps[b] = 0
+    scalar_rate = num_envs * num_steps / (time.time() - startTime)
+
+    # batched environment
+    vec_env = FireCommanderEasyVec(num_envs=num_envs, vision=1, local_reward_ratio=0.5)
+    vec_env.env_init(water_dump_action=water_dump_action)
+    startTime = time.time()
+    for t in range(num_steps):
+        actions = np.concatenate([np.random.randint(0, P_action_space, (num_envs, Num_P)),
+                                  np.random.randint(0, A_action_space, (num_envs, Num_A))], axis=1)
+        state, reward, done, outcom_flg, steps, p_c, a_c = vec_env.env_step(actions, r_func='RF1')
+    vec_rate = num_envs * num_steps / (time.time() - startTime)
+
+    print('scalar envs:: ' + str(int(scalar_rate)) + ' env-steps/sec')
+    print('batched env:: ' + str(int(vec_rate)) + ' env-steps/sec')
+    print('speed-up:: ' + str(round(vec_rate / scalar_rate, 1)) + 'x')
+
+    vec_env.env_close()
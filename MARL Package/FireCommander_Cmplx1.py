@@ -16,17 +16,22 @@
 import pygame  # for online visualization
 from pygame.locals import *
 import numpy as np
-import random
 import matplotlib.pyplot as plt
-from WildFire_Model import WildFire
-from FireCommander_Cmplx1_Utilities import EnvUtilities
+from WildFire_Model import WildFire, MultiAreaWildFire, FireMapBuffer, TerrainField, RasterField
+from FireCommander_Cmplx1_Utilities import EnvUtilities, FireStateGrid
 
 Agent_Util = EnvUtilities()
 
 
 # Full FireCommander Environment
 class FireCommanderHard(object):
-    def __init__(self, world_size=None, duration=None, fireAreas_Num=None, P_agent_num=None, A_agent_num=None, online_vis=False):
+    def __init__(self, world_size=None, duration=None, fireAreas_Num=None, P_agent_num=None, A_agent_num=None, online_vis=False,
+                 fire_engine='loop', fire_spatial_index=False, fire_decay_rate=None, fire_consolidation=False,
+                 fire_backend='farsite', terrain_tile_size=None, terrain_field=None, terrain_rasters=None, fire_multi_area=False,
+                 seed=None):
+
+        if fire_multi_area and (terrain_rasters is not None or fire_backend != 'farsite'):
+            raise ValueError(">>> Oops! The multi-area fire model only supports the 'farsite' backend over random terrains.")
 
         # pars parameters
         self.world_size = 100 if world_size is None else world_size            # world size
@@ -34,10 +39,23 @@ class FireCommanderHard(object):
         self.fireAreas_Num = 2 if fireAreas_Num is None else fireAreas_Num     # number of fire areas
         self.perception_agent_num = 2 if P_agent_num is None else P_agent_num  # number of perception agents
         self.action_agent_num = 2 if A_agent_num is None else A_agent_num      # number of action agents
+        self.fire_engine = fire_engine                                         # WildFire propagation engine ('loop', 'vectorized' or 'raster')
+        self.fire_spatial_index = fire_spatial_index                           # grid index for the WildFire heat-source radius queries
+        self.fire_decay_rate = fire_decay_rate                                 # fuel exhaustion rate (None:: no fire decay and burn-out)
+        self.fire_consolidation = fire_consolidation                           # merge the fire spots per cell (bounded number of heat sources)
+        self.fire_backend = fire_backend                                       # WildFire propagation backend ('farsite' or 'cellular')
+        self.terrain_tile_size = terrain_tile_size                             # lazily generated float32 spread rate tiles (None:: dense maps)
+        self.terrain_field = terrain_field                                     # a fixed TerrainField shared by the episodes (and processes)
+        # external terrain:: {'fuel': raster, 'wind_speed': raster, 'wind_direction': raster} (.npy file paths or RasterFields, the wind
+        # rasters are optional), memory-mapped once and shared by the fire areas and the episodes (None:: random terrain)
+        self.terrain_rasters = None if terrain_rasters is None else \
+            {key: raster if isinstance(raster, RasterField) else RasterField(raster) for key, raster in terrain_rasters.items()}
+        self.fire_multi_area = fire_multi_area                                 # one WildFire model advancing all the fire areas at once
+        self.rng = WildFire.make_rng(seed=seed)                                # the env's random number generator (shared with the fire model)
 
         # fire model parameters
-        areas_x = np.random.randint(20, self.world_size - 20, self.fireAreas_Num)
-        areas_y = np.random.randint(20, self.world_size - 20, self.fireAreas_Num)
+        areas_x = self.rng.integers(20, self.world_size - 20, self.fireAreas_Num)
+        areas_y = self.rng.integers(20, self.world_size - 20, self.fireAreas_Num)
         area_delays = [0] * self.fireAreas_Num
         area_fuel_coeffs = [5] * self.fireAreas_Num
         area_wind_speed = [5] * self.fireAreas_Num
@@ -47,8 +65,8 @@ class FireCommanderHard(object):
 
         for i in range(self.fireAreas_Num):
             area_centers.append([areas_x[i], areas_y[i]])
-            num_firespots.append(np.random.randint(low=5, high=15, size=1)[0])
-            area_wind_directions.append(random.choice([0, 45, 90, 135, 180]))
+            num_firespots.append(int(self.rng.integers(low=5, high=15)))
+            area_wind_directions.append(int(self.rng.choice([0, 45, 90, 135, 180])))
         self.fire_info = [area_centers,            # [[area1_center_x, area1_center_y], [area2_center_x, area2_center_y], ...],
                           [num_firespots,          # [[num_firespots1, num_firespots2, ...],
                            area_delays,            # [area1_start_delay, area2_start_delay, ...],
@@ -106,33 +124,8 @@ class FireCommanderHard(object):
         # the END flag
         self.done = False
 
-        # keeping track of neighboring agents (works with both 2D and 3D positions)
-        self.adjacent_agents_PnP = []
-        self.adjacent_agents_PnA = []
-        self.adjacent_agents_AnA = []
-        # Perception-Perception adjacency
-        for i in range(self.perception_agent_num):
-            for j in range(self.perception_agent_num):
-                if i != j:
-                    pose1 = self.agent_state[i]
-                    pose2 = self.agent_state[j]
-                    if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim-1], pose2[0:self.agent_pose_dim-1], hop_num=self.comm_hop):
-                        self.adjacent_agents_PnP.append([i, j])
-        # Perception-Action adjacency
-        for i in range(self.perception_agent_num):
-            for j in range(self.action_agent_num):
-                pose1 = self.agent_state[i]
-                pose2 = self.agent_state[self.perception_agent_num + j]
-                if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim-1], pose2[0:self.agent_pose_dim-1], hop_num=self.comm_hop):
-                    self.adjacent_agents_PnA.append([i, self.perception_agent_num + j])
-        # Action-Action adjacency
-        for i in range(self.action_agent_num):
-            for j in range(self.action_agent_num):
-                if i != j:
-                    pose1 = self.agent_state[self.perception_agent_num + i]
-                    pose2 = self.agent_state[self.perception_agent_num + j]
-                    if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim-1], pose2[0:self.agent_pose_dim-1], hop_num=self.comm_hop):
-                        self.adjacent_agents_AnA.append([self.perception_agent_num + i, self.perception_agent_num + j])
+        # keeping track of neighboring agents
+        self.get_adjacency_matrices()
 
         # task complete info
         self.perception_complete = 0
@@ -165,22 +158,21 @@ class FireCommanderHard(object):
 
         # updating the Perception agents' contribution
         for i in range(self.perception_agent_num):
-            sensed_num_prev = len(self.sensed_List)
+            sensed_num_prev = self.fire_grid.count(FireStateGrid.SENSED)
             # Sensing
-            self.sensed_List, FOV = Agent_Util.fire_Sensing(self.onFire_List, self.agent_state[i], self.sensed_List, self.world_size)
+            FOV = Agent_Util.fire_Sensing_Grid(self.fire_grid, self.agent_state[i], self.world_size, rng=self.rng)
             self.FOV_list.append(FOV)
             # compute the per-agent contribution (variation of the sensing list size)
-            self.sensed_contribution[i] += len(self.sensed_List) - sensed_num_prev
+            self.sensed_contribution[i] += self.fire_grid.count(FireStateGrid.SENSED) - sensed_num_prev
 
         # updating the Action agents' contribution
         for i in range(self.perception_agent_num, self.perception_agent_num + self.action_agent_num):
-            pruned_num_prev = len(self.pruned_List)
+            pruned_num_prev = self.fire_grid.count(FireStateGrid.PRUNED)
             # Pruning
-            self.onFire_List, self.sensed_List, self.pruned_List, self.new_fire_front, self.target_onFire_list =\
-                Agent_Util.fire_Pruning(self.agent_state[i], self.onFire_List, self.sensed_List, self.pruned_List, self.new_fire_front,
-                                        self.target_onFire_list, self.target_info, self.world_size, 0.8)
+            self.target_onFire_list = Agent_Util.fire_Pruning_Grid(self.agent_state[i], self.fire_grid, self.target_onFire_list, self.target_info,
+                                                                   self.world_size, 0.8, rng=self.rng)
             # compute the per-agent contribution (variation of the pruned list size)
-            self.pruned_contribution[i - self.perception_agent_num] += len(self.pruned_List) - pruned_num_prev
+            self.pruned_contribution[i - self.perception_agent_num] += self.fire_grid.count(FireStateGrid.PRUNED) - pruned_num_prev
 
         # updating the full state matrix
         state = self.state_gen()
@@ -193,47 +185,22 @@ class FireCommanderHard(object):
         '''
 
         # TODO: DISCRETE ADAJACENCY CHECK ############################################################################################################
-        # determining the neighboring agents (works with both 2D and 3D positions)
-        self.adjacent_agents_PnP = []
-        self.adjacent_agents_PnA = []
-        self.adjacent_agents_AnA = []
-        # Perception-Perception adjacency
-        for i in range(self.perception_agent_num):
-            for j in range(self.perception_agent_num):
-                if i != j:
-                    pose1 = self.agent_state[i]
-                    pose2 = self.agent_state[j]
-                    if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim-1], pose2[0:self.agent_pose_dim-1], hop_num=self.comm_hop):
-                        self.adjacent_agents_PnP.append([i, j])
-        # Perception-Action adjacency
-        for i in range(self.perception_agent_num):
-            for j in range(self.action_agent_num):
-                pose1 = self.agent_state[i]
-                pose2 = self.agent_state[self.perception_agent_num + j]
-                if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim-1], pose2[0:self.agent_pose_dim-1], hop_num=self.comm_hop):
-                    self.adjacent_agents_PnA.append([i, self.perception_agent_num + j])
-        # Action-Action adjacency
-        for i in range(self.action_agent_num):
-            for j in range(self.action_agent_num):
-                if i != j:
-                    pose1 = self.agent_state[self.perception_agent_num + i]
-                    pose2 = self.agent_state[self.perception_agent_num + j]
-                    if Agent_Util.adjacent_agents(pose1[0:self.agent_pose_dim-1], pose2[0:self.agent_pose_dim-1], hop_num=self.comm_hop):
-                        self.adjacent_agents_AnA.append([self.perception_agent_num + i, self.perception_agent_num + j])
+        # determining the neighboring agents
+        self.get_adjacency_matrices()
 
         # TODO: REWARD STRUCTURE #####################################################################################################################
         all_adjacencies = self.adjacent_agents_PnP + self.adjacent_agents_AnA + self.adjacent_agents_PnA
         if r_func == 'RF1':
-            self.reward = self.get_reward1(len(self.onFire_List), sum(self.sensed_contribution), sum(self.pruned_contribution),
+            self.reward = self.get_reward1(self.fire_grid.count(FireStateGrid.ON_FIRE), sum(self.sensed_contribution), sum(self.pruned_contribution),
                                            all_adjacencies, time_passed)
         elif r_func == 'RF2':
-            self.reward = self.get_reward2(len(self.onFire_List), sum(self.sensed_contribution), sum(self.pruned_contribution),
+            self.reward = self.get_reward2(self.fire_grid.count(FireStateGrid.ON_FIRE), sum(self.sensed_contribution), sum(self.pruned_contribution),
                                            all_adjacencies, time_passed)
         elif r_func == 'RF3':
-            self.reward = self.get_reward3(len(self.onFire_List), sum(self.sensed_contribution), sum(self.pruned_contribution),
+            self.reward = self.get_reward3(self.fire_grid.count(FireStateGrid.ON_FIRE), sum(self.sensed_contribution), sum(self.pruned_contribution),
                                            all_adjacencies, time_passed)
         elif r_func is None:
-            self.reward = self.get_reward1(len(self.onFire_List), sum(self.sensed_contribution), sum(self.pruned_contribution),
+            self.reward = self.get_reward1(self.fire_grid.count(FireStateGrid.ON_FIRE), sum(self.sensed_contribution), sum(self.pruned_contribution),
                                            all_adjacencies, time_passed)
         else:
             raise ValueError(">>> Oops! The specified Reward Function name doesn't exist. Options: RF1, RF2, RF3")
@@ -241,9 +208,10 @@ class FireCommanderHard(object):
 
         # if all the fire fronts have been sensed, exit the environment
         # Perception performance: (sensed + pruned) / (active + pruned)
-        self.perception_complete = (len(self.sensed_List) + len(self.pruned_List)) / (len(self.onFire_List) + len(self.pruned_List))
+        num_onFire, num_sensed, num_pruned = [self.fire_grid.count(flag) for flag in FireStateGrid.FLAGS]
+        self.perception_complete = (num_sensed + num_pruned) / (num_onFire + num_pruned)
         # Action performance:  pruned / (active + pruned)
-        self.action_complete = len(self.pruned_List) / (len(self.onFire_List) + len(self.pruned_List))
+        self.action_complete = num_pruned / (num_onFire + num_pruned)
         # when more than 95% of firespots have been pruned, the agent wins the game
         # lower the bar to 80%
         if self.action_complete >= a_c_threshold:
@@ -290,6 +258,19 @@ class FireCommanderHard(object):
             elif action_type[i] == 3:
                 self.agent_state[i][1] = min(self.agent_state[i][1] + a_vel, self.world_size - 1)         
 
+    # determining the neighboring agents of the current time-step (discrete, 2D positions)
+    def get_adjacency_matrices(self):
+        agent_poses = [agent[0:self.agent_pose_dim - 1] for agent in self.agent_state]
+        self.adjacency = Agent_Util.adjacency_matrix(agent_poses, hop_num=self.comm_hop)  # [N, N] boolean, P agents first
+        self.adjacent_agents_PnP, self.adjacent_agents_PnA, self.adjacent_agents_AnA = \
+            Agent_Util.adjacency_pairs(self.adjacency, self.perception_agent_num)
+
+        return self.adjacent_agents_PnP, self.adjacent_agents_PnA, self.adjacent_agents_AnA
+
+    # the communication graph of the current time-step in edge-index form, [2, E]
+    def get_edge_index(self):
+        return Agent_Util.adjacency_edge_index(self.adjacency)
+
     # get the reward for agents (reward function number 1) - w/o time penalty, w/o firespot penalty, w/ communication reward
     def get_reward1(self, num_firespots, num_sensed, num_pruned, all_adjacencies, time_passed):
         # computing performance rewards
@@ -300,29 +281,13 @@ class FireCommanderHard(object):
         self.old_reward_without_adjacent = new_reward
 
         # computing adjacency rewards for homogeneous communicatiion channel
-        uniques = list(range(0, len(self.agent_state)))
-        for pair in all_adjacencies:
-            for idx in pair:
-                if idx in uniques:
-                    uniques.remove(idx)
-                    if len(uniques) == 0:
-                        break
+        num_agents = len(self.agent_state)
+        pairs = np.asarray(all_adjacencies, dtype=int).reshape(-1, 2)
+        im_reward -= 1.0 * Agent_Util.isolated_agents(pairs, num_agents)
 
-        im_reward -= 1.0 * len(uniques)
-
-        # computing adjacency rewards for homogeneous communicatiion channel
-        uniques_hetero_cm = list(range(0, len(self.agent_state)))
-        for pair in all_adjacencies:
-            if 0 <= pair[0] < self.perception_agent_num:  # one way check is OK since heterogeneous communication is symmetric
-                if self.perception_agent_num <= pair[1] < self.perception_agent_num + self.action_agent_num:
-                    if pair[0] in uniques_hetero_cm:
-                        uniques_hetero_cm.remove(pair[0])
-                    if pair[1] in uniques_hetero_cm:
-                        uniques_hetero_cm.remove(pair[1])
-                    if len(uniques_hetero_cm) == 0:
-                        break
-
-        im_reward -= 3.0 * len(uniques_hetero_cm)
+        # computing adjacency rewards for heterogeneous communicatiion channel (one way check is OK since it is symmetric)
+        hetero = (pairs[:, 0] < self.perception_agent_num) & (pairs[:, 1] >= self.perception_agent_num) & (pairs[:, 1] < num_agents)
+        im_reward -= 3.0 * Agent_Util.isolated_agents(pairs[hetero], num_agents)
 
         return im_reward
 
@@ -361,30 +326,22 @@ class FireCommanderHard(object):
             # Perception Agents
             if self.agent_state[i][3] == 0:
                 # mark the Perception agent scope
-                for i1 in range(max(0, self.agent_state[i][0] - self.agent_state[i][2]),
-                                min(self.agent_state[i][0] + self.agent_state[i][2] + 1, self.world_size)):
-                    for j1 in range(max(0, self.agent_state[i][1] - self.agent_state[i][2]),
-                                    min(self.agent_state[i][1] + self.agent_state[i][2] + 1, self.world_size)):
-                        self.state[i1][j1] = 4  # Perception agent scope index
+                self.state[max(0, self.agent_state[i][0] - self.agent_state[i][2]):self.agent_state[i][0] + self.agent_state[i][2] + 1,
+                           max(0, self.agent_state[i][1] - self.agent_state[i][2]):self.agent_state[i][1] + self.agent_state[i][2] + 1] = 4
                 # mark the position of the perception agents
                 self.state[self.agent_state[i][0]][self.agent_state[i][1]] = 3  # Perception agent location index
 
             # Action Agents
             elif self.agent_state[i][3] == 1:
                 # mark the Action agent scope
-                for i1 in range(max(0, self.agent_state[i][0] - self.agent_state[i][2]),
-                                min(self.agent_state[i][0] + self.agent_state[i][2] + 1, self.world_size)):
-                    for j1 in range(max(0, self.agent_state[i][1] - self.agent_state[i][2]),
-                                    min(self.agent_state[i][1] + self.agent_state[i][2] + 1, self.world_size)):
-                        self.state[i1][j1] = 6  # Action agent scope index
+                self.state[max(0, self.agent_state[i][0] - self.agent_state[i][2]):self.agent_state[i][0] + self.agent_state[i][2] + 1,
+                           max(0, self.agent_state[i][1] - self.agent_state[i][2]):self.agent_state[i][1] + self.agent_state[i][2] + 1] = 6
                 # mark the position of the action agents
                 self.state[self.agent_state[i][0]][self.agent_state[i][1]] = 5  # Action agent location index
         # mark the sensed fire fronts
-        for i in range(len(self.sensed_List)):
-            self.state[self.sensed_List[i][0]][self.sensed_List[i][1]] = 1  # sensed firespots index
+        self.state[self.fire_grid.mask(FireStateGrid.SENSED)] = 1  # sensed firespots index
         # mark the pruned fire fronts
-        for i in range(len(self.pruned_List)):
-            self.state[self.pruned_List[i][0]][self.pruned_List[i][1]] = 2  # pruned firespots index
+        self.state[self.fire_grid.mask(FireStateGrid.PRUNED)] = 2  # pruned firespots index
 
         return self.state
 
@@ -484,6 +441,10 @@ class FireCommanderHard(object):
         for i in range(self.fireAreas_Num):
             hotspot_areas.append([self.fire_info[0][i][0] - 5, self.fire_info[0][i][0] + 5,
                                   self.fire_info[0][i][1] - 5, self.fire_info[0][i][1] + 5])
+        # the lazily generated terrain field (if any) is shared by all the fire areas
+        fuel_field = self.terrain_field
+        if fuel_field is None and self.terrain_tile_size is not None:
+            fuel_field = TerrainField(shape=terrain_sizes, tile_size=self.terrain_tile_size, seed=int(self.rng.integers(2 ** 63)))
 
         # checking fire model setting mode and initializing the fire model
         if self.fire_info[1][9] == 0:  # when using "uniform" fire setting (all fire areas use the same parameters)
@@ -498,71 +459,137 @@ class FireCommanderHard(object):
 
             # Init the wildfire model
             self.fire_mdl = WildFire(terrain_sizes=terrain_sizes, hotspot_areas=hotspot_areas, num_ign_points=num_ign_points, duration=self.duration,
-                                     time_step=1, radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3)
-            self.ign_points_all = self.fire_mdl.hotspot_init()      # initializing hotspots
-            self.fire_map = self.ign_points_all                     # initializing fire-map
-            self.previous_terrain_map = self.ign_points_all.copy()  # initializing the starting terrain map
-            self.geo_phys_info = self.fire_mdl.geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
-                                                                  avg_wind_direction=wind_direction)  # initialize geo-physical info
+                                     time_step=1, radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3,
+                                     engine=self.fire_engine, spatial_index=self.fire_spatial_index, backend=self.fire_backend, rng=self.rng)
+            self.ign_points_all = self.consolidate(self.fire_mdl.hotspot_init())  # initializing hotspots
+            # the growing fire histories are kept in capacity-doubling buffers (fire_map and previous_terrain_map are their views)
+            self.fire_map_buffer = FireMapBuffer(self.ign_points_all[:, 0:3])
+            self.terrain_map_buffer = FireMapBuffer(self.ign_points_all)
+            self.terrain_time_buffer = FireMapBuffer(np.zeros(shape=[len(self.ign_points_all), 1]), num_cols=1)  # time since ignition
+            self.fire_map = self.fire_map_buffer.view                # initializing fire-map
+            self.previous_terrain_map = self.terrain_map_buffer.view  # initializing the starting terrain map
+            if self.terrain_rasters is not None:
+                self.geo_phys_info = self.fire_mdl.geo_phys_info_load(
+                    fuel_raster=self.terrain_rasters['fuel'], wind_speed_raster=self.terrain_rasters.get('wind_speed'),
+                    wind_direction_raster=self.terrain_rasters.get('wind_direction'), avg_wind_speed=wind_speed,
+                    avg_wind_direction=wind_direction)  # load geo-physical info
+            else:
+                self.geo_phys_info = self.fire_mdl.geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
+                                                                      avg_wind_direction=wind_direction,
+                                                                      fuel_field=fuel_field)  # initialize geo-physical info
         else:  # when using "Specific" fire setting (each fire area uses its own parameters)
             self.fire_mdl = []
             self.geo_phys_info = []
             self.ign_points_all = []
             self.previous_terrain_map = []
+            self.terrain_map_buffer = []  # region-wise terrain map buffers
+            self.terrain_time_buffer = []  # region-wise time since ignition
             self.new_fire_front_temp = []
             self.current_geo_phys_info = []
-            # initialize fire areas separately
-            for i in range(self.fireAreas_Num):
-                self.new_fire_front_temp.append([])
-                self.current_geo_phys_info.append([])
-                # initial number of fire spots (ignition points) per hotspot area
-                num_ign_points = self.fire_info[1][0][i]
-                # fuel coefficient for vegetation type of the terrain (higher fuel_coeff:: more circular shape fire)
-                fuel_coeff = self.fire_info[1][2][i]
-                # average mid-flame wind velocity (higher values streches the fire more)
-                wind_speed = self.fire_info[1][3][i]
-                # wind azimuth
-                wind_direction = np.pi * 2 * self.fire_info[1][4][i] / 360  # converting degree to radian
-
-                # init the wildfire model
-                self.fire_mdl.append(WildFire(
-                    terrain_sizes=terrain_sizes, hotspot_areas=[hotspot_areas[i]], num_ign_points=num_ign_points, duration=self.duration, time_step=1,
-                    radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3))
-                self.ign_points_all.append(self.fire_mdl[i].hotspot_init())        # initializing hotspots
-                self.previous_terrain_map.append(self.fire_mdl[i].hotspot_init())  # initializing the starting terrain map
-                self.geo_phys_info.append(self.fire_mdl[i].geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
-                                                                              avg_wind_direction=wind_direction))  # initialize geo-physical info
-            # initializing the fire-map
-            self.fire_map = []
-            for i in range(self.fireAreas_Num):
-                for j in range(len(self.ign_points_all[i])):
-                    self.fire_map.append(self.ign_points_all[i][j])
-            self.fire_map = np.array(self.fire_map)
-            self.fire_map_spec = self.ign_points_all
-
-        # the lists to store the firespots in different state, coordinates only
-        self.onFire_List = []  # the onFire_List, store the points currently on fire (sensed points included, pruned points excluded)
-        self.sensed_List = []  # the sensed_List, store the points currently on fire and have been sensed by agents
-        self.pruned_List = []  # the pruned_List, store the pruned fire spots
+            if self.fire_multi_area:
+                # one model holding the per-area parameters as arrays (all the fire areas are propagated in one batched call)
+                self.fire_mdl = MultiAreaWildFire(
+                    terrain_sizes=terrain_sizes, hotspot_areas=hotspot_areas, num_ign_points=self.fire_info[1][0], area_delays=self.fire_info[1][1],
+                    duration=self.duration, time_step=1, radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3,
+                    engine=self.fire_engine, rng=self.rng)
+                ign_points_all, area_ids = self.fire_mdl.hotspot_init()  # initializing hotspots
+                terrain_map, terrain_area_ids = self.fire_mdl.hotspot_init()
+                self.ign_points_all = [self.consolidate(fire_spots) for fire_spots in self.fire_mdl.split_areas(ign_points_all, area_ids)]
+                for i, fire_spots in enumerate(self.fire_mdl.split_areas(terrain_map, terrain_area_ids)):
+                    self.new_fire_front_temp.append([])
+                    self.current_geo_phys_info.append([])
+                    self.terrain_map_buffer.append(FireMapBuffer(self.consolidate(fire_spots)))
+                    self.terrain_time_buffer.append(FireMapBuffer(np.zeros(shape=[len(self.terrain_map_buffer[i]), 1]), num_cols=1))
+                    self.previous_terrain_map.append(self.terrain_map_buffer[i].view)  # initializing the starting terrain map
+                self.geo_phys_info = self.fire_mdl.geo_phys_info_init(
+                    max_fuel_coeff=self.fire_info[1][2], avg_wind_speed=self.fire_info[1][3],
+                    avg_wind_direction=np.pi * 2 * np.asarray(self.fire_info[1][4]) / 360, fuel_field=fuel_field)  # initialize geo-physical info
+            else:
+                # initialize fire areas separately
+                for i in range(self.fireAreas_Num):
+                    self.new_fire_front_temp.append([])
+                    self.current_geo_phys_info.append([])
+                    # initial number of fire spots (ignition points) per hotspot area
+                    num_ign_points = self.fire_info[1][0][i]
+                    # fuel coefficient for vegetation type of the terrain (higher fuel_coeff:: more circular shape fire)
+                    fuel_coeff = self.fire_info[1][2][i]
+                    # average mid-flame wind velocity (higher values streches the fire more)
+                    wind_speed = self.fire_info[1][3][i]
+                    # wind azimuth
+                    wind_direction = np.pi * 2 * self.fire_info[1][4][i] / 360  # converting degree to radian
+
+                    # init the wildfire model
+                    self.fire_mdl.append(WildFire(
+                        terrain_sizes=terrain_sizes, hotspot_areas=[hotspot_areas[i]], num_ign_points=num_ign_points, duration=self.duration, time_step=1,
+                        radiation_radius=10, weak_fire_threshold=5, flame_height=3, flame_angle=np.pi / 3, engine=self.fire_engine,
+                        spatial_index=self.fire_spatial_index, backend=self.fire_backend, rng=self.rng))
+                    self.ign_points_all.append(self.consolidate(self.fire_mdl[i].hotspot_init()))  # initializing hotspots
+                    self.terrain_map_buffer.append(FireMapBuffer(self.consolidate(self.fire_mdl[i].hotspot_init())))
+                    self.terrain_time_buffer.append(FireMapBuffer(np.zeros(shape=[len(self.terrain_map_buffer[i]), 1]), num_cols=1))
+                    self.previous_terrain_map.append(self.terrain_map_buffer[i].view)  # initializing the starting terrain map
+                    if self.terrain_rasters is not None:
+                        self.geo_phys_info.append(self.fire_mdl[i].geo_phys_info_load(
+                            fuel_raster=self.terrain_rasters['fuel'], wind_speed_raster=self.terrain_rasters.get('wind_speed'),
+                            wind_direction_raster=self.terrain_rasters.get('wind_direction'), avg_wind_speed=wind_speed,
+                            avg_wind_direction=wind_direction))  # load geo-physical info
+                    else:
+                        self.geo_phys_info.append(self.fire_mdl[i].geo_phys_info_init(max_fuel_coeff=fuel_coeff, avg_wind_speed=wind_speed,
+                                                                                      avg_wind_direction=wind_direction,
+                                                                                      fuel_field=fuel_field))  # initialize geo-physical info
+            # initializing the fire-map (and the region-wise fire maps)
+            self.fire_map_buffer = FireMapBuffer(np.concatenate(self.ign_points_all, axis=0)[:, 0:3])
+            self.fire_map = self.fire_map_buffer.view
+            self.fire_map_spec_buffer = [FireMapBuffer(self.ign_points_all[i][:, 0:3]) for i in range(self.fireAreas_Num)]
+            self.fire_map_spec = [self.fire_map_spec_buffer[i].view for i in range(self.fireAreas_Num)]
+
+        # the grid storing the firespots in different states (the onFire_List, sensed_List and pruned_List are derived from it)
+        self.fire_grid = FireStateGrid(self.world_size)
 
         # keeping track of agents' contributions (e.g. number of sensed/pruned firespot by each Perception/Action agent)
         self.sensed_contribution = [0] * self.perception_agent_num
         self.pruned_contribution = [0] * self.action_agent_num
 
+    # read the terrain raster tiles around the active fire and the agents ahead of the fire propagation (raster terrains only)
+    def prefetch_terrain(self):
+        points = [np.asarray(self.agent_state, dtype=float)[:, 0:2]]
+        if self.fire_info[1][9] == 0:
+            points.extend([self.ign_points_all[:, 0:2], self.previous_terrain_map[:, 0:2]])
+            fire_mdl, geo_phys_info = self.fire_mdl, self.geo_phys_info
+        else:
+            for i in range(self.fireAreas_Num):
+                points.extend([self.ign_points_all[i][:, 0:2], self.previous_terrain_map[i][:, 0:2]])
+            fire_mdl, geo_phys_info = self.fire_mdl[0], self.geo_phys_info[0]  # the rasters are shared by the fire areas
+
+        fire_mdl.prefetch_terrain(geo_phys_info, np.concatenate(points, axis=0))
+
     # propagate fire one step forward according to the fire model
     def fire_propagation(self):
+        if self.terrain_rasters is not None:
+            self.prefetch_terrain()
+
+        # decaying the terrain map and putting out the burnt-out fire spots (only when a fire decay rate is set)
+        if self.fire_decay_rate is not None:
+            self.fire_decay()
+
         # checking fire model setting mode and initializing the fire model
         if self.fire_info[1][9] == 0:  # when using "uniform" fire setting (all fire areas use the same parameters)
             self.new_fire_front, current_geo_phys_info =\
                 self.fire_mdl.fire_propagation(self.world_size, ign_points_all=self.ign_points_all, geo_phys_info=self.geo_phys_info,
                                                previous_terrain_map=self.previous_terrain_map, pruned_List=self.pruned_List)
-            updated_terrain_map = self.previous_terrain_map
+            self.new_fire_front = self.consolidate(self.new_fire_front)
+        elif self.fire_multi_area:  # "Specific" fire setting, all the fire areas advanced in one call
+            new_fire_front, current_geo_phys_info, area_ids =\
+                self.fire_mdl.fire_propagation(self.world_size, ign_points_all=self.ign_points_all, previous_terrain_map=self.previous_terrain_map,
+                                               pruned_List=self.pruned_List)
+            self.new_fire_front_temp = [self.consolidate(fire_spots) for fire_spots in self.fire_mdl.split_areas(new_fire_front, area_ids)]
+            self.current_geo_phys_info = self.fire_mdl.split_areas(current_geo_phys_info, area_ids)
+            self.new_fire_front = np.concatenate(self.new_fire_front_temp, axis=0)
         else:  # when using "Specific" fire setting (each fire area uses its own parameters)
-            updated_terrain_map = self.previous_terrain_map
             for i in range(self.fireAreas_Num):
                 self.new_fire_front_temp[i], self.current_geo_phys_info[i] =\
                     self.fire_mdl[i].fire_propagation(self.world_size, ign_points_all=self.ign_points_all[i], geo_phys_info=self.geo_phys_info[i],
                                                       previous_terrain_map=self.previous_terrain_map[i], pruned_List=self.pruned_List)
+                self.new_fire_front_temp[i] = self.consolidate(self.new_fire_front_temp[i])
 
             # update the new firefront list by combining all region-wise firefronts
             self.new_fire_front = []
@@ -574,32 +601,75 @@ class FireCommanderHard(object):
         # update the region-wise fire map
         if self.fire_info[1][9] == 1:
             for i in range(self.fireAreas_Num):
-                self.fire_map_spec[i] = np.concatenate([self.fire_map_spec[i], self.new_fire_front_temp[i]], axis=0)
+                self.fire_map_spec[i] = self.fire_map_spec_buffer[i].append(self.new_fire_front_temp[i][:, 0:3])
         else:
             self.fire_map_spec = self.fire_map
 
         # process the fire spot information and generate the onFire and targer onfire list
-        self.onFire_List, self.target_onFire_list = Agent_Util.fire_Data_Storage(
-            self.new_fire_front, self.world_size, self.onFire_List, self.pruned_List, self.target_onFire_list, self.target_info)
+        self.target_onFire_list = Agent_Util.fire_Data_Storage_Grid(self.new_fire_front, self.world_size, self.fire_grid, self.target_onFire_list,
+                                                                    self.target_info)
 
         # updating the fire-map data for next step
         if self.new_fire_front.shape[0] > 0:
-            self.fire_map = np.concatenate([self.fire_map, self.new_fire_front], axis=0)  # raw fire map without fire decay
+            self.fire_map = self.fire_map_buffer.append(self.new_fire_front[:, 0:3])  # raw fire map without fire decay
 
         # update the fire propagation information
         if self.fire_info[1][9] == 1:
             ign_points_all_temp = []
             for i in range(self.fireAreas_Num):
-                if self.new_fire_front_temp[i].shape[0] > 0:
+                if self.new_fire_front_temp[i].shape[0] > 0 and self.fire_consolidation:
+                    self.previous_terrain_map[i] = self.area_fire_mdl(i).consolidate_terrain_buffer(
+                        self.terrain_map_buffer[i], self.new_fire_front_temp[i], self.terrain_time_buffer[i])
+                elif self.new_fire_front_temp[i].shape[0] > 0:
                     # fire map with fire decay
-                    self.previous_terrain_map[i] = np.concatenate((updated_terrain_map[i], self.new_fire_front_temp[i]), axis=0)
+                    self.previous_terrain_map[i] = self.terrain_map_buffer[i].append(self.new_fire_front_temp[i])
+                    self.terrain_time_buffer[i].append(np.zeros(shape=[self.new_fire_front_temp[i].shape[0], 1]))
                 ign_points_all_temp.append(self.new_fire_front_temp[i])
             self.ign_points_all = ign_points_all_temp
         else:
             if self.new_fire_front.shape[0] > 0:
-                self.previous_terrain_map = np.concatenate((updated_terrain_map, self.new_fire_front))  # fire map with fire decay
+                if self.fire_consolidation:
+                    self.previous_terrain_map = self.fire_mdl.consolidate_terrain_buffer(self.terrain_map_buffer, self.new_fire_front,
+                                                                                         self.terrain_time_buffer)
+                else:
+                    self.previous_terrain_map = self.terrain_map_buffer.append(self.new_fire_front)  # fire map with fire decay
+                    self.terrain_time_buffer.append(np.zeros(shape=[self.new_fire_front.shape[0], 1]))
                 self.ign_points_all = self.new_fire_front
 
+    # per-cell consolidation of the fire spots into [x, y, intensity, multiplicity] rows (only when the fire consolidation is enabled)
+    def consolidate(self, fire_spots):
+        return WildFire.consolidate_fire_spots(fire_spots) if self.fire_consolidation else fire_spots
+
+    # dynamic fire decay of the terrain map (the burnt-out fire spots no longer radiate heat to the fire-fronts)
+    def fire_decay(self):
+        if self.fire_info[1][9] == 0:  # when using "uniform" fire setting (all fire areas use the same parameters)
+            self.previous_terrain_map, _ =\
+                self.fire_mdl.fire_decay_buffer(self.terrain_map_buffer, self.terrain_time_buffer, self.geo_phys_info, self.fire_decay_rate)
+        else:  # when using "Specific" fire setting (each fire area uses its own parameters)
+            for i in range(self.fireAreas_Num):
+                self.previous_terrain_map[i], _ =\
+                    self.area_fire_mdl(i).fire_decay_buffer(self.terrain_map_buffer[i], self.terrain_time_buffer[i], self.geo_phys_info[i],
+                                                            self.fire_decay_rate)
+
+    # the WildFire model of a fire area ("Specific" fire setting)
+    def area_fire_mdl(self, i):
+        return self.fire_mdl if self.fire_multi_area else self.fire_mdl[i]
+
+    # the onFire_List, store the points currently on fire (sensed points included, pruned points excluded)
+    @property
+    def onFire_List(self):
+        return self.fire_grid.as_list(FireStateGrid.ON_FIRE)
+
+    # the sensed_List, store the points currently on fire and have been sensed by agents
+    @property
+    def sensed_List(self):
+        return self.fire_grid.as_list(FireStateGrid.SENSED, sort=True)
+
+    # the pruned_List, store the pruned fire spots
+    @property
+    def pruned_List(self):
+        return self.fire_grid.as_list(FireStateGrid.PRUNED)
+
     # close pygame (only for online visualization option)
     @staticmethod
     def env_close():
@@ -610,8 +680,8 @@ class FireCommanderHard(object):
     def env_init_stack(self, planar_vel, vert_vel, min_alt, max_alt):
         self.env_init()
         for _ in range(self.stack_num):
-            action_p = np.random.randint(0, 6, 2)  # Perception agent action generator, using randint now
-            action_a = np.random.randint(0, 4, 2)  # Action agent action generator, using randint now
+            action_p = self.rng.integers(0, 6, 2)  # Perception agent action generator, drawn from the env's seeded generator
+            action_a = self.rng.integers(0, 4, 2)  # Action agent action generator, drawn from the env's seeded generator
 
             actions = list(action_p) + list(action_a)
 
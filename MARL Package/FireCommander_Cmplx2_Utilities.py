@@ -75,6 +75,105 @@ class EnvUtilities(object):
 
         return onFire_List, target_onFire_list
 
+    # The grid-based version of fire_Data_Storage (the fire states are kept in a FireStateGrid instead of the lists)
+    # Input: the new fire fronts, the size of the simulation environment, the FireStateGrid, the target onFire list and target info
+    # Output: the updated target onFire list (the grid is updated in place)
+    @staticmethod
+    def fire_Data_Storage_Grid(new_fire_front, world_Size, fire_grid, target_onFire_list, target_info):
+        if new_fire_front.shape[0] > 0:
+            # Ensure that all the fire spots to be displayed must be within the window scope
+            cells = new_fire_front[:, 0:2].astype(int)
+            cells = cells[(cells[:, 0] <= (world_Size - 1)) & (cells[:, 1] <= (world_Size - 1)) & (cells[:, 0] >= 0) & (cells[:, 1] >= 0)]
+
+            # The new fire front points which are neither on fire nor pruned are added to the onFire cells
+            cells = cells[~fire_grid.test(FireStateGrid.PRUNED, cells)]
+            new_cells = cells[fire_grid.add(FireStateGrid.ON_FIRE, cells)]
+
+            # Determine whether the new fire fronts locate inside the target region
+            target_onFire_list = EnvUtilities.target_Count(new_cells, target_onFire_list, target_info, 1)
+
+        return target_onFire_list
+
+    # Counting the fire spots inside each target region (a target region is the 10 x 10 square around the target location)
+    # Input: the fire spot cells, the target onFire list, the target info, the count sign (+1 for new fires, -1 for pruned fires)
+    # Output: the updated target onFire list
+    @staticmethod
+    def target_Count(cells, target_onFire_list, target_info, sign):
+        if len(cells) == 0:
+            return target_onFire_list
+
+        for i1 in range(len(target_onFire_list)):
+            if len(target_onFire_list[i1]) == 0:
+                continue
+            target_loci = np.array([target_info[i1][j1][0:2] for j1 in range(len(target_onFire_list[i1]))], dtype=float)
+            inside = (np.abs(cells[:, 0:1] - target_loci[:, 0]) < 5) & (np.abs(cells[:, 1:2] - target_loci[:, 1]) < 5)
+            hits = inside.sum(axis=0)
+            for j1 in np.nonzero(hits)[0]:
+                target_onFire_list[i1][j1] += sign * int(hits[j1])
+
+        return target_onFire_list
+
+    # The grid-based version of fire_Sensing (the sensed cells are flagged in the FireStateGrid)
+    # Input: the FireStateGrid, current agent state, window size, random number generator (default:: the global np.random)
+    # Output: the agent's FOV (the grid is updated in place)
+    @staticmethod
+    def fire_Sensing_Grid(fire_grid, agent_loci, world_size, rng=None):
+        confidence_level = 1 - 3 / 50 * (agent_loci[2] - 10) # the sensing confidence level (highest when altitude=minimu_allowed and vice versa)
+
+        # The coordination of the upper-left and lower-right corners of the agent searching scope
+        (tl_x, tl_y) = (agent_loci[0] - agent_loci[2], agent_loci[1] - agent_loci[2])
+        (br_x, br_y) = (agent_loci[0] + agent_loci[2], agent_loci[1] + agent_loci[2])
+        upper_x, upper_y = max(0, tl_x), max(0, tl_y)
+        lower_x, lower_y = min(br_x, world_size - 1), min(br_y, world_size - 1)
+        FOV = np.zeros((lower_x - upper_x + 1, lower_y - upper_y + 1), dtype=float)
+
+        # Search for the onFire cells (in the onFire_List order), determine whether they locate within the searching scope
+        onFire_cells = fire_grid.get_cells(FireStateGrid.ON_FIRE)
+        if onFire_cells.shape[0] > 0:
+            raw_sensed_idx = np.nonzero((onFire_cells[:, 0] <= lower_x) & (onFire_cells[:, 0] >= upper_x) &
+                                        (onFire_cells[:, 1] <= lower_y) & (onFire_cells[:, 1] >= upper_y))[0]
+            # Apply the stochastic perception
+            rng = np.random if rng is None else rng
+            raw_sensed_idx = rng.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))), replace=False)
+            sensed_cells = onFire_cells[raw_sensed_idx]
+
+            FOV[sensed_cells[:, 0] - upper_x, sensed_cells[:, 1] - upper_y] = 1
+            fire_grid.add(FireStateGrid.SENSED, sensed_cells)
+
+        return FOV
+
+    # The grid-based version of fire_Pruning (the fire states are updated in the FireStateGrid)
+    # Input: current agent state, the FireStateGrid, the target onFire list and target info, window size, pruning confidence level,
+    #        random number generator (default:: the global np.random)
+    # Output: the updated target onFire list (the grid is updated in place)
+    @staticmethod
+    def fire_Pruning_Grid(agent_loci, fire_grid, target_onFire_list, target_info, world_size, confidence_level, rng=None):
+        # The coordination of the upper-left and lower-right corners of the agent searching scope
+        (tl_x, tl_y) = (agent_loci[0] - agent_loci[2], agent_loci[1] - agent_loci[2])
+        (br_x, br_y) = (agent_loci[0] + agent_loci[2], agent_loci[1] + agent_loci[2])
+
+        # Search for the onFire cells (in the onFire_List order), determine whether they locate within the searching scope
+        onFire_cells = fire_grid.get_cells(FireStateGrid.ON_FIRE)
+        if onFire_cells.shape[0] > 0:
+            raw_sensed_idx = np.nonzero((onFire_cells[:, 0] <= min(br_x, world_size - 1)) & (onFire_cells[:, 0] >= max(tl_x, 0)) &
+                                        (onFire_cells[:, 1] <= min(br_y, world_size - 1)) & (onFire_cells[:, 1] >= max(tl_y, 0)))[0]
+            # Apply the stochastic pruning
+            rng = np.random if rng is None else rng
+            raw_sensed_idx = rng.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))), replace=False)
+            temp_cells = onFire_cells[raw_sensed_idx]
+
+            # The pruning agent could only put out fire region that contains the sensed fire fronts
+            if fire_grid.test(FireStateGrid.SENSED, temp_cells).any():
+                pruned_cells = temp_cells[~fire_grid.test(FireStateGrid.PRUNED, temp_cells)]
+                fire_grid.remove(FireStateGrid.ON_FIRE, pruned_cells)
+                fire_grid.remove(FireStateGrid.SENSED, pruned_cells)
+                fire_grid.add(FireStateGrid.PRUNED, pruned_cells)
+
+                # Determine whether the pruned fire fronts locate inside the target region
+                target_onFire_list = EnvUtilities.target_Count(pruned_cells, target_onFire_list, target_info, -1)
+
+        return target_onFire_list
+
     # determining the neighboring agents (discrete) and returning a binary flag at each time step (works with both 2D and 3D positions)
     @staticmethod
     def adjacent_agents(agent1_pose, agent2_pose, hop_num=1):
@@ -104,13 +203,66 @@ class EnvUtilities(object):
 
         return adjacent_agents
 
+    # pairwise adjacency of all the agents at once
+    @staticmethod
+    def adjacency_matrix(agent_poses, hop_num=1):
+        """
+        determining the neighboring agents (discrete) of all the agent pairs in one broadcast operation
+
+        :param agent_poses: [N, 2] or [N, 3] agents' positions
+        :param hop_num: number of hops (discrete) for communication range (default:: 1-hop)
+        :return: [N, N] boolean adjacency matrix (Chebyshev distance within hop_num, no self-loops)
+        """
+
+        poses = np.asarray(agent_poses).reshape(len(agent_poses), -1)
+        adjacency = np.abs(poses[:, np.newaxis, :] - poses[np.newaxis, :, :]).max(axis=2) <= hop_num
+        np.fill_diagonal(adjacency, False)
+
+        return adjacency
+
+    # the Perception-Perception, Perception-Action and Action-Action lists of adjacent [i, j] pairs
+    @staticmethod
+    def adjacency_pairs(adjacency, NumP):
+        """
+        :param adjacency: [N, N] boolean adjacency matrix (P agents first)
+        :param NumP: number of perception agents
+        :return: the PnP, PnA and AnA lists of [i, j] pairs
+        """
+
+        adjacent_agents_PnP = np.argwhere(adjacency[:NumP, :NumP]).tolist()
+        adjacent_agents_PnA = (np.argwhere(adjacency[:NumP, NumP:]) + [0, NumP]).tolist()
+        adjacent_agents_AnA = (np.argwhere(adjacency[NumP:, NumP:]) + NumP).tolist()
+
+        return adjacent_agents_PnP, adjacent_agents_PnA, adjacent_agents_AnA
+
+    # the edge-index array of the communication graph
+    @staticmethod
+    def adjacency_edge_index(adjacency):
+        """
+        :param adjacency: [N, N] boolean adjacency matrix
+        :return: [2, E] (source, target) rows as used by GNN libraries
+        """
+
+        return np.stack(np.nonzero(adjacency))
+
+    # number of agents that do not appear in any of the adjacent pairs
+    @staticmethod
+    def isolated_agents(pairs, num_agents):
+        """
+        :param pairs: list of adjacent [i, j] pairs
+        :param num_agents: total number of agents
+        :return: number of agents with no adjacent pair
+        """
+
+        return num_agents - np.unique(np.asarray(pairs, dtype=int)).shape[0]
+
     # Sense the firemap (by Perception agents)
     '''
     Newly added: return the FOV of selected agent
     '''
     @staticmethod
-    def fire_Sensing(onFire_List, agent_loci, sensed_List, world_size):
-        # Input: fire_Map, current agent state, the agent's FOV, geometric_physics info, sensed_List, window size
+    def fire_Sensing(onFire_List, agent_loci, sensed_List, world_size, rng=None):
+        # Input: fire_Map, current agent state, the agent's FOV, geometric_physics info, sensed_List, window size, random number generator
         # Output: fire sensed map (for agent status recording), CoM info, the list of the coordinates of the sensed points
 
         confidence_level = 1 - 3 / 50 * (agent_loci[2] - 10) # the sensing confidence level (highest when altitude=minimu_allowed and vice versa)
@@ -129,7 +281,8 @@ class EnvUtilities(object):
             raw_sensed_idx = np.intersect1d(raw_sensed_idx, np.argwhere(onFire_List[:, 1] <= min(br_y, world_size - 1)))
             raw_sensed_idx = np.intersect1d(raw_sensed_idx, np.argwhere(onFire_List[:, 1] >= max(tl_y, 0)))
             # Apply the stochastic perception
-            raw_sensed_idx = np.random.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))), replace=False)
+            rng = np.random if rng is None else rng
+            raw_sensed_idx = rng.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))), replace=False)
 
             '''
             Newly added: get the FOV of this agent
@@ -185,8 +338,8 @@ class EnvUtilities(object):
     # for the current agent (For data storage)
     @staticmethod
     def fire_Pruning(agent_loci, onFire_List_raw, sensed_List, pruned_List,
-                     new_fire_front, target_onFire_list, target_info, world_size, confidence_level):
-        # Input: fire_Map, current agent state, the agent's FOV, onFire_List, sensed_List, pruned_List, new fire front list
+                     new_fire_front, target_onFire_list, target_info, world_size, confidence_level, rng=None):
+        # Input: fire_Map, current agent state, the agent's FOV, onFire_List, sensed_List, pruned_List, new fire front list, random number generator
         # Output: fire_Pruned_Map (for agent status recording), the updated fire_map, onFire_List, sensed_List, pruned_List
 
         # The coordination of the upper-left corner of the agent searching scope
@@ -206,7 +359,8 @@ class EnvUtilities(object):
             raw_sensed_idx = np.intersect1d(raw_sensed_idx, np.argwhere(onFire_List[:, 1] <= min(br_y, world_size - 1)))
             raw_sensed_idx = np.intersect1d(raw_sensed_idx, np.argwhere(onFire_List[:, 1] >= max(tl_y, 0)))
             # Apply the stochastic pruning
-            raw_sensed_idx = np.random.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))),
+            rng = np.random if rng is None else rng
+            raw_sensed_idx = rng.choice(raw_sensed_idx, int(round(confidence_level * len(raw_sensed_idx))),
                                               replace=False)
             # Temporary list to store the fire front that may be pruned
             temp_list = onFire_List[raw_sensed_idx, :]
@@ -271,3 +425,214 @@ class EnvUtilities(object):
         for i in range(len(sensed_List)):
             # Plot the fire spot using the red color the corresponds to the intensity
             pygame.draw.circle(screen, (0, 255, 255),(int(sensed_List[i][0]), int(sensed_List[i][1])), 1)
+
+
+# Grid-based store of the firespot states (canonical store behind onFire_List, sensed_List and pruned_List)
+class FireStateGrid(object):
+    """
+    Compact world grid of the firespot states. Every cell holds a uint8 bit-mask of its states (unburnt -> 0, on fire -> ON_FIRE, sensed ->
+    SENSED, pruned -> PRUNED), so adding, testing and removing a cell are O(1) and the bulk updates are array operations. For each state a
+    dense array of the cells (in insertion order) and a cell -> slot map are kept next to the grid, from which the legacy [[x, y], ...] list
+    views are derived lazily (and cached until the state changes). The grid grows automatically for cells outside the world window.
+    """
+
+    UNBURNT = 0
+    ON_FIRE = 1
+    SENSED = 2
+    PRUNED = 4
+    FLAGS = (ON_FIRE, SENSED, PRUNED)
+
+    def __init__(self, world_size=100):
+        self.world_size = world_size
+        self.clear()
+
+    # removing all the firespots
+    def clear(self):
+        self.origin = np.zeros(2, dtype=np.int64)  # world coordinates of grid[0, 0]
+        self.grid = np.zeros((self.world_size, self.world_size), dtype=np.uint8)  # state bit-mask of each cell
+        self.slots = {}  # per state: grid of the cells' slots in the dense cell array (-1 -> not in that state)
+        self.cells = {}  # per state: dense array of the [x, y] cells (insertion order, removed cells are compacted lazily)
+        self.alive = {}  # per state: flags of the dense array entries still in that state
+        self.sizes = {}  # per state: number of used entries of the dense array
+        self.counts = {}  # per state: number of cells in that state
+        self.views = {}  # cached list views
+        for flag in self.FLAGS:
+            self.slots[flag] = np.full(self.grid.shape, -1, dtype=np.int64)
+            self.cells[flag] = np.zeros((64, 2), dtype=np.int64)
+            self.alive[flag] = np.zeros(64, dtype=bool)
+            self.sizes[flag] = 0
+            self.counts[flag] = 0
+
+    # number of cells in a state
+    def count(self, flag):
+        return self.counts[flag]
+
+    # number of cells that are in all the given states (e.g., ON_FIRE | SENSED)
+    def count_all(self, flags):
+        return int(np.count_nonzero((self.grid & flags) == flags))
+
+    # converting cells into grid indices (returns the local indices and the in-grid flags)
+    def local(self, cells):
+        cells = np.asarray(cells).reshape(-1, 2).astype(np.int64)  # same truncation as int()
+        local = cells - self.origin
+        inside = (local[:, 0] >= 0) & (local[:, 0] < self.grid.shape[0]) & (local[:, 1] >= 0) & (local[:, 1] < self.grid.shape[1])
+
+        return local, inside
+
+    # enlarging the grid so that it covers a set of cells
+    def grow(self, cells):
+        low = np.minimum(cells.min(axis=0), self.origin)
+        high = np.maximum(cells.max(axis=0) + 1, self.origin + self.grid.shape)
+        pad = max(16, self.world_size // 4)  # some head-room so that the grid does not grow at every new cell
+        low = np.where(low < self.origin, low - pad, low)
+        high = np.where(high > self.origin + self.grid.shape, high + pad, high)
+
+        offset = self.origin - low
+        window = (slice(offset[0], offset[0] + self.grid.shape[0]), slice(offset[1], offset[1] + self.grid.shape[1]))
+        grid = np.zeros(tuple(high - low), dtype=np.uint8)
+        grid[window] = self.grid
+        self.grid = grid
+        for flag in self.FLAGS:
+            slots = np.full(grid.shape, -1, dtype=np.int64)
+            slots[window] = self.slots[flag]
+            self.slots[flag] = slots
+        self.origin = low
+
+    # checking which cells are in a state
+    def test(self, flag, cells):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param cells: array (or list) of [x, y] cells (truncated to int)
+        :return: boolean flag per cell
+        """
+
+        local, inside = self.local(cells)
+        found = np.zeros(local.shape[0], dtype=bool)
+        found[inside] = (self.grid[local[inside, 0], local[inside, 1]] & flag) > 0
+
+        return found
+
+    # adding cells to a state (cells already in that state and repeated cells are skipped)
+    def add(self, flag, cells):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param cells: array (or list) of [x, y] cells (truncated to int)
+        :return: boolean flag per cell, True where the cell was newly added
+        """
+
+        cells = np.asarray(cells).reshape(-1, 2).astype(np.int64)
+        added = np.zeros(cells.shape[0], dtype=bool)
+        if cells.shape[0] == 0:
+            return added
+
+        local, inside = self.local(cells)
+        if not inside.all():
+            self.grow(cells)
+            local, inside = self.local(cells)
+
+        # first occurrence of each cell which is not in the state yet
+        keys = local[:, 0] * self.grid.shape[1] + local[:, 1]
+        first = np.zeros(cells.shape[0], dtype=bool)
+        first[np.unique(keys, return_index=True)[1]] = True
+        added = first & ((self.grid[local[:, 0], local[:, 1]] & flag) == 0)
+        new_local = local[added]
+        num_new = new_local.shape[0]
+        if num_new == 0:
+            return added
+
+        # appending the cells to the dense array (doubling its capacity when needed)
+        size = self.sizes[flag]
+        if size + num_new > self.cells[flag].shape[0]:
+            capacity = max(2 * self.cells[flag].shape[0], size + num_new)
+            self.cells[flag] = np.concatenate([self.cells[flag], np.zeros((capacity - self.cells[flag].shape[0], 2), dtype=np.int64)])
+            self.alive[flag] = np.concatenate([self.alive[flag], np.zeros(capacity - self.alive[flag].shape[0], dtype=bool)])
+        self.cells[flag][size:size + num_new] = cells[added]
+        self.alive[flag][size:size + num_new] = True
+        self.slots[flag][new_local[:, 0], new_local[:, 1]] = np.arange(size, size + num_new)
+        self.grid[new_local[:, 0], new_local[:, 1]] |= flag
+        self.sizes[flag] += num_new
+        self.counts[flag] += num_new
+        self.views.pop(flag, None)
+
+        return added
+
+    # removing cells from a state
+    def remove(self, flag, cells):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param cells: array (or list) of [x, y] cells (truncated to int)
+        :return: boolean flag per cell, True where the cell was removed
+        """
+
+        local, inside = self.local(cells)
+        removed = np.zeros(local.shape[0], dtype=bool)
+        if local.shape[0] == 0:
+            return removed
+
+        # first occurrence of each cell which is in the state
+        keys = np.where(inside, local[:, 0] * self.grid.shape[1] + local[:, 1], -1)
+        first = np.zeros(local.shape[0], dtype=bool)
+        first[np.unique(keys, return_index=True)[1]] = True
+        removed[inside] = (self.grid[local[inside, 0], local[inside, 1]] & flag) > 0
+        removed &= first
+        old_local = local[removed]
+        if old_local.shape[0] == 0:
+            return removed
+
+        self.alive[flag][self.slots[flag][old_local[:, 0], old_local[:, 1]]] = False
+        self.slots[flag][old_local[:, 0], old_local[:, 1]] = -1
+        self.grid[old_local[:, 0], old_local[:, 1]] &= np.uint8(~flag & 0xFF)
+        self.counts[flag] -= old_local.shape[0]
+        self.views.pop(flag, None)
+
+        # compacting the dense array once half of it is removed cells
+        if self.sizes[flag] > 64 and 2 * self.counts[flag] < self.sizes[flag]:
+            self.compact(flag)
+
+        return removed
+
+    # dropping the removed cells from the dense array of a state
+    def compact(self, flag):
+        live = self.cells[flag][:self.sizes[flag]][self.alive[flag][:self.sizes[flag]]]
+        num_live = live.shape[0]
+        self.cells[flag][:num_live] = live
+        self.alive[flag][:] = False
+        self.alive[flag][:num_live] = True
+        self.sizes[flag] = num_live
+        local = live - self.origin
+        self.slots[flag][local[:, 0], local[:, 1]] = np.arange(num_live)
+
+    # the cells in a state as an array (insertion order)
+    def get_cells(self, flag):
+        if self.sizes[flag] != self.counts[flag]:
+            self.compact(flag)
+
+        return self.cells[flag][:self.sizes[flag]].copy()
+
+    # boolean mask of a state over the world window (world_size x world_size)
+    def mask(self, flag):
+        mask = np.zeros((self.world_size, self.world_size), dtype=bool)
+        low = np.maximum(self.origin, 0)
+        high = np.minimum(self.origin + self.grid.shape, self.world_size)
+        if (high > low).all():
+            mask[low[0]:high[0], low[1]:high[1]] = (self.grid[low[0] - self.origin[0]:high[0] - self.origin[0],
+                                                              low[1] - self.origin[1]:high[1] - self.origin[1]] & flag) > 0
+
+        return mask
+
+    # the legacy [[x, y], ...] list view of a state (cached, do not modify it in place)
+    def as_list(self, flag, sort=False):
+        """
+        :param flag: the state (ON_FIRE, SENSED or PRUNED)
+        :param sort: sort the cells by [x, y] (the order np.unique() gives) instead of the insertion order
+        :return: list of [x, y] cells
+        """
+
+        views = self.views.setdefault(flag, {})
+        if sort not in views:
+            cells = self.get_cells(flag)
+            if sort and cells.shape[0] > 0:
+                cells = cells[np.lexsort((cells[:, 1], cells[:, 0]))]
+            views[sort] = cells.tolist()
+
+        return views[sort]
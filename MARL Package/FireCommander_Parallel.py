@@ -0,0 +1,291 @@
+"""
+# **************************<><><><><>********************************
+# * Script for the Parallel (Multi-Process) FireCommander Rollouts   *
+# **************************<><><><><>********************************
+#
+# This script and all its dependencies are implemented by: Esmaeil Seraj
+#   - Esmaeil Seraj, PhD Student, Institute for Robotics and Inteelligent
+#   Machines (IRIM), Electrical and Computer Engineering (ECE)
+#   Georgia Tech, Atlanta, GA, USA
+#   - email <eseraj3@gatech.edu>
+#
+# Supported by Python 3.6.4 and PyGame 1.9.6 (or any later version)
+#
+"""
+
+import multiprocessing as mp
+import numpy as np
+import random
+import traceback
+import time
+import warnings
+from WildFire_Model import TerrainField
+
+
+# the environments that can be run in the worker processes
+ENV_CLASSES = {'Hard': ('FireCommander_Cmplx1', 'FireCommanderHard'),
+               'Extreme': ('FireCommander_Cmplx2', 'FireCommanderExtreme')}
+
+
+# building numpy views over the shared-memory buffers
+def shared_views(buffers, num_envs, world_size, num_agents):
+    return {'action': np.frombuffer(buffers['action'], dtype=np.int64).reshape(num_envs, num_agents),
+            'state': np.frombuffer(buffers['state'], dtype=np.float64).reshape(num_envs, world_size, world_size),
+            'final_state': np.frombuffer(buffers['final_state'], dtype=np.float64).reshape(num_envs, world_size, world_size),
+            'reward': np.frombuffer(buffers['reward'], dtype=np.float64),
+            'done': np.frombuffer(buffers['done'], dtype=np.uint8),
+            'p_c': np.frombuffer(buffers['p_c'], dtype=np.float64),
+            'a_c': np.frombuffer(buffers['a_c'], dtype=np.float64),
+            'steps': np.frombuffer(buffers['steps'], dtype=np.int64)}
+
+
+# the worker process: owns one environment and exchanges data with the main process through the shared-memory buffers (the pipe only
+# carries the commands and the acknowledgments)
+def env_worker(rank, conn, buffers, env_name, env_kwargs, init_kwargs, num_envs, world_size, num_agents, seed, max_steps):
+    try:
+        # per-worker seeding (the env's own random number generator, plus the global ones for any legacy draws)
+        if seed is not None:
+            np.random.seed(seed)
+            random.seed(seed)
+            env_kwargs = dict(env_kwargs, seed=seed)
+
+        module_name, class_name = ENV_CLASSES[env_name]
+        env_class = getattr(__import__(module_name), class_name)
+        views = shared_views(buffers, num_envs, world_size, num_agents)
+
+        env = env_class(**env_kwargs)
+        while True:
+            command, step_kwargs = conn.recv()
+
+            if command == 'reset':
+                env.env_init(**init_kwargs)
+                views['state'][rank] = env.state_gen()
+                views['reward'][rank], views['done'][rank], views['p_c'][rank], views['a_c'][rank], views['steps'][rank] = 0.0, 0, 0.0, 0.0, 0
+                conn.send(('ok', None))
+
+            elif command == 'step':
+                state, reward, done, p_c, a_c = env.env_step(list(views['action'][rank]), **step_kwargs)
+                views['steps'][rank] += 1
+                done = done or (max_steps is not None and views['steps'][rank] >= max_steps)
+                views['reward'][rank], views['done'][rank], views['p_c'][rank], views['a_c'][rank] = reward, done, p_c, a_c
+
+                # auto-reset (the terminal state is kept in the final state buffer)
+                if done:
+                    views['final_state'][rank] = state
+                    env.env_init(**init_kwargs)
+                    views['state'][rank] = env.state_gen()
+                    views['steps'][rank] = 0
+                else:
+                    views['state'][rank] = state
+                conn.send(('ok', None))
+
+            elif command == 'close':
+                conn.send(('ok', None))
+                break
+
+            else:
+                raise ValueError(">>> Oops! Unknown worker command '" + str(command) + "'. Options: reset, step, close")
+
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        try:
+            conn.send(('error', traceback.format_exc()))
+        except (BrokenPipeError, EOFError):
+            pass
+    finally:
+        conn.close()
+
+
+# Parallel (subprocess-based) vector environment for FireCommanderHard/FireCommanderExtreme
+class FireCommanderParallel(object):
+    """
+    Runs num_envs FireCommanderHard/FireCommanderExtreme environments in separate worker processes. Actions and the env_step() outputs
+    (state, reward, done, p_c, a_c) are exchanged through shared-memory buffers batched along a leading env axis, while the pipes only carry
+    the commands. Finished episodes are reset in the workers (the terminal states are kept in final_state) and a crashed worker is
+    restarted with a fresh environment, reporting its episode as done with crash_reward (the failure is given in crash_info and raised as
+    a RuntimeWarning).
+    """
+
+    def __init__(self, num_envs=None, env_name='Hard', env_kwargs=None, init_kwargs=None, seed=None, max_steps=None, start_method=None,
+                 worker_timeout=60.0, terrain_tile_size=None, crash_reward=0.0):
+
+        if env_name not in ENV_CLASSES:
+            raise ValueError(">>> Oops! The specified environment doesn't exist. Options: 'Hard', 'Extreme'")
+
+        # pars parameters
+        self.num_envs = mp.cpu_count() if num_envs is None else num_envs   # number of worker processes (one env each)
+        self.env_name = env_name                                          # 'Hard' or 'Extreme'
+        self.env_kwargs = {} if env_kwargs is None else dict(env_kwargs)  # env constructor arguments
+        self.init_kwargs = {} if init_kwargs is None else dict(init_kwargs)  # env_init() arguments
+        self.seed = seed                                                  # base random seed (worker i uses seed + i)
+        self.max_steps = max_steps                                        # episode length limit (None:: only the env's own done flag)
+        self.worker_timeout = worker_timeout                              # seconds to wait for a worker before restarting it
+        self.crash_reward = crash_reward                                  # reward reported for the step in which a worker crashed
+        self.world_size = self.env_kwargs.get('world_size') or 100
+        self.num_agents = (self.env_kwargs.get('P_agent_num') or 2) + (self.env_kwargs.get('A_agent_num') or 2)
+        self.env_kwargs['online_vis'] = False  # no pygame display in the workers
+
+        # shared-memory buffers
+        self.ctx = mp.get_context(start_method)
+        if terrain_tile_size is not None:
+            # one lazily generated terrain field in shared memory for all the workers (a fixed terrain, instead of a dense map per env)
+            self.env_kwargs['terrain_field'] = TerrainField(shape=(self.world_size, self.world_size), tile_size=terrain_tile_size, seed=seed,
+                                                            shared=True, ctx=self.ctx)
+        N, W = self.num_envs, self.world_size
+        self.buffers = {'action': self.ctx.RawArray('b', N * self.num_agents * 8),
+                        'state': self.ctx.RawArray('b', N * W * W * 8),
+                        'final_state': self.ctx.RawArray('b', N * W * W * 8),
+                        'reward': self.ctx.RawArray('b', N * 8),
+                        'done': self.ctx.RawArray('b', N),
+                        'p_c': self.ctx.RawArray('b', N * 8),
+                        'a_c': self.ctx.RawArray('b', N * 8),
+                        'steps': self.ctx.RawArray('b', N * 8)}
+        self.views = shared_views(self.buffers, N, W, self.num_agents)
+
+        # start the workers
+        self.processes = [None] * N
+        self.conns = [None] * N
+        self.restarts = [0] * N  # number of times each worker has been restarted
+        self.crashed = np.zeros(N, dtype=bool)  # workers restarted during the last call
+        self.crash_info = [None] * N            # failure of each worker restarted during the last call (traceback, timeout or exit)
+        self.closed = False
+        for i in range(N):
+            self.start_worker(i)
+
+    # starting (or restarting) a worker process
+    def start_worker(self, rank):
+        if self.processes[rank] is not None:
+            if self.processes[rank].is_alive():
+                self.processes[rank].terminate()
+            self.processes[rank].join(timeout=1.0)
+            self.conns[rank].close()
+
+        # a restarted worker gets a new seed so it does not replay the crashed episode
+        seed = None if self.seed is None else self.seed + rank + self.restarts[rank] * self.num_envs
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(target=env_worker, args=(rank, child_conn, self.buffers, self.env_name, self.env_kwargs, self.init_kwargs,
+                                                            self.num_envs, self.world_size, self.num_agents, seed, self.max_steps),
+                                   daemon=True)
+        process.start()
+        child_conn.close()
+        self.processes[rank] = process
+        self.conns[rank] = parent_conn
+
+    # waiting for a worker's acknowledgment (returns False if the worker crashed or timed out, the failure is kept in crash_info)
+    def wait_worker(self, rank):
+        conn, process = self.conns[rank], self.processes[rank]
+        start_time = time.time()
+        try:
+            while not conn.poll(0.05):
+                if not process.is_alive():
+                    self.crash_info[rank] = 'worker process exited with code ' + str(process.exitcode)
+                    return False
+                if time.time() - start_time > self.worker_timeout:
+                    self.crash_info[rank] = 'worker timed out after ' + str(self.worker_timeout) + ' sec'
+                    return False
+            status, message = conn.recv()
+        except (EOFError, ConnectionResetError, BrokenPipeError):
+            self.crash_info[rank] = 'worker pipe closed'
+            return False
+        if status == 'error':
+            self.crash_info[rank] = message
+            return False
+
+        return True
+
+    # sending a command to a set of workers and collecting their acknowledgments (crashed workers are restarted and reset)
+    def run_command(self, command, ranks, step_kwargs=None):
+        sent = []
+        for i in ranks:
+            try:
+                self.conns[i].send((command, step_kwargs))
+                sent.append(i)
+            except (BrokenPipeError, EOFError, OSError):
+                self.crash_info[i] = 'worker pipe closed'
+                self.recover_worker(i)
+        for i in sent:
+            if not self.wait_worker(i):
+                self.recover_worker(i)
+
+    # restarting a crashed worker and reporting its episode as done (with the crash reward)
+    def recover_worker(self, rank):
+        self.restarts[rank] += 1
+        self.crashed[rank] = True
+        warnings.warn('>>> FireCommanderParallel: worker ' + str(rank) + ' failed, restarting it\n' + str(self.crash_info[rank]), RuntimeWarning)
+        self.start_worker(rank)
+        self.conns[rank].send(('reset', None))
+        if not self.wait_worker(rank):
+            raise RuntimeError(">>> Oops! Worker " + str(rank) + " could not be restarted.")
+        self.views['final_state'][rank] = self.views['state'][rank]
+        self.views['reward'][rank], self.views['p_c'][rank], self.views['a_c'][rank] = self.crash_reward, 0.0, 0.0
+        self.views['done'][rank] = 1
+
+    # reset all the environments
+    def env_init(self):
+        self.crashed[:] = False
+        self.crash_info = [None] * self.num_envs
+        self.run_command('reset', range(self.num_envs))
+
+        return self.views['state'].copy()
+
+    # proceed all the environments one step into the future (step_kwargs are passed to each env's env_step())
+    def env_step(self, action, **step_kwargs):
+        """
+        :param action: array of actions of shape [num_envs, P_agent_num + A_agent_num]
+        :param step_kwargs: keyword arguments of the envs' env_step() (e.g., r_func, a_c_threshold)
+        :return: batched (state, reward, done, p_c, a_c), i.e., the env_step() return tuple with a leading env axis
+        """
+
+        if self.closed:
+            raise ValueError(">>> Oops! The parallel environment has already been closed.")
+        self.views['action'][:] = np.asarray(action, dtype=np.int64).reshape(self.num_envs, self.num_agents)
+        self.crashed[:] = False
+        self.crash_info = [None] * self.num_envs
+        self.run_command('step', range(self.num_envs), step_kwargs)
+
+        return (self.views['state'].copy(), self.views['reward'].copy(), self.views['done'].astype(bool), self.views['p_c'].copy(),
+                self.views['a_c'].copy())
+
+    # the terminal states of the episodes that finished in the last step
+    @property
+    def final_state(self):
+        return self.views['final_state'].copy()
+
+    # close all the workers
+    def env_close(self):
+        if self.closed:
+            return
+        for i in range(self.num_envs):
+            try:
+                self.conns[i].send(('close', None))
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+        for i in range(self.num_envs):
+            self.processes[i].join(timeout=5.0)
+            if self.processes[i].is_alive():
+                self.processes[i].terminate()
+            self.conns[i].close()
+        self.closed = True
+
+
+if __name__ == '__main__':
+    # initialize the parallel env
+    num_envs = mp.cpu_count()
+    envs = FireCommanderParallel(num_envs=num_envs, env_name='Hard', seed=0, max_steps=200)
+    envs.env_init()
+
+    # go through some steps of the games
+    num_steps = 50
+    startTime = time.time()
+    for step in range(num_steps):
+        action_p = np.random.randint(0, 6, (num_envs, 2))  # Perception agent action generator, using randint now
+        action_a = np.random.randint(0, 4, (num_envs, 2))  # Action agent action generator, using randint now
+        actions = np.concatenate([action_p, action_a], axis=1)
+
+        state, reward, done, perception_complete, action_complete = envs.env_step(actions, a_c_threshold=1.1, r_func='RF2')
+
+    executionTime = (time.time() - startTime)
+    print(str(num_envs) + ' envs:: ' + str(int(num_envs * num_steps / executionTime)) + ' env-steps/sec')
+
+    envs.env_close()
@@ -0,0 +1,144 @@
+"""
+# *******************<><><><><>**************************
+# *   Benchmarks of the Wildfire Environment Model       *
+# *******************<><><><><>**************************
+#
+# This script times (and checks the accuracy of) the alternative engines and data layouts of WildFire_Model.py against their
+# reference implementations. Run it directly:: python WildFire_Benchmarks.py
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+from WildFire_Model import WildFire, MultiAreaWildFire
+
+
+# exact pairwise intensities vs. the rasterized (FFT) intensities for a dense fire
+def benchmark_raster_intensity(num_sources=20000, num_spots=2000):
+    points_rng = np.random.default_rng(0)
+    sources = np.concatenate([points_rng.normal(50, 12, (num_sources, 2)), np.ones(shape=[num_sources, 1])], axis=1)
+    spots = points_rng.uniform(20, 80, (num_spots, 2))
+
+    # the models are seeded alike, so the exact and the rasterized runs draw the same radiation deviations
+    fire_mdl = WildFire(terrain_sizes=[100, 100], hotspot_areas=[[45, 55, 45, 55]], num_ign_points=10, duration=10, seed=1)
+    startTime = time.time()
+    exact = fire_mdl.fire_intensity_batch(spots, sources)
+    print('exact pairwise:: %.4f sec' % (time.time() - startTime))
+
+    for raster_resolution, raster_kernels in [(1, 1), (1, 3), (2, 4), (2, 8)]:
+        warm_mdl, fire_mdl = [WildFire(terrain_sizes=[100, 100], hotspot_areas=[[45, 55, 45, 55]], num_ign_points=10, duration=10,
+                                       engine='raster', raster_resolution=raster_resolution, raster_kernels=raster_kernels, seed=1)
+                              for _ in range(2)]
+        warm_mdl.fire_intensity_raster(spots, sources)  # builds the kernel bank, the timed model reuses it
+        fire_mdl.raster_kernel_cache = warm_mdl.raster_kernel_cache
+        startTime = time.time()
+        raster = fire_mdl.fire_intensity_raster(spots, sources)
+        executionTime = time.time() - startTime
+        error = np.abs(raster - exact) / exact
+        print('raster (resolution=%g, kernels=%d):: %.4f sec, relative error median %.4f, 95th percentile %.4f' %
+              (raster_resolution, raster_kernels, executionTime, np.median(error), np.percentile(error, 95)))
+
+
+# dense spread rate map vs. the lazily generated terrain field, and vs. a memory-mapped raster file (a fire touches only a few tiles)
+def benchmark_terrain_fields(num_spots=5000):
+    fire_mdl = WildFire(terrain_sizes=[1200, 1200], hotspot_areas=[[550, 650, 550, 650]], num_ign_points=10, duration=10, seed=0)
+    fire_spots = np.random.default_rng(0).uniform(450, 750, (num_spots, 2))
+    for tile_size in [None, 64]:
+        startTime = time.time()
+        geo_phys_info = fire_mdl.geo_phys_info_init(tile_size=tile_size)
+        fire_mdl.spread_rate_at(fire_spots, geo_phys_info)
+        spread_rate = geo_phys_info['spread_rate']
+        memory = spread_rate.nbytes if tile_size is None else spread_rate.resident_bytes()
+        print('spread rate (tile_size=%s):: %.4f sec, %.2f MB' % (tile_size, time.time() - startTime, memory / 2 ** 20))
+
+    raster_path = os.path.join(tempfile.mkdtemp(), 'fuel.npy')
+    np.save(raster_path, 7 * np.random.default_rng(1).random((1200, 1200), dtype=np.float32))
+    geo_phys_info = fire_mdl.geo_phys_info_load(fuel_raster=raster_path, tile_size=128, cache_tiles=16)
+    startTime = time.time()
+    fire_mdl.prefetch_terrain(geo_phys_info, fire_spots)
+    fire_mdl.spread_rate_at(fire_spots, geo_phys_info)
+    spread_rate = geo_phys_info['spread_rate']
+    print('spread rate (raster file, tile_size=128):: %.4f sec, %.2f MB cached' % (time.time() - startTime, spread_rate.resident_bytes() / 2 ** 20))
+    del geo_phys_info, spread_rate
+    os.remove(raster_path)
+
+
+# one WildFire model per fire area vs. the multi-area model advancing all the areas in one call
+def benchmark_multi_area(num_areas=40, num_steps=20):
+    centers = np.random.default_rng(0).integers(20, 180, (num_areas, 2))
+    hotspot_areas = [[x - 5, x + 5, y - 5, y + 5] for x, y in centers]
+    area_mdls = [WildFire(terrain_sizes=[200, 200], hotspot_areas=[hotspot_areas[i]], num_ign_points=10, duration=10, engine='vectorized',
+                          seed=i) for i in range(num_areas)]
+    fronts = [area_mdl.hotspot_init() for area_mdl in area_mdls]
+    terrain = [area_mdl.hotspot_init() for area_mdl in area_mdls]
+    geo_phys_info = [area_mdl.geo_phys_info_init() for area_mdl in area_mdls]
+    startTime = time.time()
+    for step in range(num_steps):
+        for i in range(num_areas):
+            fronts[i], _ = area_mdls[i].fire_propagation_batch(200, fronts[i], geo_phys_info[i], terrain[i], [])
+    print('%d areas, one model each:: %.4f sec' % (num_areas, time.time() - startTime))
+
+    multi_mdl = MultiAreaWildFire(terrain_sizes=[200, 200], hotspot_areas=hotspot_areas, num_ign_points=10, duration=10, seed=0)
+    fronts = multi_mdl.split_areas(*multi_mdl.hotspot_init())
+    terrain = multi_mdl.split_areas(*multi_mdl.hotspot_init())
+    multi_mdl.geo_phys_info_init()
+    startTime = time.time()
+    for step in range(num_steps):
+        fronts = multi_mdl.split_areas(*multi_mdl.fire_propagation(200, fronts, terrain, [])[0::2])
+    print('%d areas, multi-area model:: %.4f sec' % (num_areas, time.time() - startTime))
+
+
+# area of the convex hull of a set of [x, y] points (monotone chain)
+def hull_area(points):
+    points = np.unique(points, axis=0)
+    if points.shape[0] < 3:
+        return 0.0
+    hull = []
+    for chain in [points, points[::-1]]:  # lower and upper hulls
+        half = []
+        for point in chain:
+            while len(half) >= 2 and (half[-1][0] - half[-2][0]) * (point[1] - half[-2][1]) - \
+                    (half[-1][1] - half[-2][1]) * (point[0] - half[-2][0]) <= 0:
+                half.pop()
+            half.append(point)
+        hull.extend(half[:-1])
+    hull = np.array(hull)
+
+    return 0.5 * abs(np.dot(hull[:, 0], np.roll(hull[:, 1], 1)) - np.dot(hull[:, 1], np.roll(hull[:, 0], 1)))
+
+
+# burned area of the cellular backend vs. the FARSITE model (the area of the convex hull of all its fire spots), averaged over a few seeds
+# at the calibrated setting of the cellular backend (WildFire.cellular_setting and WildFire.cellular_terrain, i.e. the env settings)
+def calibrate_cellular(num_steps=100, num_seeds=10, checkpoints=(9, 24, 49, 99)):
+    checkpoints = list(checkpoints)
+    burned_areas = {'farsite': np.zeros(num_steps), 'cellular': np.zeros(num_steps)}
+    for backend in burned_areas:
+        startTime = time.time()
+        for seed in range(num_seeds):
+            fire_mdl = WildFire(terrain_sizes=[200, 200], hotspot_areas=[[95, 105, 95, 105]], num_ign_points=10, duration=num_steps,
+                                weak_fire_threshold=5, engine='vectorized', backend=backend, seed=seed)
+            fire_front = fire_mdl.hotspot_init()
+            geo_phys_info = fire_mdl.geo_phys_info_init(avg_wind_direction=np.pi / 4, **WildFire.cellular_terrain)
+            terrain = fire_front
+            for step in range(num_steps):
+                new_fire_front, _ = fire_mdl.fire_propagation(200, ign_points_all=fire_front, geo_phys_info=geo_phys_info,
+                                                              previous_terrain_map=terrain, pruned_List=[])
+                if new_fire_front.shape[0] > 0:
+                    fire_front, terrain = new_fire_front, np.concatenate([terrain, new_fire_front], axis=0)
+                burned_areas[backend][step] += (np.count_nonzero(fire_mdl.burn_state) * fire_mdl.cell_size ** 2 if backend == 'cellular'
+                                                else hull_area(terrain[:, 0:2])) / num_seeds
+        print('burned area (%s):: %s m^2 after %s steps, %.4f sec' %
+              (backend, burned_areas[backend][checkpoints].round(), [step + 1 for step in checkpoints], time.time() - startTime))
+    ratios = burned_areas['cellular'][checkpoints] / burned_areas['farsite'][checkpoints]
+    print('cellular / farsite burned area:: %s (within 25%%: %s)' % (ratios.round(2), bool(np.all(np.abs(ratios - 1) <= 0.25))))
+
+
+if __name__ == '__main__':
+    benchmark_raster_intensity()
+    benchmark_terrain_fields()
+    benchmark_multi_area()
+    calibrate_cellular()
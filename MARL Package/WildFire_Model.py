@@ -14,16 +14,38 @@
 """
 
 import numpy as np
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 
 
 # wildfire simulation
 class WildFire(object):
 
+    # calibrated setting of the cellular backend:: its burn time and spread scale match the burned area of the FARSITE model only for 1 m
+    # cells, a unit time step, a fuel coefficient of 5 and an average wind speed of 5 m/s (the automaton is close to its critical point
+    # there, so its burned area does not follow simple scaling laws, see calibrate_cellular() in WildFire_Benchmarks.py of the MARL package)
+    cellular_setting = {'time_step': 1, 'burn_time': 3, 'cell_size': 1, 'spread_scale': 0.9}
+    cellular_terrain = {'max_fuel_coeff': 5, 'avg_wind_speed': 5}
+
     def __init__(self, terrain_sizes=None, hotspot_areas=None, num_ign_points=None, duration=None,
-                 time_step=1, radiation_radius=10, weak_fire_threshold=0.5, flame_height=3, flame_angle=np.pi/3):
+                 time_step=1, radiation_radius=10, weak_fire_threshold=0.5, flame_height=3, flame_angle=np.pi/3, engine='loop',
+                 spatial_index=False, raster_resolution=1, raster_kernels=3, backend='farsite', burn_time=3, cell_size=1, spread_scale=0.9,
+                 seed=None, rng=None):
 
         if terrain_sizes is None or hotspot_areas is None or num_ign_points is None or duration is None:
             raise ValueError(">>> Oops! 'WildFire' environment cannot be initialized without any parameters.")
+        if engine not in ['loop', 'vectorized', 'raster']:
+            raise ValueError(">>> Oops! Unknown propagation engine. Options: 'loop', 'vectorized', 'raster'")
+        if backend not in ['farsite', 'cellular']:
+            raise ValueError(">>> Oops! Unknown propagation backend. Options: 'farsite', 'cellular'")
+        if burn_time <= 0 or cell_size <= 0 or spread_scale <= 0:
+            raise ValueError(">>> Oops! The burn time, the automaton cell size and the spread scale of the cellular backend must be positive.")
+        if backend == 'cellular' and \
+                [time_step, burn_time, cell_size, spread_scale] != [self.cellular_setting[key] for key in self.cellular_setting]:
+            raise ValueError(">>> Oops! The cellular backend is only calibrated for " +
+                             ", ".join(key + "=" + str(value) for key, value in self.cellular_setting.items()) + ".")
+        if raster_resolution <= 0 or raster_kernels < 1:
+            raise ValueError(">>> Oops! The raster resolution must be positive and at least one raster kernel is needed.")
 
         self.terrain_sizes = [int(terrain_sizes[0]), int(terrain_sizes[1])]  # sizes of the terrain
         self.initial_terrain_map = np.zeros(shape=self.terrain_sizes)  # initializing the terrain
@@ -40,6 +62,59 @@ class WildFire(object):
         # flame tilt angle (angle between flame heading and a vertical axis going through the center of fire spot on ground) [rad]
         self.flame_angle = flame_angle
 
+        # propagation engine:: 'loop' (per fire-front reference implementation), 'vectorized' (all fire-fronts in one NumPy pass) or
+        # 'raster' (heat sources rasterized on a grid and convolved with the Gaussian kernel through the FFT, see fire_intensity_raster())
+        self.engine = engine
+
+        # accuracy-vs-speed knobs of the 'raster' engine:: grid cells per meter and number of radiation deviations per axis in the kernel
+        # bank (higher values are closer to the exact pairwise intensities, but slower)
+        self.raster_resolution = raster_resolution
+        self.raster_kernels = int(raster_kernels)
+        self.raster_kernel_cache = {}  # cached kernel bank, keyed by the cell size and the deviations
+        self.raster_spectra = {}       # cached FFTs of the kernel bank, keyed by the grid shape, the cell size and the deviations
+
+        # uniform-grid spatial index (cell size = radiation radius) for the heat-source radius queries, the index over the terrain map is
+        # kept across steps and only updated with the newly appended (or pruned) fire spots
+        self.spatial_index = spatial_index
+        self.terrain_index = FireSpotIndex(cell_size=radiation_radius) if spatial_index else None
+
+        # propagation backend:: 'farsite' (point-based simplified FARSITE model) or 'cellular' (grid-based cellular automaton, see
+        # fire_propagation_cellular()), the cellular automaton keeps a per-cell burn state and the list of burning cells across steps
+        self.backend = backend
+        # a cell keeps burning (and spreading) for burn_time per unit of cell size (only the calibrated setting of the cellular backend is
+        # accepted, see cellular_setting)
+        self.burn_time = burn_time        # burning time of a cell per unit of cell size ('cellular' backend)
+        self.cell_size = cell_size        # size of the automaton cells ('cellular' backend)
+        self.spread_scale = spread_scale  # scale of the directional spread rate of the fire ellipse ('cellular' backend)
+        self.burn_steps = max(1, int(np.ceil(np.round(burn_time * cell_size / time_step, 9))))  # steps a cell keeps burning
+        self.burn_state = None      # per-cell state:: 0 -> unburnt, 1 -> burning, 2 -> burnt out or put out
+        self.burning_cells = np.zeros(shape=[0, 2], dtype=np.int64)  # [x, y] cells currently burning
+        self.ignition_steps = np.zeros(0, dtype=np.int64)             # step at which each of the burning cells ignited
+        # index over the centers of the burning cells (the heat sources of the new cells), row i mirrors burning_cells[i]
+        self.burning_index = FireSpotIndex(cell_size=radiation_radius) if backend == 'cellular' else None
+        self.cellular_step = 0                                         # number of steps of the cellular automaton
+
+        # random number generator of the model (all the stochastic parts draw from it, pass 'rng' to share an environment's stream)
+        self.rng = self.make_rng(seed=seed, rng=rng)
+
+    # building a random number generator
+    @staticmethod
+    def make_rng(seed=None, rng=None):
+        """
+        This function builds the numpy.random.Generator used by the model (and by the environments)
+
+        :param seed: seed of a new generator
+        :param rng: an existing generator to share (the seed is ignored when given)
+        :return: numpy.random.Generator (seeded from the global np.random state if neither is given, so np.random.seed() still reproduces runs)
+        """
+
+        if rng is not None:
+            return rng
+        if seed is None:
+            seed = np.random.randint(2 ** 31)
+
+        return np.random.default_rng(seed)
+
     # initializing hotspots
     def hotspot_init(self):
         """
@@ -52,18 +127,26 @@ class WildFire(object):
         for hotspot in self.hotspot_areas:
             x_min, x_max = hotspot[0], hotspot[1]
             y_min, y_max = hotspot[2], hotspot[3]
-            ign_points_x = np.random.randint(low=x_min, high=x_max, size=(self.num_ign_points, 1))
-            ign_points_y = np.random.randint(low=y_min, high=y_max, size=(self.num_ign_points, 1))
+            ign_points_x = self.rng.integers(low=x_min, high=x_max, size=(self.num_ign_points, 1))
+            ign_points_y = self.rng.integers(low=y_min, high=y_max, size=(self.num_ign_points, 1))
             ign_points_this_area = np.concatenate([ign_points_x, ign_points_y], axis=1)
             ign_points_all = np.concatenate([ign_points_all, ign_points_this_area], axis=0)
 
+        ign_index = self.build_index(ign_points_all)
+
+        # computing the fire intensity (all ignition points at once)
+        if self.engine == 'vectorized':
+            intensities = self.fire_intensity_batch(ign_points_all, ign_points_all, index=ign_index)
+            return np.concatenate([ign_points_all, intensities[:, np.newaxis]], axis=1)
+        if self.engine == 'raster':
+            intensities = self.fire_intensity_raster(ign_points_all, ign_points_all)
+            return np.concatenate([ign_points_all, intensities[:, np.newaxis]], axis=1)
+
         # computing the fire intensity
         counter = 0
         ign_points = np.zeros(shape=[ign_points_all.shape[0], 3])
         for point in ign_points_all:
-            heat_source_diff = np.tile(point, (ign_points_all.shape[0], 1)) - ign_points_all
-            heat_source_dists = np.sqrt((heat_source_diff[:, 0] ** 2) + (heat_source_diff[:, 1] ** 2))
-            idx = np.where(heat_source_dists <= self.radiation_radius)[0]
+            idx = self.heat_sources_in_range(point, ign_points_all, index=ign_index)
             fire_intensity = self.fire_intensity(point, ign_points_all[idx.tolist(), :].tolist())
             ign_points[counter] = np.array([point[0], point[1], fire_intensity])
 
@@ -91,24 +174,278 @@ class WildFire(object):
         x = current_fire_spot[0]
         y = current_fire_spot[1]
 
-        x_dev = np.random.randint(low=deviation_min, high=deviation_max, size=(1, 1))[0][0] + np.random.normal()
-        y_dev = np.random.randint(low=deviation_min, high=deviation_max, size=(1, 1))[0][0] + np.random.normal()
+        x_dev = self.rng.integers(low=deviation_min, high=deviation_max) + self.rng.normal()
+        y_dev = self.rng.integers(low=deviation_min, high=deviation_max) + self.rng.normal()
 
-        if np.cos(self.flame_angle) == 0:
-            intensity_coeff = (259.833 * (self.flame_height ** 2.174)) / 1e3  # 1e3 is to change the unit to [MW/m]
-        else:
-            intensity_coeff = (259.833 * ((self.flame_height/np.cos(self.flame_angle)) ** 2.174)) / 1e3  # 1e3 is to change the unit to [MW/m]
+        intensity_coeff = self.intensity_coefficient()
 
         intensity = []
         for spot in heat_source_spots:
             x_f = spot[0]
             y_f = spot[1]
-            intensity.append((1 / (2 * np.pi * x_dev * y_dev)) *
+            weight = spot[3] if len(spot) > 3 else 1  # multiplicity of a consolidated heat source (see consolidate_fire_spots())
+            intensity.append(weight * (1 / (2 * np.pi * x_dev * y_dev)) *
                              np.exp(-0.5 * ((((x - x_f) ** 2) / x_dev ** 2) + (((y - y_f) ** 2) / y_dev ** 2))))
         accumulated_intensity = sum(intensity) * intensity_coeff
 
         return 1e3 * accumulated_intensity
 
+    # batched fire intensity calculation
+    def fire_intensity_batch(self, current_fire_spots=None, heat_source_spots=None, deviation_min=9, deviation_max=11, max_chunk_elements=2 ** 22,
+                             index=None, pairs=None):
+        """
+        this function performs the same fire intensity calculation as fire_intensity() for a whole batch of fire spots at once. Every spot
+        draws its own radiation deviations and only accounts for the heat sources within the radiation radius.
+
+        :param current_fire_spots: array of fire locations for which the intensity is going to be computed (first two columns are [x, y])
+        :param heat_source_spots: array of candidate heat sources (first two columns are [x, y], an optional 4th column is the multiplicity)
+        :param deviation_min: min of the radiation range
+        :param deviation_max: max of the radiation range
+        :param max_chunk_elements: upper bound on the size of the pairwise distance block evaluated at once (bounds the memory usage)
+        :param index: optional FireSpotIndex over the heat sources (only the neighboring grid cells are searched when given)
+        :param pairs: optional precomputed (fire spot rows, heat source rows) pairs within the radiation radius (replaces the index query)
+        :return: fire intensity at each of the fire spot locations [W/m]
+        """
+
+        if current_fire_spots is None or heat_source_spots is None:
+            raise ValueError(">>> Oops! Current fire locations and included vicinity are required.")
+
+        num_spots = current_fire_spots.shape[0]
+        x_dev, y_dev = self.rng.integers(low=deviation_min, high=deviation_max, size=(2, num_spots)) + self.rng.normal(size=(2, num_spots))
+
+        accumulated_intensity = np.zeros(num_spots)
+        if num_spots == 0 or heat_source_spots.shape[0] == 0:
+            return accumulated_intensity
+
+        # only visiting the heat sources in the neighboring grid cells (or the given pairs)
+        if pairs is None and index is not None:
+            pairs = index.query_pairs(current_fire_spots)
+        if pairs is not None:
+            spot_idx, source_idx = pairs
+            dx = current_fire_spots[spot_idx, 0] - heat_source_spots[source_idx, 0]
+            dy = current_fire_spots[spot_idx, 1] - heat_source_spots[source_idx, 1]
+            x_d = x_dev[spot_idx]
+            y_d = y_dev[spot_idx]
+            gaussian = (1 / (2 * np.pi * x_d * y_d)) * np.exp(-0.5 * (((dx ** 2) / x_d ** 2) + ((dy ** 2) / y_d ** 2)))
+            if heat_source_spots.shape[1] > 3:
+                gaussian = gaussian * heat_source_spots[source_idx, 3]  # multiplicity of the consolidated heat sources
+            accumulated_intensity = np.bincount(spot_idx, weights=gaussian, minlength=num_spots)
+
+            return 1e3 * accumulated_intensity * self.intensity_coefficient()
+
+        x_f = heat_source_spots[:, 0]
+        y_f = heat_source_spots[:, 1]
+        chunk_size = max(1, max_chunk_elements // heat_source_spots.shape[0])
+        for start in range(0, num_spots, chunk_size):
+            stop = min(start + chunk_size, num_spots)
+            dx = current_fire_spots[start:stop, 0:1] - x_f
+            dy = current_fire_spots[start:stop, 1:2] - y_f
+            in_range = (dx ** 2 + dy ** 2) <= self.radiation_radius ** 2
+            x_d = x_dev[start:stop, np.newaxis]
+            y_d = y_dev[start:stop, np.newaxis]
+            gaussian = (1 / (2 * np.pi * x_d * y_d)) * np.exp(-0.5 * (((dx ** 2) / x_d ** 2) + ((dy ** 2) / y_d ** 2)))
+            if heat_source_spots.shape[1] > 3:
+                gaussian = gaussian * heat_source_spots[:, 3]  # multiplicity of the consolidated heat sources
+            accumulated_intensity[start:stop] = np.where(in_range, gaussian, 0.0).sum(axis=1)
+
+        return 1e3 * accumulated_intensity * self.intensity_coefficient()
+
+    # rasterized fire intensity calculation
+    def fire_intensity_raster(self, current_fire_spots=None, heat_source_spots=None, deviation_min=9, deviation_max=11):
+        """
+        this function approximates fire_intensity_batch() on a grid: the heat sources (weighted by their multiplicity) are splatted onto a
+        raster covering the terrain plus a radiation radius margin, the raster is convolved once with the truncated Gaussian kernel through
+        the FFT, and the intensities are sampled (bilinearly) at the fire spot locations. The per-spot radiation deviations are drawn as in
+        fire_intensity_batch() and snapped to the closest entry of a bank of raster_kernels x raster_kernels kernels, so the cost depends on
+        the grid size rather than on the number of (fire spot, heat source) pairs. raster_resolution and raster_kernels trade accuracy for
+        speed.
+
+        :param current_fire_spots: array of fire locations for which the intensity is going to be computed (first two columns are [x, y])
+        :param heat_source_spots: array of heat sources (first two columns are [x, y], an optional 4th column is the multiplicity)
+        :param deviation_min: min of the radiation range
+        :param deviation_max: max of the radiation range
+        :return: fire intensity at each of the fire spot locations [W/m]
+        """
+
+        if current_fire_spots is None or heat_source_spots is None:
+            raise ValueError(">>> Oops! Current fire locations and included vicinity are required.")
+
+        num_spots = current_fire_spots.shape[0]
+        x_dev, y_dev = self.rng.integers(low=deviation_min, high=deviation_max, size=(2, num_spots)) + self.rng.normal(size=(2, num_spots))
+
+        accumulated_intensity = np.zeros(num_spots)
+        if num_spots == 0 or heat_source_spots.shape[0] == 0:
+            return accumulated_intensity
+
+        # the grid:: cells of size 1 / raster_resolution, starting one radiation radius before the terrain (the heat sources further away
+        # from the terrain can not reach it and are dropped)
+        cell = 1.0 / self.raster_resolution
+        margin = int(np.ceil(self.radiation_radius / cell))  # kernel half-width in cells
+        grid_shape = (int(np.ceil(self.terrain_sizes[0] / cell)) + 2 * margin + 1, int(np.ceil(self.terrain_sizes[1] / cell)) + 2 * margin + 1)
+        fft_shape = (grid_shape[0] + margin, grid_shape[1] + margin)  # zero padding, so the circular convolution does not wrap around
+
+        # splatting the heat sources onto the grid (bilinear weights)
+        heat_grid = np.zeros(shape=grid_shape)
+        weights = heat_source_spots[:, 3] if heat_source_spots.shape[1] > 3 else np.ones(heat_source_spots.shape[0])
+        u, v = heat_source_spots[:, 0] / cell + margin, heat_source_spots[:, 1] / cell + margin
+        inside = (u >= 0) & (u < grid_shape[0] - 1) & (v >= 0) & (v < grid_shape[1] - 1)
+        u, v, weights = u[inside], v[inside], weights[inside]
+        i, j = np.floor(u).astype(np.int64), np.floor(v).astype(np.int64)
+        fu, fv = u - i, v - j
+        for di, dj, w in [(0, 0, (1 - fu) * (1 - fv)), (1, 0, fu * (1 - fv)), (0, 1, (1 - fu) * fv), (1, 1, fu * fv)]:
+            np.add.at(heat_grid, (i + di, j + dj), weights * w)
+
+        # few fire spots:: the convolution is only evaluated around them (direct sums over the kernel windows), otherwise it is computed
+        # on the whole grid through the FFT
+        direct = 4 * num_spots * (2 * margin + 1) ** 2 < 8 * fft_shape[0] * fft_shape[1]
+        if direct:
+            heat_grid = np.pad(heat_grid, margin)
+        else:
+            heat_spectrum = np.fft.rfft2(heat_grid, s=fft_shape)
+
+        # placing the radiation deviations between the kernels of the bank (evenly spaced over the +/- 3 sigma range of the draws)
+        step = (deviation_max - deviation_min + 5) / self.raster_kernels
+        levels = (deviation_min - 3) + step * (np.arange(self.raster_kernels) + 0.5)
+        x_pos = np.clip((x_dev - levels[0]) / step, 0, self.raster_kernels - 1)
+        y_pos = np.clip((y_dev - levels[0]) / step, 0, self.raster_kernels - 1)
+        x_low, y_low = np.minimum(np.floor(x_pos), max(self.raster_kernels - 2, 0)).astype(np.int64), \
+            np.minimum(np.floor(y_pos), max(self.raster_kernels - 2, 0)).astype(np.int64)
+        x_frac, y_frac = x_pos - x_low, y_pos - y_low
+
+        # sampling locations of the fire spots on the grid
+        u = np.clip(current_fire_spots[:, 0] / cell + margin, 0, grid_shape[0] - 1 - 1e-9)
+        v = np.clip(current_fire_spots[:, 1] / cell + margin, 0, grid_shape[1] - 1 - 1e-9)
+        i, j = np.floor(u).astype(np.int64), np.floor(v).astype(np.int64)
+        fu, fv = u - i, v - j
+
+        # one convolution per kernel of the bank in use, the intensities are interpolated between the kernels around each spot's deviations
+        bank_weights = {}
+        for dx_level, dy_level, w in [(0, 0, (1 - x_frac) * (1 - y_frac)), (1, 0, x_frac * (1 - y_frac)), (0, 1, (1 - x_frac) * y_frac),
+                                      (1, 1, x_frac * y_frac)]:
+            bank_idx = np.minimum(x_low + dx_level, self.raster_kernels - 1) * self.raster_kernels + \
+                np.minimum(y_low + dy_level, self.raster_kernels - 1)
+            for k in np.unique(bank_idx[w > 0]).tolist():
+                bank_weights[k] = bank_weights.get(k, 0.0) + np.where(bank_idx == k, w, 0.0)
+        window = np.arange(2 * margin + 2)
+        for k, w in bank_weights.items():
+            spots = np.nonzero(w > 0)[0]
+            i_s, j_s, fu_s, fv_s = i[spots], j[spots], fu[spots], fv[spots]
+            if direct:
+                # the (symmetric) kernel weighted sums of the heat around the 4 grid nodes of each spot
+                kernel = self.raster_kernel(levels[k // self.raster_kernels], levels[k % self.raster_kernels], cell)
+                heat = heat_grid[i_s[:, np.newaxis, np.newaxis] + window[:, np.newaxis], j_s[:, np.newaxis, np.newaxis] + window]
+                f00, f10 = np.einsum('nab,ab->n', heat[:, :-1, :-1], kernel), np.einsum('nab,ab->n', heat[:, 1:, :-1], kernel)
+                f01, f11 = np.einsum('nab,ab->n', heat[:, :-1, 1:], kernel), np.einsum('nab,ab->n', heat[:, 1:, 1:], kernel)
+            else:
+                kernel_spectrum = self.raster_kernel_spectrum(levels[k // self.raster_kernels], levels[k % self.raster_kernels], fft_shape, cell)
+                field = np.fft.irfft2(heat_spectrum * kernel_spectrum, s=fft_shape)
+                f00, f10, f01, f11 = field[i_s, j_s], field[i_s + 1, j_s], field[i_s, j_s + 1], field[i_s + 1, j_s + 1]
+            accumulated_intensity[spots] += w[spots] * (f00 * (1 - fu_s) * (1 - fv_s) + f10 * fu_s * (1 - fv_s) + f01 * (1 - fu_s) * fv_s +
+                                                        f11 * fu_s * fv_s)
+
+        return 1e3 * accumulated_intensity * self.intensity_coefficient()
+
+    # truncated Gaussian kernel of the raster engine
+    def raster_kernel(self, x_dev=None, y_dev=None, cell=None):
+        """
+        this function builds (or fetches from the cache) the Gaussian radiation kernel with the given deviations on the grid offsets
+        [-margin, margin] x [-margin, margin], truncated at the radiation radius
+
+        :param x_dev: radiation deviation along x
+        :param y_dev: radiation deviation along y
+        :param cell: grid cell size [m]
+        :return: the kernel as a (2 * margin + 1) x (2 * margin + 1) array (center at [margin, margin])
+        """
+
+        if x_dev is None or y_dev is None or cell is None:
+            raise ValueError(">>> Oops! Function 'raster_kernel()' needs ALL of its input arguments to work!")
+
+        key = (cell, float(x_dev), float(y_dev))
+        if key not in self.raster_kernel_cache:
+            offsets = np.arange(-int(np.ceil(self.radiation_radius / cell)), int(np.ceil(self.radiation_radius / cell)) + 1) * cell
+            dx, dy = np.meshgrid(offsets, offsets, indexing='ij')
+            gaussian = (1 / (2 * np.pi * x_dev * y_dev)) * np.exp(-0.5 * (((dx ** 2) / x_dev ** 2) + ((dy ** 2) / y_dev ** 2)))
+            self.raster_kernel_cache[key] = np.where(dx ** 2 + dy ** 2 <= self.radiation_radius ** 2, gaussian, 0.0)
+
+        return self.raster_kernel_cache[key]
+
+    # FFT of a truncated Gaussian kernel of the raster engine
+    def raster_kernel_spectrum(self, x_dev=None, y_dev=None, fft_shape=None, cell=None):
+        """
+        this function builds (or fetches from the cache) the FFT of raster_kernel(), laid out with its center at the grid origin (negative
+        offsets wrapped around)
+
+        :param x_dev: radiation deviation along x
+        :param y_dev: radiation deviation along y
+        :param fft_shape: shape of the (zero padded) grid
+        :param cell: grid cell size [m]
+        :return: the kernel spectrum (numpy.fft.rfft2 layout)
+        """
+
+        if x_dev is None or y_dev is None or fft_shape is None or cell is None:
+            raise ValueError(">>> Oops! Function 'raster_kernel_spectrum()' needs ALL of its input arguments to work!")
+
+        key = (fft_shape, cell, float(x_dev), float(y_dev))
+        if key not in self.raster_spectra:
+            kernel = self.raster_kernel(x_dev, y_dev, cell)
+            margin = kernel.shape[0] // 2
+            padded_kernel = np.zeros(shape=fft_shape)
+            padded_kernel[np.ix_(np.arange(-margin, margin + 1) % fft_shape[0], np.arange(-margin, margin + 1) % fft_shape[1])] = kernel
+            self.raster_spectra[key] = np.fft.rfft2(padded_kernel)
+
+        return self.raster_spectra[key]
+
+    # finding the heat sources within the radiation radius of a fire spot
+    def heat_sources_in_range(self, current_fire_spot=None, heat_source_spots=None, index=None):
+        """
+        this function finds the heat sources that are within the radiation radius of a fire spot
+
+        :param current_fire_spot: the fire location [x, y, ...]
+        :param heat_source_spots: array of candidate heat sources (first two columns are [x, y])
+        :param index: optional FireSpotIndex over the heat sources (only the neighboring grid cells are searched when given)
+        :return: row indices of the heat sources in range
+        """
+
+        if index is not None:
+            return index.query(current_fire_spot)
+
+        heat_source_diff = np.tile(current_fire_spot[0:2], (heat_source_spots.shape[0], 1)) - heat_source_spots[:, 0:2]
+        heat_source_dists = np.sqrt((heat_source_diff[:, 0] ** 2) + (heat_source_diff[:, 1] ** 2))
+
+        return np.where(heat_source_dists <= self.radiation_radius)[0]
+
+    # building the spatial index over a set of fire spots (only when the spatial index is enabled)
+    def build_index(self, fire_spots=None):
+        """
+        this function builds a fresh FireSpotIndex over a set of fire spots if the spatial index is enabled
+
+        :param fire_spots: array of fire spots (first two columns are [x, y])
+        :return: the spatial index (None if the spatial index is disabled)
+        """
+
+        if not self.spatial_index:
+            return None
+
+        index = FireSpotIndex(cell_size=self.radiation_radius)
+        index.append(fire_spots)
+
+        return index
+
+    # intensity coefficient of the flame [MW/m]
+    def intensity_coefficient(self):
+        """
+        this function computes the flame intensity coefficient used by the fire intensity calculation according to [1].
+
+        [1] http://www.cfs.nrcan.gc.ca/bookstore_pdfs/21396.pdf
+
+        :return: intensity coefficient [MW/m]
+        """
+
+        if np.cos(self.flame_angle) == 0:
+            return (259.833 * (self.flame_height ** 2.174)) / 1e3  # 1e3 is to change the unit to [MW/m]
+
+        return (259.833 * ((self.flame_height / np.cos(self.flame_angle)) ** 2.174)) / 1e3  # 1e3 is to change the unit to [MW/m]
+
     # calculating the flame length as a function of fire intensity
     @staticmethod
     def fire_flame_length(accumulated_intensity=None):
@@ -129,21 +466,34 @@ class WildFire(object):
         return flame_length
 
     # initialize the geo-physical information
-    def geo_phys_info_init(self, max_fuel_coeff=7, avg_wind_speed=5, avg_wind_direction=np.pi/8):
+    def geo_phys_info_init(self, max_fuel_coeff=7, avg_wind_speed=5, avg_wind_direction=np.pi/8, tile_size=None, fuel_field=None):
         """
         This function generates a set of Geo-Physical information based on user defined ranges for each parameter
 
         :param max_fuel_coeff: maximum fuel coefficient based on vegetation type of the terrain
         :param avg_wind_speed: average effective mid-flame wind speed
         :param avg_wind_direction: wind azimuth
+        :param tile_size: if given, the spread rate is a lazily generated (float32) TerrainField with tiles of this size
+        :param fuel_field: a (unit) TerrainField to build the spread rate on, e.g. shared by the fire areas or the worker processes
         :return: a dictionary containing geo-physical information
         """
 
+        if self.backend == 'cellular' and \
+                [max_fuel_coeff, avg_wind_speed] != [self.cellular_terrain['max_fuel_coeff'], self.cellular_terrain['avg_wind_speed']]:
+            raise ValueError(">>> Oops! The cellular backend is only calibrated for max_fuel_coeff=" +
+                             str(self.cellular_terrain['max_fuel_coeff']) + " and avg_wind_speed=" +
+                             str(self.cellular_terrain['avg_wind_speed']) + ".")
+
         min_fuel_coeff = 1e-15
         fuel_rng = max_fuel_coeff - min_fuel_coeff
-        spread_rate = fuel_rng*np.random.rand(self.terrain_sizes[0], self.terrain_sizes[1])+min_fuel_coeff
-        wind_speed = np.random.normal(avg_wind_speed, 2, size=(self.terrain_sizes[0], 1))
-        wind_direction = np.random.normal(avg_wind_direction, 2, size=(self.terrain_sizes[0], 1))
+        if fuel_field is None and tile_size is not None:
+            fuel_field = TerrainField(shape=self.terrain_sizes, tile_size=tile_size, seed=int(self.rng.integers(2 ** 63)))
+        if fuel_field is not None:
+            spread_rate = fuel_field.scaled(scale=fuel_rng, offset=min_fuel_coeff)
+        else:
+            spread_rate = fuel_rng*self.rng.random((self.terrain_sizes[0], self.terrain_sizes[1]))+min_fuel_coeff
+        wind_speed = self.rng.normal(avg_wind_speed, 2, size=(self.terrain_sizes[0], 1))
+        wind_direction = self.rng.normal(avg_wind_direction, 2, size=(self.terrain_sizes[0], 1))
 
         geo_phys_info = {'spread_rate': spread_rate,
                          'wind_speed': wind_speed,
@@ -151,6 +501,86 @@ class WildFire(object):
 
         return geo_phys_info
 
+    # load the geo-physical information from external rasters
+    def geo_phys_info_load(self, fuel_raster=None, wind_speed_raster=None, wind_direction_raster=None, avg_wind_speed=5,
+                           avg_wind_direction=np.pi/8, raster_shape=None, raster_dtype=np.float32, tile_size=256, cache_tiles=64):
+        """
+        This function builds the Geo-Physical information from external (memory-mapped) rasters instead of random noise, so the terrain
+        can be far larger than RAM (only the cached tiles around the fire are resident, see RasterField)
+
+        :param fuel_raster: spread rate (fuel coefficient) raster, as a .npy / raw file path, an array or a RasterField (e.g. shared)
+        :param wind_speed_raster: optional local mid-flame wind speed raster (same forms), replacing the drawn wind speeds
+        :param wind_direction_raster: optional local wind azimuth raster in radian (same forms), replacing the drawn wind directions
+        :param avg_wind_speed: average effective mid-flame wind speed (drawn wind, used if there is no wind speed raster)
+        :param avg_wind_direction: wind azimuth (drawn wind, used if there is no wind direction raster)
+        :param raster_shape: [length, width] of the raw raster files
+        :param raster_dtype: data type of the raw raster files
+        :param tile_size: size of the cached raster tiles
+        :param cache_tiles: maximum number of cached tiles per raster
+        :return: a dictionary containing geo-physical information
+        """
+
+        if fuel_raster is None:
+            raise ValueError(">>> Oops! The fuel coefficient raster is required to load the geo-physical information.")
+        if self.backend == 'cellular':
+            raise ValueError(">>> Oops! The cellular backend is only calibrated for the random terrain of geo_phys_info_init().")
+
+        rasters = {}
+        for key, raster in [('spread_rate', fuel_raster), ('wind_speed_map', wind_speed_raster), ('wind_direction_map', wind_direction_raster)]:
+            if raster is None:
+                continue
+            if not isinstance(raster, RasterField):
+                raster = RasterField(raster, shape=raster_shape, dtype=raster_dtype, tile_size=tile_size, cache_tiles=cache_tiles)
+            if raster.shape[0] < self.terrain_sizes[0] or raster.shape[1] < self.terrain_sizes[1]:
+                raise ValueError(">>> Oops! The " + key + " raster " + str(raster.shape) + " doesn't cover the terrain " +
+                                 str(tuple(self.terrain_sizes)))
+            rasters[key] = raster
+
+        geo_phys_info = {'spread_rate': rasters['spread_rate'],
+                         'wind_speed': self.rng.normal(avg_wind_speed, 2, size=(self.terrain_sizes[0], 1)),
+                         'wind_direction': self.rng.normal(avg_wind_direction, 2, size=(self.terrain_sizes[0], 1))}
+        geo_phys_info.update((key, rasters[key]) for key in ['wind_speed_map', 'wind_direction_map'] if key in rasters)
+
+        return geo_phys_info
+
+    # local wind from the wind rasters
+    @staticmethod
+    def local_wind(geo_phys_info=None, x_idx=None, y_idx=None, U=None, Theta=None):
+        """
+        this function replaces the drawn wind speed and direction of a set of cells by the wind rasters (if loaded)
+
+        :param geo_phys_info: a dictionary including geo-physical information
+        :param x_idx: cell x indices
+        :param y_idx: cell y indices
+        :param U: drawn wind speed per cell
+        :param Theta: drawn wind direction per cell
+        :return: wind speed and direction per cell
+        """
+
+        if 'wind_speed_map' in geo_phys_info:
+            U = geo_phys_info['wind_speed_map'][x_idx, y_idx]
+        if 'wind_direction_map' in geo_phys_info:
+            Theta = geo_phys_info['wind_direction_map'][x_idx, y_idx]
+
+        return U, Theta
+
+    # reading the raster tiles around the active fire and the agents ahead of time
+    def prefetch_terrain(self, geo_phys_info=None, points=None, radius=None):
+        """
+        this function loads the tiles of the raster-backed geo-physical information around a set of locations into their caches (no-op
+        for the in-memory maps)
+
+        :param geo_phys_info: a dictionary including geo-physical information
+        :param points: array of locations (first two columns are [x, y]), e.g. the fire-fronts and the agents
+        :param radius: radius around each location to cover (default:: the radiation radius)
+        :return: None
+        """
+
+        radius = self.radiation_radius if radius is None else radius
+        for field in geo_phys_info.values():
+            if isinstance(field, RasterField):
+                field.prefetch(points, radius=radius)
+
     # wildfire propagation
     def fire_propagation(self, world_Size, ign_points_all=None, geo_phys_info=None,
                          previous_terrain_map=None, pruned_List = None):
@@ -166,8 +596,21 @@ class WildFire(object):
         if ign_points_all is None or geo_phys_info is None or previous_terrain_map is None or pruned_List is None:
             raise ValueError(">>> Oops! Fire propagation function needs ALL of its inputs to operate!")
 
+        if self.backend == 'cellular':
+            return self.fire_propagation_cellular(world_Size, ign_points_all=ign_points_all, geo_phys_info=geo_phys_info,
+                                                  previous_terrain_map=previous_terrain_map, pruned_List=pruned_List)
+        if self.engine in ['vectorized', 'raster']:
+            return self.fire_propagation_batch(world_Size, ign_points_all=ign_points_all, geo_phys_info=geo_phys_info,
+                                               previous_terrain_map=previous_terrain_map, pruned_List=pruned_List)
+
+        # the fire-fronts are replaced every step (fresh index), while the terrain map only grows (incremental index)
+        front_index = self.build_index(ign_points_all)
+        if self.spatial_index:
+            self.terrain_index.sync(previous_terrain_map)
+
         current_geo_phys_info = np.zeros(shape=[ign_points_all.shape[0], 3])
-        new_fire_front = np.zeros(shape=[ign_points_all.shape[0], 3])
+        new_fire_front = np.zeros(shape=[ign_points_all.shape[0], max(3, ign_points_all.shape[1])])  # [x, y, intensity(, multiplicity)]
+        pruned_cells = {(int(cell[0]), int(cell[1])) for cell in pruned_List}  # O(1) membership checks
         counter = 0
         for point in ign_points_all:
             # extracting the data
@@ -180,20 +623,19 @@ class WildFire(object):
 
                 # extracting the required information
                 R = spread_rate[int(round(x)), int(round(y))]
-                U = wind_speed[np.random.randint(low=0, high=self.terrain_sizes[0])][0]
-                Theta = wind_direction[np.random.randint(low=0, high=self.terrain_sizes[0])][0]
+                U = wind_speed[self.rng.integers(low=0, high=self.terrain_sizes[0])][0]
+                Theta = wind_direction[self.rng.integers(low=0, high=self.terrain_sizes[0])][0]
+                U, Theta = self.local_wind(geo_phys_info, int(round(x)), int(round(y)), U, Theta)
                 current_geo_phys_info[counter] = np.array([R, U, Theta])  # storing GP information
 
                 # Simplified FARSITE
-                LB = 0.936 * np.exp(0.2566 * U) + 0.461 * np.exp(-0.1548 * U) - 0.397
-                HB = (LB + np.sqrt(np.absolute(np.power(LB, 2) - 1))) / (LB - np.sqrt(np.absolute(np.power(LB, 2) - 1)))
-                C = 0.5 * (R - (R / HB))
+                C, _ = self.fire_ellipse(R, U)
 
                 x_diff = C * np.sin(Theta)
                 y_diff = C * np.cos(Theta)
 
                 # updating the fire location
-                if [int(x), int(y)] not in pruned_List:
+                if (int(x), int(y)) not in pruned_cells:
                     x_new = x + x_diff * self.time_step
                     y_new = y + y_diff * self.time_step
                 else:
@@ -201,25 +643,261 @@ class WildFire(object):
                     y_new = y
 
                 # computing the fire intensity
-                heat_source_diff1 = np.tile(point, (ign_points_all.shape[0], 1)) - ign_points_all
-                heat_source_dists1 = np.sqrt((heat_source_diff1[:, 0] ** 2) + (heat_source_diff1[:, 1] ** 2))
-                idx1 = np.where(heat_source_dists1 <= self.radiation_radius)[0]
+                idx1 = self.heat_sources_in_range(point, ign_points_all, index=front_index)
                 fire_intensity1 = self.fire_intensity(point, ign_points_all[idx1.tolist(), :].tolist())
 
-                heat_source_diff2 = np.tile(point, (previous_terrain_map.shape[0], 1)) - previous_terrain_map
-                heat_source_dists2 = np.sqrt((heat_source_diff2[:, 0] ** 2) + (heat_source_diff2[:, 1] ** 2))
-                idx2 = np.where(heat_source_dists2 <= self.radiation_radius)[0]
+                idx2 = self.heat_sources_in_range(point, previous_terrain_map, index=self.terrain_index)
                 fire_intensity2 = self.fire_intensity(point, previous_terrain_map[idx2.tolist(), :].tolist())
 
                 fire_intensity = fire_intensity1 + fire_intensity2
 
-                # storing new fire-front locations and intensity
-                new_fire_front[counter] = np.array([x_new, y_new, fire_intensity])
+                # storing new fire-front locations and intensity (a consolidated fire-front keeps its multiplicity)
+                new_fire_front[counter, 0:3] = np.array([x_new, y_new, fire_intensity])
+                new_fire_front[counter, 3:] = point[3:]
 
                 counter += 1
 
         return new_fire_front, current_geo_phys_info
 
+    # batched wildfire propagation
+    def fire_propagation_batch(self, world_Size, ign_points_all=None, geo_phys_info=None,
+                               previous_terrain_map=None, pruned_List=None):
+        """
+        This function implements the same simplified FARSITE propagation as fire_propagation(), but computes the displacement, the radius
+        filtering and the Gaussian intensity of all fire-fronts in one batched NumPy pass. The output layout is identical to the per-point
+        loop (fire-fronts outside the window are dropped and the remaining rows are left as zeros).
+
+        :param ign_points_all: array including all fire-fronts and their intensities across entire terrain [output of hotspot_init()]
+        :param geo_phys_info: a dictionary including geo-physical information [output of geo_phys_info_inti()]
+        :param previous_terrain_map: the terrain including all fire-fronts and their intensities as an array
+        :param pruned_List: list of the [x, y] cells that have been pruned (these fire-fronts do not move)
+        :return: new fire front points and their corresponding geo-physical information
+        """
+
+        if ign_points_all is None or geo_phys_info is None or previous_terrain_map is None or pruned_List is None:
+            raise ValueError(">>> Oops! Fire propagation function needs ALL of its inputs to operate!")
+
+        current_geo_phys_info = np.zeros(shape=[ign_points_all.shape[0], 3])
+        new_fire_front = np.zeros(shape=[ign_points_all.shape[0], max(3, ign_points_all.shape[1])])  # [x, y, intensity(, multiplicity)]
+        if ign_points_all.shape[0] == 0:
+            return new_fire_front, current_geo_phys_info
+
+        # Ensure that all the fire spots to be displayed must be within the window scope
+        x, y = ign_points_all[:, 0], ign_points_all[:, 1]
+        in_window = (x <= (world_Size - 1)) & (y <= (world_Size - 1)) & (x > 0) & (y > 0)
+        points = ign_points_all[in_window]
+        num_points = points.shape[0]
+        x, y = points[:, 0], points[:, 1]
+
+        # extracting the required information
+        x_idx, y_idx = np.round(x).astype(int), np.round(y).astype(int)
+        R = geo_phys_info['spread_rate'][x_idx, y_idx]
+        wind_idx = self.rng.integers(low=0, high=self.terrain_sizes[0], size=(2, num_points))  # all the wind draws of the step at once
+        U = geo_phys_info['wind_speed'][wind_idx[0], 0]
+        Theta = geo_phys_info['wind_direction'][wind_idx[1], 0]
+        U, Theta = self.local_wind(geo_phys_info, x_idx, y_idx, U, Theta)
+
+        # Simplified FARSITE
+        C, _ = self.fire_ellipse(R, U)
+
+        # updating the fire locations (pruned fire-fronts stay where they are)
+        moving = ~self.in_cells(points[:, 0:2], pruned_List)
+        x_new = np.where(moving, x + C * np.sin(Theta) * self.time_step, x)
+        y_new = np.where(moving, y + C * np.cos(Theta) * self.time_step, y)
+
+        # computing the fire intensity
+        if self.engine == 'raster':
+            fire_intensity = self.fire_intensity_raster(points, ign_points_all) + self.fire_intensity_raster(points, previous_terrain_map)
+        else:
+            front_index = self.build_index(ign_points_all)
+            if self.spatial_index:
+                self.terrain_index.sync(previous_terrain_map)
+            fire_intensity = self.fire_intensity_batch(points, ign_points_all, index=front_index) +\
+                self.fire_intensity_batch(points, previous_terrain_map, index=self.terrain_index)
+
+        # storing new fire-front locations and intensity (consolidated fire-fronts keep their multiplicity)
+        new_fire_front[:num_points, 0:3] = np.stack([x_new, y_new, fire_intensity], axis=1)
+        new_fire_front[:num_points, 3:] = points[:, 3:]
+        current_geo_phys_info[:num_points] = np.stack([R, U, Theta], axis=1)
+
+        return new_fire_front, current_geo_phys_info
+
+    # simplified FARSITE fire ellipse
+    def fire_ellipse(self, R=None, U=None):
+        """
+        This function computes the head fire rate and the head-to-back ratio of the simplified FARSITE fire ellipse
+
+        :param R: spread rate(s) of the fire-fronts
+        :param U: mid-flame wind speed(s) of the fire-fronts
+        :return: head fire rate C and head-to-back ratio HB of each fire-front
+        """
+
+        HB = self.head_to_back(U)
+        C = 0.5 * (R - (R / HB))
+
+        return C, HB
+
+    # length-to-breadth ratio of the fire ellipse
+    @staticmethod
+    def length_to_breadth(U=None):
+        return 0.936 * np.exp(0.2566 * U) + 0.461 * np.exp(-0.1548 * U) - 0.397
+
+    # head-to-back ratio of the fire ellipse
+    @staticmethod
+    def head_to_back(U=None):
+        LB = WildFire.length_to_breadth(U)
+
+        return (LB + np.sqrt(np.absolute(np.power(LB, 2) - 1))) / (LB - np.sqrt(np.absolute(np.power(LB, 2) - 1)))
+
+    # checking which fire spots fall into a set of integer cells
+    @staticmethod
+    def in_cells(points=None, cells=None):
+        """
+        this function checks, for every point, whether its integer cell [int(x), int(y)] is included in a list of cells
+
+        :param points: array of [x, y] locations
+        :param cells: list (or array) of integer [x, y] cells, e.g. the pruned list
+        :return: boolean flag per point
+        """
+
+        if points is None or cells is None:
+            raise ValueError(">>> Oops! Function 'in_cells()' needs ALL of its input arguments to work!")
+
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        if cells.shape[0] == 0 or points.shape[0] == 0:
+            return np.zeros(points.shape[0], dtype=bool)
+
+        points = points.astype(np.int64)  # same truncation as int()
+        offset = min(points.min(), cells.min())
+        stride = max(points.max(), cells.max()) - offset + 1
+        point_keys = (points[:, 0] - offset) * stride + (points[:, 1] - offset)
+        cell_keys = (cells[:, 0] - offset) * stride + (cells[:, 1] - offset)
+
+        return np.isin(point_keys, cell_keys)
+
+    # cellular automaton wildfire propagation
+    def fire_propagation_cellular(self, world_Size, ign_points_all=None, geo_phys_info=None, previous_terrain_map=None, pruned_List=None):
+        """
+        This function implements a grid-based (cellular automaton) alternative to the simplified FARSITE model, with the same inputs and
+        outputs as fire_propagation(). The terrain is divided into square cells of size cell_size, each unburnt, burning or burnt out.
+        Each step, every burning cell tries to ignite its 8 unburnt neighbors with probability 1 - exp(-r * time_step / d), where d is the
+        distance to the neighbor (in cell_size units) and r is spread_scale times the directional spread rate of the simplified FARSITE
+        fire ellipse (driven by the 'spread_rate' of the cell and stretched by the 'wind_speed' along the 'wind_direction'). A cell burns
+        out burn_time * cell_size after its ignition and the pruned cells are put out. Only the burning cells are visited, so the cost per
+        step is O(active cells) rather than O(fire history).
+
+        The default burn_time and spread_scale match the burned area of the FARSITE model (the area of the convex hull of its fire spots)
+        within 25% for 1 m cells, a fuel coefficient of 5 and an average wind speed of 5 m/s (the FireCommander env settings). The
+        automaton is close to its critical point there, so other cell sizes, fuel coefficients or wind speeds are rejected (see
+        cellular_setting and cellular_terrain) rather than silently producing a mis-scaled fire.
+
+        :param ign_points_all: array of fire-fronts, their (in-terrain) cells are ignited if still unburnt (e.g. the hotspots)
+        :param geo_phys_info: a dictionary including geo-physical information [output of geo_phys_info_inti()]
+        :param previous_terrain_map: the terrain including all fire-fronts (not needed, the burn state is kept by the automaton)
+        :param pruned_List: list of the [x, y] cells that have been pruned (the automaton cells including them are put out)
+        :return: the newly ignited cells as [x, y, intensity] fire-fronts (at the cell centers) and their geo-physical information
+        """
+
+        if ign_points_all is None or geo_phys_info is None or pruned_List is None:
+            raise ValueError(">>> Oops! Fire propagation function needs ALL of its inputs to operate!")
+
+        if self.burn_state is None:
+            self.burn_state = np.zeros(shape=[int(np.ceil(self.terrain_sizes[0] / self.cell_size)),
+                                              int(np.ceil(self.terrain_sizes[1] / self.cell_size))], dtype=np.int8)
+        self.cellular_step += 1
+
+        # igniting the given fire-fronts and putting out the pruned cells
+        if np.ndim(ign_points_all) == 2:
+            self.ignite_cells(ign_points_all)
+        if len(pruned_List) > 0:
+            pruned = self.automaton_cells(np.asarray(pruned_List, dtype=float).reshape(-1, 2))
+            self.burn_state[pruned[:, 0], pruned[:, 1]] = 2
+
+        # burning out the cells that have burnt long enough (or have been put out)
+        active = (self.cellular_step - self.ignition_steps < self.burn_steps) & \
+            (self.burn_state[self.burning_cells[:, 0], self.burning_cells[:, 1]] == 1)
+        burnt_out = self.burning_cells[~active]
+        self.burn_state[burnt_out[:, 0], burnt_out[:, 1]] = 2
+        self.burning_cells, self.ignition_steps = self.burning_cells[active], self.ignition_steps[active]
+        self.burning_index.remove(~active, self.burning_cells)
+
+        num_cells = self.burning_cells.shape[0]
+        if num_cells == 0:
+            return np.zeros(shape=[0, 3]), np.zeros(shape=[0, 3])
+
+        # spread rate (at the cell centers) and wind of the burning cells (the wind is drawn per cell like the FARSITE fire-fronts draw it)
+        centers = self.cell_centers(self.burning_cells).astype(np.int64)
+        R = geo_phys_info['spread_rate'][centers[:, 0], centers[:, 1]]
+        wind_idx = self.rng.integers(low=0, high=self.terrain_sizes[0], size=(2, num_cells))
+        U = geo_phys_info['wind_speed'][wind_idx[0], 0]
+        Theta = geo_phys_info['wind_direction'][wind_idx[1], 0]
+        U, Theta = self.local_wind(geo_phys_info, centers[:, 0], centers[:, 1], U, Theta)
+
+        # Simplified FARSITE fire ellipse:: the head fire moves C per unit time (as the fire-fronts of fire_propagation() do) and the back
+        # fire C / HB, with the directional rate of an ellipse of eccentricity (HB - 1) / (HB + 1) in between
+        C, HB = self.fire_ellipse(R, U)
+        C, eccentricity = self.spread_scale * C, (HB - 1) / (HB + 1)
+
+        # ignition attempts towards the 8 neighbors (the direction convention follows fire_propagation():: [sin(Theta), cos(Theta)])
+        offsets = np.array([[-1, -1], [-1, 0], [-1, 1], [0, -1], [0, 1], [1, -1], [1, 0], [1, 1]])
+        distances = np.sqrt((offsets ** 2).sum(axis=1))
+        x_n = self.burning_cells[:, 0:1] + offsets[:, 0]
+        y_n = self.burning_cells[:, 1:2] + offsets[:, 1]
+        alignment = (offsets[:, 0] * np.sin(Theta)[:, np.newaxis] + offsets[:, 1] * np.cos(Theta)[:, np.newaxis]) / distances
+        rate = C[:, np.newaxis] * (1 - eccentricity[:, np.newaxis]) / (1 - eccentricity[:, np.newaxis] * alignment)
+        ignition_prob = 1 - np.exp(-rate * self.time_step / (distances * self.cell_size))
+
+        in_terrain = (x_n >= 0) & (x_n < self.burn_state.shape[0]) & (y_n >= 0) & (y_n < self.burn_state.shape[1])
+        candidates = np.zeros(shape=x_n.shape, dtype=bool)
+        candidates[in_terrain] = self.burn_state[x_n[in_terrain], y_n[in_terrain]] == 0
+        ignited = candidates & (self.rng.random(x_n.shape) < ignition_prob)
+        source_cells = np.nonzero(ignited)[0]  # burning cell of each ignition (same order as x_n[ignited])
+        new_cells, first_ignition = np.unique(np.stack([x_n[ignited], y_n[ignited]], axis=1), axis=0, return_index=True)
+        source_cells = source_cells[first_ignition]
+        self.ignite_cells(self.cell_centers(new_cells))
+
+        # the newly ignited cells are the new fire-fronts (their intensity comes from the burning cells within the radiation radius), with
+        # the geo-physical information of the burning cell that ignited them
+        new_fire_front = np.zeros(shape=[new_cells.shape[0], 3])
+        current_geo_phys_info = np.stack([R[source_cells], U[source_cells], Theta[source_cells]], axis=1)
+        if new_cells.shape[0] > 0:
+            new_fire_front[:, 0:2] = self.cell_centers(new_cells)
+            heat_sources = self.cell_centers(self.burning_cells)
+            new_fire_front[:, 2] = self.fire_intensity_batch(new_fire_front, heat_sources, index=self.burning_index)
+
+        return new_fire_front, current_geo_phys_info
+
+    # igniting cells of the cellular automaton
+    def ignite_cells(self, fire_spots=None):
+        """
+        this function sets the unburnt automaton cells of a set of fire spots on fire ('cellular' backend)
+
+        :param fire_spots: array of fire spots (first two columns are [x, y])
+        :return: None
+        """
+
+        if fire_spots is None:
+            raise ValueError(">>> Oops! Function 'ignite_cells()' needs the fire spots to work!")
+
+        cells = np.unique(self.automaton_cells(fire_spots), axis=0)
+        cells = cells[self.burn_state[cells[:, 0], cells[:, 1]] == 0]
+        self.burn_state[cells[:, 0], cells[:, 1]] = 1
+        self.burning_cells = np.concatenate([self.burning_cells, cells], axis=0)
+        self.burning_index.append(self.cell_centers(cells))
+        self.ignition_steps = np.concatenate([self.ignition_steps, np.full(cells.shape[0], self.cellular_step, dtype=np.int64)])
+
+    # automaton cells of a set of locations (the locations outside the terrain are dropped)
+    def automaton_cells(self, points=None):
+        cells = np.floor(np.asarray(points, dtype=float)[:, 0:2] / self.cell_size).astype(np.int64)
+
+        return cells[(cells[:, 0] >= 0) & (cells[:, 0] < self.burn_state.shape[0]) & (cells[:, 1] >= 0) & (cells[:, 1] < self.burn_state.shape[1])]
+
+    # terrain locations of the automaton cell centers (clipped to the terrain for the partial cells at its border)
+    def cell_centers(self, cells=None):
+        centers = (np.asarray(cells, dtype=float).reshape(-1, 2) + 0.5) * self.cell_size
+
+        return np.minimum(centers, np.array(self.terrain_sizes) - 0.5)
+
     # dynamic fire decay
     def fire_decay(self, terrain_map=None, time_vector=None, geo_phys_info=None, decay_rate=0.01):
         """
@@ -235,31 +913,149 @@ class WildFire(object):
         if terrain_map is None or geo_phys_info is None or time_vector is None:
             raise ValueError(">>> Oops! The fire decay function requires ALL its inputs (except for 'decay_rate=0.01' as default) to operate.")
 
-        spread_rate = geo_phys_info['spread_rate']
+        # updating the intensities (all fire spots at once)
+        updated_time_vector = time_vector + self.time_step
+        R = self.spread_rate_at(terrain_map, geo_phys_info)
+        updated_terrain_map = np.array(terrain_map[:, 0:3], dtype=float)
+        updated_terrain_map[:, 2] = updated_terrain_map[:, 2] * np.exp(-decay_rate * updated_time_vector / R)
 
-        step_vector = self.time_step * np.ones(terrain_map.shape[0])
-        updated_time_vector = time_vector + step_vector
+        # pruning dead fire spots from the fire map
+        updated_terrain_map, updated_time_vector, burnt_out_fires_new = self.pruning_fire_map(
+            updated_terrain_map=updated_terrain_map, updated_time_vector=updated_time_vector)
 
-        # updating the intensities
-        counter = 0
-        updated_terrain_map = np.zeros(shape=[terrain_map.shape[0], 3])
-        for spot in terrain_map:
-            x = spot[0]
-            y = spot[1]
-            intensity = spot[2]
-            R = spread_rate[int(round(x)), int(round(y))]
+        return updated_terrain_map, updated_time_vector, burnt_out_fires_new
 
-            I_new = intensity * np.exp(-decay_rate * updated_time_vector[counter]/R)
+    # per-cell consolidation of fire spots
+    @staticmethod
+    def consolidate_fire_spots(fire_spots=None):
+        """
+        this function merges the fire spots that fall into the same integer cell [int(x), int(y)] into a single heat source, located at
+        their weighted centroid (which stays inside the cell), with their weighted mean intensity and a 4th column holding the multiplicity
+        (number of merged fire spots). The fire intensity calculations weight every heat source by its multiplicity, so the number of rows
+        is bounded by the number of burning cells rather than by the elapsed time.
+
+        :param fire_spots: array of [x, y, intensity] or already consolidated [x, y, intensity, multiplicity] fire spots
+        :return: array of consolidated [x, y, intensity, multiplicity] fire spots (ordered by cell, zero-multiplicity rows dropped)
+        """
 
-            updated_terrain_map[counter] = np.array([x, y, I_new])
+        if fire_spots is None:
+            raise ValueError(">>> Oops! Function 'consolidate_fire_spots()' needs the fire spots to work!")
 
-            counter += 1
+        fire_spots = np.asarray(fire_spots, dtype=float)
+        if fire_spots.ndim < 2 or fire_spots.shape[0] == 0:
+            return np.zeros(shape=[0, 4])
+        weights = fire_spots[:, 3] if fire_spots.shape[1] > 3 else np.ones(fire_spots.shape[0])
+        fire_spots, weights = fire_spots[weights > 0], weights[weights > 0]
+
+        _, cell_idx = np.unique(WildFire.cell_keys(fire_spots), return_inverse=True)
+        multiplicity = np.bincount(cell_idx, weights=weights)
+        consolidated = np.zeros(shape=[multiplicity.shape[0], 4])
+        for col in range(3):
+            consolidated[:, col] = np.bincount(cell_idx, weights=weights * fire_spots[:, col]) / multiplicity
+        consolidated[:, 3] = multiplicity
+
+        return consolidated
+
+    # merging consolidated fire spots into a growable terrain map
+    def consolidate_terrain_buffer(self, terrain_buffer=None, fire_spots=None, time_buffer=None):
+        """
+        this function merges new fire spots into a consolidated terrain map kept in a FireMapBuffer. Fire spots in a cell that is already
+        in the terrain map are added to its row (multiplicity and weighted mean intensity, the row keeps its location so the terrain
+        index stays valid), while the others are appended as new rows.
+
+        :param terrain_buffer: FireMapBuffer of the consolidated [x, y, intensity, multiplicity] terrain map (one row per cell)
+        :param fire_spots: array of the new fire spots (e.g. the new fire-fronts)
+        :param time_buffer: optional FireMapBuffer (single column) with the time since ignition of each terrain row (new rows start at 0)
+        :return: the view of the updated terrain map
+        """
+
+        if terrain_buffer is None or fire_spots is None:
+            raise ValueError(">>> Oops! Function 'consolidate_terrain_buffer()' needs the terrain map and the fire spots to work!")
+
+        fire_spots = self.consolidate_fire_spots(fire_spots)
+        terrain_map = terrain_buffer.view
+        if fire_spots.shape[0] == 0:
+            return terrain_map
+
+        # finding the terrain rows of the cells (the terrain map holds at most one row per cell)
+        keys = self.cell_keys(fire_spots)
+        terrain_keys = self.cell_keys(terrain_map)
+        order = np.argsort(terrain_keys)
+        sorted_keys = terrain_keys[order]
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), max(sorted_keys.shape[0] - 1, 0))
+        found = np.zeros(keys.shape[0], dtype=bool) if sorted_keys.shape[0] == 0 else sorted_keys[pos] == keys
+
+        # merging into the existing rows
+        rows = order[pos[found]]
+        weights = terrain_map[rows, 3] + fire_spots[found, 3]
+        terrain_map[rows, 2] = (terrain_map[rows, 2] * terrain_map[rows, 3] + fire_spots[found, 2] * fire_spots[found, 3]) / weights
+        terrain_map[rows, 3] = weights
+
+        # appending the newly burning cells
+        if time_buffer is not None:
+            time_buffer.append(np.zeros(shape=[int(np.sum(~found)), 1]))
+
+        return terrain_buffer.append(fire_spots[~found])
+
+    # hashing fire spots into integer cell keys
+    @staticmethod
+    def cell_keys(fire_spots=None):
+        cells = np.asarray(fire_spots)[:, 0:2].astype(np.int64) + 2 ** 20  # same truncation as int()
+
+        return cells[:, 0] * 2 ** 21 + cells[:, 1]
+
+    # in-place fire decay of a growable terrain map
+    def fire_decay_buffer(self, terrain_buffer=None, time_buffer=None, geo_phys_info=None, decay_rate=0.01):
+        """
+        this function performs the dynamic fire decay (see fire_decay()) in place on a terrain map kept in a FireMapBuffer, and removes the
+        burnt-out fire spots from it (and from the terrain index), so the live terrain map stays bounded over long runs
+
+        :param terrain_buffer: FireMapBuffer of the terrain including all fire-fronts and their intensities
+        :param time_buffer: FireMapBuffer (single column) with how long has passed after the ignition of each point until now
+        :param geo_phys_info: a dictionary including geo-physical information [output of geo_phys_info_inti()]
+        :param decay_rate: fuel exhaustion rate (greater means faster exhaustion)
+        :return: the view of the updated terrain map and the burnt-out fire spots
+        """
+
+        if terrain_buffer is None or time_buffer is None or geo_phys_info is None:
+            raise ValueError(">>> Oops! Function 'fire_decay_buffer()' requires ALL its inputs (except for 'decay_rate=0.01' as default) to operate.")
+        if len(terrain_buffer) != len(time_buffer):
+            raise ValueError(">>> Oops! The terrain map and the time vector of 'fire_decay_buffer()' must have the same number of rows.")
+
+        # updating the intensities
+        terrain_map, time_vector = terrain_buffer.view, time_buffer.view[:, 0]
+        time_vector += self.time_step
+        terrain_map[:, 2] *= np.exp(-decay_rate * time_vector / self.spread_rate_at(terrain_map, geo_phys_info))
 
         # pruning dead fire spots from the fire map
-        updated_terrain_map, updated_time_vector, burnt_out_fires_new = self.pruning_fire_map(
-            updated_terrain_map=updated_terrain_map, updated_time_vector=updated_time_vector)
+        burnt_out = terrain_map[:, 2] < self.weak_fire_threshold
+        burnt_out_fires_new = terrain_map[burnt_out]
+        if burnt_out.any():
+            terrain_buffer.compact(~burnt_out)
+            time_buffer.compact(~burnt_out)
+            # the terrain index drops the rows from their buckets and renumbers the rest (an index lagging behind the terrain map is
+            # rebuilt at the next sync() instead)
+            if self.spatial_index and self.terrain_index.num_indexed == burnt_out.shape[0]:
+                self.terrain_index.remove(burnt_out, terrain_buffer.view)
 
-        return updated_terrain_map, updated_time_vector, burnt_out_fires_new
+        return terrain_buffer.view, burnt_out_fires_new
+
+    # spread rates at the fire spot locations
+    @staticmethod
+    def spread_rate_at(terrain_map=None, geo_phys_info=None):
+        """
+        this function looks up the spread rate at the (rounded) location of each fire spot, clipped to the terrain
+
+        :param terrain_map: array of fire spots (first two columns are [x, y])
+        :param geo_phys_info: a dictionary including geo-physical information [output of geo_phys_info_inti()]
+        :return: spread rate per fire spot
+        """
+
+        spread_rate = geo_phys_info['spread_rate']
+        x_idx = np.clip(np.round(terrain_map[:, 0]).astype(np.int64), 0, spread_rate.shape[0] - 1)
+        y_idx = np.clip(np.round(terrain_map[:, 1]).astype(np.int64), 0, spread_rate.shape[1] - 1)
+
+        return spread_rate[x_idx, y_idx]
 
     # pruning dead fire spots from the fire map
     def pruning_fire_map(self, updated_terrain_map=None, updated_time_vector=None):
@@ -277,3 +1073,709 @@ class WildFire(object):
         updated_time_vector = np.delete(updated_time_vector, burnt_out_fires_idx)
 
         return updated_terrain_map, updated_time_vector, burnt_out_fires_new
+
+
+# wildfire simulation of several fire areas with their own parameters
+class MultiAreaWildFire(WildFire):
+    """
+    WildFire model of several fire areas with their own parameters (the "specific" fire mode) advanced all at once:: the per-area
+    parameters are kept as arrays (number of ignition points, start delay, fuel coefficient and wind) and the fire-fronts of all the areas
+    are propagated by one batched call, instead of one WildFire model (and one propagation call) per area. The fire-fronts are returned
+    concatenated in area order together with their area ids. As with separate models, an area is only heated by its own fire spots.
+    """
+
+    def __init__(self, terrain_sizes=None, hotspot_areas=None, num_ign_points=None, area_delays=None, duration=None, time_step=1,
+                 radiation_radius=10, weak_fire_threshold=0.5, flame_height=3, flame_angle=np.pi/3, engine='vectorized', raster_resolution=1,
+                 raster_kernels=3, seed=None, rng=None):
+
+        WildFire.__init__(self, terrain_sizes=terrain_sizes, hotspot_areas=hotspot_areas, num_ign_points=num_ign_points, duration=duration,
+                          time_step=time_step, radiation_radius=radiation_radius, weak_fire_threshold=weak_fire_threshold,
+                          flame_height=flame_height, flame_angle=flame_angle, engine=engine, raster_resolution=raster_resolution,
+                          raster_kernels=raster_kernels, seed=seed, rng=rng)
+
+        # per-area parameters (the 'loop' engine has no per-area loop to keep, it runs the batched propagation as 'vectorized' does)
+        self.num_areas = len(hotspot_areas)
+        self.num_ign_points = np.broadcast_to(np.asarray(num_ign_points, dtype=np.int64), (self.num_areas,)).copy()
+        self.area_delays = np.zeros(self.num_areas) if area_delays is None else \
+            np.broadcast_to(np.asarray(area_delays, dtype=float), (self.num_areas,)).copy()  # start delay of each area
+
+        # per-area geo-physical parameters [set by geo_phys_info_init()]
+        self.fuel_field = None        # unit terrain field shared by the areas (or None:: one dense spread rate map per area)
+        self.spread_rate_maps = None  # [num_areas, length, width] spread rate maps
+        self.fuel_scale = None        # per-area fuel coefficient range
+        self.fuel_offset = None       # minimum fuel coefficient
+        self.wind_speeds = None       # [num_areas, length] drawn wind speeds
+        self.wind_directions = None   # [num_areas, length] drawn wind directions
+
+    # initializing hotspots
+    def hotspot_init(self):
+        """
+        This function generates the initial hotspot areas (num_ign_points[i] ignition points in area i)
+
+        :return: ignition points of all the areas (in area order) and their area ids
+        """
+
+        ign_points_all = np.zeros(shape=[0, 2])
+        for hotspot, num_ign_points in zip(self.hotspot_areas, self.num_ign_points):
+            ign_points_x = self.rng.integers(low=hotspot[0], high=hotspot[1], size=(num_ign_points, 1))
+            ign_points_y = self.rng.integers(low=hotspot[2], high=hotspot[3], size=(num_ign_points, 1))
+            ign_points_all = np.concatenate([ign_points_all, np.concatenate([ign_points_x, ign_points_y], axis=1)], axis=0)
+        area_ids = np.repeat(np.arange(self.num_areas), self.num_ign_points)
+
+        intensities = self.area_intensity(ign_points_all, area_ids, ign_points_all, area_ids)
+
+        return np.concatenate([ign_points_all, intensities[:, np.newaxis]], axis=1), area_ids
+
+    # initialize the per-area geo-physical information
+    def geo_phys_info_init(self, max_fuel_coeff=7, avg_wind_speed=5, avg_wind_direction=np.pi/8, tile_size=None, fuel_field=None):
+        """
+        This function generates the Geo-Physical information of all the areas (see WildFire.geo_phys_info_init())
+
+        :param max_fuel_coeff: maximum fuel coefficient per area (or one for all)
+        :param avg_wind_speed: average effective mid-flame wind speed per area (or one for all)
+        :param avg_wind_direction: wind azimuth per area (or one for all)
+        :param tile_size: if given, the areas share a lazily generated (float32) TerrainField with tiles of this size
+        :param fuel_field: a TerrainField shared by the areas (each area scales it with its own fuel coefficient)
+        :return: list of the per-area geo-physical information dictionaries (views of the per-area arrays)
+        """
+
+        min_fuel_coeff = 1e-15
+        fuel_rng = np.broadcast_to(np.asarray(max_fuel_coeff, dtype=float), (self.num_areas,)) - min_fuel_coeff
+        avg_wind_speed = np.broadcast_to(np.asarray(avg_wind_speed, dtype=float), (self.num_areas,))
+        avg_wind_direction = np.broadcast_to(np.asarray(avg_wind_direction, dtype=float), (self.num_areas,))
+
+        if fuel_field is None and tile_size is not None:
+            fuel_field = TerrainField(shape=self.terrain_sizes, tile_size=tile_size, seed=int(self.rng.integers(2 ** 63)))
+        if fuel_field is not None:
+            self.fuel_field, self.spread_rate_maps = fuel_field.scaled(), None
+            spread_rates = [fuel_field.scaled(scale=fuel_rng[i], offset=min_fuel_coeff) for i in range(self.num_areas)]
+        else:
+            self.fuel_field = None
+            self.spread_rate_maps = fuel_rng[:, np.newaxis, np.newaxis] * self.rng.random((self.num_areas, self.terrain_sizes[0],
+                                                                                          self.terrain_sizes[1])) + min_fuel_coeff
+            spread_rates = list(self.spread_rate_maps)
+        self.fuel_scale, self.fuel_offset = fuel_rng, min_fuel_coeff
+        self.wind_speeds = self.rng.normal(avg_wind_speed[:, np.newaxis], 2, size=(self.num_areas, self.terrain_sizes[0]))
+        self.wind_directions = self.rng.normal(avg_wind_direction[:, np.newaxis], 2, size=(self.num_areas, self.terrain_sizes[0]))
+
+        return [{'spread_rate': spread_rates[i],
+                 'wind_speed': self.wind_speeds[i][:, np.newaxis],
+                 'wind_direction': self.wind_directions[i][:, np.newaxis]} for i in range(self.num_areas)]
+
+    # spread rates of the fire spots of several areas
+    def area_spread_rate(self, x_idx=None, y_idx=None, area_ids=None):
+        if self.fuel_field is not None:
+            return self.fuel_field[x_idx, y_idx] * self.fuel_scale[area_ids] + self.fuel_offset
+
+        return self.spread_rate_maps[area_ids, x_idx, y_idx]
+
+    # fire intensity of the fire spots of several areas
+    def area_intensity(self, current_fire_spots=None, spot_areas=None, heat_source_spots=None, source_areas=None, max_pairs=2 ** 22):
+        """
+        this function computes the fire intensity of fire spots of several areas (see fire_intensity_batch()), each spot only heated by the
+        heat sources of its own area
+
+        :param current_fire_spots: array of fire locations for which the intensity is going to be computed (first two columns are [x, y])
+        :param spot_areas: area id of each fire location
+        :param heat_source_spots: array of candidate heat sources (first two columns are [x, y], an optional 4th column is the multiplicity)
+        :param source_areas: area id of each heat source (the heat sources must be in area order)
+        :param max_pairs: upper bound on the number of candidate pairs evaluated at once (beyond it, a grid index is used)
+        :return: fire intensity at each of the fire spot locations [W/m]
+        """
+
+        if current_fire_spots.shape[0] == 0 or heat_source_spots.shape[0] == 0:
+            return self.fire_intensity_batch(current_fire_spots, heat_source_spots)
+
+        # the raster grid covers the terrain, so the 'raster' engine evaluates one grid per area (the kernel spectra are shared)
+        if self.engine == 'raster':
+            fire_intensity = np.zeros(current_fire_spots.shape[0])
+            for area in np.unique(spot_areas).tolist():
+                spots = spot_areas == area
+                fire_intensity[spots] = self.fire_intensity_raster(current_fire_spots[spots], heat_source_spots[source_areas == area])
+            return fire_intensity
+
+        # the (fire spot, heat source) pairs of each area block, when they fit in one pass
+        source_counts = np.bincount(source_areas, minlength=self.num_areas)
+        pair_counts = source_counts[spot_areas]
+        if np.sum(pair_counts) <= max_pairs:
+            source_starts = np.cumsum(source_counts) - source_counts  # the heat sources are in area order
+            spot_idx = np.repeat(np.arange(current_fire_spots.shape[0]), pair_counts)
+            source_idx = np.repeat(source_starts[spot_areas] - (np.cumsum(pair_counts) - pair_counts), pair_counts) + np.arange(np.sum(pair_counts))
+            dx = current_fire_spots[spot_idx, 0] - heat_source_spots[source_idx, 0]
+            dy = current_fire_spots[spot_idx, 1] - heat_source_spots[source_idx, 1]
+            in_range = (dx ** 2 + dy ** 2) <= self.radiation_radius ** 2
+            return self.fire_intensity_batch(current_fire_spots, heat_source_spots, pairs=(spot_idx[in_range], source_idx[in_range]))
+
+        # otherwise, shifting the areas apart (farther than the radiation radius) along x, so one grid index covers all of them
+        x_all = np.concatenate([current_fire_spots[:, 0], heat_source_spots[:, 0]])
+        stride = np.max(x_all) - np.min(x_all) + 2 * self.radiation_radius + 1
+        spots = np.array(current_fire_spots, dtype=float)
+        sources = np.array(heat_source_spots, dtype=float)
+        spots[:, 0] += spot_areas * stride
+        sources[:, 0] += source_areas * stride
+        index = FireSpotIndex(cell_size=self.radiation_radius)
+        index.append(sources)
+
+        return self.fire_intensity_batch(spots, sources, index=index)
+
+    # splitting a concatenated (area ordered) array into per-area arrays
+    def split_areas(self, fire_spots=None, area_ids=None):
+        return np.split(fire_spots, np.cumsum(np.bincount(area_ids, minlength=self.num_areas))[:-1])
+
+    # wildfire propagation of all the areas
+    def fire_propagation(self, world_Size, ign_points_all=None, previous_terrain_map=None, pruned_List=None, current_time=None):
+        """
+        This function implements the simplified FARSITE propagation of fire_propagation_batch() for all the areas in one batched pass
+
+        :param ign_points_all: list of the per-area fire-fronts and their intensities [e.g. split_areas() of hotspot_init()]
+        :param previous_terrain_map: list of the per-area terrain maps (all fire-fronts and their intensities)
+        :param pruned_List: list of the [x, y] cells that have been pruned (these fire-fronts do not move)
+        :param current_time: current time, the areas whose start delay has not passed yet are not propagated (None:: all the areas)
+        :return: new fire-fronts of the active areas (in area order, each area in the fire_propagation_batch() layout), their geo-physical
+                 information and their area ids
+        """
+
+        if ign_points_all is None or previous_terrain_map is None or pruned_List is None:
+            raise ValueError(">>> Oops! Fire propagation function needs ALL of its inputs to operate!")
+        if self.wind_speeds is None:
+            raise ValueError(">>> Oops! The geo-physical information must be initialized [geo_phys_info_init()] before the propagation.")
+
+        active = np.ones(self.num_areas, dtype=bool) if current_time is None else current_time > self.area_delays
+        num_cols = max(3, max(np.shape(fronts)[1] if np.ndim(fronts) == 2 else 0 for fronts in ign_points_all))
+        fronts = [np.asarray(ign_points_all[i], dtype=float).reshape(-1, num_cols) for i in range(self.num_areas) if active[i]]
+        area_ids = np.repeat(np.nonzero(active)[0], [len(front) for front in fronts])
+        fronts = np.concatenate(fronts, axis=0) if len(fronts) > 0 else np.zeros(shape=[0, num_cols])
+
+        current_geo_phys_info = np.zeros(shape=[fronts.shape[0], 3])
+        new_fire_front = np.zeros(shape=[fronts.shape[0], num_cols])  # [x, y, intensity(, multiplicity)]
+        if fronts.shape[0] == 0:
+            return new_fire_front, current_geo_phys_info, area_ids
+
+        # Ensure that all the fire spots to be displayed must be within the window scope
+        x, y = fronts[:, 0], fronts[:, 1]
+        in_window = (x <= (world_Size - 1)) & (y <= (world_Size - 1)) & (x > 0) & (y > 0)
+        points, point_areas = fronts[in_window], area_ids[in_window]
+        num_points = points.shape[0]
+        x, y = points[:, 0], points[:, 1]
+
+        # extracting the required information (per-area spread rates and wind)
+        x_idx, y_idx = np.round(x).astype(int), np.round(y).astype(int)
+        R = self.area_spread_rate(x_idx, y_idx, point_areas)
+        wind_idx = self.rng.integers(low=0, high=self.terrain_sizes[0], size=(2, num_points))
+        U = self.wind_speeds[point_areas, wind_idx[0]]
+        Theta = self.wind_directions[point_areas, wind_idx[1]]
+
+        # Simplified FARSITE
+        C, _ = self.fire_ellipse(R, U)
+
+        # updating the fire locations (pruned fire-fronts stay where they are)
+        moving = ~self.in_cells(points[:, 0:2], pruned_List)
+        x_new = np.where(moving, x + C * np.sin(Theta) * self.time_step, x)
+        y_new = np.where(moving, y + C * np.cos(Theta) * self.time_step, y)
+
+        # computing the fire intensity (each area is heated by its own fire-fronts and terrain map)
+        terrain = [np.asarray(previous_terrain_map[i], dtype=float).reshape(-1, num_cols) for i in range(self.num_areas) if active[i]]
+        terrain_areas = np.repeat(np.nonzero(active)[0], [len(terrain_map) for terrain_map in terrain])
+        fire_intensity = self.area_intensity(points, point_areas, fronts, area_ids) +\
+            self.area_intensity(points, point_areas, np.concatenate(terrain, axis=0), terrain_areas)
+
+        # storing new fire-front locations and intensity (within each area block, the fire-fronts outside the window are left as zeros)
+        area_starts = np.cumsum(np.bincount(area_ids, minlength=self.num_areas)) - np.bincount(area_ids, minlength=self.num_areas)
+        point_counts = np.bincount(point_areas, minlength=self.num_areas)
+        rows = area_starts[point_areas] + np.arange(num_points) - (np.cumsum(point_counts) - point_counts)[point_areas]
+        new_fire_front[rows, 0:3] = np.stack([x_new, y_new, fire_intensity], axis=1)
+        new_fire_front[rows, 3:] = points[:, 3:]
+        current_geo_phys_info[rows] = np.stack([R, U, Theta], axis=1)
+
+        return new_fire_front, current_geo_phys_info, area_ids
+
+
+# uniform-grid spatial index over fire spots
+class FireSpotIndex(object):
+    """
+    Uniform-grid (spatial hash) index over fire spots for the radiation radius queries. Fire spots are hashed into square cells of size
+    cell_size (the radiation radius), so a radius query only visits the 3x3 block of cells around the query point, i.e. O(k) neighbors
+    instead of O(N) spots. The indexed rows mirror the rows of a fire map array that grows by appending rows (the index is rebuilt when the
+    fire map moves to another array, e.g. after FireMapBuffer.compact(), unless remove() was given the removed rows).
+    """
+
+    key_offset = 2 ** 20  # shift of the cell coordinates so that negative cells still map to non-negative keys
+    key_stride = 2 ** 21  # stride between two cell rows in the key space
+
+    def __init__(self, cell_size=10):
+        if cell_size <= 0:
+            raise ValueError(">>> Oops! The cell size of 'FireSpotIndex' must be positive.")
+
+        self.cell_size = cell_size
+        self.clear()
+
+    # emptying the index
+    def clear(self):
+        self.point_buffer = FireMapBuffer(num_cols=2)  # growable storage of the indexed locations
+        self.points = self.point_buffer.view          # indexed [x, y] locations (row i mirrors row i of the fire map)
+        self.cells = {}                               # cell key -> array of the row indices within that cell
+        self.num_indexed = 0                          # number of fire map rows indexed so far (sync() appends the rows after them)
+        self.storage = None                           # array holding the rows of the indexed fire map (the base of its views)
+
+    # number of indexed fire spots
+    def __len__(self):
+        return self.points.shape[0]
+
+    # hashing locations into grid cell keys
+    def cell_keys(self, points):
+        cells = np.floor(np.asarray(points)[:, 0:2] / self.cell_size).astype(np.int64) + self.key_offset
+
+        return cells[:, 0] * self.key_stride + cells[:, 1]
+
+    # appending new fire spots to the index (their rows follow the ones already indexed)
+    def append(self, points=None):
+        """
+        this function appends new fire spots to the index
+
+        :param points: array of the new fire spots (first two columns are [x, y])
+        :return: None
+        """
+
+        if points is None or len(points) == 0:
+            return
+
+        points = np.asarray(points, dtype=float)[:, 0:2]
+        rows = np.arange(self.points.shape[0], self.points.shape[0] + points.shape[0])
+        self.points = self.point_buffer.append(points)
+        self.num_indexed += points.shape[0]
+
+        # grouping the new rows by cell, then extending the cell buckets
+        keys = self.cell_keys(points)
+        order = np.argsort(keys, kind='stable')
+        unique_keys, starts = np.unique(keys[order], return_index=True)
+        for key, group in zip(unique_keys.tolist(), np.split(rows[order], starts[1:])):
+            bucket = self.cells.get(key)
+            self.cells[key] = group if bucket is None else np.concatenate([bucket, group])
+
+    # removing fire spots from the index (e.g. the burnt-out rows dropped from the fire map)
+    def remove(self, rows=None, fire_map=None):
+        """
+        this function removes fire spots from their cell buckets and renumbers the remaining rows with the old -> new row mapping of an
+        order-keeping removal (as FireMapBuffer.compact() and np.delete() do), so the index follows the fire map without a rebuild
+
+        :param rows: boolean flag per indexed row (True:: the row is removed)
+        :param fire_map: the fire map after the removal (the index follows its array from now on, see sync())
+        :return: None
+        """
+
+        if rows is None or fire_map is None:
+            raise ValueError(">>> Oops! Function 'remove()' needs the removed rows and the fire map to work!")
+
+        rows = np.asarray(rows, dtype=bool)
+        if rows.shape[0] != self.num_indexed or fire_map.shape[0] != self.num_indexed - np.count_nonzero(rows):
+            raise ValueError(">>> Oops! The removed rows of 'remove()' must match the indexed rows and the fire map.")
+
+        if rows.any():
+            # dropping the removed rows from the buckets of their cells
+            for key in np.unique(self.cell_keys(self.points[rows])).tolist():
+                bucket = self.cells[key][~rows[self.cells[key]]]
+                if bucket.shape[0] == 0:
+                    del self.cells[key]
+                else:
+                    self.cells[key] = bucket
+
+            # renumbering the remaining rows (old row -> new row)
+            new_rows = np.cumsum(~rows) - 1
+            for key, bucket in self.cells.items():
+                self.cells[key] = new_rows[bucket]
+            self.points = self.point_buffer.compact(~rows)
+            self.num_indexed = self.points.shape[0]
+        self.storage = self.storage_of(fire_map)
+
+    # array holding the rows of a fire map (the base array of a view, e.g. of a FireMapBuffer view)
+    @staticmethod
+    def storage_of(fire_map):
+        return fire_map if fire_map.base is None else fire_map.base
+
+    # keeping the index in sync with a fire map that grows by appending rows
+    def sync(self, fire_map=None):
+        """
+        this function synchronizes the index with a fire map that only grows by appending rows: the rows after the indexed ones are
+        indexed incrementally. The fire map is re-indexed when it is shorter than the index or when its rows live in another array than
+        at the last sync (e.g. a reallocated or compacted FireMapBuffer, or a new np.concatenate() / np.delete() result).
+
+        :param fire_map: the fire map array (first two columns are [x, y])
+        :return: None
+        """
+
+        if fire_map is None:
+            raise ValueError(">>> Oops! Function 'sync()' needs the fire map to work!")
+
+        storage = self.storage_of(fire_map)
+        if fire_map.shape[0] < self.num_indexed or storage is not self.storage:
+            self.clear()
+        self.storage = storage
+        self.append(fire_map[self.num_indexed:])
+
+    # candidate rows in the 3x3 block of cells around a key
+    def candidates(self, key):
+        buckets = [self.cells[k] for k in (key + dx * self.key_stride + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)) if k in self.cells]
+        if len(buckets) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.concatenate(buckets)
+
+    # radius query for one location
+    def query(self, point=None, radius=None):
+        """
+        this function finds the indexed fire spots within a radius (at most the cell size) of a location
+
+        :param point: the query location [x, y, ...]
+        :param radius: the query radius (default:: the cell size)
+        :return: row indices of the fire spots within the radius
+        """
+
+        if point is None:
+            raise ValueError(">>> Oops! Function 'query()' needs a query location to work!")
+
+        radius = self.cell_size if radius is None else radius
+        rows = self.candidates(self.cell_keys(np.asarray(point, dtype=float).reshape(1, -1))[0])
+        dists = (self.points[rows, 0] - point[0]) ** 2 + (self.points[rows, 1] - point[1]) ** 2
+
+        return np.sort(rows[dists <= radius ** 2])
+
+    # radius query for a batch of locations
+    def query_pairs(self, points=None, radius=None):
+        """
+        this function finds all (query, fire spot) pairs within a radius (at most the cell size). Query locations sharing a cell are
+        processed together, so the Python overhead scales with the number of occupied cells rather than with the number of queries.
+
+        :param points: array of query locations (first two columns are [x, y])
+        :param radius: the query radius (default:: the cell size)
+        :return: query row indices and the matching fire spot row indices
+        """
+
+        if points is None:
+            raise ValueError(">>> Oops! Function 'query_pairs()' needs the query locations to work!")
+
+        radius = self.cell_size if radius is None else radius
+        points = np.asarray(points, dtype=float)
+        query_idx, source_idx = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        if points.shape[0] == 0 or self.points.shape[0] == 0:
+            return query_idx[0], source_idx[0]
+
+        keys = self.cell_keys(points)
+        order = np.argsort(keys, kind='stable')
+        unique_keys, starts = np.unique(keys[order], return_index=True)
+        for key, group in zip(unique_keys.tolist(), np.split(order, starts[1:])):
+            rows = self.candidates(key)
+            if rows.shape[0] == 0:
+                continue
+            dists = (points[group, 0:1] - self.points[rows, 0]) ** 2 + (points[group, 1:2] - self.points[rows, 1]) ** 2
+            hit_group, hit_rows = np.nonzero(dists <= radius ** 2)
+            query_idx.append(group[hit_group])
+            source_idx.append(rows[hit_rows])
+
+        return np.concatenate(query_idx), np.concatenate(source_idx)
+
+
+# growable array buffer for the fire histories
+class FireMapBuffer(object):
+    """
+    Capacity-doubling array buffer for the fire histories that only grow by appending rows (e.g. the fire map and the terrain map). New
+    rows are copied into the spare capacity of a preallocated array, which is reallocated (at twice the size) only when it is full, so the
+    per-step append costs amortized O(new rows) instead of copying the whole history like np.concatenate() does. The live rows are exposed
+    as a zero-copy view, which keeps its length when more rows are appended later (i.e. earlier views remain valid snapshots, unless the
+    rows are modified in place).
+    """
+
+    def __init__(self, rows=None, num_cols=3, capacity=256):
+        if capacity <= 0:
+            raise ValueError(">>> Oops! The capacity of 'FireMapBuffer' must be positive.")
+
+        rows = np.zeros(shape=[0, num_cols]) if rows is None or len(rows) == 0 else np.asarray(rows, dtype=float)
+        self.num_cols = rows.shape[1]
+        self.size = 0                                                 # number of live rows
+        self.data = np.zeros(shape=[max(capacity, rows.shape[0]), self.num_cols])  # live rows followed by the spare capacity
+        self.append(rows)
+
+    # number of live rows
+    def __len__(self):
+        return self.size
+
+    # zero-copy view of the live rows
+    @property
+    def view(self):
+        return self.data[:self.size]
+
+    # appending new rows (e.g. the new fire-fronts) to the buffer
+    def append(self, rows=None):
+        """
+        this function appends new rows to the buffer, doubling its capacity whenever the new rows do not fit
+
+        :param rows: array of the new rows (an empty array is ignored)
+        :return: the view of the live rows
+        """
+
+        if rows is None or len(rows) == 0:
+            return self.view
+
+        rows = np.asarray(rows, dtype=float).reshape(-1, self.num_cols)
+        new_size = self.size + rows.shape[0]
+        if new_size > self.data.shape[0]:
+            capacity = self.data.shape[0]
+            while capacity < new_size:
+                capacity *= 2
+            data = np.zeros(shape=[capacity, self.num_cols])
+            data[:self.size] = self.data[:self.size]
+            self.data = data
+        self.data[self.size:new_size] = rows
+        self.size = new_size
+
+        return self.view
+
+    # keeping a subset of the rows (e.g. dropping the burnt-out fire spots)
+    def compact(self, keep=None):
+        """
+        this function removes rows from the buffer, keeping the order of the remaining ones (like np.delete() does). The kept rows move to
+        a new array of the same capacity, so the earlier views keep their rows and a FireSpotIndex over the buffer sees the change.
+
+        :param keep: boolean flag per live row (True:: the row is kept)
+        :return: the view of the live rows
+        """
+
+        if keep is None:
+            raise ValueError(">>> Oops! Function 'compact()' needs the rows to keep to work!")
+
+        rows = self.view[keep]
+        self.data = np.zeros(shape=self.data.shape)
+        self.data[:rows.shape[0]] = rows
+        self.size = rows.shape[0]
+
+        return self.view
+
+
+class TiledField(ABC):
+    """
+    Base of the tiled terrain fields (TerrainField, RasterField):: a [length, width] map split into tile_size x tile_size tiles and
+    indexed like the dense map with integer [x, y] indices, with the values scaled as value * scale + offset. The subclasses provide the
+    tiles through tile().
+    """
+
+    def __init__(self, shape=None, tile_size=64, scale=1.0, offset=0.0):
+        if shape is None or tile_size <= 0:
+            raise ValueError(">>> Oops! A tiled field needs the terrain shape and a positive tile size.")
+
+        self.shape = (int(shape[0]), int(shape[1]))  # terrain [length, width]
+        self.tile_size = int(tile_size)
+        self.num_tiles = (-(-self.shape[0] // self.tile_size), -(-self.shape[1] // self.tile_size))
+        self.scale = scale
+        self.offset = offset
+
+    # the values of tile [i, j] (a tile_size x tile_size array, smaller at the far edges), provided by the subclasses
+    @abstractmethod
+    def tile(self, i, j):
+        pass
+
+    # a view of the field (sharing its tiles) with another value range, e.g. per fire area fuel coefficients
+    def scaled(self, scale=1.0, offset=0.0):
+        field = object.__new__(type(self))
+        field.__dict__.update(self.__dict__)
+        field.scale, field.offset = scale, offset
+
+        return field
+
+    # checking the [x, y] indices against the terrain bounds (negative indices count from the end, like numpy)
+    def wrap_index(self, x_idx, y_idx):
+        if np.any(x_idx >= self.shape[0]) or np.any(x_idx < -self.shape[0]) or np.any(y_idx >= self.shape[1]) or np.any(y_idx < -self.shape[1]):
+            raise IndexError(">>> Oops! Index out of the terrain bounds " + str(self.shape))
+
+        return x_idx % self.shape[0], y_idx % self.shape[1]
+
+    # looking up the field at integer [x, y] indices (like the dense map)
+    def __getitem__(self, key):
+        if not isinstance(key, tuple) or len(key) != 2 or isinstance(key[0], slice) or isinstance(key[1], slice):
+            raise ValueError(">>> Oops! Tiled fields are indexed by [x, y] integer indices (use np.asarray() for the full map).")
+
+        # single cell (e.g. the 'loop' engine)
+        if isinstance(key[0], (int, np.integer)) and isinstance(key[1], (int, np.integer)):
+            x, y = self.wrap_index(int(key[0]), int(key[1]))
+            i, j = x // self.tile_size, y // self.tile_size
+            return self.tile(i, j)[x - i * self.tile_size, y - j * self.tile_size] * np.float32(self.scale) + np.float32(self.offset)
+
+        x_idx, y_idx = np.broadcast_arrays(np.asarray(key[0], dtype=np.int64), np.asarray(key[1], dtype=np.int64))
+        x_idx, y_idx = self.wrap_index(x_idx, y_idx)
+
+        return self.lookup(x_idx, y_idx) * np.float32(self.scale) + np.float32(self.offset)
+
+    # gathering the (unscaled) values of a set of cells, tile by tile
+    def lookup(self, x_idx=None, y_idx=None):
+        tile_x, tile_y = x_idx // self.tile_size, y_idx // self.tile_size
+        keys, inverse = np.unique(tile_x.ravel() * self.num_tiles[1] + tile_y.ravel(), return_inverse=True)
+        values = np.empty(x_idx.size, dtype=np.float32)
+        for k, key in enumerate(keys.tolist()):
+            i, j = divmod(key, self.num_tiles[1])
+            cells = inverse == k
+            values[cells] = self.tile(i, j)[x_idx.ravel()[cells] - i * self.tile_size, y_idx.ravel()[cells] - j * self.tile_size]
+
+        return values.reshape(x_idx.shape)
+
+    # the full (materialized) map
+    def __array__(self, dtype=None, copy=None):
+        x_idx, y_idx = np.meshgrid(np.arange(self.shape[0]), np.arange(self.shape[1]), indexing='ij')
+        values = self[x_idx, y_idx]
+
+        return values if dtype is None else values.astype(dtype)
+
+
+class TerrainField(TiledField):
+    """
+    Lazily generated geo-physical terrain field (the spread rate map), i.e. uniform random values in [offset, offset + scale) stored as
+    float32. Each tile is generated on its first touch from its own seed, so the field does not depend on the order (or the process) in
+    which its tiles are touched and the untouched tiles cost no memory. A field can be shared read-only across the fire areas (scaled()
+    views with their own fuel coefficients) and, when created with shared=True, across worker processes (the tiles are kept in shared
+    memory; it must be passed to the processes when they are started, like the FireCommanderParallel buffers are).
+    """
+
+    def __init__(self, shape=None, tile_size=64, seed=None, scale=1.0, offset=0.0, shared=False, ctx=None):
+        TiledField.__init__(self, shape=shape, tile_size=tile_size, scale=scale, offset=offset)
+        self.seed = np.random.SeedSequence(seed).entropy  # base seed of the per-tile random number generators
+        self.shared = shared
+
+        num_values = self.num_tiles[0] * self.num_tiles[1] * self.tile_size ** 2
+        if shared:
+            if ctx is None:
+                import multiprocessing as ctx
+            self.tile_buffer = ctx.RawArray('f', num_values)  # float32 tiles
+            self.ready_buffer = ctx.RawArray('b', self.num_tiles[0] * self.num_tiles[1])  # generated-tile flags
+        else:
+            self.tile_buffer = np.zeros(num_values, dtype=np.float32)
+            self.ready_buffer = np.zeros(self.num_tiles[0] * self.num_tiles[1], dtype=np.int8)
+        self.build_views()
+
+    # numpy views of the tile buffers (tiles are contiguous, so the untouched ones are never paged in)
+    def build_views(self):
+        self.tiles = np.frombuffer(self.tile_buffer, dtype=np.float32).reshape(self.num_tiles + (self.tile_size, self.tile_size))
+        self.ready = np.frombuffer(self.ready_buffer, dtype=np.int8).reshape(self.num_tiles)
+
+    # the tile buffers are pickled (e.g. to the worker processes), not their views
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['tiles'], state['ready']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.build_views()
+
+    # the values of a tile, generated from its own seed on the first touch (a tile that is generated concurrently by two processes gets
+    # the same values in both)
+    def tile(self, i, j):
+        if self.ready[i, j] == 0:
+            tile_rng = np.random.default_rng([self.seed, i, j])
+            self.tiles[i, j] = tile_rng.random((self.tile_size, self.tile_size), dtype=np.float32)
+            self.ready[i, j] = 1
+
+        return self.tiles[i, j]
+
+    # gathering the (unscaled) values of a set of cells (all the tiles are in one array)
+    def lookup(self, x_idx=None, y_idx=None):
+        tile_x, tile_y = x_idx // self.tile_size, y_idx // self.tile_size
+        missing = self.ready[tile_x, tile_y] == 0
+        if np.any(missing):
+            for i, j in set(zip(tile_x[missing].tolist(), tile_y[missing].tolist())):
+                self.tile(i, j)
+
+        return self.tiles[tile_x, tile_y, x_idx % self.tile_size, y_idx % self.tile_size]
+
+    # memory taken by the generated tiles (bytes)
+    def resident_bytes(self):
+        return int(np.count_nonzero(self.ready)) * self.tile_size ** 2 * 4
+
+
+class RasterField(TiledField):
+    """
+    External geo-physical raster (e.g. a fuel coefficient or wind map) kept on disk and memory-mapped (a .npy file, or a raw binary file
+    given its shape and dtype), so terrains far larger than RAM can be indexed [x, y] like the dense maps. The tiles in use are read into
+    a least-recently-used cache of at most cache_tiles float32 tiles, i.e. the resident memory depends on the cache size rather than on
+    the world size. prefetch() reads the tiles around the active fire and the agents ahead of the fire propagation.
+    """
+
+    def __init__(self, source=None, shape=None, dtype=np.float32, tile_size=256, cache_tiles=64, scale=1.0, offset=0.0):
+        if source is None or cache_tiles < 1:
+            raise ValueError(">>> Oops! 'RasterField' needs a raster (file or array) and room for at least one cached tile.")
+
+        self.path = source if isinstance(source, str) else None
+        self.dtype = dtype
+        self.raster = self.open_raster(source, shape, dtype)
+        if self.raster.ndim != 2:
+            raise ValueError(">>> Oops! The terrain rasters must be 2D [length, width] maps.")
+        TiledField.__init__(self, shape=self.raster.shape, tile_size=tile_size, scale=scale, offset=offset)
+        self.cache_tiles = cache_tiles
+        self.cache = OrderedDict()  # (i, j) -> tile, in the least to the most recently used order
+        self.hits, self.misses = 0, 0
+
+    # memory-mapping a raster file (arrays, e.g. an existing np.memmap, are used as they are)
+    @staticmethod
+    def open_raster(source=None, shape=None, dtype=np.float32):
+        if not isinstance(source, str):
+            return np.asarray(source) if not isinstance(source, np.memmap) else source
+        if source.endswith('.npy'):
+            return np.load(source, mmap_mode='r')
+        if shape is None:
+            raise ValueError(">>> Oops! The shape of a raw raster file is required to map it.")
+
+        return np.memmap(source, dtype=dtype, mode='r', shape=tuple(shape))
+
+    # the raster files are re-mapped (with an empty cache) after pickling, e.g. in the worker processes, instead of being copied
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.path is not None:
+            state['raster'] = None
+        state['cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.raster is None:
+            self.raster = self.open_raster(self.path, self.shape, self.dtype)
+
+    # the values of a tile (read from the raster on a cache miss, evicting the least recently used tile when the cache is full)
+    def tile(self, i, j):
+        tile = self.cache.get((i, j))
+        if tile is not None:
+            self.hits += 1
+            self.cache.move_to_end((i, j))
+            return tile
+
+        self.misses += 1
+        tile = np.array(self.raster[i * self.tile_size:(i + 1) * self.tile_size, j * self.tile_size:(j + 1) * self.tile_size], dtype=np.float32)
+        self.cache[(i, j)] = tile
+        while len(self.cache) > self.cache_tiles:
+            self.cache.popitem(last=False)
+
+        return tile
+
+    # reading the tiles around a set of locations ahead of time (e.g. the fire-fronts and the agents)
+    def prefetch(self, points=None, radius=0):
+        """
+        this function loads the tiles within the radius of a set of locations into the cache (as the most recently used ones)
+
+        :param points: array of locations (first two columns are [x, y])
+        :param radius: radius around each location to cover (e.g. the radiation radius or the agents' field of view)
+        :return: None
+        """
+
+        if points is None or len(points) == 0:
+            return
+
+        points = np.asarray(points, dtype=float).reshape(len(points), -1)[:, 0:2]
+        lower = np.clip(np.floor((points - radius) / self.tile_size), 0, np.array(self.num_tiles) - 1).astype(np.int64)
+        upper = np.clip(np.floor((points + radius) / self.tile_size), 0, np.array(self.num_tiles) - 1).astype(np.int64)
+        num_tiles = self.num_tiles[0] * self.num_tiles[1]
+        tiles = set()
+        for key in np.unique((lower[:, 0] * self.num_tiles[1] + lower[:, 1]) * num_tiles + upper[:, 0] * self.num_tiles[1] + upper[:, 1]).tolist():
+            (i0, j0), (i1, j1) = divmod(key // num_tiles, self.num_tiles[1]), divmod(key % num_tiles, self.num_tiles[1])
+            tiles.update((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+        for i, j in sorted(tiles)[-self.cache_tiles:]:
+            self.tile(i, j)
+
+    # memory taken by the cached tiles (bytes)
+    def resident_bytes(self):
+        return sum(tile.nbytes for tile in self.cache.values())
+
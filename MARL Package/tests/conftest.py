@@ -0,0 +1,12 @@
+"""
+# Regression checks of the MARL package:: python -m pytest "MARL Package/tests"
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import os
+import sys
+
+# the env modules are imported by name (as in the training scripts), from the package directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,102 @@
+"""
+# Regression checks of FireCommanderEasy:: the batched env, the in-place state update and the compact FOV encoding against the reference
+# (scalar, full update and dense) implementations
+#
+# Published under GNU GENERAL PUBLIC LICENSE ver. 3 (or any later version)
+#
+"""
+
+import numpy as np
+import pytest
+from FireCommander_Base import FireCommanderEasy
+from FireCommander_Base_Utilities import EnvUtilities
+from FireCommander_Base_Vec import FireCommanderEasyVec
+
+
+# the dense vectorized FOV of one agent, square by square (the per-square encoding FOV_index_encoding replaced)
+def reference_FOV(state_space, center, NumP, NumA, world_size, vision):
+    num_agents = NumP + NumA + 1
+    width = 2 * vision + 1
+    FOV = np.zeros((width, width, world_size ** 2 + num_agents + 2))
+    for i_x, x in enumerate(range(center[0] - vision, center[0] + vision + 1)):
+        for i_y, y in enumerate(range(center[1] - vision, center[1] + vision + 1)):
+            if x < 0 or y < 0 or x >= world_size or y >= world_size:
+                FOV[i_x, i_y, world_size ** 2 + num_agents] = 1  # out of bounds
+                continue
+            FOV[i_x, i_y, :world_size ** 2] = EnvUtilities.position_one_hot(x, y, world_size)
+            FOV[i_x, i_y, world_size ** 2] = state_space[0][x, y] in [1, 2]  # fire
+            FOV[i_x, i_y, world_size ** 2 + num_agents + 1] = state_space[0][x, y] == 2  # seen before
+            for agent_idx in range(1, num_agents):
+                FOV[i_x, i_y, world_size ** 2 + agent_idx] = state_space[agent_idx][x, y] == 1
+
+    return FOV
+
+
+@pytest.mark.parametrize('r_func, water_dump_action, vision, termination_rewrad',
+                         [('RF1', True, 1, True), ('RF2', False, 1, False), ('RF3', True, 2, False), ('RF3', False, 2, True)])
+def test_vec_env_matches_scalar_env(r_func, water_dump_action, vision, termination_rewrad):
+    for trial in range(5):
+        env = FireCommanderEasy(vision=vision, local_reward_ratio=0.3, termination_rewrad=termination_rewrad, fireSpots_Num=8, seed=trial)
+        env.env_init(water_dump_action=water_dump_action, comm_range=3)
+
+        # one batched episode, started from the scalar env's initial fire spots and agent positions
+        vec_env = FireCommanderEasyVec(num_envs=1, vision=vision, local_reward_ratio=0.3, termination_rewrad=termination_rewrad,
+                                       fireSpots_Num=8, seed=trial)
+        vec_env.env_init(water_dump_action=water_dump_action, comm_range=3)
+        vec_env.fire_map[:] = 0
+        vec_env.fire_map.reshape(1, -1)[0, env.firespot_loci] = 1
+        vec_env.agent_pos[0] = np.array(env.agent_state)[:, 0:2]
+        vec_env.state_matrix_update()
+        vec_env.adjacency = vec_env.get_adjacency_matrices()
+
+        action_rng = np.random.default_rng(trial)
+        step = 0
+        for t in range(150):
+            action = list(action_rng.integers(0, 4, 2)) + list(action_rng.integers(0, 5 if water_dump_action else 4, 2))
+            state, reward, done, outcom_flg, step, p_c, a_c = env.env_step(action, step=step, r_func=r_func, max_steps=120)
+            vec_state, vec_reward, vec_done, vec_outcom_flg, vec_step, vec_p_c, vec_a_c = \
+                vec_env.env_step(np.array([action]), r_func=r_func, max_steps=120)
+
+            assert np.allclose(reward, vec_reward[0])
+            assert np.array_equal(state, vec_env.final_state[0] if vec_done[0] else vec_state[0])
+            assert (done, outcom_flg, step) == (vec_done[0], vec_outcom_flg[0], vec_step[0])
+            assert np.isclose(p_c, vec_p_c[0]) and np.isclose(a_c, vec_a_c[0])
+            if done:
+                break
+
+
+def test_delta_update_matches_full_update():
+    states = []
+    for delta_update in [False, True]:
+        env = FireCommanderEasy(fireSpots_Num=10, seed=1, delta_update=delta_update)
+        env.env_init()
+        action_rng = np.random.default_rng(0)
+        states.append([env.state.copy()])
+        for step in range(60):
+            state = env.env_step(list(action_rng.integers(0, 5, 4)), step=step)[0]
+            states[-1].append(state.copy())  # the in-place state is overwritten by the next step
+
+    for full_state, delta_state in zip(*states):
+        assert np.array_equal(full_state, delta_state)
+
+
+@pytest.mark.parametrize('world_size, vision', [(10, 1), (10, 2), (13, 3)])
+def test_FOV_index_encoding_round_trips_to_dense(world_size, vision):
+    env = FireCommanderEasy(world_size=world_size, vision=vision, fireSpots_Num=30, seed=world_size + vision)
+    env.env_init()
+    for step in range(20):
+        env.env_step(list(env.rng.integers(0, 5, 4)), step=step)
+
+        position, features = env.get_FOV_vectorized(encoding='index')
+        dense = EnvUtilities.FOV_index_to_dense(position, features, world_size)
+        for i in range(env.perception_agent_num):
+            expected = reference_FOV(env.state, env.agent_state[i][0:2], 2, 2, world_size, vision)
+            assert np.array_equal(dense[i], expected)
+            assert np.array_equal(env.get_FOV_vectorized()[i], expected)
+
+
+def test_FOV_unknown_encoding():
+    env = FireCommanderEasy(seed=0)
+    env.env_init()
+    with pytest.raises(ValueError):
+        env.get_FOV_vectorized(encoding='sparse')